@@ -1,18 +1,44 @@
 import os
+
+# Socket.IO 비동기 모드 (threading | eventlet | gevent). 그린스레드 모드는 다른 import보다 먼저 패치해야 함
+SOCKETIO_ASYNC_MODE = os.environ.get("SOCKETIO_ASYNC_MODE") or None
+if SOCKETIO_ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+elif SOCKETIO_ASYNC_MODE == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 import io
 import base64
 import zipfile
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, session, jsonify, Response
-from werkzeug.utils import secure_filename
+import zlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, session, jsonify, Response, g, stream_with_context
+from werkzeug.utils import secure_filename, safe_join
 import tempfile
+import mimetypes
 import uuid
 import json
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 import time
-from ocr_client import ncp_ocr
+import threading
+import sqlite3
+from ocr_client import ncp_ocr, ncp_breaker, ocr_status, ocr_routing, paddle_ocr_batch
+import tracing
+from progress import ProgressReporter, NULL_PROGRESS, new_progress_token, valid_progress_token
+import metrics
+import recommendation_rules
+import thumbnails
+from result_store import ResultStore
+from upload_store import UploadStore, new_upload_id, valid_upload_id
+from image_hash import PhashIndex, phash, hamming, content_digest, same_picture
+from socket_queue import socketio_queue_options
+from metrics import UPLOAD_BYTES, PARSE_SECONDS, ANALYSES_IN_FLIGHT, STATISTICAL_FALLBACKS, RESULT_PAGE_VIEWS, DUPLICATE_IMAGES
 from parser import parse_ocr_payload, merge_totals, normalize_units, calculate_full_package_nutrition
 from rdi import RDI_MALE, RDI_FEMALE, DISPLAY_ORDER
-from llm_client import get_nutrition_recommendation, calculate_deficient_nutrients, calculate_excessive_nutrients, get_reduction_recommendation, get_nutrition_recommendation_streaming, get_reduction_recommendation_streaming, get_comprehensive_nutrition_analysis_streaming
+from llm_client import get_nutrition_recommendation, calculate_deficient_nutrients, calculate_excessive_nutrients, get_reduction_recommendation, get_nutrition_recommendation_streaming, get_reduction_recommendation_streaming, get_comprehensive_nutrition_analysis_streaming, get_statistical_comprehensive_recommendation, get_statistical_reduction_recommendation, is_llm_available
 
 ALLOWED_EXT = {"png", "jpg", "jpeg", "webp"}
 
@@ -20,12 +46,88 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret")
 
 # SocketIO 초기화
-socketio = SocketIO(app, cors_allowed_origins="*")
+# 여러 프로세스로 띄울 때는 SOCKETIO_MESSAGE_QUEUE로 room/emit을 공유
+# (sqlite:///경로, unix:///경로, redis://... - socket_queue.py 참고)
+SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE", "")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=SOCKETIO_ASYNC_MODE,
+                    **socketio_queue_options(SOCKETIO_MESSAGE_QUEUE))
+
+# 점진적 모드: 통계 기반 추천을 먼저 보여주고 LLM 응답이 오면 교체
+PROGRESSIVE_MODE = os.environ.get("PROGRESSIVE_MODE", "1") != "0"
+
+# 분석 결과 저장소 (SQLite, 워커 간 공유) - /results/<id> 렌더링과 백그라운드 추천 갱신에 사용
+RECOMMENDATION_KEYS = ("male_recommendation", "female_recommendation", "male_reduction", "female_reduction")
+result_store = ResultStore()
+
+# 브라우저에서 업로드 전에 이미지를 줄이는 설정 (긴 변 픽셀, 0이면 사용 안 함)
+CLIENT_RESIZE_MAX_DIM = int(os.environ.get("CLIENT_RESIZE_MAX_DIM", "2048"))
+CLIENT_RESIZE_QUALITY = float(os.environ.get("CLIENT_RESIZE_QUALITY", "0.85"))
+# 줄인 이미지의 OCR 평균 신뢰도가 이보다 낮거나 영양성분을 못 찾으면 원본을 다시 요청
+ORIGINAL_MIN_CONFIDENCE = float(os.environ.get("ORIGINAL_MIN_CONFIDENCE", "0.85"))
+# 네이버 OCR을 쓰지 않을 때(미설정/차단) 업로드 이미지들의 글자 조각을 모아 PaddleOCR로 한 번에 인식
+PADDLE_OCR_BATCH = os.environ.get("PADDLE_OCR_BATCH", "1") == "1"
+
+# 결과 페이지 HTML 캐시에는 이 자리표시자를 넣고 응답할 때마다 새 progress_token으로 바꿈
+PROGRESS_TOKEN_PLACEHOLDER = "__progress_token__"
+
+# 백그라운드 LLM 스트리밍 중인 분석 (늦게 접속한 클라이언트에 누적 본문 전달용, 이 프로세스에서 생성 중인 것만)
+# 여러 워커로 실행하면 다른 워커에 접속한 클라이언트를 위해 누적 본문을 result_store에도 저장 (set_partial)
+analysis_streams = {}
+analysis_streams_lock = threading.Lock()
+
+logger = tracing.get_logger("app")
+
+# 추천 문구 조각 캐시 효율을 /metrics에 노출
+metrics.register_lru_caches({
+    "nutrient_name": recommendation_rules.nutrient_name,
+    "render_line": recommendation_rules.render_line,
+    "render_overall": recommendation_rules.render_overall,
+})
+
+
+@app.before_request
+def start_request_trace():
+    """요청마다 요청 ID 발급 (클라이언트가 X-Request-ID를 보내면 그대로 사용)"""
+    g.trace_tokens = tracing.start_request(request.headers.get("X-Request-ID"))
+
+
+@app.after_request
+def add_request_id_header(response):
+    request_id = tracing.current_request_id()
+    if request_id:
+        response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.teardown_request
+def end_request_trace(exc=None):
+    tokens = g.pop("trace_tokens", None)
+    if tokens:
+        tracing.end_request(tokens)
 
 # 업로드된 이미지 임시 저장 폴더
 UPLOAD_FOLDER = os.path.join(os.getcwd(), 'temp_uploads')
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+
+# 업로드 이미지 캐시/전송 설정
+# 파일명에 uuid가 붙어 내용이 바뀌지 않으므로 브라우저가 오래 캐시해도 안전
+UPLOAD_CACHE_MAX_AGE = int(os.environ.get("UPLOAD_CACHE_MAX_AGE", "86400"))
+# 앞단 nginx에 파일 전송을 넘길 internal location (예: /_uploads/ -> alias temp_uploads/)
+UPLOAD_ACCEL_REDIRECT = os.environ.get("UPLOAD_ACCEL_REDIRECT", "")
+# Apache mod_xsendfile / lighttpd 사용 시 1 (Flask send_file이 X-Sendfile 헤더로 응답)
+app.use_x_sendfile = os.environ.get("UPLOAD_X_SENDFILE", "0") == "1"
+
+# 세션/요청별 하위 디렉터리에 저장하고, 오래된 디렉터리는 백그라운드에서 정리 (UPLOAD_TTL, UPLOAD_MAX_BYTES)
+# 여러 워커로 실행해도 파일 잠금을 잡은 워커 하나만 정리
+upload_store = UploadStore(UPLOAD_FOLDER)
+metrics.REGISTRY.register_collector(upload_store.collect)
+upload_store.start_sweeper()
+
+# 같은 세션에서 이전에 올린 같은 사진(pHash 후보 + 바이트/픽셀 비교 확인)의 OCR/파싱 결과 (업로드 ID별)
+# 워커 프로세스마다 따로 보관: sticky session이면 같은 세션은 같은 워커로 오고, 다른 워커로 가면 OCR을 다시 할 뿐
+phash_index = PhashIndex()
+
+# 네이버 OCR 회로 차단기 상태 (/metrics, /api/ocr/status)
+metrics.REGISTRY.register_collector(ncp_breaker.collect)
 
 # nl2br 필터 추가 (개행문자를 <br> 태그로 변환)
 @app.template_filter('nl2br')
@@ -40,17 +142,238 @@ def allowed(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXT
 
 
+def generate_recommendations(totals, male_pct, female_pct, male_deficient, male_excessive,
+                             female_deficient, female_excessive, progress=NULL_PROGRESS,
+                             stream=None, room=None):
+    """남/녀 종합 분석과 과다 영양소 감소 방법을 LLM(실패 시 통계 기반)으로 생성합니다.
+
+    room이 있으면 LLM 토큰을 섹션(male/female × recommendation/reduction)별로 해당 room에 스트리밍합니다.
+    stream은 socketio 대신 쓸 중계 객체 (RecommendationStream)입니다.
+    """
+    stream = stream or socketio
+    # AI 추천 생성 시작 신호 (웹소켓)
+    progress.emit('recommendation', 0, 'AI 추천 생성 시작...')
+
+    # 종합 영양 분석 및 추천 (남성 기준) - 1번의 LLM 호출로 모든 분석
+    logger.debug("Starting comprehensive male analysis")
+    progress.emit('recommendation', 25, '👨 남성 기준 종합 분석 중...')
+    
+    male_comprehensive = get_comprehensive_nutrition_analysis_streaming(
+        totals=totals,
+        male_pct=male_pct,
+        female_pct=female_pct,
+        deficient_nutrients=male_deficient,
+        excessive_nutrients=male_excessive,
+        rdi_info=RDI_MALE,
+        gender="male",
+        socketio=stream,
+        session_id=room,
+        section="male_recommendation"
+    )
+    logger.debug("Male comprehensive result", preview=male_comprehensive[:200] if male_comprehensive else None)
+    
+    # 종합 영양 분석 및 추천 (여성 기준) - 1번의 LLM 호출로 모든 분석
+    logger.debug("Starting comprehensive female analysis")
+    progress.emit('recommendation', 75, '👩 여성 기준 종합 분석 중...')
+    
+    female_comprehensive = get_comprehensive_nutrition_analysis_streaming(
+        totals=totals,
+        male_pct=male_pct,
+        female_pct=female_pct,
+        deficient_nutrients=female_deficient,
+        excessive_nutrients=female_excessive,
+        rdi_info=RDI_FEMALE,
+        gender="female",
+        socketio=stream,
+        session_id=room,
+        section="female_recommendation"
+    )
+    logger.debug("Female comprehensive result", preview=female_comprehensive[:200] if female_comprehensive else None)
+    
+    # 기존 변수들을 종합 분석 결과로 설정 (호환성 유지)
+    male_recommendation = male_comprehensive
+    female_recommendation = female_comprehensive  # 각각의 성별 맞춤 종합 분석
+    
+    # 과다 섭취 영양소 감소 방법 생성 (별도 LLM 호출)
+    logger.debug("Starting reduction recommendations")
+    
+    # 남성 기준 과다 섭취 감소 방법
+    if male_excessive:
+        progress.emit('recommendation', 80, '👨 남성 과다 영양소 감소 방법 생성 중...')
+        male_reduction = get_reduction_recommendation_streaming(
+            excessive_nutrients=male_excessive,
+            rdi_info=RDI_MALE,
+            gender="male",
+            socketio=stream,
+            session_id=room,
+            section="male_reduction"
+        )
+        logger.debug("Male reduction result", preview=male_reduction[:100] if male_reduction else None)
+    else:
+        male_reduction = ""
+    
+    # 여성 기준 과다 섭취 감소 방법
+    if female_excessive:
+        progress.emit('recommendation', 85, '👩 여성 과다 영양소 감소 방법 생성 중...')
+        female_reduction = get_reduction_recommendation_streaming(
+            excessive_nutrients=female_excessive,
+            rdi_info=RDI_FEMALE,
+            gender="female",
+            socketio=stream,
+            session_id=room,
+            section="female_reduction"
+        )
+        logger.debug("Female reduction result", preview=female_reduction[:100] if female_reduction else None)
+    else:
+        female_reduction = ""
+    
+    # AI 사용 여부 최종 분석 및 로그 출력
+    male_is_ai = male_recommendation and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in male_recommendation
+    female_is_ai = female_recommendation and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in female_recommendation
+    male_reduction_is_ai = male_reduction and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in male_reduction
+    female_reduction_is_ai = female_reduction and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in female_reduction
+    
+    # 전체 AI 사용률 계산 (추천 + 감소 방법)
+    total_functions = 2  # 기본 남성/여성 추천
+    ai_success_count = sum([bool(male_is_ai), bool(female_is_ai)])
+    
+    if male_excessive:
+        total_functions += 1
+        ai_success_count += bool(male_reduction_is_ai)
+    if female_excessive:
+        total_functions += 1
+        ai_success_count += bool(female_reduction_is_ai)
+    
+    ai_usage_rate = (ai_success_count / total_functions) * 100 if total_functions > 0 else 0
+    
+    # AI 사용 현황 요약 (한 줄 구조화 로그)
+    logger.info("영양 분석 완료 - AI 사용 현황",
+                male="ai" if male_is_ai else "statistical",
+                female="ai" if female_is_ai else "statistical",
+                male_reduction=("ai" if male_reduction_is_ai else "statistical") if male_excessive else "-",
+                female_reduction=("ai" if female_reduction_is_ai else "statistical") if female_excessive else "-",
+                ai_usage=f"{ai_success_count}/{total_functions}",
+                ai_usage_rate=round(ai_usage_rate))
+
+    return {
+        "male_recommendation": male_recommendation,
+        "female_recommendation": female_recommendation,
+        "male_reduction": male_reduction,
+        "female_reduction": female_reduction,
+    }
+
+
+def get_instant_recommendations(male_deficient, male_excessive, female_deficient, female_excessive):
+    """LLM 응답 전 즉시 보여줄 통계 기반 추천 (점진적 모드)"""
+    STATISTICAL_FALLBACKS.labels("comprehensive", "instant").inc(2)
+    if male_excessive or female_excessive:
+        STATISTICAL_FALLBACKS.labels("reduction", "instant").inc(bool(male_excessive) + bool(female_excessive))
+    return {
+        "male_recommendation": get_statistical_comprehensive_recommendation(male_deficient, male_excessive, RDI_MALE, "male", is_fallback=False),
+        "female_recommendation": get_statistical_comprehensive_recommendation(female_deficient, female_excessive, RDI_FEMALE, "female", is_fallback=False),
+        "male_reduction": get_statistical_reduction_recommendation(male_excessive, RDI_MALE, "male", is_fallback=False) if male_excessive else "",
+        "female_reduction": get_statistical_reduction_recommendation(female_excessive, RDI_FEMALE, "female", is_fallback=False) if female_excessive else "",
+    }
+
+
+class RecommendationStream:
+    """LLM 토큰을 분석 room으로 중계하면서 섹션별 누적 본문을 보관하는 socketio 대체 객체
+
+    store가 있으면 조각마다 누적 본문을 먼저 저장한 뒤 전송하므로, 다른 워커에서 저장본을 읽은 클라이언트는
+    이어지는 조각을 offset으로 빠짐없이(또는 중복으로 무시하며) 이어 붙일 수 있습니다.
+    """
 
+    def __init__(self, analysis_id=None, store=None):
+        self.analysis_id = analysis_id
+        self.store = store
+        self.partial = {}
+        self.lock = threading.Lock()
+
+    def emit(self, event, payload, room=None):
+        section = payload.get("section")
+        if section:
+            with self.lock:
+                if payload.get("type") == "chunk":
+                    self.partial[section] = self.partial.get(section, "") + payload["data"]
+                elif payload.get("type") == "complete":
+                    self.partial[section] = payload["data"]
+                if self.store is not None and payload.get("type") in ("chunk", "complete"):
+                    try:
+                        self.store.set_partial(self.analysis_id, self.partial)
+                    except sqlite3.Error as e:
+                        # 다른 워커의 늦은 접속자만 영향받으므로 스트리밍은 계속 (complete 이벤트로 전체 본문 전달)
+                        logger.warning("추천 누적 본문 저장 실패", analysis_id=self.analysis_id, error=str(e))
+        socketio.emit(event, payload, room=room)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.partial)
+
+
+def upgrade_recommendations(analysis_id, request_id, *args):
+    """백그라운드에서 LLM 추천을 생성하고 저장된 결과와 클라이언트 화면을 갱신합니다."""
+    stream = RecommendationStream(analysis_id, result_store if SOCKETIO_MESSAGE_QUEUE else None)
+    with analysis_streams_lock:
+        analysis_streams[analysis_id] = stream
+    try:
+        # 업로드 요청과 같은 요청 ID로 로그/span을 남김
+        with tracing.request_context(request_id), tracing.span("recommendation", background=True), \
+                ANALYSES_IN_FLIGHT.labels("recommendation").track_inprogress():
+            recommendations = generate_recommendations(*args, stream=stream, room=analysis_id)
+        status = "complete"
+    except Exception:
+        logger.exception("백그라운드 AI 추천 생성 중 오류", analysis_id=analysis_id)
+        recommendations = {}
+        status = "failed"
+
+    with analysis_streams_lock:
+        analysis_streams.pop(analysis_id, None)
+    # 저장된 결과를 갱신하면 캐시된 결과 페이지 HTML도 무효화됨
+    stored = result_store.update(analysis_id, dict(recommendations, recommendation_status=status,
+                                                   recommendation_pending=False))
+    if stream.store is not None:
+        result_store.clear_partial(analysis_id)  # 이후 접속자는 갱신된 결과(status != pending)를 받음
+    payload = recommendation_payload(analysis_id, stored) if stored else None
+
+    if payload:
+        try:
+            socketio.emit('recommendation_update', payload, room=analysis_id)
+        except Exception as e:
+            # 저장은 끝났으므로 클라이언트는 /analysis/<id>/recommendations 폴링이나 새로고침으로 받을 수 있음
+            logger.warning("추천 갱신 이벤트 전송 실패", analysis_id=analysis_id, error=str(e))
+
+
+def recommendation_payload(analysis_id, stored):
+    """recommendation_update 이벤트/조회 API 공통 응답 형식"""
+    return {
+        "analysis_id": analysis_id,
+        "status": stored.get("recommendation_status"),
+        "male_recommendation": stored.get("male_recommendation"),
+        "female_recommendation": stored.get("female_recommendation"),
+        "male_reduction": stored.get("male_reduction"),
+        "female_reduction": stored.get("female_reduction"),
+    }
+
+
+@app.context_processor
+def inject_client_resize():
+    """업로드 폼의 브라우저 측 축소 설정 (data-* 속성으로 person.js에 전달)"""
+    return {"client_resize": {"max_dim": CLIENT_RESIZE_MAX_DIM, "quality": CLIENT_RESIZE_QUALITY}}
 
 
 @app.route("/", methods=["GET"])
 def index():
-    return render_template("index.html")
+    return render_template("index.html", progress_token=new_progress_token())
 
 
 @app.route("/reset", methods=["POST", "GET"])
 def reset():
     """초기화 버튼 처리 (POST) 및 새로고침 리다이렉트 처리 (GET)"""
+    # 이 세션의 업로드 디렉터리만 정리 (rename 한 번, 실제 삭제는 백그라운드 스위퍼)
+    upload_id = session.get("upload_id")
+    if valid_upload_id(upload_id):
+        upload_store.discard(upload_id)
+
     # Flash 메시지와 세션 데이터 클리어
     session.clear()
     
@@ -58,16 +381,6 @@ def reset():
     if '_flashes' in session:
         session.pop('_flashes', None)
     
-    # 임시 업로드 파일들도 정리
-    try:
-        import glob
-        temp_files = glob.glob(os.path.join(UPLOAD_FOLDER, '*'))
-        for temp_file in temp_files:
-            if os.path.isfile(temp_file):
-                os.remove(temp_file)
-    except Exception as e:
-        print(f"임시 파일 정리 중 오류: {e}")
-    
     # 초기화 완료 후 메인 페이지로 리다이렉트 (매개변수 추가)
     return redirect(url_for("index", from_reset="true"))
 
@@ -95,230 +408,684 @@ def download_samples():
         return redirect(url_for("index"))
 
 
-@app.route("/uploaded_image/<filename>")
-def uploaded_image(filename):
-    """업로드된 이미지 파일을 제공"""
-    try:
-        return send_file(os.path.join(UPLOAD_FOLDER, filename))
-    except Exception as e:
+def send_upload(upload_id, filename, thumbnail=False):
+    """업로드 파일을 캐시 헤더(ETag, Cache-Control)와 함께 전송. If-None-Match가 맞으면 304"""
+    path = safe_join(upload_store.root, upload_id, filename) if valid_upload_id(upload_id) else None
+    if path is None or not os.path.isfile(path):
         return "Image not found", 404
+    mimetype = None
+    if thumbnail:
+        # 업로드 때 만들지 못한 경우(이전 업로드 등) 첫 요청에서 생성, 이미지가 아니면 원본 전송
+        thumb_path = thumbnails.save_thumbnail(path)
+        if thumb_path:
+            path, mimetype = thumb_path, thumbnails.THUMBNAIL_MIMETYPE
+
+    if UPLOAD_ACCEL_REDIRECT:
+        response = Response(mimetype=mimetype or mimetypes.guess_type(path)[0] or "application/octet-stream")
+        response.headers["X-Accel-Redirect"] = f"{UPLOAD_ACCEL_REDIRECT.rstrip('/')}/{upload_id}/{os.path.basename(path)}"
+        response.cache_control.max_age = UPLOAD_CACHE_MAX_AGE
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=True, max_age=UPLOAD_CACHE_MAX_AGE)
+    # 사용자가 올린 사진이므로 공유 캐시에는 저장하지 않음
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
+@app.route("/uploaded_image/<upload_id>/<filename>")
+def uploaded_image(upload_id, filename):
+    """업로드된 원본 이미지 파일을 제공 (상세보기에서만 사용)"""
+    return send_upload(upload_id, filename)
+
+
+@app.route("/uploaded_image/<upload_id>/<filename>/thumbnail")
+def uploaded_thumbnail(upload_id, filename):
+    """결과 화면 섬네일용 축소 이미지"""
+    return send_upload(upload_id, filename, thumbnail=True)
+
+
+@app.route("/analysis/<analysis_id>/recommendations")
+def analysis_recommendations(analysis_id):
+    """저장된 추천 결과 조회 (웹소켓을 쓸 수 없는 클라이언트의 폴링용)"""
+    stored = result_store.get(analysis_id)
+    if stored is None:
+        return jsonify({"error": "not found"}), 404
+    return jsonify(recommendation_payload(analysis_id, stored))
+
+
+@app.route("/results/<analysis_id>")
+def results_page(analysis_id):
+    """저장된 분석 결과 페이지 (새로고침/공유 시 다시 분석하지 않고 저장소에서 렌더링)"""
+    # flash 메시지가 있으면 이번 응답에만 보여야 하므로 캐시를 쓰지도, 저장하지도 않음
+    flashed = bool(session.get("_flashes"))
+    if not flashed:
+        html = result_store.get_html(analysis_id)
+        if html:
+            RESULT_PAGE_VIEWS.labels("hit").inc()
+            return html.replace(PROGRESS_TOKEN_PLACEHOLDER, new_progress_token())
+
+    results, version = result_store.get_versioned(analysis_id)
+    if results is None:
+        flash("분석 결과를 찾을 수 없습니다. 보관 기간이 지났을 수 있으니 다시 분석해주세요.")
+        return redirect(url_for("index"))
+    RESULT_PAGE_VIEWS.labels("miss").inc()
+    html = render_template("index.html", results=results, progress_token=PROGRESS_TOKEN_PLACEHOLDER)
+    if not flashed:
+        result_store.set_html(analysis_id, html, version)
+    return html.replace(PROGRESS_TOKEN_PLACEHOLDER, new_progress_token())
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus 텍스트 형식 메트릭"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/ocr/status")
+def api_ocr_status():
+    """OCR 라우팅 상태 (네이버 OCR / 차단 후 PaddleOCR / 복구 시험 중)와 네이버 OCR 최근 실패율·응답 시간"""
+    return jsonify(ocr_status())
 
 
 @app.route("/upload", methods=["POST"])
 def upload():
-    if "images" not in request.files:
-        flash("이미지 파일을 선택하세요.")
-        return redirect(url_for("index"))
+    with ANALYSES_IN_FLIGHT.labels("upload").track_inprogress():
+        return process_upload()
 
-    files = request.files.getlist("images")
-    images_bytes = []
-    unsupported_files = []
-    
-    # 웹소켓으로 업로드 시작 신호 전송
+
+# JSON API(/api/analyze) 응답 필드
+API_FIELDS = ("analysis_id", "images", "totals", "percentages", "overall", "calorie_achievement",
+              "deficient", "excessive", "recommendations")
+API_IMAGE_FIELDS = ("filename", "status", "fields", "full_package", "ocr_texts", "ocr_confidence", "image_url",
+                    "thumbnail_url", "error", "phash", "duplicate_of", "ocr_reused")
+API_RECOMMENDATION_MODES = ("auto", "sync", "none")
+
+# ZIP 일괄 분석 제한
+ZIP_CONCURRENCY = int(os.environ.get("ZIP_CONCURRENCY", "4"))  # 동시에 OCR하는 이미지 수
+ZIP_MAX_IMAGES = int(os.environ.get("ZIP_MAX_IMAGES", "5000"))
+ZIP_MAX_MEMBER_BYTES = int(os.environ.get("ZIP_MAX_MEMBER_BYTES", str(20 * 1024 * 1024)))
+
+
+def parse_field_list(value) -> set:
+    """'a,b, c' -> {'a', 'b', 'c'}"""
+    return {v.strip() for v in (value or "").split(",") if v.strip()}
+
+
+def build_api_response(results, fields, exclude):
+    """분석 결과를 JSON API 스키마로 변환 (fields: 포함할 최상위 필드, exclude: 뺄 최상위/이미지 하위 필드)"""
+    selected = [f for f in API_FIELDS if (not fields or f in fields) and f not in exclude]
+    image_fields = [f for f in API_IMAGE_FIELDS if f not in exclude]
+    body = {}
+    for field in selected:
+        if field == "analysis_id":
+            if results["analysis_id"] is not None:  # 저장하지 않은 결과(recommendations=none)는 ID 없음
+                body[field] = results["analysis_id"]
+        elif field == "images":
+            body[field] = [{k: r[k] for k in image_fields if r.get(k) is not None} for r in results["images"]]
+        elif field == "totals":
+            body[field] = results["totals"]
+        elif field == "percentages":
+            body[field] = {"male": results["male_pct"], "female": results["female_pct"]}
+        elif field == "overall":
+            body[field] = {"male": results["male_overall"], "female": results["female_overall"]}
+        elif field == "calorie_achievement":
+            body[field] = {"male": results["male_calorie_achievement"], "female": results["female_calorie_achievement"]}
+        elif field == "deficient":
+            body[field] = {"male": results["male_deficient"], "female": results["female_deficient"]}
+        elif field == "excessive":
+            body[field] = {"male": results["male_excessive"], "female": results["female_excessive"]}
+        elif field == "recommendations":
+            recommendations = {key: results[key] for key in RECOMMENDATION_KEYS}
+            recommendations["status"] = results["recommendation_status"]
+            if results["recommendation_pending"]:
+                # 백그라운드 AI 추천 결과 조회 URL
+                recommendations["url"] = url_for("analysis_recommendations", analysis_id=results["analysis_id"])
+            body[field] = recommendations
+    return body
+
+
+@app.route("/api/analyze", methods=["POST"])
+def api_analyze():
+    """업로드와 같은 파이프라인을 실행하고 JSON으로 응답 (템플릿 렌더링 없음)
+
+    폼/쿼리 파라미터:
+    - fields: 포함할 최상위 필드 (쉼표 구분, 기본 전체)
+    - exclude: 제외할 필드 (최상위 또는 이미지 하위 필드, 예: ocr_texts,recommendations)
+    - recommendations: auto | sync | none (추천을 제외하면 none과 동일하게 생성 생략, 결과를 저장하지 않아 analysis_id 없음)
+    """
+    with ANALYSES_IN_FLIGHT.labels("upload").track_inprogress():
+        fields = parse_field_list(request.values.get("fields"))
+        exclude = parse_field_list(request.values.get("exclude"))
+        mode = request.values.get("recommendations", "auto")
+        if mode not in API_RECOMMENDATION_MODES:
+            return jsonify({"error": f"recommendations는 {', '.join(API_RECOMMENDATION_MODES)} 중 하나여야 합니다."}), 400
+        if "recommendations" in exclude or (fields and "recommendations" not in fields):
+            mode = "none"
+
+        # API 호출은 쿠키 세션이 없으므로 요청마다 새 디렉터리 (TTL/용량 기준으로 정리됨)
+        images_bytes, unsupported_files = save_uploaded_files(request.files.getlist("images"), new_upload_id())
+        if not images_bytes:
+            return jsonify({"error": "지원되는 이미지가 없습니다. PNG, JPG, JPEG, WEBP 파일을 images 필드로 보내주세요.",
+                            "unsupported_files": unsupported_files}), 400
+
+        progress = ProgressReporter(socketio, request.values.get("progress_token"))
+        results = analyze_images(images_bytes, progress, recommendation_mode=mode)
+        body = build_api_response(results, fields, exclude)
+        if unsupported_files:
+            body["unsupported_files"] = unsupported_files
+        return jsonify(body)
+
+
+@app.route("/api/analyze-zip", methods=["POST"])
+def api_analyze_zip():
+    """ZIP 안의 라벨 이미지를 일괄 분석하고 NDJSON으로 스트리밍 (한 줄에 이미지 하나, 마지막 줄은 합계)
+
+    압축은 풀지 않고 멤버를 하나씩 읽어 OCR 스레드 풀(ZIP_CONCURRENCY)에 넘기며,
+    대기 중인 작업은 동시 실행 수의 2배로 제한해 메모리에 올라가는 이미지 수를 묶어 둡니다.
+    결과 줄은 완료된 순서대로 나가므로 index로 ZIP 내 순서를 확인하세요.
+
+    폼 필드:
+    - archive: ZIP 파일
+    - exclude: 이미지 줄에서 뺄 필드 (예: ocr_texts)
+    """
+    archive = request.files.get("archive")
+    if archive is None or not archive.filename:
+        return jsonify({"error": "archive 필드로 ZIP 파일을 보내주세요."}), 400
     try:
-        socketio.emit('analysis_progress', {
-            'step': 'upload',
-            'progress': 0,
-            'message': f'{len(files)}개 파일 업로드 시작...',
-            'total_files': len(files)
+        zf = zipfile.ZipFile(archive.stream)
+    except zipfile.BadZipFile:
+        return jsonify({"error": "올바른 ZIP 파일이 아닙니다."}), 400
+
+    exclude = parse_field_list(request.values.get("exclude"))
+    image_fields = [f for f in API_IMAGE_FIELDS if f not in exclude]
+    members = [m for m in zf.infolist()
+               if not m.is_dir() and not m.filename.startswith("__MACOSX/")
+               and not os.path.basename(m.filename).startswith(".")]
+
+    def line(obj):
+        return json.dumps(obj, ensure_ascii=False) + "\n"
+
+    def generate():
+        counts = {"success": 0, "pass": 0, "skipped": 0}
+        totals = {}
+        accepted = 0
+        started = time.perf_counter()
+        with ANALYSES_IN_FLIGHT.labels("zip").track_inprogress(), zf, \
+                ThreadPoolExecutor(max_workers=ZIP_CONCURRENCY, thread_name_prefix="zip-ocr") as pool:
+            pending = {}
+
+            def finished(futures):
+                nonlocal totals
+                for future in futures:
+                    index = pending.pop(future)
+                    result = future.result()
+                    counts[result["status"]] += 1
+                    if result["status"] == "success" and result["full_package"] is not None:
+                        totals = merge_totals(totals, result["full_package"])
+                    body = {k: result[k] for k in image_fields if result.get(k) is not None}
+                    yield line({"type": "image", "index": index, **body})
+
+            for index, member in enumerate(members):
+                name = os.path.basename(member.filename)
+                reason = None
+                if not allowed(name):
+                    reason = "지원하지 않는 파일 형식"
+                elif accepted >= ZIP_MAX_IMAGES:
+                    reason = f"이미지 수 제한({ZIP_MAX_IMAGES}개) 초과"
+                elif member.file_size > ZIP_MAX_MEMBER_BYTES:
+                    reason = f"파일 크기 제한({ZIP_MAX_MEMBER_BYTES} bytes) 초과"
+                elif member.file_size == 0:
+                    reason = "빈 파일"
+                if reason:
+                    counts["skipped"] += 1
+                    yield line({"type": "image", "index": index, "filename": name, "status": "skipped", "error": reason})
+                    continue
+
+                # 대기 작업이 많으면 하나 이상 끝날 때까지 결과를 먼저 내보냄
+                while len(pending) >= ZIP_CONCURRENCY * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from finished(done)
+
+                try:
+                    content = zf.read(member)
+                except (zipfile.BadZipFile, zlib.error, RuntimeError, NotImplementedError, EOFError, OSError) as e:
+                    # CRC 오류/손상된 멤버, 암호화된 멤버(RuntimeError), 지원하지 않는 압축 방식
+                    logger.warning("ZIP 멤버 읽기 실패", filename=name, error=str(e))
+                    counts["skipped"] += 1
+                    yield line({"type": "image", "index": index, "filename": name, "status": "skipped",
+                                "error": f"압축 해제 실패: {e}"})
+                    continue
+                accepted += 1
+                UPLOAD_BYTES.observe(len(content))
+                # 요청 ID/스팬이 작업 스레드의 로그에도 이어지도록 컨텍스트 복사
+                ctx = contextvars.copy_context()
+                pending[pool.submit(ctx.run, analyze_image, secure_filename(name) or name, content)] = index
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from finished(done)
+
+        totals = normalize_units(totals)
+        logger.info("ZIP 일괄 분석 완료", images=len(members), elapsed=round(time.perf_counter() - started, 3), **counts)
+        yield line({
+            "type": "summary",
+            "images": len(members),
+            **counts,
+            "totals": totals,
+            "percentages": {"male": pct_map(totals, RDI_MALE), "female": pct_map(totals, RDI_FEMALE)},
         })
-    except:
-        pass
-    
-    for f in files:
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def save_uploaded_files(files, upload_id, positions=None):
+    """업로드 파일을 읽어 upload_id 디렉터리에 미리보기용 임시 파일로 저장. (이미지 목록, 지원하지 않는 파일명 목록) 반환
+
+    positions 목록을 넘기면 저장한 이미지마다 요청 내 파일 순번을 추가합니다.
+    """
+    images_bytes = []
+    unsupported_files = []
+    for position, f in enumerate(files):
         if f and f.filename:  # 빈 파일명 체크 추가
             if allowed(f.filename):
                 # 고유한 파일명 생성
                 unique_filename = f"{uuid.uuid4().hex}_{secure_filename(f.filename)}"
-                file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
                 
                 # 파일 내용 읽기
                 file_content = f.read()
+                UPLOAD_BYTES.observe(len(file_content))
                 
                 # 실제 파일 내용이 있는지 확인
                 if len(file_content) > 0:
                     # 임시 파일 저장 (미리보기용)
-                    with open(file_path, 'wb') as temp_file:
-                        temp_file.write(file_content)
+                    file_path = upload_store.save(upload_id, unique_filename, file_content)
+                    thumbnails.save_thumbnail(file_path, file_content)
                     
-                    images_bytes.append((secure_filename(f.filename), file_content, unique_filename))
+                    images_bytes.append((secure_filename(f.filename), file_content, upload_id, unique_filename))
+                    if positions is not None:
+                        positions.append(position)
                 else:
                     unsupported_files.append(f.filename)
             else:
                 unsupported_files.append(f.filename)
     
+    return images_bytes, unsupported_files
+
+
+def process_upload():
+    """업로드된 이미지들의 OCR -> 영양성분 합산 -> 추천 생성 후 결과 페이지 렌더링
+
+    fetch 업로드(Accept: application/json)는 결과 URL을, 오류는 flash/리다이렉트 대신 JSON error로 받습니다.
+    """
+    wants_json = request.accept_mimetypes.best == "application/json"
+
+    def upload_error(message):
+        if wants_json:
+            return jsonify({"error": message}), 400
+        flash(message)
+        return redirect(url_for("index"))
+
+    if "images" not in request.files:
+        return upload_error("이미지 파일을 선택하세요.")
+
+    files = request.files.getlist("images")
+    
+    # 진행 상황은 폼을 제출한 클라이언트의 room으로만 전송
+    progress = ProgressReporter(socketio, request.form.get("progress_token"))
+    
+    # 웹소켓으로 업로드 시작 신호 전송
+    progress.emit('upload', 0, f'{len(files)}개 파일 업로드 시작...', total_files=len(files))
+    
+    # 같은 브라우저 세션의 업로드는 한 디렉터리에 모아 초기화 시 한 번에 정리
+    if not valid_upload_id(session.get("upload_id")):
+        session["upload_id"] = new_upload_id()
+    positions = []
+    images_bytes, unsupported_files = save_uploaded_files(files, session["upload_id"], positions)
+    
     # 지원하지 않는 파일이 있을 때만 flash 메시지 표시
     if unsupported_files and images_bytes:  # 성공한 파일이 있을 때만
         flash(f"일부 파일은 지원하지 않는 형식입니다: {', '.join(unsupported_files)}")
     elif unsupported_files and not images_bytes:  # 모든 파일이 실패한 경우
-        flash("업로드된 파일 중 지원되는 형식이 없습니다. PNG, JPG, JPEG, WEBP 파일을 선택해주세요.")
-        return redirect(url_for("index"))
+        return upload_error("업로드된 파일 중 지원되는 형식이 없습니다. PNG, JPG, JPEG, WEBP 파일을 선택해주세요.")
 
     if not images_bytes:
-        return redirect(url_for("index"))
+        return upload_error("이미지 파일을 선택하세요.") if wants_json else redirect(url_for("index"))
 
-    # 업로드 완료 신호
+    per_image_results = ocr_images(images_bytes, progress)
+
+    # 브라우저에서 줄여 보낸 이미지 중 인식이 불확실한 것은 원본을 요청 (fetch 업로드만 가능)
+    client_resized = set(request.form.getlist("client_resized"))  # 줄여 보낸 파일의 요청 내 순번
+    needs_original = []
+    for index, (position, r) in enumerate(zip(positions, per_image_results)):
+        if wants_json and str(position) in client_resized and needs_original_image(r):
+            r["needs_original"] = True
+            needs_original.append({"index": index, "position": position, "filename": r["filename"]})
+
+    # 원본을 받을 예정이면 추천(LLM) 생성은 원본 분석 때로 미룸
+    results = summarize_images(per_image_results, progress, "defer" if needs_original else "auto")
+    
+    # OCR 실패 이미지 안내 (PASS 처리되어 합계에서 제외됨, 원본을 다시 받을 이미지는 제외)
+    for r in results["images"]:
+        if r["status"] == "pass" and not r.get("needs_original"):
+            flash(f"OCR 중 오류({r['filename']}): {r['error']}")
+
+    results_url = url_for("results_page", analysis_id=results["analysis_id"])
+    if wants_json:
+        return jsonify({"analysis_id": results["analysis_id"], "results_url": results_url,
+                        "needs_original": needs_original,
+                        "originals_url": url_for("upload_originals", analysis_id=results["analysis_id"])})
+    # 결과는 저장소에 있으므로 GET 페이지로 이동 (새로고침해도 재분석하지 않음)
+    return redirect(results_url, code=303)
+
+
+def needs_original_image(result) -> bool:
+    """축소 이미지의 OCR 결과가 불확실한지 (실패, 영양성분 없음, 낮은 신뢰도)"""
+    if result["status"] != "success":
+        return True
+    if not any(v is not None for k, v in (result["fields"] or {}).items() if not k.startswith("total_volume")):
+        return True
+    confidence = result.get("ocr_confidence")
+    return confidence is not None and confidence < ORIGINAL_MIN_CONFIDENCE
+
+
+@app.route("/results/<analysis_id>/originals", methods=["POST"])
+def upload_originals(analysis_id):
+    """원본 이미지로 다시 분석해 새 결과를 만들고 결과 URL을 반환
+
+    폼 필드: index(이미지 순번)와 images(원본 파일)를 같은 순서로 반복.
+    원본 없이 호출하면 기존 OCR 결과 그대로 추천까지 생성합니다 (원본 업로드 실패 시 마무리용).
+    """
+    stored = result_store.get(analysis_id)
+    if stored is None:
+        return jsonify({"error": "분석 결과를 찾을 수 없습니다."}), 404
+
+    progress = ProgressReporter(socketio, request.form.get("progress_token"))
+    per_image_results = [dict(r) for r in stored["images"]]
     try:
-        socketio.emit('analysis_progress', {
-            'step': 'upload',
-            'progress': 100,
-            'message': f'{len(images_bytes)}개 파일 업로드 완료'
-        })
-    except:
-        pass
+        indexes = [int(i) for i in request.form.getlist("index")]
+    except ValueError:
+        return jsonify({"error": "index는 정수여야 합니다."}), 400
+    files = request.files.getlist("images")
+    if len(indexes) != len(files) or any(not 0 <= i < len(per_image_results) for i in indexes):
+        return jsonify({"error": "index와 images 개수/범위가 맞지 않습니다."}), 400
+
+    with ANALYSES_IN_FLIGHT.labels("upload").track_inprogress():
+        if not valid_upload_id(session.get("upload_id")):
+            session["upload_id"] = new_upload_id()
+        images_bytes, _ = save_uploaded_files(files, session["upload_id"])
+        if len(images_bytes) != len(files):
+            return jsonify({"error": "지원되지 않는 원본 파일이 있습니다."}), 400
+
+        # 원본은 축소본과 pHash가 같으므로 중복 재사용 없이 다시 인식
+        for index, result in zip(indexes, ocr_images(images_bytes, progress, reuse=False)):
+            per_image_results[index] = result
+        for r in per_image_results:
+            r.pop("needs_original", None)
+
+        results = summarize_images(per_image_results, progress)
+
+    # 첫 업로드 때 안내하지 않은(원본을 요청했던) 이미지의 OCR 실패만 안내
+    for index, r in enumerate(results["images"]):
+        if r["status"] == "pass" and stored["images"][index].get("needs_original"):
+            flash(f"OCR 중 오류({r['filename']}): {r['error']}")
+    return jsonify({"analysis_id": results["analysis_id"],
+                    "results_url": url_for("results_page", analysis_id=results["analysis_id"])})
+
+
+def analyze_image(fname, content, path=None, ocr_json=None):
+    """이미지 한 장 OCR -> 파싱. 실패하면 status=pass (합계 계산에서 제외)
+
+    path: 업로드 저장소에 저장된 같은 이미지 경로 (OCR 요청 시 디스크에서 바로 전송)
+    ocr_json: 배치 처리로 이미 얻은 OCR 결과 (있으면 OCR 호출 생략)
+    """
+    try:
+        if ocr_json is None:
+            with tracing.span("ocr", filename=fname, bytes=len(content)):
+                ocr_json = ncp_ocr(content, filename=fname, path=path)
+        with tracing.span("parse", filename=fname), PARSE_SECONDS.time():
+            fields = parse_ocr_payload(ocr_json)
+            # 전체 패키지 기준으로 계산 (총 내용량 고려)
+            full_package_fields = calculate_full_package_nutrition(fields)
+        
+        # OCR 원시 텍스트와 신뢰도 추출 (네이버: inferConfidence, PaddleOCR: confidence)
+        ocr_texts = []
+        confidences = []
+        try:
+            images = ocr_json.get("images", [])
+            for img in images:
+                for f in img.get("fields", []):
+                    text = f.get("inferText") or f.get("inferTextRaw")
+                    if text:
+                        ocr_texts.append(str(text))
+                    confidence = f.get("inferConfidence", f.get("confidence"))
+                    if confidence is not None:
+                        confidences.append(float(confidence))
+        except Exception:
+            pass
+        
+        return {
+            "filename": fname, 
+            "fields": fields,  # 원본 (100g 기준)
+            "full_package": full_package_fields,  # 전체 패키지 기준
+            "ocr_texts": ocr_texts,  # OCR 원시 텍스트
+            "ocr_confidence": round(sum(confidences) / len(confidences), 3) if confidences else None,
+            "status": "success",
+        }
+        
+    except Exception as e:
+        logger.warning("OCR 중 오류", filename=fname, error=str(e))
+        # 오류 발생 시 PASS 상태로 추가 (합계 계산에서 제외)
+        return {
+            "filename": fname,
+            "fields": None,
+            "full_package": None,
+            "status": "pass",
+            "error": str(e),
+        }
+
+
+def pct_map(totals_dict, rdi):
+    """권장 섭취량 대비 백분율 (최대 100%)"""
+    out = {}
+    for k, v in totals_dict.items():
+        if k in rdi and rdi[k] > 0 and v is not None:
+            out[k] = round(min(100.0, 100.0 * v / rdi[k]), 1)
+    return out
+
+
+def analyze_images(images_bytes, progress=NULL_PROGRESS, recommendation_mode="auto"):
+    """OCR -> 영양성분 합산 -> 추천 생성 파이프라인. HTML/JSON 응답이 공유하는 결과 dict를 반환합니다.
+
+    recommendation_mode: auto(점진적 모드 설정을 따름) | sync(LLM 응답까지 대기) | none(추천 생략)
+    """
+    per_image_results = ocr_images(images_bytes, progress)
+    return summarize_images(per_image_results, progress, recommendation_mode)
+
+
+def batch_ocr_results(images_bytes, progress=NULL_PROGRESS):
+    """네이버 OCR을 쓰지 않을 때 여러 이미지를 PaddleOCR 배치로 인식한 결과 {순번: OCR 결과}. 배치 미사용/실패 시 빈 dict
+
+    회로 차단기가 복구 시험(probe) 상태면 첫 이미지는 배치에서 빼고 이미지별 경로(ncp_ocr)로 보내
+    시험 호출이 되게 합니다. 그렇지 않으면 여러 장 업로드만 들어오는 동안 차단기가 닫히지 않습니다.
+    """
+    routing = ocr_routing()
+    if not PADDLE_OCR_BATCH or routing not in ("paddle", "probe"):
+        return {}
+    positions = list(range(len(images_bytes)))[1 if routing == "probe" else 0:]
+    if len(positions) < 2:
+        return {}
+    progress.emit('ocr', 10, f'{len(positions)}개 이미지 일괄 인식 중...')
+    try:
+        with tracing.span("ocr.batch", images=len(positions)):
+            results = paddle_ocr_batch([(images_bytes[i][1], images_bytes[i][0]) for i in positions])
+    except Exception as e:
+        logger.warning("PaddleOCR 배치 처리 실패, 이미지별로 처리", images=len(positions), error=str(e))
+        return {}
+    return dict(zip(positions, results))
+
+
+# 재사용할 이미지별 결과 항목 (파일명/URL 등 업로드마다 다른 값은 제외)
+REUSABLE_RESULT_KEYS = ("fields", "full_package", "ocr_texts", "ocr_confidence", "status", "error")
+
+
+def read_cached_image(path):
+    """이전 결과의 원본 이미지 바이트 (업로드 보관 기간이 지나 지워졌으면 None)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def confirmed_duplicate(content, digest, entry) -> bool:
+    """pHash가 가까운 이전 결과가 같은 사진인지 (같은 파일이거나 원본과 픽셀 비교가 통과할 때)"""
+    if entry["digest"] == digest:
+        return True
+    cached_content = read_cached_image(entry["path"])
+    return cached_content is not None and same_picture(cached_content, content)
+
+
+def find_duplicates(hashes, digests, scopes, contents):
+    """pHash 목록 -> 이미지별 (같은 업로드 안의 같은 사진 순번, pHash만 가까운 앞선 이미지 순번 목록, 같은 scope 이전 결과)
+
+    표준 양식 라벨은 제품이 달라도 pHash가 가까우므로 pHash 후보는 같은 파일이거나
+    픽셀 비교(same_picture)로 같은 사진임을 확인한 경우에만 OCR을 생략합니다.
+    확인되지 않은 가까운 사진은 OCR 뒤 영양성분 숫자가 같을 때 중복으로 봅니다 (same_nutrients).
+    """
+    same = [None] * len(hashes)
+    similar = [[] for _ in hashes]
+    cached = [None] * len(hashes)
+    for i, h in enumerate(hashes):
+        if h is None:
+            continue
+        for j in range(i):
+            if hashes[j] is None or same[j] is not None:
+                continue
+            if digests[j] == digests[i]:
+                same[i] = j
+                break
+            if hamming(h, hashes[j]) <= phash_index.max_distance:
+                if same_picture(contents[j], contents[i]):
+                    same[i] = j
+                    break
+                similar[i].append(j)
+        if same[i] is None:
+            cached[i] = phash_index.find(
+                h, scope=scopes[i],
+                confirm=lambda entry, c=contents[i], d=digests[i]: confirmed_duplicate(c, d, entry))
+    return same, similar, cached
+
+
+def same_nutrients(result, other) -> bool:
+    """두 이미지에서 읽은 영양성분 숫자가 같은지 (pHash가 가까운 사진을 같은 라벨로 볼지 확인)"""
+    if result["status"] != "success" or other["status"] != "success" or other.get("duplicate_of"):
+        return False
+    fields = result["fields"] or {}
+    if not any(v is not None for k, v in fields.items() if not k.startswith("total_volume")):
+        return False
+    return fields == other["fields"] and result["full_package"] == other["full_package"]
+
+
+def ocr_images(images_bytes, progress=NULL_PROGRESS, reuse=True):
+    """업로드 이미지들을 순서대로 OCR/파싱하고 이미지별 결과 목록을 반환
+
+    reuse가 True면 pHash로 같은 사진 후보를 찾아 확인된 경우에만 결과를 재사용합니다.
+    - 같은 업로드 안의 같은 사진(같은 파일 또는 다시 인코딩한 사진): OCR 없이 앞선 이미지 결과를 쓰고 duplicate_of로 표시 (합계에서 제외)
+    - 같은 업로드 안의 pHash만 가까운 사진: OCR 후 숫자가 같으면 duplicate_of로 표시
+    - 같은 세션(업로드 ID)의 이전 업로드와 같은 사진: 저장된 결과를 쓰고 ocr_reused로 표시
+    원본 재분석처럼 같은 사진을 다시 인식해야 하면 reuse=False로 호출합니다.
+    """
+    total_files = len(images_bytes)
+
+    # 업로드 완료 신호
+    progress.emit('upload', 100, f'{len(images_bytes)}개 파일 업로드 완료')
 
     # OCR 호출 & 파싱 (진행 상황과 함께)
     per_image_results = []
-    total_files = len(images_bytes)
     
     # OCR 시작 신호
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'ocr',
-            'progress': 0,
-            'message': 'OCR 분석 시작...',
-            'total_files': total_files
-        })
-    except:
-        pass
+    progress.emit('ocr', 0, 'OCR 분석 시작...', total_files=total_files)
+    hashes = [phash(content) if reuse else None for _, content, *_ in images_bytes]
+    digests = [content_digest(content) if reuse else None for _, content, *_ in images_bytes]
+    same, similar, cached = find_duplicates(hashes, digests, [upload_id for _, _, upload_id, _ in images_bytes],
+                                            [content for _, content, *_ in images_bytes])
+    to_ocr = [i for i in range(total_files) if same[i] is None and cached[i] is None]
+    batched = batch_ocr_results([images_bytes[i] for i in to_ocr], progress)
+    batched = {to_ocr[position]: result for position, result in batched.items()}
     
-    for idx, (fname, content, unique_filename) in enumerate(images_bytes, 1):
-        try:
-            # 진행 상황 메시지 및 웹소켓 신호
-            progress_msg = f"분석 중... ({idx}/{total_files}) {fname}"
-            print(progress_msg)  # 서버 로그에 출력
-            
-            # 파일별 OCR 진행 상황 전송
-            ocr_progress = int(((idx - 1) / total_files) * 100)
-            try:
-                socketio.emit('analysis_progress', {
-                    'step': 'ocr',
-                    'progress': ocr_progress,
-                    'message': f'OCR 분석 중: {fname} ({idx}/{total_files})',
-                    'current_file': idx,
-                    'total_files': total_files
-                })
-            except:
-                pass
-            
-            ocr_json = ncp_ocr(content, filename=fname)
-            fields = parse_ocr_payload(ocr_json)
-            # 전체 패키지 기준으로 계산 (총 내용량 고려)
-            full_package_fields = calculate_full_package_nutrition(fields)
-            
-            # OCR 원시 텍스트 추출
-            ocr_texts = []
-            try:
-                images = ocr_json.get("images", [])
-                for img in images:
-                    for f in img.get("fields", []):
-                        text = f.get("inferText") or f.get("inferTextRaw")
-                        if text:
-                            ocr_texts.append(str(text))
-            except Exception:
-                pass
-            
-            per_image_results.append({
-                "filename": fname, 
-                "fields": fields,  # 원본 (100g 기준)
-                "full_package": full_package_fields,  # 전체 패키지 기준
-                "ocr_texts": ocr_texts,  # OCR 원시 텍스트
-                "status": "success",
-                "image_url": url_for('uploaded_image', filename=unique_filename)
-            })
-            
-        except Exception as e:
-            error_msg = f"OCR 중 오류({fname}): {e}"
-            flash(error_msg)
-            # 오류 발생 시 PASS 상태로 추가 (합계 계산에서 제외)
-            per_image_results.append({
-                "filename": fname,
-                "fields": None,
-                "full_package": None,
-                "status": "pass",
-                "error": str(e),
-                "image_url": url_for('uploaded_image', filename=unique_filename)
-            })
-
-    if not per_image_results:
-        return redirect(url_for("index"))
+    for idx, (fname, content, upload_id, unique_filename) in enumerate(images_bytes, 1):
+        i = idx - 1
+        # 진행 상황 메시지 및 웹소켓 신호
+        progress_msg = f"분석 중... ({idx}/{total_files}) {fname}"
+        logger.info(progress_msg, filename=fname, bytes=len(content))  # 서버 로그에 출력
+        
+        # 파일별 OCR 진행 상황 전송
+        ocr_progress = int(((idx - 1) / total_files) * 100)
+        progress.emit('ocr', ocr_progress, f'OCR 분석 중: {fname} ({idx}/{total_files})', current_file=idx, total_files=total_files)
+        
+        if same[i] is not None:
+            original = per_image_results[same[i]]
+            result = {key: original.get(key) for key in REUSABLE_RESULT_KEYS if key in original}
+            result.update(filename=fname, duplicate_of=original["filename"])
+            DUPLICATE_IMAGES.labels("upload").inc()
+        elif cached[i] is not None:
+            result = {key: value for key, value in cached[i].items() if key not in ("digest", "path")}
+            result.update(filename=fname, ocr_reused=True)
+            DUPLICATE_IMAGES.labels("previous").inc()
+        else:
+            result = analyze_image(fname, content, path=upload_store.path(upload_id, unique_filename),
+                                   ocr_json=batched.get(i))
+            original = next((per_image_results[j] for j in similar[i] if same_nutrients(result, per_image_results[j])), None)
+            if original is not None:
+                result["duplicate_of"] = original["filename"]
+                DUPLICATE_IMAGES.labels("upload").inc()
+            if hashes[i] is not None and not needs_original_image(result):
+                entry = {key: result[key] for key in REUSABLE_RESULT_KEYS if key in result}
+                phash_index.add(hashes[i], dict(entry, digest=digests[i], path=upload_store.path(upload_id, unique_filename)),
+                                scope=upload_id)
+        if hashes[i] is not None:
+            result["phash"] = f"{hashes[i]:016x}"
+        result["upload_id"] = upload_id  # 결과를 저장할 때 이미지 보관 기간 연장용
+        result["image_url"] = url_for('uploaded_image', upload_id=upload_id, filename=unique_filename)
+        result["thumbnail_url"] = url_for('uploaded_thumbnail', upload_id=upload_id, filename=unique_filename)
+        per_image_results.append(result)
 
     # OCR 완료 신호
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'ocr',
-            'progress': 100,
-            'message': f'{total_files}개 파일 OCR 완료'
-        })
-    except:
-        pass
+    progress.emit('ocr', 100, f'{total_files}개 파일 OCR 완료')
+    return per_image_results
+
 
+def summarize_images(per_image_results, progress=NULL_PROGRESS, recommendation_mode="auto"):
+    """이미지별 결과 -> 합계/백분율/부족·과다 영양소 -> 추천 생성 후 결과 저장
+
+    recommendation_mode에 defer를 주면 추천 없이 결과만 저장합니다 (원본 재업로드를 기다리는 경우).
+    """
     # 영양정보 추출 시작 신호
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'nutrition',
-            'progress': 0,
-            'message': '영양성분 계산 시작...'
-        })
-    except:
-        pass
+    progress.emit('nutrition', 0, '영양성분 계산 시작...')
 
     # 1. 합계 계산 (전체 패키지 기준) - PASS 상태는 제외
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'nutrition',
-            'progress': 20,
-            'message': '영양성분 합계 계산 중...'
-        })
-    except:
-        pass
+    progress.emit('nutrition', 20, '영양성분 합계 계산 중...')
     
     totals = {}
     for r in per_image_results:
-        if r["status"] == "success" and r["full_package"] is not None:
+        # 같은 업로드 안에서 중복으로 찍은 사진은 한 번만 합산
+        if r["status"] == "success" and r["full_package"] is not None and not r.get("duplicate_of"):
             totals = merge_totals(totals, r["full_package"])
 
     # 2. 단위 정규화
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'nutrition',
-            'progress': 40,
-            'message': '영양성분 단위 정규화 중...'
-        })
-    except:
-        pass
+    progress.emit('nutrition', 40, '영양성분 단위 정규화 중...')
     
     totals = normalize_units(totals)
 
     # 3. 남/녀 기준 백분율 계산
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'nutrition',
-            'progress': 60,
-            'message': '남성/여성 기준 백분율 계산 중...'
-        })
-    except:
-        pass
+    progress.emit('nutrition', 60, '남성/여성 기준 백분율 계산 중...')
     
-    def pct_map(totals_dict, rdi):
-        out = {}
-        for k, v in totals_dict.items():
-            if k in rdi and rdi[k] > 0 and v is not None:
-                out[k] = round(min(100.0, 100.0 * v / rdi[k]), 1)
-        return out
-
     male_pct = pct_map(totals, RDI_MALE)
     female_pct = pct_map(totals, RDI_FEMALE)
 
     # 4. 전체 달성률 계산
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'nutrition',
-            'progress': 80,
-            'message': '전체 달성률 계산 중...'
-        })
-    except:
-        pass
+    progress.emit('nutrition', 80, '전체 달성률 계산 중...')
     
     # 전체 실루엣 채움 비율(가중 평균). 단순 평균으로 시작
     keys_for_overall = [k for k in DISPLAY_ORDER if k in totals and totals[k] is not None]
@@ -338,14 +1105,7 @@ def upload():
         female_calorie_achievement = round((totals["calories_kcal"] / RDI_FEMALE["calories_kcal"]) * 100, 1)
 
     # 5. 부족/과다 영양소 분석
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'nutrition',
-            'progress': 90,
-            'message': '부족/과다 영양소 분석 중...'
-        })
-    except:
-        pass
+    progress.emit('nutrition', 90, '부족/과다 영양소 분석 중...')
         
     # 부족한 영양소 계산
     male_deficient = calculate_deficient_nutrients(totals, RDI_MALE)
@@ -356,226 +1116,105 @@ def upload():
     female_excessive = calculate_excessive_nutrients(totals, RDI_FEMALE)
 
     # 영양정보 추출 완료 신호
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'nutrition',
-            'progress': 100,
-            'message': '영양정보 추출 완료'
-        })
-    except:
-        pass
+    progress.emit('nutrition', 100, '영양정보 추출 완료')
 
-    # AI 추천 생성 시작 신호 (웹소켓)
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'recommendation',
-            'progress': 0,
-            'message': 'AI 추천 생성 시작...'
-        })
-    except:
-        pass  # 웹소켓 연결이 없는 경우 무시
+    llm_args = (totals, male_pct, female_pct, male_deficient, male_excessive, female_deficient, female_excessive)
+    # 추천을 생략하면(none) 결과를 저장하지 않으므로 조회할 수 없는 ID도 만들지 않음
+    saved = recommendation_mode != "none"
+    analysis_id = uuid.uuid4().hex if saved else None
+    progressive = recommendation_mode == "auto" and PROGRESSIVE_MODE and is_llm_available()
 
-    # 종합 영양 분석 및 추천 (남성 기준) - 1번의 LLM 호출로 모든 분석
-    print(f"DEBUG: Starting comprehensive male analysis")
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'recommendation',
-            'progress': 25,
-            'message': '👨 남성 기준 종합 분석 중...'
-        })
-    except:
-        pass
-    
-    male_comprehensive = get_comprehensive_nutrition_analysis_streaming(
-        totals=totals,
-        male_pct=male_pct,
-        female_pct=female_pct,
-        deficient_nutrients=male_deficient,
-        excessive_nutrients=male_excessive,
-        rdi_info=RDI_MALE,
-        gender="male",
-        socketio=socketio,
-        session_id=None
-    )
-    print(f"DEBUG: Male comprehensive result (first 200 chars): {male_comprehensive[:200] if male_comprehensive else 'None'}")
-    print(f"DEBUG: Male comprehensive contains API key message: {'AI 추천 서비스를 이용하려면 API 키가 필요합니다' in (male_comprehensive or '')}")
-    
-    # 종합 영양 분석 및 추천 (여성 기준) - 1번의 LLM 호출로 모든 분석
-    print(f"DEBUG: Starting comprehensive female analysis")
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'recommendation',
-            'progress': 75,
-            'message': '👩 여성 기준 종합 분석 중...'
-        })
-    except:
-        pass
-    
-    female_comprehensive = get_comprehensive_nutrition_analysis_streaming(
-        totals=totals,
-        male_pct=male_pct,
-        female_pct=female_pct,
-        deficient_nutrients=female_deficient,
-        excessive_nutrients=female_excessive,
-        rdi_info=RDI_FEMALE,
-        gender="female",
-        socketio=socketio,
-        session_id=None
-    )
-    print(f"DEBUG: Female comprehensive result (first 200 chars): {female_comprehensive[:200] if female_comprehensive else 'None'}")
-    print(f"DEBUG: Female comprehensive contains API key message: {'AI 추천 서비스를 이용하려면 API 키가 필요합니다' in (female_comprehensive or '')}")
-    
-    # 기존 변수들을 종합 분석 결과로 설정 (호환성 유지)
-    male_recommendation = male_comprehensive
-    female_recommendation = female_comprehensive  # 각각의 성별 맞춤 종합 분석
-    
-    # 과다 섭취 영양소 감소 방법 생성 (별도 LLM 호출)
-    print(f"DEBUG: Starting reduction recommendations")
-    
-    # 남성 기준 과다 섭취 감소 방법
-    if male_excessive:
-        try:
-            socketio.emit('analysis_progress', {
-                'step': 'recommendation',
-                'progress': 80,
-                'message': '👨 남성 과다 영양소 감소 방법 생성 중...'
-            })
-        except:
-            pass
-        male_reduction = get_reduction_recommendation_streaming(
-            excessive_nutrients=male_excessive,
-            rdi_info=RDI_MALE,
-            gender="male",
-            socketio=socketio,
-            session_id=None
-        )
-        print(f"DEBUG: Male reduction result (first 100 chars): {male_reduction[:100] if male_reduction else 'None'}")
-    else:
-        male_reduction = ""
-    
-    # 여성 기준 과다 섭취 감소 방법
-    if female_excessive:
-        try:
-            socketio.emit('analysis_progress', {
-                'step': 'recommendation', 
-                'progress': 85,
-                'message': '👩 여성 과다 영양소 감소 방법 생성 중...'
-            })
-        except:
-            pass
-        female_reduction = get_reduction_recommendation_streaming(
-            excessive_nutrients=female_excessive,
-            rdi_info=RDI_FEMALE,
-            gender="female",
-            socketio=socketio,
-            session_id=None
-        )
-        print(f"DEBUG: Female reduction result (first 100 chars): {female_reduction[:100] if female_reduction else 'None'}")
-    else:
-        female_reduction = ""
-    
-    # AI 사용 여부 최종 분석 및 로그 출력
-    male_is_ai = male_recommendation and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in male_recommendation
-    female_is_ai = female_recommendation and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in female_recommendation
-    male_reduction_is_ai = male_reduction and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in male_reduction
-    female_reduction_is_ai = female_reduction and 'AI 추천 서비스를 이용하려면 API 키가 필요합니다' not in female_reduction
-    
-    print("\n" + "="*80)
-    print("🎯 영양 분석 완료 - AI 사용 현황 요약")
-    print("="*80)
-    print(f"👨 남성 기준 추천: {'🤖 AI 생성' if male_is_ai else '📊 통계 기반'}")
-    if male_is_ai:
-        print(f"   ✅ HyperCLOVA X API 응답 성공 (길이: {len(male_recommendation)}자)")
-    else:
-        print(f"   ⚠️  통계 기반 추천 사용 (API 키 없음 또는 실패)")
-    
-    if male_excessive:
-        print(f"   👨 과다 영양소 감소: {'🤖 AI 생성' if male_reduction_is_ai else '📊 통계 기반'}")
-        if male_reduction_is_ai:
-            print(f"     ✅ 감소 방법 AI 생성 성공 (길이: {len(male_reduction)}자)")
-    
-    print(f"👩 여성 기준 추천: {'🤖 AI 생성' if female_is_ai else '📊 통계 기반'}")
-    if female_is_ai:
-        print(f"   ✅ HyperCLOVA X API 응답 성공 (길이: {len(female_recommendation)}자)")
+    if recommendation_mode in ("none", "defer"):
+        # API에서 추천을 요청하지 않았거나 원본 이미지로 다시 분석할 예정이면 LLM/통계 추천 생성을 생략
+        recommendations = dict.fromkeys(RECOMMENDATION_KEYS, "")
+        recommendations["recommendation_status"] = "skipped" if recommendation_mode == "none" else "deferred"
+    elif progressive:
+        # 점진적 모드: 통계 기반 추천으로 즉시 렌더링하고 LLM 결과는 백그라운드에서 교체
+        recommendations = get_instant_recommendations(male_deficient, male_excessive, female_deficient, female_excessive)
+        recommendations["recommendation_status"] = "pending"
     else:
-        print(f"   ⚠️  통계 기반 추천 사용 (API 키 없음 또는 실패)")
-    
-    if female_excessive:
-        print(f"   👩 과다 영양소 감소: {'🤖 AI 생성' if female_reduction_is_ai else '📊 통계 기반'}")
-        if female_reduction_is_ai:
-            print(f"     ✅ 감소 방법 AI 생성 성공 (길이: {len(female_reduction)}자)")
-    
-    # 전체 AI 사용률 계산 (추천 + 감소 방법)
-    total_functions = 2  # 기본 남성/여성 추천
-    ai_success_count = sum([male_is_ai, female_is_ai])
-    
-    if male_excessive:
-        total_functions += 1
-        ai_success_count += male_reduction_is_ai
-    if female_excessive:
-        total_functions += 1
-        ai_success_count += female_reduction_is_ai
-    
-    ai_usage_rate = (ai_success_count / total_functions) * 100 if total_functions > 0 else 0
-    
-    print(f"\n🎯 AI 활용률: {ai_success_count}/{total_functions} ({ai_usage_rate:.0f}%)")
-    
-    if ai_usage_rate == 100:
-        print("🌟 모든 추천이 AI로 생성되었습니다!")
-    elif ai_usage_rate >= 50:
-        print("⚡ 일부 추천이 AI로 생성되었습니다.")
-    else:
-        print("📊 대부분 통계 기반으로 생성되었습니다.")
-    
-    print("="*80 + "\n")
+        with tracing.span("recommendation"):
+            # 결과 화면 전이라 진행 중인 업로드 화면(progress room)으로 스트리밍
+            recommendations = generate_recommendations(*llm_args, progress=progress, room=progress.room)
+        recommendations["recommendation_status"] = "complete"
 
-    # AI 추천 완료 및 분석 완료 신호
-    try:
-        socketio.emit('analysis_progress', {
-            'step': 'complete',
-            'progress': 100,
-            'message': '모든 분석이 완료되었습니다!'
-        })
-    except:
-        pass
+    results = {
+        "images": per_image_results,
+        "totals": totals,
+        "male_pct": male_pct,
+        "female_pct": female_pct,
+        "male_overall": male_overall,
+        "female_overall": female_overall,
+        "male_calorie_achievement": male_calorie_achievement,
+        "female_calorie_achievement": female_calorie_achievement,
+        "display_order": DISPLAY_ORDER,
+        "male_deficient": male_deficient,
+        "female_deficient": female_deficient,
+        "male_recommendation": recommendations["male_recommendation"],
+        "female_recommendation": recommendations["female_recommendation"],
+        "male_excessive": male_excessive,
+        "female_excessive": female_excessive,
+        "male_reduction": recommendations["male_reduction"],
+        "female_reduction": recommendations["female_reduction"],
+        "analysis_id": analysis_id,
+        "recommendation_pending": progressive,
+        "recommendation_status": recommendations["recommendation_status"],
+    }
 
-    return render_template(
-        "index.html",
-        results={
-            "images": per_image_results,
-            "totals": totals,
-            "male_pct": male_pct,
-            "female_pct": female_pct,
-            "male_overall": male_overall,
-            "female_overall": female_overall,
-            "male_calorie_achievement": male_calorie_achievement,
-            "female_calorie_achievement": female_calorie_achievement,
-            "display_order": DISPLAY_ORDER,
-            "male_deficient": male_deficient,
-            "female_deficient": female_deficient,
-            "male_recommendation": male_recommendation,
-            "female_recommendation": female_recommendation,
-            "male_excessive": male_excessive,
-            "female_excessive": female_excessive,
-            "male_reduction": male_reduction,
-            "female_reduction": female_reduction,
-        },
-    )
+    if saved:
+        result_store.save(analysis_id, results)
+        # 결과 페이지의 섬네일/원본 이미지를 결과 보관 기간(RESULT_TTL)까지 남김
+        for upload_id in {r["upload_id"] for r in per_image_results if r.get("upload_id")}:
+            upload_store.retain(upload_id, time.time() + result_store.ttl)
+
+    if progressive:
+        socketio.start_background_task(upgrade_recommendations, analysis_id, tracing.current_request_id(), *llm_args)
+
+    # 분석 완료 신호 (점진적 모드에서는 AI 추천이 백그라운드에서 계속 생성됨)
+    progress.emit('complete', 100, '모든 분석이 완료되었습니다!')
+
+    return results
 
 
 # 웹소켓 이벤트 핸들러
 @socketio.on('connect')
 def handle_connect():
-    print(f'Client connected: {request.sid}')
+    logger.debug('Client connected', sid=request.sid)
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    print(f'Client disconnected: {request.sid}')
+    logger.debug('Client disconnected', sid=request.sid)
 
 @socketio.on('join_analysis')
 def handle_join_analysis(data):
     session_id = data.get('session_id', request.sid)
-    print(f'Client {request.sid} joined analysis session {session_id}')
+    logger.debug('Client joined analysis session', sid=request.sid, session_id=session_id)
+
+    # 업로드 폼의 progress_token room에 참여 -> 이 클라이언트의 analysis_progress만 수신
+    progress_token = data.get('progress_token')
+    if valid_progress_token(progress_token):
+        join_room(progress_token)
+
+    # 결과 페이지에서 백그라운드 AI 추천을 기다리는 경우 해당 분석 room에 참여
+    analysis_id = data.get('analysis_id')
+    if analysis_id:
+        join_room(analysis_id)
+        stored = result_store.get(analysis_id)
+        payload = recommendation_payload(analysis_id, stored) if stored else None
+        with analysis_streams_lock:
+            stream = analysis_streams.get(analysis_id)
+        # room 참여 전에 이미 완료된 경우 바로 전달
+        if payload and payload["status"] != "pending":
+            emit('recommendation_update', payload)
+        else:
+            # 스트리밍 도중 참여: 지금까지 받은 섹션별 본문을 먼저 전달 (이후 조각은 offset으로 이어 붙임)
+            # 다른 워커에서 생성 중이면 그 워커가 result_store에 저장한 누적 본문을 사용
+            if stream:
+                sections = stream.snapshot()
+            else:
+                sections = result_store.get_partial(analysis_id) if payload else None
+            for section, text in (sections or {}).items():
+                emit('llm_response', {'data': text, 'type': 'snapshot', 'section': section})
 
 # @socketio.on('start_analysis')
 # 이 핸들러는 비활성화됨 - 실제 upload() 함수에서 진행 상황을 전송함
@@ -585,4 +1224,5 @@ def handle_join_analysis(data):
 
 
 if __name__ == "__main__":
-    socketio.run(app, debug=True, host="0.0.0.0", port=int(os.environ.get("PORT", 8000)))
\ No newline at end of file
+    socketio.run(app, debug=os.environ.get("FLASK_DEBUG", "1") == "1", host="0.0.0.0",
+                 port=int(os.environ.get("PORT", 8000)), allow_unsafe_werkzeug=True)
\ No newline at end of file
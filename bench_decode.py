@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+OCR 이미지 디코딩 메모리 벤치마크 (원본 해상도 np.array(Image.open()) vs image_decode)
+
+이미지마다 방식별로 새 프로세스를 띄워 디코딩 중 늘어난 최대 RSS와 소요 시간을 비교합니다.
+기본으로 sample/ 이미지와 sample/info.jpg를 12MP(4000x3000)로 키운 휴대폰 사진 크기 JPEG을 측정합니다.
+
+사용법:
+python bench_decode.py                               # sample/ + 12MP JPEG, 긴 변 2560px
+python bench_decode.py --max-dim 1600 a.jpg b.jpg
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from io import BytesIO
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample")
+MODES = ("full", "decode", "decode-gray")
+
+
+def measure(mode: str, path: str, max_dim: int) -> dict:
+    """한 프로세스에서 한 번 디코딩하고 최대 RSS 증가량을 측정 (--worker로 실행)"""
+    import numpy as np
+    from PIL import Image
+    import image_decode
+
+    with open(path, "rb") as f:
+        content = f.read()
+    image_decode.to_array(Image.new("RGB", (1, 1)))  # numpy/PIL 초기화 비용 제외
+    image_decode.reset_peak_rss()
+    before = image_decode.current_rss_bytes()
+    start = time.perf_counter()
+    if mode == "full":
+        array = np.array(Image.open(BytesIO(content)))
+    else:
+        image = image_decode.decode_image(content, max_dim=max_dim, mode="L" if mode == "decode-gray" else "RGB")
+        array = image_decode.to_array(image)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "peak_growth": image_decode.peak_rss_bytes() - before, "shape": list(array.shape)}
+
+
+def run_worker(mode: str, path: str, max_dim: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", mode, "--max-dim", str(max_dim), path],
+        capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 이미지 디코딩 메모리 벤치마크")
+    parser.add_argument("images", nargs="*", help="측정할 이미지 파일 (기본: sample/ + 12MP JPEG)")
+    parser.add_argument("--max-dim", type=int, default=2560)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.images[0], args.max_dim)))
+        return
+
+    import image_decode
+    if not image_decode.reset_peak_rss():
+        sys.exit("/proc/self/clear_refs를 쓸 수 없어 디코딩별 최대 RSS를 측정할 수 없습니다 (Linux 4.0+ 필요)")
+
+    paths = args.images or sorted(os.path.join(SAMPLE_DIR, n) for n in os.listdir(SAMPLE_DIR))
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.images:
+            from PIL import Image
+            large = os.path.join(tmp, "info_12mp.jpg")
+            with Image.open(os.path.join(SAMPLE_DIR, "info.jpg")) as img:
+                img.convert("RGB").resize((3000, 4000), Image.BICUBIC).save(large, "JPEG", quality=90)
+            paths.append(large)
+
+        print(f"{'image':<18}{'mode':<13}{'shape':>16}{'ms':>9}{'peak RSS MB':>13}")
+        for path in paths:
+            for mode in MODES:
+                result = run_worker(mode, path, args.max_dim)
+                shape = "x".join(str(n) for n in result["shape"])
+                print(f"{os.path.basename(path)[:17]:<18}{mode:<13}{shape:>16}{result['seconds'] * 1000:>9.1f}"
+                      f"{result['peak_growth'] / 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
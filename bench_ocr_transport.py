@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+네이버 OCR 전송 방식 벤치마크 (json base64 vs multipart)
+
+로컬 Mock OCR 서버(mock_clova_server.py)로 같은 이미지를 두 방식으로 보내고
+요청 본문 크기와 지연 시간(p50/p95)을 비교합니다.
+
+사용법:
+python bench_ocr_transport.py                       # sample/ 이미지 + 합성 이미지(1, 5, 10MB)
+python bench_ocr_transport.py --repeat 50 --sizes 2 8 photo.jpg
+python bench_ocr_transport.py --endpoint https://.../general   # 실제 엔드포인트 (NCP_OCR_SECRET 필요)
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+import ocr_client
+from mock_clova_server import start_mock_server, OCR_PATH
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample")
+
+TRANSPORTS = {
+    "json": lambda content, name, path: ocr_client.ncp_ocr_process(content, name),
+    "multipart": lambda content, name, path: ocr_client.ncp_ocr_process_multipart(None, name, path=path),
+}
+
+
+def request_bytes(transport: str, content: bytes, name: str, path: str) -> int:
+    """전송 방식별 요청 본문 크기 (실제 전송 없이 계산)"""
+    if transport == "json":
+        return len(json.dumps(ocr_client._ocr_message(name, content)))
+    with open(path, "rb") as f:
+        body = ocr_client.MultipartBody([("message", json.dumps(ocr_client._ocr_message(name)))],
+                                        "file", name, f, len(content))
+        return len(body)
+
+
+def measure(transport: str, content: bytes, name: str, path: str, repeat: int) -> dict:
+    send = TRANSPORTS[transport]
+    send(content, name, path)  # 연결/임포트 워밍업
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        send(content, name, path)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "request_bytes": request_bytes(transport, content, name, path),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000,
+    }
+
+
+def collect_images(args, tmpdir: str):
+    """(이름, 경로) 목록: 지정한 파일/sample 이미지 + 지정 크기(MB)의 합성 바이트"""
+    images = []
+    for item in args.images or sorted(os.path.join(SAMPLE_DIR, n) for n in os.listdir(SAMPLE_DIR)):
+        images.append((os.path.basename(item), item))
+    for size_mb in args.sizes:
+        path = os.path.join(tmpdir, f"synthetic_{size_mb:g}mb.jpg")
+        with open(path, "wb") as f:
+            f.write(os.urandom(int(size_mb * 1024 * 1024)))
+        images.append((os.path.basename(path), path))
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버 OCR 전송 방식(json/multipart) 벤치마크")
+    parser.add_argument("images", nargs="*", help="측정할 이미지 파일 (기본: sample/)")
+    parser.add_argument("--sizes", type=float, nargs="*", default=[1, 5, 10], help="합성 이미지 크기(MB)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--endpoint", default=None, help="미지정 시 로컬 Mock OCR 서버 사용")
+    parser.add_argument("--ocr-latency", type=float, default=0.0, help="Mock 서버 OCR 응답 지연(초)")
+    args = parser.parse_args()
+
+    server = None
+    if args.endpoint:
+        ocr_client.ENDPOINT = args.endpoint
+    else:
+        server, host = start_mock_server(ocr_latency=args.ocr_latency)
+        ocr_client.ENDPOINT = host + OCR_PATH
+        ocr_client.SECRET = ocr_client.SECRET or "mock"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            print(f"{'image':<24}{'size':>10}  {'transport':<10}{'request':>11}{'p50 ms':>9}{'p95 ms':>9}")
+            for name, path in collect_images(args, tmpdir):
+                with open(path, "rb") as f:
+                    content = f.read()
+                for transport in TRANSPORTS:
+                    r = measure(transport, content, name, path, args.repeat)
+                    print(f"{name:<24}{len(content):>10}  {transport:<10}{r['request_bytes']:>11}"
+                          f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
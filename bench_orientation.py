@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+PaddleOCR 방향 분류 생략 벤치마크 (글자 조각마다 방향 분류 vs 방향을 미리 맞추고 생략)
+
+이미지마다 방향 판단(줄 방향 + 글자 줄 선택, 방향 분류기 투표 제외) 비용을 재고, paddleocr가 설치되어 있으면
+PADDLE_ORIENTATION_CHECK=0(기존: cls=True)과 1(orient_image 후 필요할 때만 cls)로
+paddle_ocr_process 소요 시간을 비교합니다. 원본과 90/180/270도 돌린 사본을 함께 측정합니다.
+
+사용법:
+python bench_orientation.py                     # sample/ 이미지
+python bench_orientation.py --repeat 5 a.jpg b.jpg
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+import ocr_client
+from image_decode import decode_image
+from orientation import rotate, normalize_direction
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample")
+
+
+def timed(fn, repeat: int) -> float:
+    """repeat회 실행 시간의 중앙값(초)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def rotated_copies(path: str):
+    """(이름, 이미지 바이트) 원본 + 90/180/270도"""
+    with Image.open(path) as img:
+        image = img.convert("RGB")
+    name = os.path.basename(path)
+    for rotation in (0, 90, 180, 270):
+        buffer = BytesIO()
+        rotate(image, rotation).save(buffer, "PNG")
+        yield f"{name}@{rotation}", buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PaddleOCR 방향 분류 생략 벤치마크")
+    parser.add_argument("images", nargs="*", help="측정할 이미지 파일 (기본: sample/)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.images or sorted(os.path.join(SAMPLE_DIR, n) for n in os.listdir(SAMPLE_DIR))
+    images = [item for path in paths for item in rotated_copies(path)]
+
+    print(f"{'image':<24}{'direction':>11}{'rotation':>9}{'bands':>7}{'check ms':>10}")
+    for name, content in images:
+        image = decode_image(content)
+        _, rotation, direction, bands = normalize_direction(image)
+        check_ms = timed(lambda: normalize_direction(image), args.repeat) * 1000
+        print(f"{name:<24}{str(direction):>11}{rotation:>9}{len(bands):>7}{check_ms:>10.1f}")
+
+    try:
+        ocr_client._paddle_call(ocr_client.get_paddle_ocr)  # PaddleOCR 작업 스레드에서 모델 로딩
+    except RuntimeError as e:
+        sys.exit(f"\n{e} (방향 판단 비용만 측정)")
+
+    ocr_client.paddle_ocr_process(*images[0][::-1])  # 모델 로딩/첫 실행 비용 제외
+    print(f"\n{'image':<24}{'rotation':>9}{'cls':>5}{'always cls':>12}{'oriented':>10}{'speedup':>9}")
+    totals = [0.0, 0.0]
+    for name, content in images:
+        with patch.object(ocr_client, "ORIENTATION_CHECK", False):
+            baseline = timed(lambda: ocr_client.paddle_ocr_process(content, name), args.repeat)
+        oriented = timed(lambda: ocr_client.paddle_ocr_process(content, name), args.repeat)
+        _, rotation, cls = ocr_client._paddle_call(ocr_client.orient_image, decode_image(content))
+        totals[0] += baseline
+        totals[1] += oriented
+        print(f"{name:<24}{rotation:>9}{str(cls):>5}{baseline:>12.2f}{oriented:>10.2f}{baseline / oriented:>9.2f}")
+    print(f"{'total':<38}{totals[0]:>12.2f}{totals[1]:>10.2f}{totals[0] / totals[1]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
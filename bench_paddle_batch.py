@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+PaddleOCR 배치 인식 벤치마크 (이미지별 ocr() 호출 vs paddle_ocr_batch)
+
+같은 이미지 묶음을 이미지별 경로(paddle_ocr_process)와 배치 경로(paddle_ocr_batch)로 처리해
+초당 처리 이미지 수를 비교합니다. paddleocr/paddlepaddle이 설치되어 있어야 합니다.
+
+사용법:
+python bench_paddle_batch.py                          # sample/ 이미지 x 4장 묶음, 배치 크기 8/32/64
+python bench_paddle_batch.py --copies 8 --batch-sizes 16 32 a.jpg b.jpg
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import ocr_client
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample")
+
+
+def timed(fn, repeat: int) -> float:
+    """repeat회 실행 시간의 중앙값(초)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PaddleOCR 배치 인식 벤치마크")
+    parser.add_argument("images", nargs="*", help="측정할 이미지 파일 (기본: sample/)")
+    parser.add_argument("--copies", type=int, default=4, help="이미지 목록을 반복해 한 번에 처리할 묶음 크기")
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[8, 32, 64])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.images or sorted(os.path.join(SAMPLE_DIR, n) for n in os.listdir(SAMPLE_DIR))
+    images = []
+    for path in paths:
+        with open(path, "rb") as f:
+            images.append((f.read(), os.path.basename(path)))
+    images = images * args.copies
+
+    try:
+        ocr_client._paddle_call(ocr_client.get_paddle_ocr)  # PaddleOCR 작업 스레드에서 모델 로딩
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+    # 모델 로딩/첫 실행 비용 제외
+    ocr_client.paddle_ocr_process(*images[0])
+    ocr_client.paddle_ocr_batch(images[:2])
+
+    per_image = timed(lambda: [ocr_client.paddle_ocr_process(content, name) for content, name in images], args.repeat)
+    print(f"{'mode':<22}{'seconds':>10}{'images/s':>11}{'speedup':>9}")
+    print(f"{'per-image':<22}{per_image:>10.2f}{len(images) / per_image:>11.2f}{1.0:>9.2f}")
+    for batch_size in args.batch_sizes:
+        seconds = timed(lambda: ocr_client.paddle_ocr_batch(images, batch_size=batch_size), args.repeat)
+        print(f"{f'batch (size={batch_size})':<22}{seconds:>10.2f}{len(images) / seconds:>11.2f}"
+              f"{per_image / seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+from collections import deque
+
+import tracing
+
+# 외부 API 호출용 회로 차단기 (네이버 OCR)
+# - 최근 BREAKER_WINDOW초 동안의 호출 결과(성공/실패, 응답 시간)를 모아 실패율을 계산합니다.
+#   BREAKER_SLOW_SECONDS보다 오래 걸린 호출도 실패로 셉니다.
+# - 실패율이 BREAKER_ERROR_RATE 이상이면 차단(open)하고 호출하지 않도록 알려 바로 로컬 엔진을 쓰게 합니다.
+# - BREAKER_OPEN_SECONDS가 지나면 반개방(half_open) 상태로 호출 하나만 시험 삼아 허용하고,
+#   성공하면 정상(closed)으로 돌아가고 실패하면 다시 차단합니다.
+# - 상태는 프로세스별로 관리합니다 (워커마다 몇 건의 실패로 각자 차단).
+
+BREAKER_ENABLED = os.environ.get("NCP_OCR_BREAKER", "1") != "0"
+BREAKER_WINDOW = float(os.environ.get("NCP_OCR_BREAKER_WINDOW", "60"))
+BREAKER_MIN_CALLS = int(os.environ.get("NCP_OCR_BREAKER_MIN_CALLS", "3"))
+BREAKER_ERROR_RATE = float(os.environ.get("NCP_OCR_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_SECONDS = float(os.environ.get("NCP_OCR_BREAKER_SLOW_SECONDS", "10"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("NCP_OCR_BREAKER_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+logger = tracing.get_logger("circuit_breaker")
+
+
+class CircuitBreaker:
+    """최근 호출 실패율/응답 시간 기반 회로 차단기"""
+
+    def __init__(self, name: str, window: float = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 error_rate: float = BREAKER_ERROR_RATE, slow_seconds: float = BREAKER_SLOW_SECONDS,
+                 open_seconds: float = BREAKER_OPEN_SECONDS, enabled: bool = BREAKER_ENABLED,
+                 clock=time.monotonic):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.open_seconds = open_seconds
+        self.enabled = enabled
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at = None
+        self.last_error = None
+        self._calls = deque()  # (시각, 실패 여부, 응답 시간)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _transition(self, state: str, now: float):
+        if state == self.state:
+            return
+        logger.warning("회로 차단기 상태 변경", breaker=self.name, previous=self.state, state=state,
+                       error=self.last_error)
+        self.state = state
+        self.opened_at = now if state == OPEN else None
+        if state == CLOSED:
+            self._calls.clear()
+
+    def _advance(self, now: float):
+        """차단 시간이 지났으면 반개방으로 (시험 호출 허용은 allow에서)"""
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, now)
+
+    def allow(self) -> bool:
+        """지금 호출해도 되는지. 반개방 상태에서는 시험 호출 하나만 허용"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            now = self.clock()
+            self._advance(now)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self):
+        """allow()로 받은 호출을 하지 않고 끝낼 때 (예: 헤지 모드에서 시작 전에 취소). 반개방 시험 권한을 반납"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._probing = False
+
+    def record(self, success: bool, seconds: float = 0.0, error: str = None):
+        """호출 결과 기록. 느린 호출(slow_seconds 초과)은 실패로 취급"""
+        if not self.enabled:
+            return
+        with self._lock:
+            now = self.clock()
+            failed = not success or seconds > self.slow_seconds
+            if failed:
+                self.last_error = error or ("slow" if success else "error")
+            self._calls.append((now, failed, seconds))
+            self._trim(now)
+            if self.state == HALF_OPEN:
+                self._probing = False
+                self._transition(OPEN if failed else CLOSED, now)
+            elif self.state == CLOSED and failed:
+                calls = len(self._calls)
+                failures = sum(1 for _, f, _ in self._calls if f)
+                if calls >= self.min_calls and failures / calls >= self.error_rate:
+                    self._transition(OPEN, now)
+
+    def status(self) -> dict:
+        """현재 상태. 차단 시간이 지났으면 반개방으로 바꿔 보고 (호출하지 않는 경로도 복구 시험 시점을 알 수 있게)"""
+        with self._lock:
+            now = self.clock()
+            if self.enabled:
+                self._advance(now)
+            self._trim(now)
+            latencies = sorted(seconds for _, _, seconds in self._calls)
+            failures = sum(1 for _, f, _ in self._calls if f)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.opened_at + self.open_seconds - now), 1)
+            return {
+                "name": self.name,
+                "enabled": self.enabled,
+                "state": self.state,
+                "window_seconds": self.window,
+                "calls": len(latencies),
+                "failures": failures,
+                "error_rate": round(failures / len(latencies), 3) if latencies else 0.0,
+                "p50_seconds": round(latencies[len(latencies) // 2], 3) if latencies else None,
+                "p95_seconds": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3) if latencies else None,
+                "retry_in_seconds": retry_in,
+                "last_error": self.last_error,
+            }
+
+    def collect(self):
+        """/metrics collector"""
+        status = self.status()
+        return [
+            ("ncp_circuit_breaker_state", "gauge", "회로 차단기 상태 (0=closed, 1=half_open, 2=open)",
+             [({"breaker": self.name}, STATE_VALUES[status["state"]])]),
+            ("ncp_circuit_breaker_error_rate", "gauge", "회로 차단기 최근 호출 실패율",
+             [({"breaker": self.name}, status["error_rate"])]),
+        ]
@@ -0,0 +1,167 @@
+import os
+import math
+import time
+import threading
+from io import BytesIO
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+import tracing
+from orientation import EXIF_TRANSPOSE
+from ocr_tiles import TILE_ENABLED
+from metrics import OCR_DECODE_SECONDS, OCR_DECODE_PEAK_RSS
+
+# 로컬 OCR용 저메모리 이미지 디코딩
+# - 휴대폰 사진(12MP 이상)을 원본 해상도 RGB로 풀면 이미지 한 장에 수십 MB가 필요합니다.
+#   JPEG은 draft 모드로 DCT 단계에서 1/2, 1/4, 1/8로 줄여 디코딩하고(흑백이면 채널도 하나만),
+#   그 외 형식은 정수배 reduce로 줄인 뒤 필요한 채널로만 변환합니다.
+# - numpy 배열은 작업 스레드별 버퍼를 재사용해 채우므로 이미지마다 큰 배열을 새로 할당하지 않습니다.
+# - PADDLE_DECODE_TRACK_RSS=1이면 디코딩마다 프로세스 최대 RSS 증가량을 기록합니다
+#   (Linux: /proc/self/clear_refs로 최대값을 초기화하므로 측정할 때만 켭니다).
+# - 타일 분할 인식(PADDLE_OCR_TILE=1)을 켜면 기본값으로는 줄이지 않고 원본 해상도로 디코딩합니다.
+
+DECODE_MAX_DIM = int(os.environ.get("PADDLE_DECODE_MAX_DIM", "2560"))  # 디코딩할 긴 변 목표 px (0이면 원본 해상도)
+DECODE_GRAYSCALE = os.environ.get("PADDLE_DECODE_GRAYSCALE", "0") == "1"  # 흑백 한 채널로 디코딩
+DECODE_TRACK_RSS = os.environ.get("PADDLE_DECODE_TRACK_RSS", "0") == "1"
+BUFFER_MAX_BYTES = 64 * 1024 * 1024  # 이보다 큰 이미지는 스레드 버퍼에 두지 않음 (메모리를 계속 잡고 있지 않도록)
+COPY_STRIP_BYTES = 1024 * 1024  # 버퍼에 픽셀을 옮길 때 한 번에 꺼내는 행 묶음 크기
+
+_REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA")  # Image.reduce 지원 모드
+_local = threading.local()
+
+logger = tracing.get_logger("image_decode")
+
+
+def decode_mode() -> str:
+    """PaddleOCR.ocr()는 2차원(흑백) 배열을 내부에서 3채널로 바꿔 받으므로 흑백 디코딩을 선택할 수 있음"""
+    return "L" if DECODE_GRAYSCALE else "RGB"
+
+
+def _read_status_kb(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def current_rss_bytes() -> Optional[int]:
+    kb = _read_status_kb("VmRSS")
+    return kb * 1024 if kb is not None else None
+
+
+def peak_rss_bytes() -> int:
+    """프로세스 최대 RSS (Linux는 VmHWM, 그 외는 getrusage 기준 시작 후 최대값)"""
+    kb = _read_status_kb("VmHWM")
+    if kb is not None:
+        return kb * 1024
+    import resource  # Unix 전용
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024  # macOS는 바이트, Linux는 KB
+
+
+def reset_peak_rss() -> bool:
+    """최대 RSS를 현재 RSS로 초기화 (Linux 4.0+). 지원하지 않으면 False"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _scale_factor(longest: int, max_dim: int, powers_of_two: bool) -> int:
+    """긴 변을 max_dim에 가장 가깝게(로그 기준) 만드는 축소 배율 (1이면 그대로)"""
+    if not max_dim or longest <= max_dim:
+        return 1
+    if powers_of_two:
+        candidates = (1, 2, 4, 8)  # JPEG draft 지원 배율
+    else:
+        candidates = range(1, longest // max_dim + 2)
+    return min(candidates, key=lambda factor: abs(math.log(longest / factor / max_dim)))
+
+
+def decode_image(content: bytes, max_dim: int = None, mode: str = None) -> Image.Image:
+    """이미지 바이트 -> 긴 변이 max_dim에 가까운 크기, mode 채널로 디코딩된 PIL 이미지
+
+    리샘플링(12MP 사진에서 수백 ms)을 하지 않도록 JPEG은 draft의 1/2^n 배율, 그 외 형식은 정수배 reduce 중
+    max_dim에 가장 가까운 배율을 고릅니다. 긴 변은 max_dim의 약 0.7~1.4배가 됩니다.
+    EXIF 방향 태그가 있으면 바로 세운 이미지를 반환합니다.
+    max_dim을 주지 않으면 PADDLE_DECODE_MAX_DIM, 타일 분할 인식을 켰으면 원본 해상도(타일이 해상도를 그대로 씀)입니다.
+    """
+    if max_dim is None:
+        max_dim = 0 if TILE_ENABLED else DECODE_MAX_DIM
+    mode = mode or decode_mode()
+    track = DECODE_TRACK_RSS and reset_peak_rss()
+    rss_before = current_rss_bytes() if track else None
+    start = time.perf_counter()
+
+    image = Image.open(BytesIO(content))
+    original_size = image.size
+    exif_orientation = image.getexif().get(0x0112)  # EXIF 방향 태그
+    if image.format == "JPEG":
+        factor = _scale_factor(max(image.size), max_dim, powers_of_two=True)
+        image.draft(mode, (image.width // factor, image.height // factor))  # DCT 단계에서 축소/흑백 디코딩
+    if image.mode not in _REDUCIBLE_MODES:
+        image = image.convert("RGB" if mode == "RGB" else "L")
+    factor = _scale_factor(max(image.size), max_dim, powers_of_two=False)
+    if factor > 1:
+        image = image.reduce(factor)
+    if image.mode != mode:
+        image = image.convert(mode)  # 줄인 뒤 변환 (알파 채널 제거/흑백 변환을 작은 이미지에서)
+    if exif_orientation in EXIF_TRANSPOSE:
+        image = image.transpose(EXIF_TRANSPOSE[exif_orientation])  # 줄인 이미지에서 한 번만 바로 세움
+    image.load()
+
+    seconds = time.perf_counter() - start
+    OCR_DECODE_SECONDS.observe(seconds)
+    fields = {"original_size": list(original_size), "size": list(image.size), "mode": image.mode,
+              "exif_orientation": exif_orientation, "seconds": round(seconds, 4)}
+    if track and rss_before is not None:
+        peak = peak_rss_bytes()
+        OCR_DECODE_PEAK_RSS.observe(max(0, peak - rss_before))
+        fields.update(peak_rss_bytes=peak, peak_rss_growth_bytes=max(0, peak - rss_before))
+    logger.debug("OCR 이미지 디코딩", **fields)
+    return image
+
+
+def _copy_pixels(image: Image.Image, out: np.ndarray):
+    """행 묶음(COPY_STRIP_BYTES)씩 잘라 out에 채움 (이미지 전체 크기의 bytes를 만들지 않음)"""
+    row_bytes = out.size // image.height
+    rows = max(1, COPY_STRIP_BYTES // row_bytes)
+    for top in range(0, image.height, rows):
+        bottom = min(image.height, top + rows)
+        out[top * row_bytes:bottom * row_bytes] = np.frombuffer(image.crop((0, top, image.width, bottom)).tobytes(),
+                                                                dtype=np.uint8)
+
+
+def to_array(image: Image.Image, reuse: bool = True) -> np.ndarray:
+    """PIL 이미지(L/RGB) -> uint8 numpy 배열
+
+    reuse=True면 현재 스레드의 버퍼에 채운 배열을 반환하므로 같은 스레드에서 다음에 호출하면 내용이 바뀝니다.
+    결과(또는 그 슬라이스)를 다음 이미지 처리 뒤까지 들고 있어야 하면 reuse=False를 쓰세요.
+    """
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    shape = (image.height, image.width) if image.mode == "L" else (image.height, image.width, 3)
+    size = int(np.prod(shape))
+    if not reuse or size > BUFFER_MAX_BYTES:
+        return np.array(image)
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None or buffer.size < size:
+        buffer = _local.buffer = np.empty(size, dtype=np.uint8)
+    out = buffer[:size]
+    _copy_pixels(image, out)
+    return out.reshape(shape)
+
+
+def as_three_channel(image_array: np.ndarray) -> np.ndarray:
+    """흑백 배열을 3채널로 (PaddleOCR 검출/인식기를 직접 호출할 때는 3채널이 필요)"""
+    if image_array.ndim == 2:
+        return np.repeat(image_array[:, :, None], 3, axis=2)
+    return image_array
@@ -0,0 +1,191 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageOps, ImageFilter
+
+# 업로드 이미지 중복 감지 (perceptual hash)
+# - 같은 라벨을 다시 찍었거나 다시 인코딩/축소/살짝 이동한 사진은 바이트 해시는 달라도 pHash는 거의 같습니다.
+# - 해밍 거리로 가까운 해시를 BK-tree에서 찾되, 표준 양식 라벨은 제품이 달라도 해시가 몇 비트 차이밖에 안 나므로
+#   pHash만으로 같은 사진이라고 판단하지 않습니다. 후보는 바이트 해시(content_digest)가 같거나,
+#   두 사진을 같은 크기로 줄여 비교한 픽셀 차이가 작을 때(same_picture)만 재사용합니다.
+# - same_picture는 숫자 한 글자가 바뀐 부분처럼 좁은 영역의 차이를 보도록 블록별 평균 차이의 최대값을 씁니다.
+#   긴 변이 PHASH_CONFIRM_SIZE보다 작은 사진은 글자를 구분할 해상도가 안 되므로 확인하지 않습니다 (OCR로 처리).
+
+PHASH_MAX_DISTANCE = int(os.environ.get("PHASH_MAX_DISTANCE", "8"))  # 64비트 중 다른 비트 수가 이 이하면 같은 사진
+PHASH_INDEX_SIZE = int(os.environ.get("PHASH_INDEX_SIZE", "2000"))  # 보관할 이전 결과 수 (넘으면 오래된 순으로 제거)
+PHASH_CONFIRM_SIZE = int(os.environ.get("PHASH_CONFIRM_SIZE", "768"))  # 같은 사진 확인용으로 줄일 긴 변(px)
+PHASH_CONFIRM_MAX_DIFF = float(os.environ.get("PHASH_CONFIRM_MAX_DIFF", "0.12"))  # 블록 평균 차이(표준화 밝기) 최대값
+CONFIRM_BLOCK = 16  # 픽셀 차이를 평균할 블록 한 변(px), 숫자 한 글자 크기 정도
+CONFIRM_BLUR = 1.5  # JPEG 압축 잡음을 줄이는 가우시안 블러 반경
+CONFIRM_ASPECT_TOLERANCE = 0.01  # 가로세로 비가 이보다 다르면 다른 사진 (잘라낸 사진은 OCR로 처리)
+
+_HASH_SIZE = 8
+_SAMPLE_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(_SAMPLE_SIZE)
+
+
+def phash(content: bytes) -> Optional[int]:
+    """이미지 바이트 -> 64비트 pHash (32x32 흑백 DCT의 저주파 8x8 계수를 중앙값과 비교). 이미지가 아니면 None"""
+    try:
+        with Image.open(BytesIO(content)) as img:
+            img.draft("L", (_SAMPLE_SIZE * 4, _SAMPLE_SIZE * 4))  # JPEG은 디코딩 단계에서 축소
+            img = ImageOps.exif_transpose(img).convert("L").resize((_SAMPLE_SIZE, _SAMPLE_SIZE), Image.BILINEAR)
+            pixels = np.asarray(img, dtype=np.float64)
+    except Exception:
+        return None
+    coefficients = (_DCT @ pixels @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE].flatten()
+    bits = coefficients > np.median(coefficients[1:])  # DC 성분은 중앙값 계산에서 제외
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def content_digest(content: bytes) -> str:
+    """이미지 바이트의 SHA-256 (pHash 후보가 정말 같은 파일인지 확인용)"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _confirm_pixels(content: bytes, shape=None) -> Optional[np.ndarray]:
+    """같은 사진 확인용 표준화 밝기 배열 (shape가 없으면 긴 변 PHASH_CONFIRM_SIZE). 작거나 이미지가 아니면 None"""
+    try:
+        with Image.open(BytesIO(content)) as img:
+            img.draft("L", (PHASH_CONFIRM_SIZE * 2, PHASH_CONFIRM_SIZE * 2))  # 원본과 같은 경로로 줄이도록 여유 있게
+            img = ImageOps.exif_transpose(img).convert("L")
+            if max(img.size) < PHASH_CONFIRM_SIZE:
+                return None
+            if shape is None:
+                scale = PHASH_CONFIRM_SIZE / max(img.size)
+                shape = (round(img.height * scale), round(img.width * scale))
+            elif abs(img.width / img.height - shape[1] / shape[0]) > CONFIRM_ASPECT_TOLERANCE * shape[1] / shape[0]:
+                return None
+            img = img.resize((shape[1], shape[0]), Image.BILINEAR).filter(ImageFilter.GaussianBlur(CONFIRM_BLUR))
+            pixels = np.asarray(img, dtype=np.float32)
+    except Exception:
+        return None
+    return (pixels - pixels.mean()) / (pixels.std() + 1e-6)
+
+
+def same_picture(a: bytes, b: bytes, max_diff: float = None) -> bool:
+    """pHash가 가까운 두 이미지가 같은 사진을 다시 인코딩/축소한 것인지 (블록 평균 픽셀 차이의 최대값으로 확인)"""
+    max_diff = PHASH_CONFIRM_MAX_DIFF if max_diff is None else max_diff
+    first = _confirm_pixels(a)
+    second = _confirm_pixels(b, first.shape) if first is not None else None
+    if second is None:
+        return False
+    diff = np.abs(first - second)
+    height, width = (diff.shape[0] // CONFIRM_BLOCK) * CONFIRM_BLOCK, (diff.shape[1] // CONFIRM_BLOCK) * CONFIRM_BLOCK
+    blocks = diff[:height, :width].reshape(height // CONFIRM_BLOCK, CONFIRM_BLOCK, width // CONFIRM_BLOCK, CONFIRM_BLOCK)
+    return float(blocks.mean(axis=(1, 3)).max()) <= max_diff
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """해밍 거리 BK-tree (거리 d 이내 검색 시 삼각부등식으로 가지를 잘라냄)"""
+
+    def __init__(self):
+        self.root = None  # [해시, 값, {거리: 자식 노드}]
+        self.size = 0
+
+    def add(self, key: int, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [key, value, {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(key, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, value, {}]
+                return
+            node = child
+
+    def search(self, key: int, max_distance: int):
+        """거리 max_distance 이내의 [(거리, 해시, 값)] (가까운 순)"""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_key, value, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= max_distance:
+                found.append((distance, node_key, value))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found, key=lambda item: item[0])
+
+
+class PhashIndex:
+    """pHash -> 이전 분석 결과 인덱스 (scope별로 구분, 전체 최대 max_size개)
+
+    scope(예: 세션의 업로드 ID)가 다른 항목은 찾지 않으므로 다른 사용자의 결과가 섞이지 않습니다.
+    BK-tree는 삭제가 어려우므로 오래된 항목을 지울 때는 남은 항목으로 트리를 다시 만듭니다.
+    """
+
+    def __init__(self, max_distance: int = PHASH_MAX_DISTANCE, max_size: int = PHASH_INDEX_SIZE):
+        self.max_distance = max_distance
+        self.max_size = max_size
+        self._entries = OrderedDict()  # (scope, 해시) -> 값 (추가 순서)
+        self._tree = BKTree()
+        self._tree_keys = set()  # 트리에 들어 있는 해시
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, key: int, scope=None, confirm=None):
+        """같은 scope에서 max_distance 이내 가장 가까운 이전 값. confirm이 있으면 confirm(값)이 참인 것만. 없으면 None"""
+        with self._lock:
+            candidates = [self._entries[(scope, node_key)]
+                          for _, node_key, _ in self._tree.search(key, self.max_distance)
+                          if (scope, node_key) in self._entries]
+        for value in candidates:
+            if confirm is None or confirm(value):
+                return value
+        return None
+
+    def add(self, key: int, value, scope=None):
+        """값은 _entries에만 두고 트리에는 해시만 넣음 (같은 scope/해시는 값만 교체)"""
+        entry = (scope, key)
+        with self._lock:
+            if entry in self._entries:
+                self._entries[entry] = value
+                self._entries.move_to_end(entry)
+                return
+            self._entries[entry] = value
+            if key not in self._tree_keys:
+                self._tree_keys.add(key)
+                self._tree.add(key, None)
+            if len(self._entries) > self.max_size:
+                # 오래된 절반을 지우고 재구성 (재구성 비용을 여러 번의 추가에 나눔)
+                for _ in range(len(self._entries) - self.max_size // 2):
+                    self._entries.popitem(last=False)
+                self._rebuild()
+
+    def _rebuild(self):
+        self._tree = BKTree()
+        self._tree_keys = {key for _, key in self._entries}
+        for key in self._tree_keys:
+            self._tree.add(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tree = BKTree()
+            self._tree_keys = set()
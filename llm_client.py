@@ -3,7 +3,14 @@ import json
 import requests
 import time
 import hashlib
+import logging
 from typing import Dict, List, Any
+from rate_limiter import get_rate_limiter, estimate_tokens
+import recommendation_rules
+import tracing
+from metrics import LLM_TTFT_SECONDS, LLM_TOKENS_PER_SECOND, LLM_STREAM_SECONDS, LLM_REQUESTS, STATISTICAL_FALLBACKS
+
+logger = tracing.get_logger("llm_client")
 
 # 네이버클라우드 HyperCLOVA X LLM API 클라이언트
 # test.py 구조를 기반으로 재작성
@@ -15,78 +22,140 @@ def generate_request_id():
 
 HOST = os.environ.get("NCP_LLM_HOST", "https://clovastudio.stream.ntruss.com")
 API_KEY = os.environ.get("NCP_LLM_API_KEY", "")  # Bearer <api-key> 형태
-REQUEST_ID = os.environ.get("NCP_REQUEST_ID", generate_request_id())
+REQUEST_ID = os.environ.get("NCP_REQUEST_ID")  # 고정 ID가 필요할 때만 설정 (없으면 요청마다 발급)
+
+def emit_llm_response(socketio, session_id, payload, section=None):
+    """llm_response 이벤트를 session_id room으로 전송 (section이 있으면 화면 영역 표시)"""
+    if not (socketio and session_id):
+        return
+    if section:
+        payload["section"] = section
+    socketio.emit('llm_response', payload, room=session_id)
+
 
 class CompletionExecutor:
     """test.py를 기반으로 한 완성도 높은 LLM 클라이언트"""
     
-    def __init__(self, host, api_key, request_id):
+    def __init__(self, host, api_key, request_id, rate_limiter=None):
         self._host = host
         self._api_key = api_key
         self._request_id = request_id
+        self._rate_limiter = rate_limiter
         
 
-    def execute_streaming(self, completion_request, socketio=None, session_id=None):
-        """스트리밍 방식으로 LLM 응답을 처리"""
+    def execute_streaming(self, completion_request, socketio=None, session_id=None, section=None):
+        """스트리밍 방식으로 LLM 응답을 처리 (section: 화면의 어느 추천 영역으로 보낼지)"""
         headers = {
             'Authorization': self._api_key,
-            'X-NCP-CLOVASTUDIO-REQUEST-ID': self._request_id,
+            # 고정 ID 대신 호출마다 현재 요청 ID를 실어 서버 로그와 대조할 수 있게 함
+            'X-NCP-CLOVASTUDIO-REQUEST-ID': self._request_id or tracing.current_request_id() or generate_request_id(),
             'Content-Type': 'application/json; charset=utf-8',
             'Accept': 'text/event-stream'
         }
 
-        print(f"DEBUG: Making LLM request to {self._host + '/v3/chat-completions/HCX-005'}")
-        print(f"DEBUG: Request data: {json.dumps(completion_request, ensure_ascii=False, indent=2)}")
+        logger.info("LLM request", url=self._host + '/v3/chat-completions/HCX-005',
+                    max_tokens=completion_request.get('maxTokens'))
+        if logger.isEnabledFor(logging.DEBUG):
+            # 요청 본문 직렬화는 DEBUG 레벨에서만 수행
+            logger.debug(f"Request data: {json.dumps(completion_request, ensure_ascii=False, indent=2)}")
+
+        # 호출량 제한: 대기 허용 시간 안에 슬롯을 못 얻으면 None 반환 -> 통계 기반 추천으로 대체
+        if self._rate_limiter:
+            try:
+                acquired = self._rate_limiter.acquire(estimate_tokens(completion_request))
+            except Exception as e:
+                # 제한기 DB가 잠겼거나 손상되어도 분석 요청은 실패시키지 않음 (제한 없이 진행)
+                logger.warning("LLM rate limiter unavailable, proceeding without limit", error=str(e))
+                acquired = True
+            if not acquired:
+                logger.warning("LLM rate limit wait exceeded, skipping request")
+                LLM_REQUESTS.labels("rate_limited").inc()
+                return None
+
+        with tracing.span("llm.stream") as llm_span:
+            return self._stream(completion_request, headers, llm_span, socketio, session_id, section)
+
+    def _record_outcome(self, method: str):
+        """호출 결과를 제한기 AIMD에 반영 (on_success/on_throttled/on_error). 제한기 오류는 경고만 남김"""
+        if not self._rate_limiter:
+            return
+        try:
+            getattr(self._rate_limiter, method)()
+        except Exception as e:
+            logger.warning("LLM rate limiter update failed", method=method, error=str(e))
 
+    def _stream(self, completion_request, headers, llm_span, socketio=None, session_id=None, section=None):
+        start_time = time.perf_counter()
         try:
             full_response = ""
             
             # 연결 중 메시지
-            if socketio and session_id:
-                socketio.emit('llm_response', {
-                    'data': "🔗 AI 서버에 연결 중...", 
-                    'type': 'connecting'
-                }, room=session_id)
+            emit_llm_response(socketio, session_id, {
+                'data': "🔗 AI 서버에 연결 중...",
+                'type': 'connecting'
+            }, section)
             
             with requests.post(self._host + '/v3/chat-completions/HCX-005',
                              headers=headers, json=completion_request, stream=True, timeout=30) as r:
                 
-                print(f"DEBUG: Response status: {r.status_code}")
-                # print(f"DEBUG: Response status: {r.text}")
+                logger.debug("Response status", status=r.status_code)
+                llm_span.set("status", r.status_code)
                 
+                if r.status_code == 429:
+                    # 할당량 초과: 공유 호출 속도를 절반으로 줄임 (AIMD)
+                    self._record_outcome("on_throttled")
+
                 if r.status_code != 200:
-                    print(f"DEBUG: LLM API error status: {r.status_code}")
-                    print(f"DEBUG: Response content: {r.text}")
+                    logger.warning("LLM API error", status=r.status_code, body=r.text[:500])
+                    LLM_REQUESTS.labels("error").inc()
                     # 에러 메시지 전송
-                    if socketio and session_id:
-                        socketio.emit('llm_response', {
-                            'data': "❌ AI 서버 연결 오류", 
-                            'type': 'error'
-                        }, room=session_id)
+                    emit_llm_response(socketio, session_id, {
+                        'data': "❌ AI 서버 연결 오류",
+                        'type': 'error'
+                    }, section)
                     return None
                 
                 # 응답 스트림 시작 메시지
-                if socketio and session_id:
-                    socketio.emit('llm_response', {
-                        'data': "💭 AI가 응답을 생성하고 있습니다", 
-                        'type': 'generating'
-                    }, room=session_id)
+                emit_llm_response(socketio, session_id, {
+                    'data': "💭 AI가 응답을 생성하고 있습니다",
+                    'type': 'generating'
+                }, section)
                 
                 response_started = False
+                first_token_time = None
+                chunks = 0
+                event_type = None
+                completed = False  # result 이벤트나 [DONE]을 받았는지 (못 받으면 도중에 끊긴 것)
                 for line in r.iter_lines():
                     if line:
                         line_str = line.decode("utf-8")
-                        # print(f"DEBUG: Raw line: {line_str}")
+                        
+                        # v3 SSE: 'event: token' 뒤에 조각, 'event: result' 뒤에 전체 응답이 옴
+                        if line_str.startswith('event:'):
+                            event_type = line_str[6:].strip()
+                            continue
+                        
+                        if line_str.startswith('data:') and event_type == 'result':
+                            # 최종 결과 이벤트: 이미 받은 조각과 중복되므로 전체 응답으로 교체
+                            try:
+                                json_data = json.loads(line_str[5:])
+                                final_content = json_data.get('message', {}).get('content')
+                                if final_content:
+                                    full_response = final_content
+                                completed = True
+                            except json.JSONDecodeError as e:
+                                logger.warning("JSON decode error", error=str(e))
+                            break
                         
                         if line_str.startswith('data:'):
                             try:
                                 json_str = line_str[5:]  # 'data:' 제거
                                 if json_str.strip() == '[DONE]':
-                                    print("DEBUG: Stream completed")
+                                    logger.debug("Stream completed")
+                                    completed = True
                                     break
                                     
                                 json_data = json.loads(json_str)
-                                # print(f"DEBUG: Parsed JSON: {json_data}")
                                 
                                 # 메시지 내용 추출
                                 if 'message' in json_data and 'content' in json_data['message']:
@@ -95,74 +164,102 @@ class CompletionExecutor:
                                         # 첫 번째 응답 시작 시 메시지 변경
                                         if not response_started:
                                             response_started = True
-                                            print(f"DEBUG: First content received: {content[:50]}...")
-                                            if socketio and session_id:
-                                                socketio.emit('llm_response', {
-                                                    'data': "✨ AI 영양사가 답변하고 있습니다...", 
-                                                    'type': 'responding'
-                                                }, room=session_id)
+                                            first_token_time = time.perf_counter()
+                                            LLM_TTFT_SECONDS.observe(first_token_time - start_time)
+                                            llm_span.set("ttft_ms", round((first_token_time - start_time) * 1000, 3))
+                                            logger.debug("First content received", preview=content[:50])
+                                            emit_llm_response(socketio, session_id, {
+                                                'data': "✨ AI 영양사가 답변하고 있습니다...",
+                                                'type': 'responding'
+                                            }, section)
                                         
+                                        # 실시간으로 소켓을 통해 전송 (누적 본문 대신 조각과 시작 위치만 보냄)
+                                        emit_llm_response(socketio, session_id, {
+                                            'data': content,
+                                            'type': 'chunk',
+                                            'offset': len(full_response)
+                                        }, section)
                                         full_response += content
-                                        # print(f"DEBUG: Content chunk: {content}")  # 너무 많은 로그 방지
-                                        
-                                        # 실시간으로 소켓을 통해 전송
-                                        if socketio and session_id:
-                                            socketio.emit('llm_response', {
-                                                'data': content, 
-                                                'type': 'chunk',
-                                                'full_response': full_response
-                                            }, room=session_id)
+                                        chunks += 1
                                 else:
-                                    print(f"DEBUG: Unexpected JSON structure: {json_data}")
+                                    logger.debug("Unexpected JSON structure", data=json_data)
                                             
                             except json.JSONDecodeError as e:
-                                print(f"DEBUG: JSON decode error: {e}")
+                                logger.warning("JSON decode error", error=str(e))
                                 continue
                 
-                print(f"DEBUG: Full LLM response: {full_response}")
-                print(f"DEBUG: Response length: {len(full_response) if full_response else 0}")
+                llm_span.set("chunks", chunks)
+                if not completed:
+                    # 연결이 도중에 끊기면 받은 조각까지만 있으므로 최종 추천으로 쓰지 않음 -> 통계 기반 추천으로 대체
+                    logger.warning("LLM stream ended without result event", chunks=chunks,
+                                   length=len(full_response))
+                    LLM_REQUESTS.labels("error").inc()
+                    llm_span.set("error", "incomplete_stream")
+                    self._record_outcome("on_error")
+                    emit_llm_response(socketio, session_id, {
+                        'data': "❌ AI 응답이 중간에 끊겼습니다",
+                        'type': 'error'
+                    }, section)
+                    return None
+                end_time = time.perf_counter()
+                LLM_STREAM_SECONDS.observe(end_time - start_time)
+                if first_token_time is not None and chunks > 1 and end_time > first_token_time:
+                    LLM_TOKENS_PER_SECOND.observe((chunks - 1) / (end_time - first_token_time))
+                logger.debug("Full LLM response: %s", full_response)  # DEBUG가 꺼져 있으면 문자열을 만들지 않음
+                logger.info("LLM response received", length=len(full_response) if full_response else 0,
+                            chunks=chunks, elapsed_ms=round((time.perf_counter() - start_time) * 1000, 1))
                 
                 # 응답이 있는지 확인
                 if full_response and full_response.strip():
-                    print("DEBUG: LLM returned valid response")
+                    LLM_REQUESTS.labels("success").inc()
+                    self._record_outcome("on_success")
                     # 완료 신호 전송
-                    if socketio and session_id:
-                        socketio.emit('llm_response', {
-                            'data': full_response, 
-                            'type': 'complete'
-                        }, room=session_id)
+                    emit_llm_response(socketio, session_id, {
+                        'data': full_response,
+                        'type': 'complete'
+                    }, section)
                     return full_response
                 else:
-                    print("DEBUG: LLM returned empty or invalid response")
+                    logger.warning("LLM returned empty or invalid response")
+                    LLM_REQUESTS.labels("empty").inc()
                     return None
                 
         except requests.exceptions.Timeout:
-            print("DEBUG: LLM API timeout")
+            logger.warning("LLM API timeout")
+            LLM_REQUESTS.labels("timeout").inc()
+            llm_span.set("error", "timeout")
             return None
         except requests.exceptions.RequestException as e:
-            print(f"DEBUG: LLM API request error: {e}")
+            logger.warning("LLM API request error", error=str(e))
+            LLM_REQUESTS.labels("error").inc()
+            llm_span.set("error", type(e).__name__)
             return None
-        except Exception as e:
-            print(f"DEBUG: Unexpected error: {e}")
+        except Exception:
+            logger.exception("Unexpected LLM error")
+            LLM_REQUESTS.labels("error").inc()
             return None
 
 # 전역 클라이언트 인스턴스
 llm_client = None
 if API_KEY:
-    # REQUEST_ID가 환경변수에 없으면 자동으로 타임스탬프 MD5 해시 생성
-    request_id = REQUEST_ID if REQUEST_ID else generate_request_id()
-    llm_client = CompletionExecutor(HOST, API_KEY, request_id)
+    # REQUEST_ID가 없으면 호출 시점의 요청 ID(없으면 타임스탬프 MD5 해시)를 사용
+    llm_client = CompletionExecutor(HOST, API_KEY, REQUEST_ID, rate_limiter=get_rate_limiter())
+
+def is_llm_available() -> bool:
+    """LLM API 키가 설정되어 실제 AI 추천을 호출할 수 있는지 여부"""
+    return llm_client is not None
 
-def get_comprehensive_nutrition_analysis_streaming(totals: Dict[str, float], male_pct: Dict[str, float], female_pct: Dict[str, float], deficient_nutrients: Dict[str, float], excessive_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", socketio=None, session_id=None):
+
+def get_comprehensive_nutrition_analysis_streaming(totals: Dict[str, float], male_pct: Dict[str, float], female_pct: Dict[str, float], deficient_nutrients: Dict[str, float], excessive_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", socketio=None, session_id=None, section=None):
     """
     전체 영양 분석 결과를 기반으로 종합적인 추천을 생성합니다.
     부족/과다 영양소를 모두 고려하여 한 번에 완전한 분석을 제공합니다.
     """
     if not llm_client:
-        print("DEBUG: LLM client not available, using statistical recommendation")
+        logger.info("LLM client not available, using statistical recommendation")
+        STATISTICAL_FALLBACKS.labels("comprehensive", "no_client").inc()
         result = get_statistical_comprehensive_recommendation(deficient_nutrients, excessive_nutrients, rdi_info, gender)
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': result, 'type': 'complete'}, section)
         return result
     
     # 부족한 영양소 목록 생성
@@ -242,11 +339,10 @@ def get_comprehensive_nutrition_analysis_streaming(totals: Dict[str, float], mal
 한국인이 쉽게 구할 수 있는 음식 위주로 현실적이고 실천 가능한 방안을 제시해주세요."""
 
     # 진행 중 상태 표시를 위한 초기 메시지
-    if socketio and session_id:
-        socketio.emit('llm_response', {
-            'data': "🤖 AI 영양사가 분석 중입니다.", 
-            'type': 'thinking'
-        }, room=session_id)
+    emit_llm_response(socketio, session_id, {
+        'data': "🤖 AI 영양사가 분석 중입니다.",
+        'type': 'thinking'
+    }, section)
 
     # test.py와 동일한 요청 데이터 구조
     completion_request = {
@@ -280,35 +376,35 @@ def get_comprehensive_nutrition_analysis_streaming(totals: Dict[str, float], mal
         "includeAiFilters": True
     }
     
-    print(f"DEBUG: Calling LLM for comprehensive {gender} analysis")
+    logger.info("Calling LLM for comprehensive analysis", gender=gender)
     
     # test.py 기반 CompletionExecutor 사용
-    result = llm_client.execute_streaming(completion_request, socketio, session_id)
+    result = llm_client.execute_streaming(completion_request, socketio, session_id, section)
     
     if result and result.strip():
         # LLM이 실제 내용이 있는 응답을 반환한 경우
-        print(f"DEBUG: LLM success for {gender} - response length: {len(result)}")
-        print(f"DEBUG: LLM response starts with: {result[:100]}...")
+        logger.info("LLM success", gender=gender, length=len(result))
+        logger.debug("LLM response preview", preview=result[:100])
         return result
     else:
-        print(f"DEBUG: LLM API failed or returned empty response for {gender}, falling back to statistical recommendation")
-        print(f"DEBUG: Result was: {repr(result)}")
+        logger.warning("LLM failed or returned empty response, falling back to statistical recommendation", gender=gender)
+        logger.debug("LLM result", result=repr(result))
+        STATISTICAL_FALLBACKS.labels("comprehensive", "llm_failed").inc()
         fallback_result = get_statistical_comprehensive_recommendation(deficient_nutrients, excessive_nutrients, rdi_info, gender, is_fallback=True)
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': fallback_result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': fallback_result, 'type': 'complete'}, section)
         return fallback_result
 
 
-def get_nutrition_recommendation_streaming(deficient_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", socketio=None, session_id=None):
+def get_nutrition_recommendation_streaming(deficient_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", socketio=None, session_id=None, section=None):
     """
     스트리밍 방식으로 부족한 영양소 보충 추천을 생성합니다.
     test.py 기반 CompletionExecutor 사용
     """
     if not llm_client:
-        print("DEBUG: LLM client not available, using statistical recommendation")
+        logger.info("LLM client not available, using statistical recommendation")
+        STATISTICAL_FALLBACKS.labels("supplement", "no_client").inc()
         result = get_statistical_nutrition_recommendation(deficient_nutrients, rdi_info, gender)
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': result, 'type': 'complete'}, section)
         return result
     
     # 부족한 영양소 목록 생성
@@ -322,8 +418,7 @@ def get_nutrition_recommendation_streaming(deficient_nutrients: Dict[str, float]
     
     if not deficient_list:
         result = "현재 모든 영양소가 충분히 섭취되었습니다! 👍"
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': result, 'type': 'complete'}, section)
         return result
     
     # 성별에 따른 맞춤형 프롬프트 생성
@@ -389,32 +484,32 @@ def get_nutrition_recommendation_streaming(deficient_nutrients: Dict[str, float]
         "includeAiFilters": True
     }
     
-    print("DEBUG: Calling LLM for nutrition recommendation")
+    logger.info("Calling LLM for nutrition recommendation")
     
     # test.py 기반 CompletionExecutor 사용
-    result = llm_client.execute_streaming(completion_request, socketio, session_id)
+    result = llm_client.execute_streaming(completion_request, socketio, session_id, section)
     
     if result and result.strip():
         # LLM이 실제 내용이 있는 응답을 반환한 경우
         return result
     else:
-        print("DEBUG: LLM API failed or returned empty response, falling back to statistical recommendation")
+        logger.warning("LLM failed or returned empty response, falling back to statistical recommendation")
+        STATISTICAL_FALLBACKS.labels("supplement", "llm_failed").inc()
         fallback_result = get_statistical_nutrition_recommendation(deficient_nutrients, rdi_info, gender)
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': fallback_result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': fallback_result, 'type': 'complete'}, section)
         return fallback_result
 
 
-def get_reduction_recommendation_streaming(excessive_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", socketio=None, session_id=None):
+def get_reduction_recommendation_streaming(excessive_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", socketio=None, session_id=None, section=None):
     """
     스트리밍 방식으로 과다 섭취 영양소 감소 방법을 생성합니다.
     test.py 기반 CompletionExecutor 사용
     """
     if not llm_client:
-        print("DEBUG: LLM client not available, using statistical recommendation")
+        logger.info("LLM client not available, using statistical recommendation")
+        STATISTICAL_FALLBACKS.labels("reduction", "no_client").inc()
         result = get_statistical_reduction_recommendation(excessive_nutrients, rdi_info, gender)
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': result, 'type': 'complete'}, section)
         return result
     
     # 과다 섭취한 영양소 목록 생성
@@ -428,8 +523,7 @@ def get_reduction_recommendation_streaming(excessive_nutrients: Dict[str, float]
     
     if not excessive_list:
         result = "현재 과다 섭취한 영양소가 없습니다! 👍"
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': result, 'type': 'complete'}, section)
         return result
     
     # 성별에 따른 맞춤형 프롬프트 생성
@@ -497,19 +591,19 @@ def get_reduction_recommendation_streaming(excessive_nutrients: Dict[str, float]
         "includeAiFilters": True
     }
     
-    print("DEBUG: Calling LLM for reduction recommendation")
+    logger.info("Calling LLM for reduction recommendation")
     
     # test.py 기반 CompletionExecutor 사용
-    result = llm_client.execute_streaming(completion_request, socketio, session_id)
+    result = llm_client.execute_streaming(completion_request, socketio, session_id, section)
     
     if result and result.strip():
         # LLM이 실제 내용이 있는 응답을 반환한 경우
         return result
     else:
-        print("DEBUG: LLM API failed or returned empty response, falling back to statistical recommendation")
+        logger.warning("LLM failed or returned empty response, falling back to statistical recommendation")
+        STATISTICAL_FALLBACKS.labels("reduction", "llm_failed").inc()
         fallback_result = get_statistical_reduction_recommendation(excessive_nutrients, rdi_info, gender)
-        if socketio and session_id:
-            socketio.emit('llm_response', {'data': fallback_result, 'type': 'complete'}, room=session_id)
+        emit_llm_response(socketio, session_id, {'data': fallback_result, 'type': 'complete'}, section)
         return fallback_result
 
 
@@ -525,82 +619,8 @@ def get_reduction_recommendation(excessive_nutrients: Dict[str, float], rdi_info
 
 # 영양소 한국어 이름 매핑
 def get_nutrient_korean_name(nutrient_key: str) -> str:
-    """영양소 키를 한국어 이름으로 변환 (포괄적 매핑)"""
-    names = {
-        # 기본 영양소
-        'calories_kcal': '칼로리',
-        'carbs_g': '탄수화물',
-        'protein_g': '단백질',
-        'fat_g': '지방',
-        'saturated_fat_g': '포화지방',
-        'trans_fat_g': '트랜스지방',
-        'cholesterol_mg': '콜레스테롤',
-        'sodium_mg': '나트륨',
-        'potassium_mg': '칼륨',
-        'fiber_g': '식이섬유',
-        'sugars_g': '당류',
-        'calcium_mg': '칼슘',
-        'iron_mg': '철분',
-        'phosphorus_mg': '인',
-        'vitamin_a_ug': '비타민A',
-        'thiamine_mg': '티아민',
-        'riboflavin_mg': '리보플라빈',
-        'niacin_mg': '나이아신',
-        'vitamin_c_mg': '비타민C',
-        
-        # 다양한 형태의 키 매핑
-        'sat_fat_g': '포화지방',
-        'saturated_fat': '포화지방',
-        'trans_fat': '트랜스지방',
-        'dietary_fiber': '식이섬유',
-        'total_sugars': '당류',
-        'added_sugars': '첨가당',
-        'vitamin_d': '비타민D',
-        'vitamin_e': '비타민E',
-        'vitamin_k': '비타민K',
-        'folate': '엽산',
-        'vitamin_b6': '비타민B6',
-        'vitamin_b12': '비타민B12',
-        'magnesium': '마그네슘',
-        'zinc': '아연',
-        'selenium': '셀레늄',
-        
-        # 영어 원문도 매핑
-        'Calories': '칼로리',
-        'Total Fat': '지방',
-        'Saturated Fat': '포화지방',
-        'Trans Fat': '트랜스지방',
-        'Cholesterol': '콜레스테롤',
-        'Sodium': '나트륨',
-        'Total Carbohydrate': '탄수화물',
-        'Dietary Fiber': '식이섬유',
-        'Total Sugars': '당류',
-        'Added Sugars': '첨가당',
-        'Protein': '단백질',
-        'Vitamin D': '비타민D',
-        'Calcium': '칼슘',
-        'Iron': '철분',
-        'Potassium': '칼륨'
-    }
-    
-    # 대소문자 구분 없이 매핑
-    result = names.get(nutrient_key)
-    if result:
-        return result
-    
-    # 소문자로 변환해서 다시 시도
-    result = names.get(nutrient_key.lower())
-    if result:
-        return result
-        
-    # 키에서 단위 제거 후 매핑 시도 (예: sat_fat_g -> sat_fat)
-    key_without_unit = nutrient_key.replace('_g', '').replace('_mg', '').replace('_ug', '').replace('_kcal', '')
-    result = names.get(key_without_unit)
-    if result:
-        return result
-    
-    # 매핑되지 않은 경우 원본 반환
-    return nutrient_key
+    """영양소 키를 한국어 이름으로 변환 (포괄적 매핑, recommendation_rules에서 캐시)"""
+    return recommendation_rules.nutrient_name(nutrient_key)
 
 
 def calculate_deficient_nutrients(totals: Dict[str, float], rdi_info: Dict[str, float]) -> Dict[str, float]:
@@ -629,181 +649,17 @@ def calculate_excessive_nutrients(totals: Dict[str, float], rdi_info: Dict[str,
     return excessive
 
 
-# 통계 기반 추천 (API 없을 때 대체)
+# 통계 기반 추천 (API 없을 때 대체) - recommendation_rules의 캐시된 문구 조각으로 조합
 def get_statistical_nutrition_recommendation(deficient_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", is_fallback: bool = True) -> str:
     """API 없을 때 통계 기반 추천"""
-    if not deficient_nutrients:
-        return "현재 모든 영양소가 충분히 섭취되었습니다! 👍"
-    
-    recommendations = []
-    
-    food_recommendations = {
-        'calories_kcal': {
-            'male': '견과류(아몬드, 호두), 아보카도, 바나나, 현미밥',
-            'female': '견과류(아몬드, 호두), 아보카도, 바나나, 현미밥'
-        },
-        'protein_g': {
-            'male': '닭가슴살, 달걀, 두부, 생선(연어, 고등어)',
-            'female': '닭가슴살, 달걀, 두부, 생선(연어, 고등어)'
-        },
-        'carbs_g': {
-            'male': '현미, 고구마, 귀리, 바나나',
-            'female': '현미, 고구마, 귀리, 바나나'
-        },
-        'fat_g': {
-            'male': '올리브오일, 견과류, 아보카도, 연어',
-            'female': '올리브오일, 견과류, 아보카도, 연어'
-        },
-        'calcium_mg': {
-            'male': '우유, 요거트, 치즈, 멸치, 시금치',
-            'female': '우유, 요거트, 치즈, 멸치, 시금치'
-        },
-        'iron_mg': {
-            'male': '시금치, 소고기, 닭고기, 콩류',
-            'female': '시금치, 소고기, 닭고기, 콩류, 굴'
-        },
-        'sodium_mg': {
-            'male': '김치, 된장, 간장 (적당량)',
-            'female': '김치, 된장, 간장 (적당량)'
-        },
-        'vitamin_c_mg': {
-            'male': '오렌지, 키위, 딸기, 브로콜리, 파프리카',
-            'female': '오렌지, 키위, 딸기, 브로콜리, 파프리카'
-        }
-    }
-    
-    for nutrient in deficient_nutrients:
-        nutrient_name = get_nutrient_korean_name(nutrient)
-        if nutrient in food_recommendations:
-            foods = food_recommendations[nutrient][gender]
-            recommendations.append(f"• {nutrient_name}: {foods}")
-    
-    gender_text = "남성" if gender == "male" else "여성"
-    
-    if is_fallback:
-        result = f"⚠️ AI 추천 서비스를 이용하려면 API 키가 필요합니다.\n\n📊 통계 기반 {gender_text} 맞춤 추천:\n\n" + "\n".join(recommendations)
-        result += f"\n\n💡 {gender_text}에게 특히 중요한 영양소들을 위주로 선별된 음식들입니다."
-    else:
-        result = f"📊 {gender_text} 맞춤 영양 추천:\n\n" + "\n".join(recommendations)
-        result += f"\n\n💡 {gender_text}에게 특히 중요한 영양소들을 위주로 선별된 음식들입니다."
-    
-    return result
+    return recommendation_rules.render_supplement(deficient_nutrients, gender, is_fallback)
 
 
 def get_statistical_comprehensive_recommendation(deficient_nutrients: Dict[str, float], excessive_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", is_fallback: bool = True) -> str:
     """종합적인 통계 기반 추천 (API 없을 때 대체)"""
-    gender_text = "남성" if gender == "male" else "여성"
-    
-    if is_fallback:
-        result = f"⚠️ AI 추천 서비스를 이용하려면 API 키가 필요합니다.\n\n📊 통계 기반 {gender_text} 종합 영양 분석:\n\n"
-    else:
-        result = f"📊 {gender_text} 종합 영양 분석:\n\n"
-    
-    # 전체적인 상태 평가
-    total_issues = len(deficient_nutrients) + len(excessive_nutrients)
-    if total_issues == 0:
-        result += "🎉 **전체 평가:** 모든 영양소가 적정 수준으로 매우 양호한 상태입니다!\n\n"
-    elif total_issues <= 3:
-        result += f"✅ **전체 평가:** {total_issues}개 영양소에 주의가 필요하지만 전반적으로 양호한 상태입니다.\n\n"
-    else:
-        result += f"⚠️ **전체 평가:** {total_issues}개 영양소 개선이 필요하여 식단 조정을 권장합니다.\n\n"
-    
-    # 부족한 영양소 대응
-    if deficient_nutrients:
-        result += "🔴 **부족한 영양소 개선 방안:**\n"
-        for nutrient in list(deficient_nutrients.keys())[:3]:  # 상위 3개만
-            nutrient_name = get_nutrient_korean_name(nutrient)
-            if nutrient == 'protein_g':
-                foods = "닭가슴살, 달걀, 두부, 생선" if gender == "male" else "닭가슴살, 달걀, 두부, 콩류"
-            elif nutrient == 'calcium_mg':
-                foods = "우유, 멸치, 치즈, 시금치" if gender == "male" else "우유, 멸치, 치즈, 케일"
-            elif nutrient == 'iron_mg':
-                foods = "소고기, 시금치, 콩류" if gender == "male" else "소고기, 시금치, 굴, 콩류"
-            elif nutrient == 'vitamin_c_mg':
-                foods = "오렌지, 키위, 브로콜리, 파프리카"
-            elif nutrient == 'fiber_g':
-                foods = "현미, 고구마, 사과, 양배추"
-            else:
-                foods = "균형 잡힌 식단"
-            result += f"• {nutrient_name}: {foods}\n"
-        result += "\n"
-    
-    # 과다 영양소 대응
-    if excessive_nutrients:
-        result += "⚠️ **과다 섭취 영양소 조절 방안:**\n"
-        for nutrient in list(excessive_nutrients.keys())[:3]:  # 상위 3개만
-            nutrient_name = get_nutrient_korean_name(nutrient)
-            if nutrient == 'sodium_mg':
-                advice = "라면, 찌개류 줄이고 신선한 채소 늘리기"
-            elif nutrient == 'saturated_fat_g':
-                advice = "튀김, 버터 줄이고 올리브오일, 견과류로 대체"
-            elif nutrient == 'sugars_g':
-                advice = "음료수, 과자 줄이고 신선한 과일로 대체"
-            else:
-                advice = "섭취량 조절 및 균형 맞추기"
-            result += f"• {nutrient_name}: {advice}\n"
-        result += "\n"
-    
-    # 성별별 맞춤 조언
-    if gender == "male":
-        result += "👨 **남성 맞춤 조언:**\n"
-        result += "• 근육량 유지를 위한 충분한 단백질 섭취\n"
-        result += "• 활동량에 맞는 적절한 칼로리 조절\n"
-        result += "• 규칙적인 운동과 함께 균형잡힌 식단 유지\n\n"
-    else:
-        result += "👩 **여성 맞춤 조언:**\n"
-        result += "• 철분 부족 예방을 위한 철분 함유 식품 섭취\n"
-        result += "• 골건강을 위한 칼슘, 비타민D 충분 섭취\n"
-        result += "• 호르몬 균형을 위한 규칙적인 식사 패턴\n\n"
-    
-    if is_fallback:
-        result += "💡 더 정확한 개인 맞춤 분석을 원하시면 AI 추천 서비스 이용을 권장합니다."
-    else:
-        result += "💡 지속적인 실천으로 건강한 영양 균형을 유지하세요."
-    
-    return result
+    return recommendation_rules.render_comprehensive(deficient_nutrients, excessive_nutrients, gender, is_fallback)
 
 
 def get_statistical_reduction_recommendation(excessive_nutrients: Dict[str, float], rdi_info: Dict[str, float], gender: str = "male", is_fallback: bool = True) -> str:
     """API 없을 때 통계 기반 감소 추천"""
-    if not excessive_nutrients:
-        return "현재 과다 섭취한 영양소가 없습니다! 👍"
-    
-    recommendations = []
-    
-    reduction_recommendations = {
-        'sodium_mg': {
-            'reduce': '라면, 찌개류, 김치, 젓갈류, 가공식품',
-            'alternative': '신선한 채소, 과일, 허브 양념'
-        },
-        'saturated_fat_g': {
-            'reduce': '버터, 치즈, 육류 지방, 튀김류',
-            'alternative': '올리브오일, 견과류, 생선'
-        },
-        'sugars_g': {
-            'reduce': '탄산음료, 과자, 케이크, 사탕',
-            'alternative': '신선한 과일, 무가당 요거트'
-        },
-        'cholesterol_mg': {
-            'reduce': '계란 노른자, 내장류, 새우',
-            'alternative': '계란 흰자, 생선, 두부'
-        }
-    }
-    
-    for nutrient in excessive_nutrients:
-        nutrient_name = get_nutrient_korean_name(nutrient)
-        if nutrient in reduction_recommendations:
-            reduce_foods = reduction_recommendations[nutrient]['reduce']
-            alternative_foods = reduction_recommendations[nutrient]['alternative']
-            recommendations.append(f"• {nutrient_name}:\n  - 줄일 음식: {reduce_foods}\n  - 대체 음식: {alternative_foods}")
-    
-    gender_text = "남성" if gender == "male" else "여성"
-    
-    if is_fallback:
-        result = f"⚠️ AI 추천 서비스를 이용하려면 API 키가 필요합니다.\n\n📊 통계 기반 {gender_text} 맞춤 감소 방법:\n\n" + "\n\n".join(recommendations)
-        result += f"\n\n💡 {gender_text} 건강을 위해 점진적으로 줄여나가세요."
-    else:
-        result = f"📊 {gender_text} 맞춤 감소 방법:\n\n" + "\n\n".join(recommendations)
-        result += f"\n\n💡 {gender_text} 건강을 위해 점진적으로 줄여나가세요."
-    
-    return result
\ No newline at end of file
+    return recommendation_rules.render_reduction(excessive_nutrients, gender, is_fallback)
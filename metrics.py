@@ -0,0 +1,370 @@
+import bisect
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+# 프로세스 내 메트릭 레지스트리 (Prometheus 텍스트 형식으로 /metrics에 노출)
+# - 값은 스레드별로 나눈 스트라이프(STRIPES개)에 누적하고 조회 시에만 합산합니다.
+#   요청 스레드끼리 같은 락을 두고 경쟁하지 않도록 하기 위함입니다.
+# - prometheus_client 의존성 없이 Counter / Gauge(inc/dec) / Histogram만 지원합니다.
+
+STRIPES = 8
+
+_stripe_counter = itertools.count()
+_stripe_local = threading.local()
+
+
+def _stripe() -> int:
+    """현재 스레드(또는 그린스레드)에 고정 배정된 스트라이프 번호"""
+    index = getattr(_stripe_local, "index", None)
+    if index is None:
+        index = _stripe_local.index = next(_stripe_counter) % STRIPES
+    return index
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _StripedValues:
+    """스트라이프별 값 배열 (쓰기는 자기 스트라이프 락만, 읽기는 전부 합산)"""
+
+    __slots__ = ("_values", "_locks")
+
+    def __init__(self, size: int):
+        self._values = [[0.0] * size for _ in range(STRIPES)]
+        self._locks = [threading.Lock() for _ in range(STRIPES)]
+
+    def add(self, index: int, amount: float):
+        stripe = _stripe()
+        with self._locks[stripe]:
+            self._values[stripe][index] += amount
+
+    def add_many(self, updates: Tuple[Tuple[int, float], ...]):
+        stripe = _stripe()
+        with self._locks[stripe]:
+            values = self._values[stripe]
+            for index, amount in updates:
+                values[index] += amount
+
+    def snapshot(self) -> List[float]:
+        total = None
+        for stripe in range(STRIPES):
+            with self._locks[stripe]:
+                values = list(self._values[stripe])
+            total = values if total is None else [a + b for a, b in zip(total, values)]
+        return total
+
+
+class _Metric:
+    """라벨 조합별 자식 값을 관리하는 공통 부모"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._children_lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 {self.labelnames}에 맞는 값이 필요합니다: {key}")
+            with self._children_lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, labels: Dict[str, str], child) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._children_lock:
+            children = sorted(self._children.items())
+        for key, child in children:
+            labels = dict(zip(self.labelnames, key))
+            for sample_name, sample_labels, value in self._samples(labels, child):
+                lines.append(f"{sample_name}{_format_labels(sample_labels)} {_format_value(value)}")
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values = _StripedValues(1)
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counter는 감소할 수 없습니다")
+        self._values.add(0, amount)
+
+    def get(self) -> float:
+        return self._values.snapshot()[0]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def get(self) -> float:
+        return self._default.get()
+
+    def _samples(self, labels, child):
+        return [(self.name, labels, child.get())]
+
+
+class _GaugeChild:
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values = _StripedValues(1)
+
+    def inc(self, amount: float = 1.0):
+        self._values.add(0, amount)
+
+    def dec(self, amount: float = 1.0):
+        self._values.add(0, -amount)
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def get(self) -> float:
+        return self._values.snapshot()[0]
+
+
+class Gauge(_Metric):
+    """증감만 지원하는 게이지 (진행 중 작업 수 등)"""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def track_inprogress(self):
+        return self._default.track_inprogress()
+
+    def get(self) -> float:
+        return self._default.get()
+
+    def _samples(self, labels, child):
+        return [(self.name, labels, child.get())]
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_values")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # [버킷별 개수..., +Inf 개수, 합계]
+        self._values = _StripedValues(len(bounds) + 2)
+
+    def observe(self, value: float):
+        bucket = bisect.bisect_left(self._bounds, value)
+        self._values.add_many(((bucket, 1.0), (len(self._bounds) + 1, value)))
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        """(누적 버킷 개수 목록, 전체 개수, 합계)"""
+        values = self._values.snapshot()
+        cumulative = list(itertools.accumulate(values[:len(self._bounds) + 1]))
+        return cumulative, cumulative[-1], values[-1]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def _samples(self, labels, child):
+        cumulative, count, total = child.snapshot()
+        samples = []
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), cumulative):
+            samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), bucket_count))
+        samples.append((f"{self.name}_sum", labels, total))
+        samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Registry:
+    """메트릭과 조회 시점 수집 함수(collector) 모음"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]):
+        """조회 시 (이름, 타입, 설명, [(라벨, 값), ...]) 목록을 돌려주는 함수 등록"""
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        for collector in list(self._collectors):
+            for name, type_name, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_lru_caches(caches: Dict[str, Callable]):
+    """functools.lru_cache 함수들의 hit/miss/크기를 조회 시점에 노출"""
+    def collect():
+        infos = {name: fn.cache_info() for name, fn in caches.items()}
+        return [
+            ("ncp_cache_hits_total", "counter", "lru_cache 적중 횟수",
+             [({"cache": name}, info.hits) for name, info in infos.items()]),
+            ("ncp_cache_misses_total", "counter", "lru_cache 미적중 횟수",
+             [({"cache": name}, info.misses) for name, info in infos.items()]),
+            ("ncp_cache_entries", "gauge", "lru_cache 현재 항목 수",
+             [({"cache": name}, info.currsize) for name, info in infos.items()]),
+        ]
+    return REGISTRY.register_collector(collect)
+
+
+# 파이프라인 공통 메트릭 (각 모듈에서 import해서 기록)
+UPLOAD_BYTES = histogram(
+    "ncp_upload_image_bytes", "업로드된 이미지 한 장의 크기(바이트)",
+    buckets=(50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000))
+OCR_SECONDS = histogram(
+    "ncp_ocr_seconds", "이미지 한 장의 OCR 소요 시간 (backend=ncp|paddle|paddle_batch, 배치는 한 장당 평균)", ("backend",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0))
+OCR_REQUEST_BYTES = histogram(
+    "ncp_ocr_request_bytes", "네이버 OCR 요청 본문 크기 (transport=json|multipart)", ("transport",),
+    buckets=(50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 20_000_000))
+OCR_DECODE_SECONDS = histogram(
+    "ncp_ocr_decode_seconds", "로컬 OCR용 이미지 디코딩 소요 시간",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+OCR_DECODE_PEAK_RSS = histogram(
+    "ncp_ocr_decode_peak_rss_bytes", "로컬 OCR용 이미지 디코딩 중 늘어난 프로세스 최대 RSS(바이트)",
+    buckets=(1_000_000, 5_000_000, 10_000_000, 25_000_000, 50_000_000, 100_000_000, 250_000_000))
+OCR_FALLBACKS = counter("ncp_ocr_fallback_total", "네이버 OCR 실패로 PaddleOCR로 대체한 횟수")
+DUPLICATE_IMAGES = counter(
+    "ncp_duplicate_images_total", "pHash로 찾은 중복 이미지 수 (scope=upload|previous: 같은 업로드 안/이전 업로드)", ("scope",))
+OCR_TABLE_CROPS = counter(
+    "ncp_ocr_table_crop_total", "PaddleOCR 영양정보 표 영역 인식 결과 (result=cropped|fallback|not_found)", ("result",))
+OCR_SECOND_PASSES = counter(
+    "ncp_ocr_second_pass_total",
+    "PaddleOCR 2차 인식 (strategy=full|region: 전체 고해상도/줄 영역, result=improved|unchanged)", ("strategy", "result"))
+OCR_ORIENTATIONS = counter(
+    "ncp_ocr_orientation_total",
+    "PaddleOCR 전 방향 판단 결과 (rotation=0|90|180|270: 맞춘 각도, 글자별 분류 생략 / ambiguous: 글자별 분류)",
+    ("rotation",))
+OCR_HEDGES = counter("ncp_ocr_hedged_total", "헤지 모드에서 PaddleOCR를 병행 시작한 횟수")
+OCR_HEDGE_WINS = counter(
+    "ncp_ocr_hedge_wins_total", "헤지 모드에서 먼저 쓸 만한 결과를 낸 엔진 (backend=ncp|paddle)", ("backend",))
+PARSE_SECONDS = histogram(
+    "ncp_parse_seconds", "OCR 결과 파싱/전체 패키지 환산 소요 시간",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+LLM_TTFT_SECONDS = histogram(
+    "ncp_llm_time_to_first_token_seconds", "LLM 요청부터 첫 토큰까지 시간",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0))
+LLM_TOKENS_PER_SECOND = histogram(
+    "ncp_llm_tokens_per_second", "첫 토큰 이후 초당 수신 토큰(스트림 조각) 수",
+    buckets=(1, 5, 10, 20, 40, 80, 160))
+LLM_STREAM_SECONDS = histogram(
+    "ncp_llm_stream_seconds", "LLM 스트리밍 전체 소요 시간",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0))
+LLM_REQUESTS = counter("ncp_llm_requests_total", "LLM 요청 결과 (result=success|error|empty|timeout|rate_limited)", ("result",))
+STATISTICAL_FALLBACKS = counter(
+    "ncp_statistical_fallback_total", "get_statistical_* 통계 기반 추천 사용 횟수 (reason=no_client|llm_failed|instant)",
+    ("kind", "reason"))
+ANALYSES_IN_FLIGHT = gauge(
+    "ncp_analyses_in_flight", "진행 중인 분석 수 (stage=upload|zip|recommendation)", ("stage",))
+RESULT_PAGE_VIEWS = counter("ncp_result_page_views_total", "결과 페이지 조회 (cache=hit|miss, 렌더링 HTML 캐시 기준)", ("cache",))
+UPLOAD_EVICTIONS = counter("ncp_upload_evictions_total", "삭제된 업로드 디렉터리 수 (reason=ttl|quota|reset)", ("reason",))
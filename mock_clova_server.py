@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+로컬 Mock Clova Studio 서버 (HCX-005 SSE 스트리밍 흉내)
+
+실제 API 키/할당량 없이 llm_client 성능 실험과 부하 테스트를 하기 위한 서버입니다.
+Clova OCR(General) 엔드포인트(/ocr/general)도 함께 흉내냅니다 (JSON base64 / multipart 요청 모두 지원).
+
+사용법:
+python mock_clova_server.py --port 8900 --ttft 0.8 --inter-token 0.03 --tokens 300
+NCP_LLM_HOST=http://127.0.0.1:8900 NCP_LLM_API_KEY="Bearer mock" python app.py
+
+옵션:
+--ttft           첫 토큰까지 지연(초)
+--inter-token    토큰 간 지연(초)
+--tokens         응답 토큰 수 (요청의 maxTokens가 더 작으면 maxTokens)
+--error-rate     500 에러 응답 비율 (0~1)
+--rate-429       429 응답 비율 (0~1)
+--drop-rate      스트리밍 도중 연결을 끊는 비율 (0~1)
+--ocr-latency    OCR 응답 지연(초)
+"""
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_PATH = "/v3/chat-completions/HCX-005"
+OCR_PATH = "/ocr/general"
+
+# OCR 응답으로 돌려줄 영양정보 표 텍스트
+SAMPLE_OCR_TEXTS = ["영양정보", "총 내용량 100g", "열량 250kcal", "나트륨 500mg", "탄수화물 30g", "당류 10g",
+                    "지방 12g", "포화지방 4g", "단백질 8g"]
+
+# 응답 본문으로 반복 사용할 샘플 문장 (토큰 단위로 잘라 전송)
+SAMPLE_TEXT = (
+    "## 전체적인 영양 상태 평가\n"
+    "**나트륨** 섭취가 많고 `단백질`이 부족한 편입니다.\n\n"
+    "### 우선순위별 개선 방안\n"
+    "1. 국물 요리를 줄이고 `신선한 채소`를 늘리세요.\n"
+    "2. 매 끼니 `달걀`, `두부`, `닭가슴살` 등 단백질 식품을 추가하세요.\n"
+    "3. 가공식품 대신 `현미밥`과 `고구마`로 탄수화물을 채우세요.\n\n"
+)
+
+
+def tokenize(text: str):
+    """2글자 단위로 잘라 토큰 스트림을 흉내냅니다"""
+    return [text[i:i + 2] for i in range(0, len(text), 2)]
+
+
+SAMPLE_TOKENS = tokenize(SAMPLE_TEXT)
+
+
+class MockConfig:
+    """Mock 서버 동작 설정"""
+
+    def __init__(self, ttft=0.5, inter_token=0.02, tokens=200, error_rate=0.0,
+                 rate_429=0.0, drop_rate=0.0, seed=None, ocr_latency=0.0):
+        self.ttft = ttft
+        self.ocr_latency = ocr_latency
+        self.inter_token = inter_token
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "dropped": 0,
+                      "ocr_requests": 0, "ocr_request_bytes": 0, "ocr_image_bytes": 0}
+
+    def roll(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+
+def extract_ocr_image(content_type: str, body: bytes):
+    """OCR 요청 본문에서 (message dict, 이미지 바이트) 추출. JSON(base64)과 multipart 모두 처리"""
+    if content_type.startswith("multipart/form-data"):
+        boundary = content_type.split("boundary=", 1)[1].strip('"').encode("utf-8")
+        message, image = {}, b""
+        for part in body.split(b"--" + boundary):
+            head, sep, data = part.partition(b"\r\n\r\n")
+            if not sep:
+                continue
+            data = data[:-2] if data.endswith(b"\r\n") else data
+            if b'name="message"' in head:
+                message = json.loads(data)
+            elif b'name="file"' in head:
+                image = data
+        return message, image
+    message = json.loads(body or b"{}")
+    images = message.get("images") or [{}]
+    return message, base64.b64decode(images[0].get("data") or "")
+
+
+class MockClovaHandler(BaseHTTPRequestHandler):
+    """/v3/chat-completions/HCX-005 SSE 응답 핸들러"""
+
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        pass  # 부하 테스트 중 접근 로그 출력 생략
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event(self, event: str, data: dict):
+        frame = f"id: {uuid.uuid4()}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        self.wfile.write(frame.encode("utf-8"))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.config.lock:
+                return self._send_json(200, dict(self.config.stats))
+        self._send_json(404, {"status": {"code": "40400", "message": "Not Found"}})
+
+    def do_POST(self):
+        config = self.config
+        config.count("requests")
+
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if self.path == OCR_PATH:
+            return self._handle_ocr(body)
+        if self.path != CHAT_PATH:
+            return self._send_json(404, {"status": {"code": "40400", "message": "Not Found"}})
+        if not self.headers.get("Authorization"):
+            config.count("errors")
+            return self._send_json(401, {"status": {"code": "40100", "message": "Unauthorized"}})
+        if config.roll(config.rate_429):
+            config.count("throttled")
+            return self._send_json(429, {"status": {"code": "42901", "message": "Too many requests"}})
+        if config.roll(config.error_rate):
+            config.count("errors")
+            return self._send_json(500, {"status": {"code": "50000", "message": "Internal Server Error"}})
+
+        try:
+            request_json = json.loads(body or b"{}")
+        except ValueError:
+            config.count("errors")
+            return self._send_json(400, {"status": {"code": "40000", "message": "Bad Request"}})
+
+        max_tokens = int(request_json.get("maxTokens") or config.tokens)
+        token_count = max(1, min(config.tokens, max_tokens))
+        drop_at = config.random.randint(1, token_count) if config.roll(config.drop_rate) else None
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        time.sleep(config.ttft)
+        full_text = ""
+        try:
+            for i in range(token_count):
+                if drop_at is not None and i == drop_at:
+                    config.count("dropped")
+                    self.close_connection = True
+                    return
+                token = SAMPLE_TOKENS[i % len(SAMPLE_TOKENS)]
+                full_text += token
+                self._send_event("token", {
+                    "message": {"role": "assistant", "content": token},
+                    "finishReason": None,
+                    "created": int(time.time() * 1000),
+                })
+                if config.inter_token:
+                    time.sleep(config.inter_token)
+
+            self._send_event("result", {
+                "message": {"role": "assistant", "content": full_text},
+                "finishReason": "length" if token_count == max_tokens else "stop",
+                "created": int(time.time() * 1000),
+                "usage": {"promptTokens": length // 3, "completionTokens": token_count,
+                          "totalTokens": length // 3 + token_count},
+            })
+            config.count("ok")
+        except (BrokenPipeError, ConnectionResetError):
+            config.count("dropped")
+
+    def _handle_ocr(self, body: bytes):
+        config = self.config
+        if not self.headers.get("X-OCR-SECRET"):
+            config.count("errors")
+            return self._send_json(401, {"code": "0002", "message": "Authentication failed"})
+        try:
+            message, image = extract_ocr_image(self.headers.get("Content-Type", ""), body)
+        except (ValueError, IndexError):
+            config.count("errors")
+            return self._send_json(400, {"code": "0011", "message": "Request invalid"})
+        if not image:
+            config.count("errors")
+            return self._send_json(400, {"code": "0021", "message": "Image data is empty"})
+
+        config.count("ocr_requests")
+        config.count("ocr_request_bytes", len(body))
+        config.count("ocr_image_bytes", len(image))
+        if config.ocr_latency:
+            time.sleep(config.ocr_latency)
+        name = ((message.get("images") or [{}])[0]).get("name", "image")
+        self._send_json(200, {
+            "version": "V2",
+            "requestId": message.get("requestId", ""),
+            "timestamp": int(time.time() * 1000),
+            "images": [{
+                "uid": uuid.uuid4().hex,
+                "name": name,
+                "inferResult": "SUCCESS",
+                "message": "SUCCESS",
+                "fields": [{"inferText": text, "inferConfidence": 0.99} for text in SAMPLE_OCR_TEXTS],
+            }],
+        })
+        config.count("ok")
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config_kwargs):
+    """백그라운드 스레드로 Mock 서버를 시작하고 (server, base_url)을 반환합니다"""
+    handler = type("ConfiguredMockClovaHandler", (MockClovaHandler,), {"config": MockConfig(**config_kwargs)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Clova Studio HCX-005 SSE 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft", type=float, default=0.5)
+    parser.add_argument("--inter-token", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--ocr-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    MockClovaHandler.config = MockConfig(
+        ttft=args.ttft, inter_token=args.inter_token, tokens=args.tokens,
+        error_rate=args.error_rate, rate_429=args.rate_429, drop_rate=args.drop_rate, seed=args.seed,
+        ocr_latency=args.ocr_latency,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), MockClovaHandler)
+    server.daemon_threads = True
+    print(f"🧪 Mock Clova Studio 서버 실행: http://{args.host}:{args.port}{CHAT_PATH}")
+    print(f"   NCP_LLM_HOST=http://{args.host}:{args.port} 로 설정하세요. (통계: GET /stats)")
+    print(f"   OCR: NCP_OCR_ENDPOINT=http://{args.host}:{args.port}{OCR_PATH} NCP_OCR_SECRET=mock")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
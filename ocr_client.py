@@ -1,10 +1,28 @@
 import os
+import time
+import uuid
 import base64
 import json
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
 from io import BytesIO
-from PIL import Image
 import numpy as np
+import tracing
+from circuit_breaker import CircuitBreaker
+from table_region import TABLE_CROP, find_table_region
+from image_decode import decode_image, to_array, as_three_channel
+from ocr_refine import (REOCR_ENABLED, FIRST_PASS_MAX_DIM, REOCR_MAX_DIM, REOCR_CONFIDENCE, reocr_plan, key_field_count,
+                        source_confidence, line_strip, replace_region, scale_fields, better_result)
+from orientation import ORIENTATION_CHECK, MIN_SAMPLES, rotate, normalize_direction, vote
+from ocr_tiles import TILE_ENABLED, TILE_WORKERS, tile_boxes, needs_tiling, merge_tile_detections
+from parser import parse_ocr_payload
+from metrics import (OCR_SECONDS, OCR_FALLBACKS, OCR_REQUEST_BYTES, OCR_HEDGES, OCR_HEDGE_WINS, OCR_TABLE_CROPS,
+                     OCR_SECOND_PASSES, OCR_ORIENTATIONS)
+
+logger = tracing.get_logger("ocr_client")
 
 # 네이버클라우드 Clova OCR (General) 예시 클라이언트
 # 실제 엔드포인트/버전은 콘솔에서 발급받은 URL/Secret에 맞게 변경하세요.
@@ -15,103 +33,604 @@ ENDPOINT = os.environ.get("NCP_OCR_ENDPOINT")
 SECRET = os.environ.get("NCP_OCR_SECRET")
 API_KEY_ID = os.environ.get("NCP_API_KEY_ID", "")
 API_KEY = os.environ.get("NCP_API_KEY", "")
+# 이미지 전송 방식
+# - multipart: message(JSON) 파트 + file 파트로 원본 바이트를 그대로 전송 (base64 인코딩/JSON 직렬화 없음)
+# - json: images[].data에 base64 문자열을 넣은 JSON 본문 (요청 크기 약 1.33배)
+TRANSPORT = os.environ.get("NCP_OCR_TRANSPORT", "multipart")
+NCP_TIMEOUT = float(os.environ.get("NCP_OCR_TIMEOUT", "30"))  # 네이버 OCR 요청 타임아웃(초)
+
+# 헤지(hedged) 모드: 네이버 OCR이 지연 시간 안에 끝나지 않거나 쓸 만한 결과를 못 주면 PaddleOCR를 병행 실행하고
+# 영양성분이 HEDGE_MIN_FIELDS개 이상 파싱되는 결과를 먼저 낸 쪽을 사용합니다.
+HEDGE = os.environ.get("NCP_OCR_HEDGE", "0") == "1"
+HEDGE_DELAY = os.environ.get("NCP_OCR_HEDGE_DELAY", "p95")  # 초 단위 숫자 또는 p95(최근 네이버 OCR 지연 시간)
+HEDGE_INITIAL_DELAY = 2.0  # p95 계산에 필요한 표본이 모이기 전 사용할 지연 시간
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_FIELDS = int(os.environ.get("NCP_OCR_HEDGE_MIN_FIELDS", "3"))
+HEDGE_WORKERS = int(os.environ.get("NCP_OCR_HEDGE_WORKERS", "8"))
+# 헤지 모드의 네이버 OCR 타임아웃(초). 진 호출이 작업 스레드를 오래 잡고 있지 않도록 NCP_OCR_TIMEOUT보다 짧게
+HEDGE_NCP_TIMEOUT = float(os.environ.get("NCP_OCR_HEDGE_TIMEOUT", "10"))
+
+# 최근 네이버 OCR 응답 시간(초) (헤지 지연 시간 p95 계산용)
+_ncp_latencies = deque(maxlen=200)
+_hedge_pool = None
+_pool_lock = threading.Lock()
+
+# 네이버 OCR 장애 시 요청마다 타임아웃을 기다리지 않도록 바로 PaddleOCR로 보내는 차단기
+ncp_breaker = CircuitBreaker("ncp_ocr")
 
-# PaddleOCR 인스턴스 (필요시 생성)
-_paddle_ocr = None
+# PaddleOCR 추론기는 스레드 간에 공유하면 안전하지 않으므로 스레드마다 인스턴스를 하나씩 둡니다.
+# 요청/헤지/ZIP 스레드마다 모델을 만들지 않도록 인식은 PADDLE_WORKERS개의 작업 스레드(와 타일 작업 스레드)에서만 실행합니다.
+PADDLE_WORKERS = int(os.environ.get("PADDLE_WORKERS", "2"))
+_paddle_pool = None
+_paddle_local = threading.local()
+# 여러 이미지의 글자 영역을 모아 한 번에 인식할 때의 배치 크기 (PaddleOCR rec_batch_num)
+PADDLE_REC_BATCH_SIZE = int(os.environ.get("PADDLE_REC_BATCH_SIZE", "32"))
+# 이 신뢰도 이하의 인식 결과는 버림
+PADDLE_MIN_CONFIDENCE = float(os.environ.get("PADDLE_MIN_CONFIDENCE", "0.5"))
+# 타일 분할 인식용 작업 스레드 풀
+_tile_pool = None
 
 
 def get_paddle_ocr():
-    """PaddleOCR 인스턴스를 가져오거나 생성합니다"""
-    global _paddle_ocr
-    if _paddle_ocr is None:
+    """현재 스레드의 PaddleOCR 인스턴스를 가져오거나 생성합니다 (PaddleOCR/타일 작업 스레드에서 호출)"""
+    ocr = getattr(_paddle_local, "ocr", None)
+    if ocr is None:
         try:
             from paddleocr import PaddleOCR
-            _paddle_ocr = PaddleOCR(use_angle_cls=True, lang='korean')
+            ocr = _paddle_local.ocr = PaddleOCR(use_angle_cls=True, lang='korean', rec_batch_num=PADDLE_REC_BATCH_SIZE)
         except ImportError:
             raise RuntimeError("PaddleOCR이 설치되지 않았습니다. 'pip install paddleocr' 실행하세요.")
-    return _paddle_ocr
+    return ocr
 
 
-def paddle_ocr_process(image_bytes: bytes, filename: str = "image.jpg"):
-    """PaddleOCR를 사용해서 이미지에서 텍스트를 추출합니다"""
-    try:
-        # 이미지 바이트를 numpy 배열로 변환
-        image = Image.open(BytesIO(image_bytes))
-        image_array = np.array(image)
-        
-        # PaddleOCR 실행
-        ocr = get_paddle_ocr()
-        result = ocr.ocr(image_array, cls=True)
-        
-        # 네이버 OCR 형식으로 변환
-        fields = []
-        if result and result[0]:
-            for detection in result[0]:
-                if detection and len(detection) >= 2:
-                    bbox, (text, confidence) = detection
-                    if confidence > 0.5:  # 신뢰도 임계값
-                        fields.append({
-                            "inferText": text,
-                            "inferTextRaw": text,
-                            "confidence": confidence
-                        })
-        
-        # 네이버 OCR API 응답 형식으로 변환
-        return {
-            "version": "V2",
-            "requestId": "paddle-ocr",
-            "timestamp": 0,
-            "images": [{
-                "uid": filename,
-                "name": filename,
-                "inferResult": "SUCCESS",
-                "message": "SUCCESS",
-                "fields": fields
-            }]
+def _mark_paddle_worker():
+    _paddle_local.worker = True
+
+
+def _paddle_call(fn, *args):
+    """fn을 PaddleOCR 작업 스레드에서 실행하고 결과를 기다림 (이미 작업 스레드면 바로 실행)"""
+    global _paddle_pool
+    if getattr(_paddle_local, "worker", False):
+        return fn(*args)
+    if _paddle_pool is None:
+        with _pool_lock:
+            if _paddle_pool is None:
+                _paddle_pool = ThreadPoolExecutor(max_workers=PADDLE_WORKERS, thread_name_prefix="ocr-paddle",
+                                                  initializer=_mark_paddle_worker)
+    return _paddle_pool.submit(contextvars.copy_context().run, fn, *args).result()
+
+
+def _paddle_detections(image_array, ocr=None, cls: bool = True) -> list:
+    """PaddleOCR 실행 결과 -> [(꼭짓점 목록, 텍스트, 신뢰도)]"""
+    result = (ocr or get_paddle_ocr()).ocr(image_array, cls=cls)
+    detections = []
+    if result and result[0]:
+        for detection in result[0]:
+            if detection and len(detection) >= 2:
+                bbox, (text, confidence) = detection
+                detections.append((bbox, text, confidence))
+    return detections
+
+
+def _paddle_field(text: str, confidence: float, points=None, offset=(0, 0)) -> dict:
+    """네이버 OCR field 형식 (꼭짓점이 있으면 offset만큼 옮겨 boundingPoly로)"""
+    field = {"inferText": text, "inferTextRaw": text, "confidence": confidence}
+    if points is not None:
+        field["boundingPoly"] = {"vertices": [{"x": float(x) + offset[0], "y": float(y) + offset[1]} for x, y in points]}
+    return field
+
+
+def _paddle_fields(image_array, offset=(0, 0), cls: bool = True) -> list:
+    """PaddleOCR 실행 결과 -> 네이버 OCR fields 형식 목록 (잘라낸 영역이면 offset은 그 영역의 왼쪽 위 좌표)"""
+    return [
+        _paddle_field(text, confidence, points, offset)
+        for points, text, confidence in _paddle_detections(image_array, cls=cls)
+        if confidence > PADDLE_MIN_CONFIDENCE
+    ]
+
+
+def _ocr_tile(image_array, tile, cls: bool = True):
+    x0, y0, x1, y1 = tile
+    with tracing.span("ocr.paddle.tile", tile=list(tile)):
+        return tile, _paddle_detections(image_array[y0:y1, x0:x1], get_paddle_ocr(), cls=cls)
+
+
+def paddle_tiled_fields(image_array, cls: bool = True) -> list:
+    """큰 이미지를 겹치는 타일로 나눠 병렬 인식하고 전체 좌표로 합친 fields 목록"""
+    global _tile_pool
+    if _tile_pool is None:
+        with _pool_lock:
+            if _tile_pool is None:
+                _tile_pool = ThreadPoolExecutor(max_workers=TILE_WORKERS, thread_name_prefix="ocr-tile")
+    height, width = image_array.shape[:2]
+    tiles = tile_boxes(width, height)
+    futures = [_tile_pool.submit(contextvars.copy_context().run, _ocr_tile, image_array, tile, cls) for tile in tiles]
+    merged = merge_tile_detections([future.result() for future in futures], (width, height))
+    return [
+        {
+            "inferText": text,
+            "inferTextRaw": text,
+            "confidence": confidence,
+            "boundingPoly": {"vertices": [{"x": box[0], "y": box[1]}, {"x": box[2], "y": box[1]},
+                                          {"x": box[2], "y": box[3]}, {"x": box[0], "y": box[3]}]},
         }
-        
-    except Exception as e:
-        raise RuntimeError(f"PaddleOCR 처리 중 오류: {e}")
+        for box, text, confidence in merged
+        if confidence > PADDLE_MIN_CONFIDENCE
+    ]
+
+
+def _paddle_full_fields(image, cls: bool = True) -> list:
+    """전체 이미지 인식. PADDLE_OCR_TILE=1이고 타일보다 크면 타일 분할 병렬 인식"""
+    image_array = to_array(image)
+    if TILE_ENABLED and needs_tiling(image.width, image.height):
+        return paddle_tiled_fields(image_array, cls=cls)
+    return _paddle_fields(image_array, cls=cls)
 
 
-def ncp_ocr_process(image_bytes: bytes, filename: str = "image.jpg"):
-    """네이버 클라우드 OCR를 사용해서 이미지에서 텍스트를 추출합니다"""
-    payload = {
+def _paddle_response(fields: list, filename: str) -> dict:
+    """네이버 OCR API 응답 형식으로 변환"""
+    return {
         "version": "V2",
-        "requestId": "webapp",
+        "requestId": "paddle-ocr",
         "timestamp": 0,
-        "lang": "ko",
-        "images": [
-            {
-                "name": filename,
-                "format": filename.split(".")[-1].lower(),
-                "data": base64.b64encode(image_bytes).decode("utf-8"),
-            }
-        ],
+        "images": [{
+            "uid": filename,
+            "name": filename,
+            "inferResult": "SUCCESS",
+            "message": "SUCCESS",
+            "fields": fields
+        }]
     }
 
-    headers = {"Content-Type": "application/json", "X-OCR-SECRET": SECRET}
+
+def _first_pass_image(image_bytes: bytes):
+    """1차 인식용 디코딩. PADDLE_REOCR=1이면 싼 해상도(PADDLE_FIRST_PASS_MAX_DIM)로"""
+    return decode_image(image_bytes, max_dim=FIRST_PASS_MAX_DIM if REOCR_ENABLED else None)
+
+
+def orient_image(image, ocr=None):
+    """이미지 방향을 한 번 맞춤 -> (맞춘 이미지, 반시계 방향으로 돌린 각도, 글자 조각마다 방향 분류가 필요한지)
+
+    축소본의 경계 분포로 세로 줄이면 90도 돌리고, 글자 줄 몇 개만 방향 분류기로 투표해 180도 여부를 정합니다.
+    줄 방향이 애매하거나 투표가 갈리면 돌린 각도와 함께 분류 필요(True)를 반환합니다.
+    """
+    if not ORIENTATION_CHECK:
+        return image, 0, True
+    classifier = getattr(ocr or get_paddle_ocr(), "text_classifier", None)
+    image, rotation, direction, bands = normalize_direction(image)
+
+    angle = None
+    if classifier is not None and len(bands) >= MIN_SAMPLES:
+        crops = [as_three_channel(to_array(image.crop(band), reuse=False)) for band in bands]
+        with tracing.span("ocr.paddle.orientation", samples=len(crops), direction=direction):
+            _, cls_results, _ = classifier(crops)
+        angle = vote(cls_results)
+    if angle is None:
+        OCR_ORIENTATIONS.labels("ambiguous").inc()
+        return image, rotation, True
+    if angle == 180:
+        image, rotation = rotate(image, 180), (rotation + 180) % 360
+    OCR_ORIENTATIONS.labels(str(rotation)).inc()
+    return image, rotation, False
+
+
+def paddle_ocr_process(image_bytes: bytes, filename: str = "image.jpg"):
+    """PaddleOCR를 사용해서 이미지에서 텍스트를 추출합니다
+
+    NCP_OCR_TABLE_CROP=1이면 영양정보 표 영역만 먼저 인식하고, 영양성분이 부족하면 전체 이미지로 다시 인식합니다.
+    PADDLE_REOCR=1이면 주요 영양성분이 없거나 신뢰도가 낮을 때 고해상도로 2차 인식합니다 (refine_paddle_result).
+    방향을 미리 맞춘 이미지는 글자 조각별 방향 분류를 건너뜁니다 (orient_image).
+    인식은 PaddleOCR 작업 스레드에서 실행합니다 (PADDLE_WORKERS).
+    """
+    try:
+        # 필요한 크기/채널로 바로 디코딩 (PADDLE_DECODE_MAX_DIM, PADDLE_DECODE_GRAYSCALE)
+        return _paddle_call(_paddle_ocr_image, _first_pass_image(image_bytes), image_bytes, filename)
+    except Exception as e:
+        raise RuntimeError(f"PaddleOCR 처리 중 오류: {e}")
+
+
+def _paddle_ocr_image(image, image_bytes: bytes, filename: str) -> dict:
+    """1차 인식용으로 디코딩한 이미지 한 장 인식 (방향 맞춤 -> 표 영역/전체 인식 -> 2차 인식)"""
+    image, rotation, cls = orient_image(image)
+
+    response = None
+    if TABLE_CROP:
+        region = find_table_region(image)
+        if region is None:
+            OCR_TABLE_CROPS.labels("not_found").inc()
+        else:
+            with tracing.span("ocr.paddle.table", filename=filename, region=list(region)):
+                response = _paddle_response(_paddle_fields(to_array(image.crop(region)), offset=region[:2], cls=cls),
+                                            filename)
+            if is_usable_result(response):
+                OCR_TABLE_CROPS.labels("cropped").inc()
+            else:
+                OCR_TABLE_CROPS.labels("fallback").inc()
+                response = None
+
+    if response is None:
+        response = _paddle_response(_paddle_full_fields(image, cls=cls), filename)
+    if REOCR_ENABLED:
+        response = refine_paddle_result(response, image_bytes, image.size, filename, rotation)
+    return response
+
+
+def refine_paddle_result(response: dict, image_bytes: bytes, first_size, filename: str = "image.jpg",
+                         rotation: int = 0) -> dict:
+    """1차 인식 결과에서 주요 영양성분(PADDLE_REOCR_KEYS)이 없거나 값을 읽은 글자의 신뢰도가 낮으면 2차 인식
+
+    - 못 읽은 항목이 있으면 이미지 전체를 고해상도(PADDLE_REOCR_MAX_DIM) + 방향 분류기로 다시 인식해
+      주요 영양성분을 더 많이 읽은 결과를 씁니다.
+    - 신뢰도가 낮은 항목은 그 줄(가로 띠)만 고해상도로 다시 인식해, 신뢰도가 오르면 그 영역의 글자를 바꿉니다.
+    first_size는 1차 인식 이미지 크기 (좌표를 고해상도 이미지 기준으로 맞추는 데 사용),
+    rotation은 1차 인식 전에 돌린 각도 (고해상도 이미지도 같은 방향으로 돌림)
+    """
+    missing, low = reocr_plan(response)
+    if not missing and not low:
+        return response
+
+    with tracing.span("ocr.paddle.reocr", filename=filename, missing=missing, low_confidence=sorted(low)):
+        image = rotate(decode_image(image_bytes, max_dim=REOCR_MAX_DIM), rotation)
+        current = _paddle_response(scale_fields(response["images"][0]["fields"], image.width / first_size[0]), filename)
+
+        if missing:
+            full = _paddle_response(_paddle_full_fields(image, cls=True), filename)
+            chosen = better_result(current, full)
+            OCR_SECOND_PASSES.labels("full", "improved" if chosen is full else "unchanged").inc()
+            current = chosen
+
+        _, low = reocr_plan(current)  # 고해상도 좌표 기준 출처 field
+        for key, sources in low.items():
+            before = source_confidence(current, key)
+            if before is None or before >= REOCR_CONFIDENCE:  # 앞선 재인식에서 이미 바뀐 줄
+                continue
+            strip = line_strip(sources, image.size)
+            if strip is None:  # 위치 정보가 없는 결과
+                continue
+            box = (int(strip[0]), int(strip[1]), int(np.ceil(strip[2])), int(np.ceil(strip[3])))
+            strip_fields = _paddle_fields(to_array(image.crop(box)), offset=box[:2], cls=True)
+            candidate = _paddle_response(replace_region(current["images"][0]["fields"], strip, strip_fields), filename)
+            after = source_confidence(candidate, key)
+            if after is not None and after > before and key_field_count(candidate) >= key_field_count(current):
+                OCR_SECOND_PASSES.labels("region", "improved").inc()
+                current = candidate
+            else:
+                OCR_SECOND_PASSES.labels("region", "unchanged").inc()
+    return current
+
+
+def _crop_text_boxes(image_array, boxes) -> list:
+    """검출된 글자 영역(사각형 꼭짓점 4개)을 위->아래, 왼쪽->오른쪽 순서로 잘라냄 -> [(꼭짓점, 조각)]"""
+    try:
+        from paddleocr.tools.infer.utility import get_rotate_crop_image  # 기울어진 영역 보정
+    except ImportError:
+        get_rotate_crop_image = None
+    boxes = sorted((np.asarray(box, dtype=np.float32) for box in boxes), key=lambda b: (b[0][1], b[0][0]))
+    crops = []
+    for box in boxes:
+        if get_rotate_crop_image is not None:
+            crops.append((box, get_rotate_crop_image(image_array, box)))
+            continue
+        x0, y0 = np.floor(box.min(axis=0)).astype(int)
+        x1, y1 = np.ceil(box.max(axis=0)).astype(int)
+        crops.append((box, image_array[max(0, y0):y1, max(0, x0):x1]))
+    return [(box, crop) for box, crop in crops if crop.size]
+
+
+def paddle_ocr_batch(images, batch_size: int = None) -> list:
+    """여러 이미지를 PaddleOCR로 한 번에 처리 [(image_bytes, filename), ...] -> 네이버 OCR 형식 결과 목록
+
+    글자 영역 검출은 이미지별로 하고, 모든 이미지의 글자 조각을 모아 batch_size 단위로 방향 분류/인식한 뒤
+    이미지별로 다시 나눕니다. NCP_OCR_TABLE_CROP=1이면 표 영역에서만 검출하고,
+    영양성분이 부족한 이미지는 전체 이미지로 따로 다시 인식합니다. PADDLE_REOCR=1이면 이미지별로 2차 인식합니다.
+    방향 분류는 방향이 애매한 이미지의 글자 조각에만 합니다.
+    PADDLE_OCR_TILE=1이고 타일보다 큰 이미지는 검출기에 통째로 넣지 않고 이미지별 경로(타일 분할 인식)로 처리합니다.
+    소요 시간은 이미지 한 장당 평균으로 ncp_ocr_seconds{backend="paddle_batch"}에 기록합니다.
+    """
+    return _paddle_call(_paddle_batch, images, batch_size)
+
+
+def _paddle_batch(images, batch_size: int = None) -> list:
+    start = time.perf_counter()
+    ocr = get_paddle_ocr()
+    batch_size = batch_size or PADDLE_REC_BATCH_SIZE
+    cropped, sizes, orientations, owners, boxes, crops = [], [], [], [], [], []
+    tiled = {}
+    for index, (image_bytes, filename) in enumerate(images):
+        image = _first_pass_image(image_bytes)
+        if TILE_ENABLED and needs_tiling(image.width, image.height):
+            tiled[index] = _paddle_ocr_image(image, image_bytes, filename)
+            sizes.append(image.size)
+            orientations.append((0, True))
+            cropped.append(False)
+            continue
+        image, rotation, cls = orient_image(image, ocr)
+        sizes.append(image.size)
+        orientations.append((rotation, cls))
+        region = find_table_region(image) if TABLE_CROP else None
+        if TABLE_CROP and region is None:
+            OCR_TABLE_CROPS.labels("not_found").inc()
+        cropped.append(region is not None)
+        offset = region[:2] if region else (0, 0)
+        # 글자 조각이 배열의 슬라이스일 수 있어 스레드 버퍼를 재사용하지 않음
+        target = as_three_channel(to_array(image.crop(region) if region else image, reuse=False))
+        with tracing.span("ocr.paddle.det", filename=filename):
+            dt_boxes, _ = ocr.text_detector(target)
+        for box, crop in _crop_text_boxes(target, dt_boxes if dt_boxes is not None else []):
+            crops.append(crop)
+            boxes.append((box, offset))
+            owners.append(index)
+
+    recognized = []
+    with tracing.span("ocr.paddle.rec", images=len(images), crops=len(crops), batch_size=batch_size):
+        for offset in range(0, len(crops), batch_size):
+            batch = crops[offset:offset + batch_size]
+            ambiguous = [i for i in range(len(batch)) if orientations[owners[offset + i]][1]]
+            if ambiguous and getattr(ocr, "use_angle_cls", True) and ocr.text_classifier is not None:
+                classified, _, _ = ocr.text_classifier([batch[i] for i in ambiguous])
+                for i, crop in zip(ambiguous, classified):
+                    batch[i] = crop
+            rec_res, _ = ocr.text_recognizer(batch)
+            recognized.extend(rec_res)
+
+    fields = [[] for _ in images]
+    for owner, (box, offset), (text, confidence) in zip(owners, boxes, recognized):
+        if confidence > PADDLE_MIN_CONFIDENCE:
+            fields[owner].append(_paddle_field(text, confidence, box, offset))
+
+    results = []
+    for index, (image_bytes, filename) in enumerate(images):
+        if index in tiled:
+            results.append(tiled[index])
+            continue
+        response = _paddle_response(fields[index], filename)
+        if cropped[index]:
+            if is_usable_result(response):
+                OCR_TABLE_CROPS.labels("cropped").inc()
+            else:
+                OCR_TABLE_CROPS.labels("fallback").inc()
+                # 전체 배열을 모든 이미지만큼 들고 있지 않고 필요한 이미지만 다시 디코딩
+                rotation, cls = orientations[index]
+                response = _paddle_response(
+                    _paddle_full_fields(rotate(_first_pass_image(image_bytes), rotation), cls=cls), filename)
+        if REOCR_ENABLED:
+            response = refine_paddle_result(response, image_bytes, sizes[index], filename, orientations[index][0])
+        results.append(response)
+    per_image = (time.perf_counter() - start) / max(1, len(images))
+    for _ in images:
+        OCR_SECONDS.labels("paddle_batch").observe(per_image)
+    return results
+
+
+class MultipartBody:
+    """multipart/form-data 요청 본문을 파트별로 조금씩 읽어 보내는 파일 형태 객체
+
+    requests에 data=로 넘기면 전체 길이(__len__)로 Content-Length를 채우고 read()로 나눠 전송하므로
+    파일 파트를 메모리에 다시 복사하지 않습니다.
+    """
+
+    def __init__(self, fields, file_field: str, filename: str, fileobj, file_size: int,
+                 file_content_type: str = "application/octet-stream"):
+        self.boundary = uuid.uuid4().hex
+        safe_name = filename.replace('"', "").replace("\r", "").replace("\n", "")
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode("utf-8")
+            + value.encode("utf-8") + b"\r\n"
+            for name, value in fields
+        )
+        head += (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{safe_name}"\r\n'
+                 f"Content-Type: {file_content_type}\r\n\r\n").encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self._parts = [BytesIO(head), fileobj, BytesIO(tail)]
+        self._length = len(head) + file_size + len(tail)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self._parts and size != 0:
+            data = self._parts[0].read(size)
+            if not data:
+                self._parts.pop(0)
+                continue
+            chunks.append(data)
+            if size > 0:
+                size -= len(data)
+        return b"".join(chunks)
+
+
+def _ocr_message(filename: str, image_bytes: bytes = None) -> dict:
+    image = {"name": filename, "format": filename.split(".")[-1].lower()}
+    if image_bytes is not None:
+        image["data"] = base64.b64encode(image_bytes).decode("utf-8")
+    return {"version": "V2", "requestId": "webapp", "timestamp": 0, "lang": "ko", "images": [image]}
+
+
+def _ocr_headers(content_type: str) -> dict:
+    headers = {"Content-Type": content_type, "X-OCR-SECRET": SECRET}
     if API_KEY_ID and API_KEY:
         headers["X-NCP-APIGW-API-KEY-ID"] = API_KEY_ID
         headers["X-NCP-APIGW-API-KEY"] = API_KEY
+    return headers
+
 
-    resp = requests.post(ENDPOINT, headers=headers, data=json.dumps(payload), timeout=30)
+def ncp_ocr_process(image_bytes: bytes, filename: str = "image.jpg", timeout: float = None):
+    """네이버 클라우드 OCR를 사용해서 이미지에서 텍스트를 추출합니다 (base64 JSON 전송)"""
+    body = json.dumps(_ocr_message(filename, image_bytes))
+    OCR_REQUEST_BYTES.labels("json").observe(len(body))
+    resp = requests.post(ENDPOINT, headers=_ocr_headers("application/json"), data=body,
+                         timeout=timeout or NCP_TIMEOUT)
     resp.raise_for_status()
     return resp.json()
 
 
-def ncp_ocr(image_bytes: bytes, filename: str = "image.jpg"):
-    """OCR 처리 메인 함수 - 네이버 키가 있으면 네이버 OCR, 없으면 PaddleOCR 사용"""
+def ncp_ocr_process_multipart(image_bytes: bytes = None, filename: str = "image.jpg", path: str = None,
+                              timeout: float = None):
+    """네이버 클라우드 OCR multipart 전송. path가 있으면 디스크에서 바로 읽어 보냅니다"""
+    if path:
+        fileobj = open(path, "rb")
+        file_size = os.fstat(fileobj.fileno()).st_size
+    else:
+        fileobj = BytesIO(image_bytes)
+        file_size = len(image_bytes)
+    with fileobj:
+        body = MultipartBody([("message", json.dumps(_ocr_message(filename)))], "file", filename, fileobj, file_size)
+        OCR_REQUEST_BYTES.labels("multipart").observe(len(body))
+        resp = requests.post(ENDPOINT, headers=_ocr_headers(body.content_type), data=body,
+                             timeout=timeout or NCP_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _run_ncp(image_bytes: bytes, filename: str, path: str = None, timeout: float = None):
+    logger.info("네이버 클라우드 OCR 사용", filename=filename, transport=TRANSPORT)
+    with tracing.span("ocr.ncp", filename=filename, transport=TRANSPORT), OCR_SECONDS.labels("ncp").time():
+        start = time.perf_counter()
+        try:
+            if TRANSPORT == "multipart":
+                result = ncp_ocr_process_multipart(image_bytes, filename, path=path, timeout=timeout)
+            else:
+                result = ncp_ocr_process(image_bytes, filename, timeout=timeout)
+        except Exception as e:
+            ncp_breaker.record(False, time.perf_counter() - start, error=str(e))
+            raise
+        elapsed = time.perf_counter() - start
+        ncp_breaker.record(True, elapsed)
+        _ncp_latencies.append(elapsed)
+        return result
+
+
+def _run_paddle(image_bytes: bytes, filename: str):
+    with tracing.span("ocr.paddle", filename=filename), OCR_SECONDS.labels("paddle").time():
+        return paddle_ocr_process(image_bytes, filename)
+
+
+def hedge_delay() -> float:
+    """PaddleOCR 병행 시작까지 기다릴 시간(초)"""
+    if HEDGE_DELAY != "p95":
+        return float(HEDGE_DELAY)
+    samples = sorted(_ncp_latencies)
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_INITIAL_DELAY
+    return samples[int(len(samples) * 0.95) - 1]
+
+
+def is_usable_result(ocr_json) -> bool:
+    """파싱했을 때 영양성분이 HEDGE_MIN_FIELDS개 이상 나오는 OCR 결과인지"""
+    try:
+        fields = parse_ocr_payload(ocr_json)
+    except Exception:
+        return False
+    return sum(value is not None for value in fields.values()) >= HEDGE_MIN_FIELDS
+
+
+def _submit(fn, *args):
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="ocr-hedge")
+    # 추적 컨텍스트(trace_id)를 작업 스레드로 전달
+    return _hedge_pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def hedged_ocr(image_bytes: bytes, filename: str = "image.jpg", path: str = None):
+    """네이버 OCR을 먼저 시작하고, 지연되거나 실패하면 PaddleOCR를 병행해 먼저 쓸 만한 결과를 반환
+
+    진 쪽은 아직 시작 전이면 취소하고, 이미 실행 중이면 결과를 버립니다 (네이버 OCR은 HEDGE_NCP_TIMEOUT으로 제한).
+    시작 전에 취소된 네이버 OCR 호출이 차단기 반개방 시험 호출이었다면 시험 권한을 반납합니다.
+    둘 다 쓸 만한 결과가 없으면 먼저 성공한 결과를, 둘 다 실패하면 마지막 오류를 던집니다.
+    """
+    futures = {_submit(_run_ncp, image_bytes, filename, path, HEDGE_NCP_TIMEOUT): "ncp"}
+    pending = set(futures)
+    delay = hedge_delay()
+    fallback = error = None
+
+    def start_paddle(reason):
+        logger.info("PaddleOCR 병행 시작", filename=filename, reason=reason)
+        OCR_HEDGES.inc()
+        future = _submit(_run_paddle, image_bytes, filename)
+        futures[future] = "paddle"
+        pending.add(future)
+
+    while pending:
+        hedging = len(futures) > 1
+        done, pending = wait(pending, timeout=None if hedging else delay, return_when=FIRST_COMPLETED)
+        if not done:
+            start_paddle("timeout")
+            continue
+        for future in done:
+            backend = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning("OCR 실패", filename=filename, backend=backend, error=str(e))
+                error = e
+                continue
+            if is_usable_result(result):
+                for other in pending:
+                    if other.cancel() and futures[other] == "ncp":
+                        ncp_breaker.release()  # 실행되지 않아 record가 불리지 않음
+                OCR_HEDGE_WINS.labels(backend).inc()
+                return result
+            if fallback is None:
+                fallback = result
+        if not pending and not hedging:
+            start_paddle("failed" if fallback is None else "insufficient")
+
+    if fallback is not None:
+        return fallback
+    raise error
+
+
+def ncp_ocr(image_bytes: bytes, filename: str = "image.jpg", path: str = None):
+    """OCR 처리 메인 함수 - 네이버 키가 있으면 네이버 OCR, 없으면 PaddleOCR 사용
+
+    path: 같은 내용이 저장된 파일 경로 (multipart 전송 시 디스크에서 바로 스트리밍)
+    """
     
     # 네이버 클라우드 OCR 설정 확인
-    if ENDPOINT and SECRET:
+    if ENDPOINT and SECRET and not ncp_breaker.allow():
+        logger.info("네이버 OCR 차단 중, PaddleOCR 사용", filename=filename)
+        OCR_FALLBACKS.inc()
+    elif ENDPOINT and SECRET:
+        if HEDGE:
+            return hedged_ocr(image_bytes, filename, path=path)
         try:
-            print(f"네이버 클라우드 OCR 사용: {filename}")
-            return ncp_ocr_process(image_bytes, filename)
+            return _run_ncp(image_bytes, filename, path)
         except Exception as e:
-            print(f"네이버 OCR 실패, PaddleOCR로 대체: {e}")
+            logger.warning("네이버 OCR 실패, PaddleOCR로 대체", filename=filename, error=str(e))
+            OCR_FALLBACKS.inc()
     else:
-        print(f"네이버 OCR 설정 없음, PaddleOCR 사용: {filename}")
+        logger.info("네이버 OCR 설정 없음, PaddleOCR 사용", filename=filename)
     
     # PaddleOCR 사용
-    return paddle_ocr_process(image_bytes, filename)
\ No newline at end of file
+    return _run_paddle(image_bytes, filename)
+
+
+def ocr_routing() -> str:
+    """현재 OCR 요청이 가는 곳: ncp | hedged | probe(차단기 반개방 시험 호출) | paddle"""
+    if not (ENDPOINT and SECRET):
+        return "paddle"
+    state = ncp_breaker.status()["state"]
+    if state == "open":
+        return "paddle"
+    if state == "half_open":
+        return "probe"
+    return "hedged" if HEDGE else "ncp"
+
+
+def ocr_status() -> dict:
+    """/api/ocr/status 응답 (라우팅 상태, 네이버 OCR 최근 상태)"""
+    return {
+        "routing": ocr_routing(),
+        "ncp_configured": bool(ENDPOINT and SECRET),
+        "transport": TRANSPORT,
+        "hedge": HEDGE,
+        "breaker": ncp_breaker.status(),
+    }
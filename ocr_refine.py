@@ -0,0 +1,111 @@
+import os
+from typing import List, Optional, Tuple
+
+from parser import parse_ocr_with_sources
+
+# PaddleOCR 선택적 재인식 도우미
+# - 1차 인식은 싼 해상도로 하고, 주요 영양성분을 못 읽었거나 값을 읽은 글자의 신뢰도가 낮을 때만 2차 인식합니다.
+# - 신뢰도가 낮은 항목은 그 글자가 있는 줄(가로 띠)만 고해상도로 다시 인식해 해당 영역의 글자를 바꿔 넣고,
+#   아예 없는 항목이 있으면 이미지 전체를 고해상도 + 방향 분류기로 다시 인식해 더 많이 읽힌 쪽을 씁니다.
+
+REOCR_ENABLED = os.environ.get("PADDLE_REOCR", "0") == "1"
+FIRST_PASS_MAX_DIM = int(os.environ.get("PADDLE_FIRST_PASS_MAX_DIM", "1280"))  # 재인식 사용 시 1차 인식 긴 변(px)
+REOCR_MAX_DIM = int(os.environ.get("PADDLE_REOCR_MAX_DIM", "0"))  # 2차 인식 긴 변(px), 0이면 원본 해상도
+REOCR_CONFIDENCE = float(os.environ.get("PADDLE_REOCR_CONFIDENCE", "0.8"))  # 값을 읽은 글자 신뢰도가 이 미만이면 재인식
+REOCR_KEYS = tuple(key.strip() for key in os.environ.get(
+    "PADDLE_REOCR_KEYS", "calories_kcal,sodium_mg,carbs_g,sugars_g,fat_g,protein_g").split(",") if key.strip())
+STRIP_PADDING = 0.5  # 줄 높이 대비 위아래 여유
+
+Box = Tuple[float, float, float, float]  # (x0, y0, x1, y1)
+
+
+def field_box(field: dict) -> Optional[Box]:
+    """네이버 OCR 형식 field의 boundingPoly -> 상자. 없으면 None"""
+    vertices = (field.get("boundingPoly") or {}).get("vertices") or []
+    if not vertices:
+        return None
+    xs = [float(v.get("x", 0)) for v in vertices]
+    ys = [float(v.get("y", 0)) for v in vertices]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _confidence(field: dict) -> float:
+    return float(field.get("confidence", 1.0))
+
+
+def reocr_plan(ocr_json, keys=REOCR_KEYS, threshold: float = REOCR_CONFIDENCE):
+    """(못 읽은 항목 목록, {신뢰도가 낮은 항목: 값을 읽은 field 목록})"""
+    values, sources = parse_ocr_with_sources(ocr_json)
+    missing = [key for key in keys if values.get(key) is None]
+    low = {key: sources[key] for key in keys
+           if values.get(key) is not None and min(_confidence(f) for f in sources[key]) < threshold}
+    return missing, low
+
+
+def key_field_count(ocr_json, keys=REOCR_KEYS) -> int:
+    values, _ = parse_ocr_with_sources(ocr_json)
+    return sum(values.get(key) is not None for key in keys)
+
+
+def source_confidence(ocr_json, key: str) -> Optional[float]:
+    """key 값을 읽은 글자들의 최저 신뢰도. 못 읽었으면 None"""
+    values, sources = parse_ocr_with_sources(ocr_json)
+    if values.get(key) is None:
+        return None
+    return min(_confidence(f) for f in sources[key])
+
+
+def line_strip(fields: List[dict], image_size: Tuple[int, int], padding: float = STRIP_PADDING) -> Optional[Box]:
+    """field들이 있는 줄 전체(이미지 너비)를 덮는 가로 띠. 위치 정보가 없으면 None
+
+    키워드와 값이 따로 검출되는 경우가 많아 가로로는 이미지 끝까지 넓힙니다.
+    """
+    boxes = [field_box(f) for f in fields]
+    if not boxes or any(box is None for box in boxes):
+        return None
+    y0 = min(box[1] for box in boxes)
+    y1 = max(box[3] for box in boxes)
+    pad = (y1 - y0) * padding
+    width, height = image_size
+    return 0.0, max(0.0, y0 - pad), float(width), min(float(height), y1 + pad)
+
+
+def _center_inside(box: Box, region: Box) -> bool:
+    cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+    return region[0] <= cx <= region[2] and region[1] <= cy <= region[3]
+
+
+def replace_region(fields: List[dict], region: Box, new_fields: List[dict]) -> List[dict]:
+    """region 안(중심 기준)의 기존 field를 new_fields로 바꿈 (첫 번째로 지운 자리에 넣어 읽는 순서 유지)"""
+    out, inserted = [], False
+    for field in fields:
+        box = field_box(field)
+        if box is not None and _center_inside(box, region):
+            if not inserted:
+                out.extend(new_fields)
+                inserted = True
+            continue
+        out.append(field)
+    if not inserted:
+        out.extend(new_fields)
+    return out
+
+
+def scale_fields(fields: List[dict], scale: float) -> List[dict]:
+    """field 좌표를 scale배 (해상도가 다른 인식 결과를 같은 좌표계로 맞출 때)"""
+    if scale == 1:
+        return fields
+    scaled = []
+    for field in fields:
+        vertices = (field.get("boundingPoly") or {}).get("vertices")
+        if vertices:
+            field = dict(field, boundingPoly={"vertices": [
+                {"x": v.get("x", 0) * scale, "y": v.get("y", 0) * scale} for v in vertices]})
+        scaled.append(field)
+    return scaled
+
+
+def better_result(first, second, keys=REOCR_KEYS):
+    """주요 영양성분을 더 많이 읽은 결과 (같으면 first)"""
+    return second if key_field_count(second, keys) > key_field_count(first, keys) else first
+
@@ -0,0 +1,81 @@
+import os
+from typing import List, Tuple
+
+# 고해상도 이미지 타일 분할 OCR 도우미
+# - 긴 파노라마 라벨 사진을 축소하지 않고 겹치는 타일로 나눠 로컬 OCR에 넣습니다.
+# - 타일 경계에 걸려 잘린 글자는 버리고(겹침 영역 안의 이웃 타일이 온전한 글자를 인식),
+#   겹침 영역에서 두 번 인식된 글자는 신뢰도가 높은 쪽만 남깁니다.
+
+TILE_ENABLED = os.environ.get("PADDLE_OCR_TILE", "0") == "1"
+TILE_SIZE = int(os.environ.get("PADDLE_TILE_SIZE", "1280"))  # 타일 한 변(px)
+TILE_OVERLAP = int(os.environ.get("PADDLE_TILE_OVERLAP", "160"))  # 이웃 타일과 겹치는 폭(px), 글자 줄 높이보다 크게
+TILE_WORKERS = int(os.environ.get("PADDLE_TILE_WORKERS", "4"))
+EDGE_MARGIN = 2  # 타일 안쪽 경계에서 이 거리(px) 안에 닿은 글자는 잘린 것으로 봄
+DUPLICATE_OVERLAP = 0.5  # 겹치는 면적이 작은 상자의 이 비율 이상이면 같은 글자로 봄
+
+Box = Tuple[float, float, float, float]  # (x0, y0, x1, y1)
+
+
+def _spans(length: int, size: int, step: int) -> List[Tuple[int, int]]:
+    if length <= size:
+        return [(0, length)]
+    starts = list(range(0, length - size, step)) + [length - size]  # 마지막 타일은 이미지 끝에 맞춤
+    return [(start, start + size) for start in starts]
+
+
+def tile_boxes(width: int, height: int, size: int = TILE_SIZE, overlap: int = TILE_OVERLAP) -> List[Box]:
+    """이미지를 덮는 겹치는 타일 좌표 목록 (위->아래, 왼쪽->오른쪽)"""
+    step = max(1, size - overlap)
+    return [(x0, y0, x1, y1) for y0, y1 in _spans(height, size, step) for x0, x1 in _spans(width, size, step)]
+
+
+def needs_tiling(width: int, height: int, size: int = TILE_SIZE) -> bool:
+    return width > size or height > size
+
+
+def _bounds(points) -> Box:
+    xs = [float(p[0]) for p in points]
+    ys = [float(p[1]) for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _touches_inner_edge(box: Box, tile: Box, image_size: Tuple[int, int]) -> bool:
+    """이미지 가장자리가 아닌 타일 경계에 닿은(잘렸을 수 있는) 상자인지"""
+    x0, y0, x1, y1 = box
+    tx0, ty0, tx1, ty1 = tile
+    width, height = image_size
+    return ((tx0 > 0 and x0 - tx0 <= EDGE_MARGIN) or (ty0 > 0 and y0 - ty0 <= EDGE_MARGIN)
+            or (tx1 < width and tx1 - x1 <= EDGE_MARGIN) or (ty1 < height and ty1 - y1 <= EDGE_MARGIN))
+
+
+def _overlap_ratio(a: Box, b: Box) -> float:
+    """교집합 면적 / 작은 상자 면적"""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return width * height / smaller if smaller > 0 else 0.0
+
+
+def merge_tile_detections(tile_results, image_size: Tuple[int, int]) -> List[Tuple[Box, str, float]]:
+    """타일별 검출 결과를 전체 좌표로 옮기고 잘린 글자/중복 글자를 정리
+
+    tile_results: [(타일 좌표, [(꼭짓점 목록(타일 좌표계), 텍스트, 신뢰도), ...]), ...]
+    반환: [(전체 좌표 상자, 텍스트, 신뢰도)] 위->아래, 왼쪽->오른쪽 순서
+    """
+    complete, cut = [], []
+    for tile, detections in tile_results:
+        tx0, ty0 = tile[0], tile[1]
+        for points, text, confidence in detections:
+            x0, y0, x1, y1 = _bounds(points)
+            box = (x0 + tx0, y0 + ty0, x1 + tx0, y1 + ty0)
+            (cut if _touches_inner_edge(box, tile, image_size) else complete).append((box, text, confidence))
+
+    # 온전한 글자를 신뢰도 순으로 먼저 채우고, 잘린 글자는 겹침보다 커서 어느 타일에도 온전히 없을 때만 사용
+    kept = []
+    for candidates in (complete, cut):
+        for candidate in sorted(candidates, key=lambda c: -c[2]):
+            if all(_overlap_ratio(candidate[0], other[0]) < DUPLICATE_OVERLAP for other in kept):
+                kept.append(candidate)
+    return sorted(kept, key=lambda c: (c[0][1], c[0][0]))
@@ -0,0 +1,129 @@
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# 로컬 OCR 전 이미지 방향 정리
+# - EXIF 방향 태그는 디코딩할 때 한 번 적용합니다 (image_decode.decode_image).
+# - 축소한 흑백 이미지의 가로/세로 경계 분포로 글자 줄이 가로인지 세로인지 보고, 세로면 90도 돌립니다.
+# - 0도/180도는 글자 줄 몇 개만 잘라 PaddleOCR 방향 분류기로 투표해 정하고, 이미지 전체를 한 번 돌립니다.
+#   투표가 갈리면(방향이 애매하면) 기존처럼 글자 조각마다 방향 분류기를 돌립니다.
+
+ORIENTATION_CHECK = os.environ.get("PADDLE_ORIENTATION_CHECK", "1") != "0"
+ORIENTATION_SAMPLES = int(os.environ.get("PADDLE_ORIENTATION_SAMPLES", "6"))  # 방향 투표에 쓸 글자 줄 수
+MIN_SAMPLES = 3  # 이보다 적은 줄만 찾으면 애매한 것으로 봄
+AGREEMENT = 0.8  # 같은 방향이라고 답한 줄의 최소 비율
+MIN_SCORE = 0.9  # 투표로 인정할 방향 분류 점수
+CHECK_MAX_DIM = 800  # 방향 판단용 축소본의 긴 변(px)
+EDGE_THRESHOLD = 40  # 이웃 픽셀 밝기 차이가 이 이상이면 경계
+DIRECTION_RATIO = 1.3  # 행/열 경계 분포 변동계수 비율이 이 이상이면 가로 줄, 역수 이하면 세로 줄
+BAND_MIN_RATIO = 0.15  # 글자 줄로 볼 행의 경계 수 (최대 행 대비)
+SEGMENT_ASPECT = 8  # 분류기에 넣을 줄 조각의 최대 가로/세로 비
+
+_TRANSPOSE = {90: Image.ROTATE_90, 180: Image.ROTATE_180, 270: Image.ROTATE_270}
+# EXIF 방향 태그 -> 바로 세우는 변환 (ImageOps.exif_transpose와 같은 표)
+EXIF_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+
+Band = Tuple[int, int, int, int]  # 원본 좌표계 (left, top, right, bottom)
+
+
+def rotate(image: Image.Image, rotation: int) -> Image.Image:
+    """반시계 방향으로 rotation도 (0/90/180/270) 돌린 이미지"""
+    method = _TRANSPOSE.get(rotation % 360)
+    return image.transpose(method) if method is not None else image
+
+
+def small_gray(image: Image.Image) -> np.ndarray:
+    factor = max(1, max(image.size) // CHECK_MAX_DIM)
+    small = image.reduce(factor) if factor > 1 else image
+    return np.asarray(small.convert("L"), dtype=np.int16)
+
+
+def _variation(profile: np.ndarray) -> float:
+    mean = profile.mean()
+    return float(profile.std() / mean) if mean > 0 else 0.0
+
+
+def text_direction(gray: np.ndarray) -> Optional[str]:
+    """글자 줄 방향 "horizontal" | "vertical". 애매하면 None
+
+    가로 줄이면 줄과 줄 사이가 비어 행별 경계 수는 크게 출렁이고 열별 경계 수는 고릅니다.
+    """
+    edges = ((np.abs(np.diff(gray, axis=1)) >= EDGE_THRESHOLD)[:-1, :]
+             | (np.abs(np.diff(gray, axis=0)) >= EDGE_THRESHOLD)[:, :-1])
+    rows, cols = np.nonzero(edges.any(axis=1))[0], np.nonzero(edges.any(axis=0))[0]
+    if len(rows) < 2 or len(cols) < 2:
+        return None
+    edges = edges[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]  # 여백은 제외 (글자가 한쪽에 몰린 사진)
+    rows, cols = _variation(edges.sum(axis=1)), _variation(edges.sum(axis=0))
+    if rows == 0 or cols == 0:
+        return None
+    ratio = rows / cols
+    if ratio >= DIRECTION_RATIO:
+        return "horizontal"
+    if ratio <= 1 / DIRECTION_RATIO:
+        return "vertical"
+    return None
+
+
+def text_bands(gray: np.ndarray, image_size: Tuple[int, int], count: int = ORIENTATION_SAMPLES) -> List[Band]:
+    """세로 획(가로 방향 밝기 변화)이 많은 행 구간을 글자 줄로 보고, 가장 진한 count개를 원본 좌표로 반환
+
+    표 구분선은 세로 획이 거의 없어 제외되고, 긴 줄은 앞부분만 (높이의 SEGMENT_ASPECT배) 잘라냅니다.
+    """
+    strokes = np.abs(np.diff(gray, axis=1)) >= EDGE_THRESHOLD
+    profile = strokes.sum(axis=1)
+    if profile.max() == 0:
+        return []
+    active = np.concatenate(([0], (profile >= BAND_MIN_RATIO * profile.max()).astype(np.int8), [0]))
+    starts = np.nonzero(np.diff(active) == 1)[0]
+    ends = np.nonzero(np.diff(active) == -1)[0]
+
+    scale_x = image_size[0] / gray.shape[1]
+    scale_y = image_size[1] / gray.shape[0]
+    bands = []
+    for top, bottom in zip(starts, ends):
+        height = bottom - top
+        if height < 3:
+            continue
+        columns = np.nonzero(strokes[top:bottom].any(axis=0))[0]
+        pad = max(1, height // 4)
+        left = max(0, columns[0] - pad)
+        right = min(gray.shape[1], columns[-1] + pad, left + SEGMENT_ASPECT * (height + 2 * pad))
+        weight = int(strokes[top:bottom, left:right].sum())
+        box = (int(left * scale_x), int(max(0, top - pad) * scale_y),
+               int(np.ceil(right * scale_x)), int(np.ceil(min(gray.shape[0], bottom + pad) * scale_y)))
+        bands.append((weight, box))
+    bands.sort(key=lambda item: -item[0])
+    return [box for _, box in bands[:count]]
+
+
+def normalize_direction(image: Image.Image):
+    """세로 줄이면 90도 돌림 -> (이미지, 돌린 각도, 줄 방향 또는 None, 방향 투표용 글자 줄 상자 목록)"""
+    gray = small_gray(image)
+    direction = text_direction(gray)
+    rotation = 0
+    if direction == "vertical":
+        image, rotation, gray = rotate(image, 90), 90, np.rot90(gray)
+    bands = text_bands(gray, image.size) if direction is not None else []
+    return image, rotation, direction, bands
+
+
+def vote(cls_results, min_samples: int = MIN_SAMPLES) -> Optional[int]:
+    """방향 분류 결과 [(라벨 "0"|"180", 점수)] -> 합의된 각도. 표본이 적거나 갈리면 None"""
+    if len(cls_results) < min_samples:
+        return None
+    confident = [int(label) for label, score in cls_results if score >= MIN_SCORE]
+    for angle in (0, 180):
+        if confident.count(angle) >= AGREEMENT * len(cls_results):
+            return angle
+    return None
@@ -1,5 +1,7 @@
 import re
-from typing import Dict, Any, List
+import bisect
+import itertools
+from typing import Dict, Any, List, Tuple
 from rdi import DISPLAY_ORDER
 
 # OCR 결과에서 문자열을 회수하고, 한국어 영양 키워드를 찾아 값/단위를 파싱합니다.
@@ -33,37 +35,46 @@ KEY_PATTERNS = [
 ]
 
 
-def _collect_texts(ocr_json: Dict[str, Any]) -> List[str]:
-    texts = []
+def _collect_fields(ocr_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """텍스트가 있는 OCR field 목록 (이미지 순서대로)"""
+    fields = []
     try:
         images = ocr_json.get("images", [])
         for img in images:
             for f in img.get("fields", []):
-                t = f.get("inferText") or f.get("inferTextRaw")
-                if t:
-                    texts.append(str(t))
+                if f.get("inferText") or f.get("inferTextRaw"):
+                    fields.append(f)
     except Exception:
         pass
-    return texts
+    return fields
+
+
+def _collect_texts(ocr_json: Dict[str, Any]) -> List[str]:
+    return [str(f.get("inferText") or f.get("inferTextRaw")) for f in _collect_fields(ocr_json)]
 
 
 def _to_float(s: str) -> float:
     return float(s.replace(",", "."))
 
 
-def parse_ocr_payload(ocr_json: Dict[str, Any]) -> Dict[str, float]:
-    texts = _collect_texts(ocr_json)
+def parse_ocr_with_sources(ocr_json: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, List[Dict[str, Any]]]]:
+    """parse_ocr_payload와 같은 결과 + 항목별로 값을 읽어낸 OCR field 목록 (신뢰도/위치 확인용)"""
+    source_fields = _collect_fields(ocr_json)
+    texts = [str(f.get("inferText") or f.get("inferTextRaw")) for f in source_fields]
     joined = "\n".join(texts)
+    starts = list(itertools.accumulate([0] + [len(t) + 1 for t in texts[:-1]]))  # joined에서 각 줄의 시작 위치
 
     out: Dict[str, float] = {}
+    sources: Dict[str, List[Dict[str, Any]]] = {}
     for key, aliases, num_pat in KEY_PATTERNS:
         # 1) 줄 수준에서 "키워드 ... 값 단위" 형식 매칭
         found = False
-        for line in texts:
+        for index, line in enumerate(texts):
             if any(re.search(a, line) for a in aliases):
                 m = re.search(num_pat, line, flags=re.IGNORECASE)
                 if m:
                     out[key] = _to_float(m.group(1))
+                    sources[key] = [source_fields[index]]
                     found = True
                     break
         if found:
@@ -81,9 +92,16 @@ def parse_ocr_payload(ocr_json: Dict[str, Any]) -> Dict[str, float]:
             m2 = re.search(num_pat, window, flags=re.IGNORECASE)
             if m2:
                 out[key] = _to_float(m2.group(1))
+                first = bisect.bisect_right(starts, idx - 1) - 1
+                last = bisect.bisect_right(starts, idx + m2.end() - 1) - 1
+                sources[key] = source_fields[first:last + 1]
 
     # 읽기 실패한 항목들을 0으로 채우기
-    return fill_missing_fields(out)
+    return fill_missing_fields(out), sources
+
+
+def parse_ocr_payload(ocr_json: Dict[str, Any]) -> Dict[str, float]:
+    return parse_ocr_with_sources(ocr_json)[0]
 
 
 def fill_missing_fields(fields: Dict[str, float]) -> Dict[str, float]:
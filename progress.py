@@ -0,0 +1,73 @@
+import re
+import time
+import uuid
+import threading
+
+# 분석 진행 상황(analysis_progress) 전송기
+# - 업로드 폼이 제출한 progress_token으로 해당 클라이언트의 Socket.IO room에만 전송합니다.
+# - 같은 내용의 반복 이벤트와 같은 단계 안에서 너무 잦은 갱신은 건너뜁니다.
+#   단계 전환과 시작(0%)/완료(100%) 이벤트는 항상 전송합니다.
+
+PROGRESS_MIN_INTERVAL = 0.1  # 같은 단계의 중간 진행률 이벤트 최소 간격(초)
+
+_TOKEN_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def new_progress_token() -> str:
+    return uuid.uuid4().hex
+
+
+def valid_progress_token(token) -> bool:
+    """폼/소켓으로 받은 토큰 형식 확인 (임의 room 이름 주입 방지)"""
+    return isinstance(token, str) and bool(_TOKEN_PATTERN.match(token))
+
+
+class ProgressReporter:
+    """한 업로드의 진행 상황을 요청한 클라이언트 room으로만 보내는 전송기"""
+
+    def __init__(self, socketio, room=None, min_interval: float = PROGRESS_MIN_INTERVAL):
+        self.socketio = socketio
+        self.room = room if valid_progress_token(room) else None
+        self.min_interval = min_interval
+        self.sent = 0
+        self.skipped = 0
+        self._last = None
+        self._last_step = None
+        self._last_time = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.socketio is not None and self.room is not None
+
+    def emit(self, step: str, progress: int, message: str, **extra) -> bool:
+        """진행 상황 전송. 실제로 보냈으면 True"""
+        if not self.enabled:
+            return False
+
+        key = (step, progress, message)
+        now = time.monotonic()
+        with self._lock:
+            if key == self._last:
+                self.skipped += 1
+                return False
+            boundary = step != self._last_step or progress in (0, 100)
+            if not boundary and now - self._last_time < self.min_interval:
+                self.skipped += 1
+                return False
+            self._last = key
+            self._last_step = step
+            self._last_time = now
+            self.sent += 1
+
+        payload = {"step": step, "progress": progress, "message": message}
+        payload.update(extra)
+        try:
+            self.socketio.emit("analysis_progress", payload, room=self.room)
+        except Exception:
+            pass  # 웹소켓 연결이 없는 경우 무시
+        return True
+
+
+# 토큰 없이 들어온 요청(구버전 폼, API 호출 등)용: 아무에게도 전송하지 않음
+NULL_PROGRESS = ProgressReporter(None)
@@ -0,0 +1,183 @@
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, Any
+
+import tracing
+
+# HyperCLOVA X 호출량 제한기 (요청 수 + 토큰 수 기준 토큰 버킷)
+# - 상태를 SQLite 파일에 저장해 같은 호스트의 스레드/워커 프로세스가 버킷을 공유합니다.
+# - 429 응답을 받으면 속도를 절반으로 줄이고(multiplicative decrease),
+#   성공할 때마다 조금씩 원래 속도로 되돌립니다(additive increase).
+# - 속도는 요청 1건이 RATE_MAX_WAIT 안에 채워지는 수준 아래로 줄이지 않습니다 (그보다 느리면 모든 요청이 바로 거절됨).
+# - 줄어든 속도는 DB에 남으므로 시작할 때 쉬었던 시간만큼 회복시킵니다 (IDLE_RECOVERY_SECONDS 동안 쉬면 원래 속도).
+
+RATE_LIMIT_ENABLED = os.environ.get("NCP_LLM_RATE_LIMIT", "1") != "0"
+RATE_QPS = float(os.environ.get("NCP_LLM_RATE_QPS", "1.0"))  # 초당 요청 수
+RATE_TPM = float(os.environ.get("NCP_LLM_RATE_TPM", "60000"))  # 분당 토큰 수
+RATE_MAX_WAIT = float(os.environ.get("NCP_LLM_RATE_MAX_WAIT", "10"))  # 대기 허용 시간(초)
+RATE_DB_PATH = os.environ.get(
+    "NCP_LLM_RATE_DB", os.path.join(tempfile.gettempdir(), "ncp_llm_rate.sqlite3")
+)
+
+# AIMD 파라미터
+MIN_SCALE = 0.05
+DECREASE_FACTOR = 0.5
+INCREASE_STEP = 0.05
+IDLE_RECOVERY_SECONDS = 60.0
+
+logger = tracing.get_logger("rate_limiter")
+
+
+def estimate_tokens(completion_request: Dict[str, Any]) -> int:
+    """요청 본문으로 소비 토큰 수를 보수적으로 추정 (한글 1글자 ≈ 1토큰 + maxTokens)"""
+    chars = 0
+    for message in completion_request.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            for part in content:
+                chars += len(part.get("text", "") or "")
+    return chars + int(completion_request.get("maxTokens", 0) or 0)
+
+
+class RateLimiter:
+    """프로세스 간 공유되는 요청/토큰 버킷 제한기"""
+
+    def __init__(self, db_path: str = RATE_DB_PATH, qps: float = RATE_QPS, tpm: float = RATE_TPM,
+                 name: str = "hcx-005", burst_seconds: float = 1.0, max_wait: float = RATE_MAX_WAIT):
+        self._db_path = db_path
+        self._name = name
+        self._qps = qps
+        self._tps = tpm / 60.0
+        # 가장 느린 속도에서도 요청 1건은 max_wait 안에 허용되도록 하한을 올림
+        self.min_scale = min(1.0, max(MIN_SCALE, 1.0 / (qps * max_wait)))
+        # 버킷 용량: 요청은 최소 1건, 토큰은 1분치까지 모아둘 수 있음
+        self._req_capacity = max(1.0, qps * burst_seconds)
+        self._tok_capacity = tpm
+        self._local = threading.local()
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "name TEXT PRIMARY KEY, req REAL, tok REAL, scale REAL, updated REAL)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, 1.0, ?)",
+            (self._name, self._req_capacity, self._tok_capacity, time.time()),
+        )
+        # 이전 실행에서 줄어든 속도는 쉬었던 시간만큼 회복하고 현재 설정의 하한 아래로 두지 않음
+        conn.execute(
+            "UPDATE buckets SET scale = MIN(1.0, MAX(?, scale + MAX(0.0, ? - updated) / ?)) WHERE name = ?",
+            (self.min_scale, time.time(), IDLE_RECOVERY_SECONDS, self._name),
+        )
+
+    def _update(self, fn):
+        """버킷 행을 잠근 상태에서 읽고 fn 결과로 갱신합니다 (BEGIN IMMEDIATE로 프로세스 간 직렬화)"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT req, tok, scale, updated FROM buckets WHERE name = ?", (self._name,)
+            ).fetchone()
+            req, tok, scale, updated = row
+            now = time.time()
+            elapsed = max(0.0, now - updated)
+            req = min(self._req_capacity, req + elapsed * self._qps * scale)
+            tok = min(self._tok_capacity, tok + elapsed * self._tps * scale)
+            req, tok, scale, result = fn(req, tok, scale)
+            conn.execute(
+                "UPDATE buckets SET req = ?, tok = ?, scale = ?, updated = ? WHERE name = ?",
+                (req, tok, scale, now, self._name),
+            )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """버킷에서 1요청 + tokens 만큼 차감. 성공 시 0, 실패 시 필요한 대기 시간(초) 반환"""
+        cost = min(float(tokens), self._tok_capacity)
+
+        def take(req, tok, scale):
+            if req >= 1.0 and tok >= cost:
+                return req - 1.0, tok - cost, scale, 0.0
+            wait_req = (1.0 - req) / (self._qps * scale) if req < 1.0 else 0.0
+            wait_tok = (cost - tok) / (self._tps * scale) if tok < cost else 0.0
+            return req, tok, scale, max(wait_req, wait_tok, 0.001)
+
+        return self._update(take)
+
+    def acquire(self, tokens: int = 0, timeout: float = RATE_MAX_WAIT) -> bool:
+        """허용될 때까지 대기. timeout 안에 불가능하면 False (호출부는 통계 기반 추천으로 대체)"""
+        deadline = time.time() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            remaining = deadline - time.time()
+            if wait > remaining:
+                return False
+            time.sleep(wait)
+
+    def on_throttled(self):
+        """429 응답 수신 시 속도를 절반으로 줄이고 남은 요청 여유분을 비움"""
+        def decrease(req, tok, scale):
+            new_scale = max(self.min_scale, scale * DECREASE_FACTOR)
+            return 0.0, tok, new_scale, new_scale
+
+        return self._update(decrease)
+
+    def on_error(self):
+        """응답이 도중에 끊기는 등 실패하면 성공 한 번의 회복분만큼 속도를 줄임 (429처럼 절반으로 줄이지는 않음)"""
+        def decrease(req, tok, scale):
+            new_scale = max(self.min_scale, scale - INCREASE_STEP)
+            return req, tok, new_scale, new_scale
+
+        return self._update(decrease)
+
+    def on_success(self):
+        """성공 응답마다 속도를 조금씩 회복"""
+        def increase(req, tok, scale):
+            new_scale = min(1.0, scale + INCREASE_STEP)
+            return req, tok, new_scale, new_scale
+
+        return self._update(increase)
+
+    @property
+    def scale(self) -> float:
+        return self._update(lambda req, tok, scale: (req, tok, scale, scale))
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """공유 RateLimiter 인스턴스를 가져오거나 생성합니다 (비활성화 또는 DB를 열 수 없으면 None)"""
+    global _rate_limiter
+    if not RATE_LIMIT_ENABLED:
+        return None
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                try:
+                    _rate_limiter = RateLimiter()
+                except (sqlite3.Error, OSError) as e:
+                    # 임포트 시점에 호출되므로 DB 문제로 앱이 뜨지 못하게 하지 않고 제한 없이 호출
+                    logger.warning("호출량 제한 DB를 열 수 없어 제한 없이 호출", db_path=RATE_DB_PATH, error=str(e))
+                    return None
+    return _rate_limiter
@@ -0,0 +1,252 @@
+from functools import lru_cache
+from typing import Dict, Iterable
+
+# 통계 기반 영양 추천 규칙 엔진
+# - 추천 문구 표/템플릿을 모듈 로드 시 한 번만 만들고,
+#   (섹션, 성별, 영양소) 단위로 렌더링된 조각을 캐시해서 조합만 합니다.
+# - 문구는 입력 영양소 키 목록에만 의존하므로 (성별, 키 목록) 조합이 같으면 결과도 같습니다.
+
+FALLBACK_NOTICE = "⚠️ AI 추천 서비스를 이용하려면 API 키가 필요합니다.\n\n"
+NO_DEFICIENT_MESSAGE = "현재 모든 영양소가 충분히 섭취되었습니다! 👍"
+NO_EXCESSIVE_MESSAGE = "현재 과다 섭취한 영양소가 없습니다! 👍"
+
+GENDER_TEXT = {"male": "남성", "female": "여성"}
+
+# 영양소 키 -> 한국어 이름 (다양한 형태의 키/영어 원문 포함)
+NUTRIENT_NAMES = {
+    # 기본 영양소
+    'calories_kcal': '칼로리',
+    'carbs_g': '탄수화물',
+    'protein_g': '단백질',
+    'fat_g': '지방',
+    'saturated_fat_g': '포화지방',
+    'trans_fat_g': '트랜스지방',
+    'cholesterol_mg': '콜레스테롤',
+    'sodium_mg': '나트륨',
+    'potassium_mg': '칼륨',
+    'fiber_g': '식이섬유',
+    'sugars_g': '당류',
+    'calcium_mg': '칼슘',
+    'iron_mg': '철분',
+    'phosphorus_mg': '인',
+    'vitamin_a_ug': '비타민A',
+    'thiamine_mg': '티아민',
+    'riboflavin_mg': '리보플라빈',
+    'niacin_mg': '나이아신',
+    'vitamin_c_mg': '비타민C',
+
+    # 다양한 형태의 키 매핑
+    'sat_fat_g': '포화지방',
+    'saturated_fat': '포화지방',
+    'trans_fat': '트랜스지방',
+    'dietary_fiber': '식이섬유',
+    'total_sugars': '당류',
+    'added_sugars': '첨가당',
+    'vitamin_d': '비타민D',
+    'vitamin_e': '비타민E',
+    'vitamin_k': '비타민K',
+    'folate': '엽산',
+    'vitamin_b6': '비타민B6',
+    'vitamin_b12': '비타민B12',
+    'magnesium': '마그네슘',
+    'zinc': '아연',
+    'selenium': '셀레늄',
+
+    # 영어 원문도 매핑
+    'Calories': '칼로리',
+    'Total Fat': '지방',
+    'Saturated Fat': '포화지방',
+    'Trans Fat': '트랜스지방',
+    'Cholesterol': '콜레스테롤',
+    'Sodium': '나트륨',
+    'Total Carbohydrate': '탄수화물',
+    'Dietary Fiber': '식이섬유',
+    'Total Sugars': '당류',
+    'Added Sugars': '첨가당',
+    'Protein': '단백질',
+    'Vitamin D': '비타민D',
+    'Calcium': '칼슘',
+    'Iron': '철분',
+    'Potassium': '칼륨'
+}
+
+# 부족 영양소 보충 음식 (get_statistical_nutrition_recommendation)
+SUPPLEMENT_FOODS = {
+    'calories_kcal': {'male': '견과류(아몬드, 호두), 아보카도, 바나나, 현미밥', 'female': '견과류(아몬드, 호두), 아보카도, 바나나, 현미밥'},
+    'protein_g': {'male': '닭가슴살, 달걀, 두부, 생선(연어, 고등어)', 'female': '닭가슴살, 달걀, 두부, 생선(연어, 고등어)'},
+    'carbs_g': {'male': '현미, 고구마, 귀리, 바나나', 'female': '현미, 고구마, 귀리, 바나나'},
+    'fat_g': {'male': '올리브오일, 견과류, 아보카도, 연어', 'female': '올리브오일, 견과류, 아보카도, 연어'},
+    'calcium_mg': {'male': '우유, 요거트, 치즈, 멸치, 시금치', 'female': '우유, 요거트, 치즈, 멸치, 시금치'},
+    'iron_mg': {'male': '시금치, 소고기, 닭고기, 콩류', 'female': '시금치, 소고기, 닭고기, 콩류, 굴'},
+    'sodium_mg': {'male': '김치, 된장, 간장 (적당량)', 'female': '김치, 된장, 간장 (적당량)'},
+    'vitamin_c_mg': {'male': '오렌지, 키위, 딸기, 브로콜리, 파프리카', 'female': '오렌지, 키위, 딸기, 브로콜리, 파프리카'},
+}
+
+# 종합 추천의 부족 영양소 개선 음식 (없으면 DEFAULT)
+COMPREHENSIVE_FOODS = {
+    'protein_g': {'male': "닭가슴살, 달걀, 두부, 생선", 'female': "닭가슴살, 달걀, 두부, 콩류"},
+    'calcium_mg': {'male': "우유, 멸치, 치즈, 시금치", 'female': "우유, 멸치, 치즈, 케일"},
+    'iron_mg': {'male': "소고기, 시금치, 콩류", 'female': "소고기, 시금치, 굴, 콩류"},
+    'vitamin_c_mg': {'male': "오렌지, 키위, 브로콜리, 파프리카", 'female': "오렌지, 키위, 브로콜리, 파프리카"},
+    'fiber_g': {'male': "현미, 고구마, 사과, 양배추", 'female': "현미, 고구마, 사과, 양배추"},
+}
+DEFAULT_COMPREHENSIVE_FOODS = "균형 잡힌 식단"
+
+# 종합 추천의 과다 영양소 조절 방안 (없으면 DEFAULT)
+EXCESS_ADVICE = {
+    'sodium_mg': "라면, 찌개류 줄이고 신선한 채소 늘리기",
+    'saturated_fat_g': "튀김, 버터 줄이고 올리브오일, 견과류로 대체",
+    'sugars_g': "음료수, 과자 줄이고 신선한 과일로 대체",
+}
+DEFAULT_EXCESS_ADVICE = "섭취량 조절 및 균형 맞추기"
+
+# 과다 영양소 감소 방법 (get_statistical_reduction_recommendation)
+REDUCTION_FOODS = {
+    'sodium_mg': {'reduce': '라면, 찌개류, 김치, 젓갈류, 가공식품', 'alternative': '신선한 채소, 과일, 허브 양념'},
+    'saturated_fat_g': {'reduce': '버터, 치즈, 육류 지방, 튀김류', 'alternative': '올리브오일, 견과류, 생선'},
+    'sugars_g': {'reduce': '탄산음료, 과자, 케이크, 사탕', 'alternative': '신선한 과일, 무가당 요거트'},
+    'cholesterol_mg': {'reduce': '계란 노른자, 내장류, 새우', 'alternative': '계란 흰자, 생선, 두부'},
+}
+
+# 종합 추천의 성별 맞춤 조언
+GENDER_ADVICE = {
+    "male": (
+        "👨 **남성 맞춤 조언:**\n"
+        "• 근육량 유지를 위한 충분한 단백질 섭취\n"
+        "• 활동량에 맞는 적절한 칼로리 조절\n"
+        "• 규칙적인 운동과 함께 균형잡힌 식단 유지\n\n"
+    ),
+    "female": (
+        "👩 **여성 맞춤 조언:**\n"
+        "• 철분 부족 예방을 위한 철분 함유 식품 섭취\n"
+        "• 골건강을 위한 칼슘, 비타민D 충분 섭취\n"
+        "• 호르몬 균형을 위한 규칙적인 식사 패턴\n\n"
+    ),
+}
+
+COMPREHENSIVE_TOP_N = 3  # 종합 추천에서 영양소 종류별 최대 표시 개수
+
+
+def _normalize_gender(gender: str) -> str:
+    """male 이외의 값은 여성 기준으로 처리 (기존 동작과 동일)"""
+    return "male" if gender == "male" else "female"
+
+
+def _build_frames():
+    """(종류, 성별, fallback 여부)별 머리말/맺음말을 미리 만들어 둡니다"""
+    frames = {}
+    for gender, gender_text in GENDER_TEXT.items():
+        for is_fallback in (True, False):
+            prefix = FALLBACK_NOTICE + "📊 통계 기반 " if is_fallback else "📊 "
+            frames[("supplement", gender, is_fallback)] = (
+                f"{prefix}{gender_text} 맞춤 {'추천' if is_fallback else '영양 추천'}:\n\n",
+                f"\n\n💡 {gender_text}에게 특히 중요한 영양소들을 위주로 선별된 음식들입니다.",
+            )
+            frames[("comprehensive", gender, is_fallback)] = (
+                f"{prefix}{gender_text} 종합 영양 분석:\n\n",
+                GENDER_ADVICE[gender] + (
+                    "💡 더 정확한 개인 맞춤 분석을 원하시면 AI 추천 서비스 이용을 권장합니다."
+                    if is_fallback else "💡 지속적인 실천으로 건강한 영양 균형을 유지하세요."
+                ),
+            )
+            frames[("reduction", gender, is_fallback)] = (
+                f"{prefix}{gender_text} 맞춤 감소 방법:\n\n",
+                f"\n\n💡 {gender_text} 건강을 위해 점진적으로 줄여나가세요.",
+            )
+    return frames
+
+
+FRAMES = _build_frames()
+
+
+@lru_cache(maxsize=1024)
+def nutrient_name(nutrient_key: str) -> str:
+    """영양소 키를 한국어 이름으로 변환 (원본 -> 소문자 -> 단위 제거 순으로 조회)"""
+    result = NUTRIENT_NAMES.get(nutrient_key)
+    if result:
+        return result
+
+    result = NUTRIENT_NAMES.get(nutrient_key.lower())
+    if result:
+        return result
+
+    key_without_unit = nutrient_key.replace('_g', '').replace('_mg', '').replace('_ug', '').replace('_kcal', '')
+    result = NUTRIENT_NAMES.get(key_without_unit)
+    if result:
+        return result
+
+    return nutrient_key
+
+
+@lru_cache(maxsize=4096)
+def render_line(section: str, gender: str, nutrient: str) -> str:
+    """(섹션, 성별, 영양소) 단위 추천 문구 조각. 해당 규칙이 없으면 빈 문자열"""
+    name = nutrient_name(nutrient)
+    if section == "supplement":
+        foods = SUPPLEMENT_FOODS.get(nutrient)
+        return f"• {name}: {foods[gender]}" if foods else ""
+    if section == "deficient":
+        foods = COMPREHENSIVE_FOODS.get(nutrient)
+        return f"• {name}: {foods[gender] if foods else DEFAULT_COMPREHENSIVE_FOODS}\n"
+    if section == "excessive":
+        return f"• {name}: {EXCESS_ADVICE.get(nutrient, DEFAULT_EXCESS_ADVICE)}\n"
+    if section == "reduction":
+        foods = REDUCTION_FOODS.get(nutrient)
+        if not foods:
+            return ""
+        return f"• {name}:\n  - 줄일 음식: {foods['reduce']}\n  - 대체 음식: {foods['alternative']}"
+    raise ValueError(f"unknown section: {section}")
+
+
+@lru_cache(maxsize=64)
+def render_overall(total_issues: int) -> str:
+    """문제 영양소 개수 구간(0 / 1~3 / 4+)별 전체 평가 문구"""
+    if total_issues == 0:
+        return "🎉 **전체 평가:** 모든 영양소가 적정 수준으로 매우 양호한 상태입니다!\n\n"
+    if total_issues <= 3:
+        return f"✅ **전체 평가:** {total_issues}개 영양소에 주의가 필요하지만 전반적으로 양호한 상태입니다.\n\n"
+    return f"⚠️ **전체 평가:** {total_issues}개 영양소 개선이 필요하여 식단 조정을 권장합니다.\n\n"
+
+
+def _top(nutrients: Iterable[str]):
+    keys = []
+    for key in nutrients:
+        if len(keys) == COMPREHENSIVE_TOP_N:
+            break
+        keys.append(key)
+    return keys
+
+
+def render_supplement(deficient_nutrients: Dict[str, float], gender: str, is_fallback: bool) -> str:
+    if not deficient_nutrients:
+        return NO_DEFICIENT_MESSAGE
+    gender = _normalize_gender(gender)
+    head, tail = FRAMES[("supplement", gender, is_fallback)]
+    lines = [line for line in (render_line("supplement", gender, n) for n in deficient_nutrients) if line]
+    return head + "\n".join(lines) + tail
+
+
+def render_comprehensive(deficient_nutrients: Dict[str, float], excessive_nutrients: Dict[str, float],
+                         gender: str, is_fallback: bool) -> str:
+    gender = _normalize_gender(gender)
+    head, tail = FRAMES[("comprehensive", gender, is_fallback)]
+    parts = [head, render_overall(len(deficient_nutrients) + len(excessive_nutrients))]
+    if deficient_nutrients:
+        parts.append("🔴 **부족한 영양소 개선 방안:**\n")
+        parts.extend(render_line("deficient", gender, n) for n in _top(deficient_nutrients))
+        parts.append("\n")
+    if excessive_nutrients:
+        parts.append("⚠️ **과다 섭취 영양소 조절 방안:**\n")
+        parts.extend(render_line("excessive", gender, n) for n in _top(excessive_nutrients))
+        parts.append("\n")
+    parts.append(tail)
+    return "".join(parts)
+
+
+def render_reduction(excessive_nutrients: Dict[str, float], gender: str, is_fallback: bool) -> str:
+    if not excessive_nutrients:
+        return NO_EXCESSIVE_MESSAGE
+    gender = _normalize_gender(gender)
+    head, tail = FRAMES[("reduction", gender, is_fallback)]
+    lines = [line for line in (render_line("reduction", gender, n) for n in excessive_nutrients) if line]
+    return head + "\n\n".join(lines) + tail
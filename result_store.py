@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Optional
+
+# 분석 결과 저장소
+# - 완료된 분석 결과(results dict)를 SQLite 파일에 analysis_id로 저장해 /results/<id>에서 다시 렌더링합니다.
+# - 워커 프로세스가 같은 파일을 공유하므로 어느 프로세스로 요청이 가도 결과/추천 상태를 조회할 수 있습니다.
+# - 렌더링한 HTML도 함께 캐시하고, 추천 결과가 갱신되면 캐시를 비웁니다.
+# - 스트리밍 중인 AI 추천의 섹션별 누적 본문(partials)도 보관해 다른 워커에 늦게 접속한 클라이언트에 전달합니다.
+
+RESULT_DB_PATH = os.environ.get("RESULT_DB", os.path.join(tempfile.gettempdir(), "ncp_results.sqlite3"))
+RESULT_TTL = float(os.environ.get("RESULT_TTL", str(7 * 24 * 3600)))  # 저장 후 보관 시간(초)
+RESULT_MAX_ROWS = int(os.environ.get("RESULT_MAX_ROWS", "1000"))  # 넘으면 오래된 결과부터 삭제
+PURGE_EVERY = 50  # 저장 N회마다 보관 정책 적용
+
+
+class ResultStore:
+    """analysis_id -> 결과 JSON / 렌더링된 HTML 저장소"""
+
+    def __init__(self, db_path: str = RESULT_DB_PATH, ttl: float = RESULT_TTL, max_rows: int = RESULT_MAX_ROWS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._local = threading.local()
+        self._saved = 0
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " id TEXT PRIMARY KEY,"
+            " created REAL NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0,"  # 갱신할 때마다 증가 (HTML 캐시 경쟁 방지)
+            " html TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS partials ("
+            " id TEXT PRIMARY KEY,"
+            " updated REAL NOT NULL,"
+            " sections TEXT NOT NULL)"
+        )
+
+    def save(self, analysis_id: str, results: dict):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO results (id, created, payload, html) VALUES (?, ?, ?, NULL)",
+            (analysis_id, time.time(), json.dumps(results, ensure_ascii=False)),
+        )
+        self._saved += 1
+        if self._saved % PURGE_EVERY == 0:
+            self.purge()
+
+    def get(self, analysis_id: str) -> Optional[dict]:
+        results, _ = self.get_versioned(analysis_id)
+        return results
+
+    def get_versioned(self, analysis_id: str):
+        """(결과, 버전) 반환. 없거나 보관 기간이 지났으면 (None, None)"""
+        row = self._conn().execute(
+            "SELECT payload, version FROM results WHERE id = ? AND created >= ?", (analysis_id, time.time() - self.ttl)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def update(self, analysis_id: str, changes: dict) -> Optional[dict]:
+        """저장된 결과 일부를 갱신하고(HTML 캐시 무효화) 갱신된 결과를 반환. 없으면 None"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # 다른 프로세스의 갱신과 직렬화
+        try:
+            row = conn.execute("SELECT payload FROM results WHERE id = ?", (analysis_id,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            results = json.loads(row[0])
+            results.update(changes)
+            conn.execute("UPDATE results SET payload = ?, version = version + 1, html = NULL WHERE id = ?",
+                         (json.dumps(results, ensure_ascii=False), analysis_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def get_html(self, analysis_id: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT html FROM results WHERE id = ? AND created >= ?", (analysis_id, time.time() - self.ttl)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_html(self, analysis_id: str, html: str, version: int):
+        """렌더링한 HTML 캐시. 렌더링하는 동안 결과가 갱신됐으면(version 불일치) 저장하지 않음"""
+        self._conn().execute("UPDATE results SET html = ? WHERE id = ? AND version = ?", (html, analysis_id, version))
+
+    def set_partial(self, analysis_id: str, sections: dict):
+        """스트리밍 중인 추천의 섹션별 누적 본문 저장 (결과 버전/HTML 캐시는 건드리지 않음)"""
+        self._conn().execute(
+            "INSERT OR REPLACE INTO partials (id, updated, sections) VALUES (?, ?, ?)",
+            (analysis_id, time.time(), json.dumps(sections, ensure_ascii=False)),
+        )
+
+    def get_partial(self, analysis_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT sections FROM partials WHERE id = ?", (analysis_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def clear_partial(self, analysis_id: str):
+        self._conn().execute("DELETE FROM partials WHERE id = ?", (analysis_id,))
+
+    def purge(self, now: float = None) -> int:
+        """보관 기간이 지난 결과와 최대 개수를 넘는 오래된 결과 삭제. 삭제한 행 수 반환"""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM results WHERE id IN (SELECT id FROM results ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        ).rowcount
+        # 스트리밍 도중 프로세스가 끝나 지우지 못한 누적 본문
+        conn.execute("DELETE FROM partials WHERE updated < ?", (now - self.ttl,))
+        return removed
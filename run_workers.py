@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+app.py를 여러 프로세스로 실행하는 런처 (단일 서버 스케일 아웃)
+
+각 워커는 PORT, PORT+1, ... 에서 실행되고 SOCKETIO_MESSAGE_QUEUE로 Socket.IO 상태를 공유합니다.
+앞단 로드밸런서는 Socket.IO long-polling 때문에 sticky session(ip_hash 등)으로 설정하세요.
+
+사용법:
+python run_workers.py --workers 4 --base-port 8001
+python run_workers.py --workers 4 --queue unix:///tmp/ncp_socketio.sock --async-mode eventlet
+
+nginx 예시:
+upstream ncp_app { ip_hash; server 127.0.0.1:8001; server 127.0.0.1:8002; ... }
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import tempfile
+import subprocess
+
+DEFAULT_QUEUE = "sqlite://" + os.path.join(tempfile.gettempdir(), "ncp_socketio.sqlite3")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py 멀티 프로세스 런처")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--base-port", type=int, default=8001)
+    parser.add_argument("--queue", default=os.environ.get("SOCKETIO_MESSAGE_QUEUE") or DEFAULT_QUEUE,
+                        help="sqlite:///경로 | unix:///경로 | redis://...")
+    parser.add_argument("--async-mode", default=os.environ.get("SOCKETIO_ASYNC_MODE", "threading"),
+                        choices=["threading", "eventlet", "gevent"])
+    args = parser.parse_args()
+
+    processes = []
+    broker = None
+    if args.queue.startswith("unix://"):
+        # Unix 소켓 큐는 브로커 프로세스를 먼저 띄움
+        socket_path = args.queue[len("unix://"):]
+        broker = subprocess.Popen([sys.executable, "socket_queue.py", "broker", "--path", socket_path])
+        for _ in range(50):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.1)
+
+    for i in range(args.workers):
+        port = args.base_port + i
+        env = dict(os.environ, PORT=str(port), FLASK_DEBUG="0",
+                   SOCKETIO_MESSAGE_QUEUE=args.queue, SOCKETIO_ASYNC_MODE=args.async_mode)
+        processes.append(subprocess.Popen([sys.executable, "app.py"], env=env))
+        print(f"🚀 워커 {i + 1}/{args.workers}: http://127.0.0.1:{port}")
+    print(f"   Socket.IO 큐: {args.queue} (async_mode={args.async_mode})")
+
+    def stop(*_):
+        for proc in processes + ([broker] if broker else []):
+            proc.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for proc in processes:
+            proc.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Socket.IO 멀티 프로세스용 메시지 큐 백엔드
+
+여러 app.py 프로세스가 room/emit 상태를 공유하도록 python-socketio의 PubSubManager를 구현합니다.
+Redis 등 외부 브로커 없이 한 서버 안에서 프로세스를 늘릴 때 사용합니다.
+
+SOCKETIO_MESSAGE_QUEUE 설정:
+- sqlite:///tmp/ncp_socketio.sqlite3   SQLite 파일을 폴링 (별도 프로세스 불필요)
+- unix:///tmp/ncp_socketio.sock        Unix 소켓 브로커 (python socket_queue.py broker --path ... 로 실행)
+- redis://..., amqp://... 등           Flask-SocketIO 기본 백엔드 사용
+
+브로커 실행:
+python socket_queue.py broker --path /tmp/ncp_socketio.sock
+"""
+
+import os
+import json
+import time
+import queue
+import socket
+import sqlite3
+import argparse
+import threading
+import socketserver
+
+from socketio import PubSubManager
+
+import tracing
+
+SQLITE_POLL_INTERVAL = float(os.environ.get("SOCKETIO_QUEUE_POLL_INTERVAL", "0.05"))
+SQLITE_RETENTION = float(os.environ.get("SOCKETIO_QUEUE_RETENTION", "60"))  # 메시지 보관 시간(초)
+BROKER_CLIENT_BUFFER = int(os.environ.get("SOCKETIO_QUEUE_CLIENT_BUFFER", "1000"))  # 구독자별 대기 메시지 수 (넘치면 연결 끊음)
+
+SUBSCRIBE_LINE = b'{"subscribe": true}\n'  # 구독 연결이 처음 보내는 줄 (발행 전용 연결과 구분)
+
+logger = tracing.get_logger("socket_queue")
+
+
+class SQLiteManager(PubSubManager):
+    """SQLite 테이블을 메시지 큐로 쓰는 Socket.IO 클라이언트 매니저
+
+    발행은 INSERT 한 번, 구독은 마지막으로 읽은 id 이후 행을 주기적으로 조회합니다.
+    오래된 메시지는 발행 시 가끔 정리합니다.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, url: str, channel: str = "flask-socketio", write_only: bool = False, logger=None,
+                 poll_interval: float = SQLITE_POLL_INTERVAL, retention: float = SQLITE_RETENTION):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.db_path = url[len("sqlite://"):] if url.startswith("sqlite://") else url
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._local = threading.local()
+        self._published = 0
+        self._init_db()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS socketio_messages ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " channel TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+
+    def _publish(self, data):
+        conn = self._conn()
+        conn.execute("INSERT INTO socketio_messages (channel, created, payload) VALUES (?, ?, ?)",
+                     (self.channel, time.time(), self.json.dumps(data)))
+        self._published += 1
+        if self._published % 200 == 0:
+            conn.execute("DELETE FROM socketio_messages WHERE created < ?", (time.time() - self.retention,))
+
+    def _sleep(self, seconds: float):
+        # eventlet/gevent 모드에서는 서버의 sleep을 써야 다른 그린스레드가 실행됨
+        if self.server is not None:
+            self.server.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _listen(self):
+        conn = self._conn()
+        row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM socketio_messages").fetchone()
+        last_id = row[0]
+        while True:
+            rows = conn.execute(
+                "SELECT id, payload FROM socketio_messages WHERE id > ? AND channel = ? ORDER BY id",
+                (last_id, self.channel),
+            ).fetchall()
+            for message_id, payload in rows:
+                last_id = message_id
+                yield payload
+            if not rows:
+                self._sleep(self.poll_interval)
+
+
+class UnixSocketManager(PubSubManager):
+    """Unix 소켓 브로커(UnixSocketBroker)를 거쳐 프로세스 간에 메시지를 주고받는 매니저
+
+    메시지는 한 줄에 JSON 하나(newline-delimited)로 전송합니다.
+    구독 연결은 먼저 SUBSCRIBE_LINE을 보내고, 발행 연결은 메시지만 보냅니다 (브로커는 구독 연결에만 전달).
+    """
+
+    name = "unix"
+
+    def __init__(self, url: str, channel: str = "flask-socketio", write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = url[len("unix://"):] if url.startswith("unix://") else url
+        self._publish_sock = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        return sock
+
+    def _publish(self, data):
+        line = (json.dumps({"channel": self.channel, "data": data}) + "\n").encode("utf-8")
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publish_sock is None:
+                        self._publish_sock = self._connect()
+                    self._publish_sock.sendall(line)
+                    return
+                except OSError as e:
+                    if self._publish_sock is not None:
+                        self._publish_sock.close()
+                    self._publish_sock = None
+                    if attempt:
+                        self._get_logger().error(f"Socket.IO 큐 브로커로 전송 실패: {e}")
+
+    def _listen(self):
+        retry_sleep = 1
+        while True:
+            try:
+                sock = self._connect()
+                sock.sendall(SUBSCRIBE_LINE)
+                retry_sleep = 1
+                with sock, sock.makefile("rb") as reader:
+                    for line in reader:
+                        try:
+                            message = json.loads(line)
+                        except ValueError:
+                            continue
+                        if message.get("channel") == self.channel:
+                            yield message.get("data")
+            except OSError as e:
+                self._get_logger().error(f"Socket.IO 큐 브로커 연결 실패, {retry_sleep}초 후 재시도: {e}")
+            if self.server is not None:
+                self.server.sleep(retry_sleep)
+            else:
+                time.sleep(retry_sleep)
+            retry_sleep = min(retry_sleep * 2, 30)
+
+
+class _Subscriber:
+    """브로커 쪽 구독 연결 하나. 전용 큐와 쓰기 스레드를 둬 느린 구독자가 발행이나 다른 구독자를 막지 않게 함"""
+
+    def __init__(self, conn, buffer_size: int):
+        self.conn = conn
+        self.queue = queue.Queue(buffer_size)
+        self.closed = False
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def offer(self, line: bytes) -> bool:
+        """보낼 줄을 큐에 넣음. 큐가 차 있으면 False"""
+        try:
+            self.queue.put_nowait(line)
+            return True
+        except queue.Full:
+            return False
+
+    def _write_loop(self):
+        while True:
+            line = self.queue.get()
+            if line is None:
+                return
+            try:
+                self.conn.sendall(line)
+            except OSError:
+                self.close()
+                return
+
+    def close(self):
+        """연결을 끊음 (구독 쪽 UnixSocketManager는 다시 연결함)"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)  # 막혀 있는 sendall/readline도 깨움
+        except OSError:
+            pass
+        self.offer(None)
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        broker = self.server
+        first = self.rfile.readline()
+        if first.strip() == SUBSCRIBE_LINE.strip():
+            subscriber = _Subscriber(self.connection, broker.client_buffer)
+            broker.add_subscriber(subscriber)
+            try:
+                for _ in self.rfile:  # 구독 연결은 보내는 메시지가 없으므로 끊길 때까지 대기
+                    pass
+            finally:
+                broker.remove_subscriber(subscriber)
+            return
+        if first:
+            broker.broadcast(first)
+        for line in self.rfile:
+            broker.broadcast(line)
+
+
+class UnixSocketBroker(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """받은 줄을 구독 중인 모든 프로세스에 그대로 전달하는 최소 브로커
+
+    구독자마다 BROKER_CLIENT_BUFFER개까지 쌓아 두고 별도 스레드로 보내며, 못 따라오는 구독자는 연결을 끊습니다.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, client_buffer: int = BROKER_CLIENT_BUFFER):
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _BrokerHandler)
+        self.path = path
+        self.client_buffer = client_buffer
+        self.clients = set()
+        self.clients_lock = threading.Lock()
+
+    def add_subscriber(self, subscriber: _Subscriber):
+        with self.clients_lock:
+            self.clients.add(subscriber)
+
+    def remove_subscriber(self, subscriber: _Subscriber):
+        with self.clients_lock:
+            self.clients.discard(subscriber)
+        subscriber.close()
+
+    def broadcast(self, line: bytes):
+        with self.clients_lock:
+            clients = list(self.clients)
+        for subscriber in clients:
+            if not subscriber.offer(line):
+                logger.warning("Socket.IO 큐 구독자가 밀려 연결을 끊습니다", buffer=self.client_buffer)
+                self.remove_subscriber(subscriber)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def start_broker(path: str, client_buffer: int = BROKER_CLIENT_BUFFER):
+    """백그라운드 스레드로 브로커를 시작하고 서버 객체를 반환 (테스트/단일 프로세스용)"""
+    broker = UnixSocketBroker(path, client_buffer=client_buffer)
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    return broker
+
+
+def create_client_manager(url: str, channel: str = "flask-socketio", write_only: bool = False):
+    """SOCKETIO_MESSAGE_QUEUE URL에 맞는 로컬 매니저 (sqlite/unix가 아니면 None)"""
+    if url.startswith("sqlite://"):
+        return SQLiteManager(url, channel=channel, write_only=write_only)
+    if url.startswith("unix://"):
+        return UnixSocketManager(url, channel=channel, write_only=write_only)
+    return None
+
+
+def socketio_queue_options(url: str) -> dict:
+    """SocketIO(...)에 넘길 메시지 큐 옵션"""
+    if not url:
+        return {}
+    manager = create_client_manager(url)
+    if manager is not None:
+        return {"client_manager": manager}
+    return {"message_queue": url}  # redis://, amqp:// 등은 Flask-SocketIO 기본 매니저 사용
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO 로컬 메시지 큐 브로커")
+    sub = parser.add_subparsers(dest="command", required=True)
+    broker_parser = sub.add_parser("broker", help="Unix 소켓 브로커 실행")
+    broker_parser.add_argument("--path", default="/tmp/ncp_socketio.sock")
+    args = parser.parse_args()
+
+    if args.command == "broker":
+        broker = UnixSocketBroker(args.path)
+        print(f"📮 Socket.IO 큐 브로커 실행: unix://{args.path}")
+        try:
+            broker.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            broker.server_close()
+
+
+if __name__ == "__main__":
+    main()
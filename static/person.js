@@ -10,8 +10,13 @@ if (typeof io !== 'undefined') {
     console.log('Socket.IO connected immediately');
     isSocketConnected = true;
     
-    // 분석 세션 참여
-    socket.emit('join_analysis', { session_id: socket.id });
+    // 분석 세션 참여: 업로드 폼 토큰 room(진행 상황) + 결과 페이지면 백그라운드 AI 추천 room
+    const pendingAnalysisId = getPendingAnalysisId();
+    socket.emit('join_analysis', {
+      session_id: socket.id,
+      analysis_id: pendingAnalysisId,
+      progress_token: getProgressToken()
+    });
   });
   
   socket.on('disconnect', function() {
@@ -30,6 +35,12 @@ if (typeof io !== 'undefined') {
     console.log('LLM response:', data);
     updateLLMResponse(data);
   });
+  
+  // 점진적 모드: 백그라운드 AI 추천 완료 시 통계 기반 추천을 교체
+  socket.on('recommendation_update', function(data) {
+    console.log('Recommendation update:', data);
+    applyRecommendationUpdate(data);
+  });
 } else {
   console.log('Socket.IO not available');
 }
@@ -74,6 +85,9 @@ window.addEventListener("DOMContentLoaded", () => {
   
   // 이미지 갤러리 슬라이더
   initImageGallery();
+  
+  // 웹소켓이 없으면 AI 추천 결과를 폴링
+  initRecommendationPolling();
 });
 
 function initDropzone() {
@@ -311,6 +325,12 @@ function initProgressTracking() {
         simulateRealisticProgress(files);
       });
     }
+
+    // 브라우저 측 축소를 쓸 수 있으면 기본 제출 대신 줄인 이미지를 업로드
+    if (getResizeOptions(form).enabled) {
+      e.preventDefault();
+      submitUploadForm(form);
+    }
   });
 }
 
@@ -396,7 +416,32 @@ function showResultsWithAnimation() {
 }
 
 // LLM 스트리밍 응답 처리
+// LLM 스트리밍 섹션 -> 결과 화면 요소 ID
+const LLM_SECTION_TARGETS = {
+  male_recommendation: 'male-recommendation-content',
+  female_recommendation: 'female-recommendation-content',
+  male_reduction: 'male-reduction-content',
+  female_reduction: 'female-reduction-content'
+};
+
+// 업로드 화면(결과 영역 없음)에서 보여줄 섹션별 진행률 (서버 progress 값과 동일)
+const LLM_SECTION_PROGRESS = {
+  male_recommendation: 25,
+  female_recommendation: 75,
+  male_reduction: 80,
+  female_reduction: 85
+};
+
+// 섹션별 누적 본문과 렌더링 예약 상태
+const llmSectionBuffers = {};
+const llmSectionRenderPending = {};
+
 function updateLLMResponse(data) {
+  if (data.section && LLM_SECTION_TARGETS[data.section]) {
+    updateLLMSection(data);
+    return;
+  }
+  
   const { type, data: content, full_response } = data;
   
   console.log('LLM Response received:', { type, content, full_response });
@@ -420,6 +465,283 @@ function updateLLMResponse(data) {
   }
 }
 
+// 업로드 폼에 심어진 진행 상황 토큰 (없으면 null)
+function getProgressToken() {
+  const input = document.getElementById('progress-token');
+  return input && input.value ? input.value : null;
+}
+
+// 업로드 전 브라우저 측 이미지 축소 설정 (폼의 data-resize-max가 0이면 사용 안 함)
+function getResizeOptions(form) {
+  const maxDim = parseInt(form.dataset.resizeMax || '0', 10);
+  const quality = parseFloat(form.dataset.resizeQuality || '0.85');
+  const supported = typeof createImageBitmap === 'function' && typeof fetch === 'function';
+  return { enabled: supported && maxDim > 0, maxDim, quality };
+}
+
+// 이미지 한 장을 긴 변 maxDim 이하 JPEG으로 다시 인코딩 (작아지지 않거나 디코딩할 수 없으면 null)
+async function downscaleImage(file, maxDim, quality) {
+  let bitmap;
+  try {
+    // EXIF 회전을 반영해 디코딩 (다시 인코딩하면 EXIF가 사라지므로)
+    bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' });
+  } catch (e) {
+    return null;
+  }
+
+  const scale = Math.min(1, maxDim / Math.max(bitmap.width, bitmap.height));
+  if (scale === 1 && file.type === 'image/jpeg') {
+    bitmap.close();
+    return null;
+  }
+
+  const canvas = document.createElement('canvas');
+  canvas.width = Math.round(bitmap.width * scale);
+  canvas.height = Math.round(bitmap.height * scale);
+  const ctx = canvas.getContext('2d');
+  ctx.fillStyle = '#fff';  // 투명 PNG 배경을 흰색으로
+  ctx.fillRect(0, 0, canvas.width, canvas.height);
+  ctx.drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+  bitmap.close();
+
+  const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', quality));
+  if (!blob || blob.size >= file.size) return null;
+  return new File([blob], file.name.replace(/\.[^.]+$/, '') + '.jpg', { type: 'image/jpeg' });
+}
+
+// 서버가 응답했지만 분석 결과가 아닌 경우 (리다이렉트, 오류, HTML). 다시 업로드하지 않고 사용자에게 보여줌
+class UploadResponseError extends Error {
+  constructor(message, redirectUrl = null) {
+    super(message);
+    this.name = 'UploadResponseError';
+    this.redirectUrl = redirectUrl;
+  }
+}
+
+async function postForJson(url, formData) {
+  const response = await fetch(url, {
+    method: 'POST',
+    body: formData,
+    headers: { 'Accept': 'application/json' },
+    credentials: 'same-origin'
+  });
+  if (response.redirected) {
+    throw new UploadResponseError('', response.url);
+  }
+  const contentType = response.headers.get('Content-Type') || '';
+  if (!contentType.includes('application/json')) {
+    throw new UploadResponseError(`서버 응답을 처리할 수 없습니다. (HTTP ${response.status})`);
+  }
+  const data = await response.json();
+  if (!response.ok) {
+    throw new UploadResponseError(data.error || `업로드에 실패했습니다. (HTTP ${response.status})`);
+  }
+  return data;
+}
+
+// 업로드 오류를 flash 메시지로 표시하고 분석 버튼/진행 상황을 되돌림
+function showUploadError(message) {
+  const main = document.querySelector('main');
+  let flash = document.querySelector('.flash');
+  if (!flash && main) {
+    flash = document.createElement('div');
+    flash.className = 'flash';
+    main.prepend(flash);
+  }
+  if (flash) {
+    const item = document.createElement('div');
+    item.textContent = message;
+    flash.appendChild(item);
+  }
+
+  const progressContainer = document.getElementById('progress-container');
+  const analyzeBtn = document.getElementById('analyze-btn');
+  if (progressContainer) progressContainer.style.display = 'none';
+  if (analyzeBtn) {
+    analyzeBtn.disabled = false;
+    analyzeBtn.textContent = '영양정보 분석';
+  }
+  sessionStorage.removeItem('isFromAnalysis');
+}
+
+// 줄인 이미지를 업로드하고, 서버가 요청한 이미지(인식 불확실)만 원본을 다시 보낸 뒤 결과 페이지로 이동
+async function uploadWithClientResize(form, files) {
+  const options = getResizeOptions(form);
+  const progressToken = getProgressToken() || '';
+
+  const formData = new FormData();
+  formData.append('progress_token', progressToken);
+  for (let i = 0; i < files.length; i++) {
+    const resized = await downscaleImage(files[i], options.maxDim, options.quality);
+    const file = resized || files[i];
+    formData.append('images', file, file.name);
+    if (resized) {
+      formData.append('client_resized', String(i));
+      console.log(`Resized ${files[i].name}: ${files[i].size} -> ${resized.size} bytes`);
+    }
+  }
+
+  const data = await postForJson(form.action, formData);
+  let resultsUrl = data.results_url;
+
+  if (data.needs_original && data.needs_original.length > 0) {
+    console.log('Server requested originals:', data.needs_original);
+    const originals = new FormData();
+    originals.append('progress_token', progressToken);
+    data.needs_original.forEach(item => {
+      originals.append('index', String(item.index));
+      originals.append('images', files[item.position], files[item.position].name);
+    });
+    try {
+      resultsUrl = (await postForJson(data.originals_url, originals)).results_url;
+    } catch (error) {
+      // 원본 전송 실패: 줄인 이미지 결과로 추천까지 마무리
+      console.warn('Original upload failed, finalizing with resized images:', error);
+      const finalize = new FormData();
+      finalize.append('progress_token', progressToken);
+      try {
+        resultsUrl = (await postForJson(data.originals_url, finalize)).results_url;
+      } catch (e) {
+        console.warn('Finalize failed:', e);
+      }
+    }
+  }
+
+  window.location.href = resultsUrl;
+}
+
+// 업로드 폼 제출: 브라우저 축소를 쓸 수 있으면 fetch 업로드, 아니면 기본 폼 제출
+// 축소/네트워크 오류일 때만 기본 폼 제출(원본 전송)로 다시 시도하고, 서버 응답(리다이렉트/오류)은 그대로 보여줌
+function submitUploadForm(form) {
+  const files = Array.from(document.getElementById('images').files);
+  if (!getResizeOptions(form).enabled || files.length === 0) {
+    form.submit();
+    return;
+  }
+  uploadWithClientResize(form, files).catch(error => {
+    if (error instanceof UploadResponseError) {
+      console.warn('Upload rejected by server:', error);
+      if (error.redirectUrl) {
+        window.location.href = error.redirectUrl;
+      } else {
+        showUploadError(error.message);
+      }
+      return;
+    }
+    console.warn('Client-side resize upload failed, falling back to form submit:', error);
+    form.submit();
+  });
+}
+
+// 결과 페이지에서 AI 추천을 기다리는 분석 ID
+function getPendingAnalysisId() {
+  const results = window.analysisResults;
+  return results && results.recommendation_pending ? results.analysis_id : null;
+}
+
+// 섹션별 LLM 스트리밍 반영 (조각은 offset으로 순서/중복 확인 후 이어 붙임)
+function updateLLMSection(data) {
+  const { type, section, data: content } = data;
+  const element = document.getElementById(LLM_SECTION_TARGETS[section]);
+  
+  if (!element) {
+    // 결과 화면 전(업로드 진행 중)이면 진행 메시지로만 표시
+    if (type === 'responding') {
+      updateAnalysisStepRealtime('recommendation', LLM_SECTION_PROGRESS[section], content);
+    }
+    return;
+  }
+  
+  const buffer = llmSectionBuffers[section];
+  if (type === 'thinking' || type === 'connecting' || type === 'generating' || type === 'responding') {
+    // 아직 받은 본문이 없을 때만 타이핑 표시
+    if (buffer === undefined) {
+      element.innerHTML = createTypingIndicator(content);
+    }
+    return;
+  }
+  
+  if (type === 'snapshot') {
+    if (buffer === undefined || content.length > buffer.length) {
+      llmSectionBuffers[section] = content;
+    }
+  } else if (type === 'chunk') {
+    const current = buffer || '';
+    if (data.offset === current.length) {
+      llmSectionBuffers[section] = current + content;
+    } else {
+      return; // 이미 받은 조각(중복) 또는 누락 -> complete 이벤트에서 전체 본문으로 맞춤
+    }
+  } else if (type === 'complete') {
+    llmSectionBuffers[section] = content;
+    renderMarkdownContent(LLM_SECTION_TARGETS[section], content);
+    return;
+  } else if (type === 'error') {
+    console.error('LLM Error:', section, content);
+    return; // 통계 기반 추천을 그대로 유지
+  }
+  
+  scheduleSectionRender(section);
+}
+
+// 조각마다 마크다운을 다시 그리지 않도록 프레임당 한 번만 렌더링
+function scheduleSectionRender(section) {
+  if (llmSectionRenderPending[section]) return;
+  llmSectionRenderPending[section] = true;
+  
+  const schedule = window.requestAnimationFrame || (fn => setTimeout(fn, 16));
+  schedule(() => {
+    llmSectionRenderPending[section] = false;
+    renderMarkdownContent(LLM_SECTION_TARGETS[section], llmSectionBuffers[section]);
+  });
+}
+
+// 백그라운드에서 생성된 AI 추천으로 화면 갱신
+function applyRecommendationUpdate(data) {
+  if (!data || data.analysis_id !== getPendingAnalysisId() || data.status === 'pending') {
+    return;
+  }
+  
+  window.analysisResults.recommendation_pending = false;
+  
+  Object.keys(LLM_SECTION_TARGETS).forEach(key => {
+    if (data[key]) {
+      llmSectionBuffers[key] = data[key];
+      renderMarkdownContent(LLM_SECTION_TARGETS[key], data[key]);
+    }
+  });
+  
+  const pendingNotice = document.getElementById('recommendation-pending');
+  if (pendingNotice) {
+    pendingNotice.remove();
+  }
+}
+
+// 웹소켓 연결이 없을 때 저장된 추천 결과를 주기적으로 조회
+function initRecommendationPolling() {
+  const analysisId = getPendingAnalysisId();
+  if (!analysisId) return;
+  
+  const poll = () => {
+    if (!getPendingAnalysisId()) return;
+    if (isSocketConnected) {
+      setTimeout(poll, 5000);
+      return;
+    }
+    fetch(`/analysis/${analysisId}/recommendations`)
+      .then(res => res.ok ? res.json() : null)
+      .then(data => {
+        if (data && data.status !== 'pending') {
+          applyRecommendationUpdate(data);
+        } else {
+          setTimeout(poll, 3000);
+        }
+      })
+      .catch(() => setTimeout(poll, 5000));
+  };
+  setTimeout(poll, 3000);
+}
+
 // 타이핑 인디케이터 생성 (채팅 스타일)
 function createTypingIndicator(message) {
   return `
@@ -1021,6 +1343,13 @@ function handlePageRefresh() {
   
   if (hasResults) {
     console.log('Results found on page load');
+
+    // 저장된 결과 페이지(/results/<id>)는 새로고침/공유해도 다시 분석하지 않으므로 그대로 표시
+    if (window.location.pathname.startsWith('/results/')) {
+      console.log('Persisted results page');
+      sessionStorage.removeItem('isFromAnalysis');
+      return;
+    }
     
     // 세션 스토리지를 사용한 새로고침 감지
     const pageLoadTime = Date.now();
@@ -1147,7 +1476,7 @@ function initAnalysisConfirmation() {
       
       // 폼 제출 (분석 시작)
       if (form) {
-        form.submit();
+        submitUploadForm(form);
       }
     });
   }
@@ -0,0 +1,79 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# 영양정보 표 영역 찾기
+# - 영양정보 표는 항목마다 가로 구분선이 반복되므로, 축소한 흑백 이미지에서 긴 가로 경계선이
+#   일정한 간격으로 모여 있는 구간을 표로 봅니다 (OpenCV 없이 numpy 연산만 사용).
+# - 찾은 영역만 PaddleOCR에 넣어 포장 그림/원재료 문구까지 검출·인식하는 비용을 줄입니다.
+
+TABLE_CROP = os.environ.get("NCP_OCR_TABLE_CROP", "0") == "1"
+DETECT_MAX_DIM = 800  # 영역 탐지용 축소본의 긴 변(px)
+EDGE_THRESHOLD = 40  # 세로 방향 밝기 차이가 이 이상이면 가로 경계로 봄
+LINE_MIN_RATIO = 0.3  # 가로선으로 볼 최소 길이 (축소본 너비 대비)
+MIN_LINES = 3  # 표로 볼 최소 가로선 수
+MAX_GAP_RATIO = 0.2  # 같은 표로 묶을 가로선 간 최대 간격 (축소본 높이 대비)
+MAX_AREA_RATIO = 0.85  # 영역이 이보다 크면 전체 이미지와 차이가 없으므로 자르지 않음
+
+Region = Tuple[int, int, int, int]
+
+
+def _horizontal_lines(gray: np.ndarray):
+    """긴 가로 경계선 목록 [(y, x_start, x_end)] (두꺼운 선의 인접 행은 하나로 합침)"""
+    edges = np.abs(np.diff(gray, axis=0)) >= EDGE_THRESHOLD
+    height, width = edges.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = edges
+    steps = np.diff(padded, axis=1)
+    start_rows, start_cols = np.nonzero(steps == 1)
+    _, end_cols = np.nonzero(steps == -1)  # 행 우선 순서라 시작/끝이 짝을 이룸
+    long_runs = (end_cols - start_cols) >= LINE_MIN_RATIO * width
+
+    lines = []
+    for y, x0, x1 in zip(start_rows[long_runs], start_cols[long_runs], end_cols[long_runs]):
+        if lines and y - lines[-1][0] <= 2:
+            last_y, last_x0, last_x1 = lines[-1]
+            lines[-1] = (int(y), min(last_x0, int(x0)), max(last_x1, int(x1)))
+        else:
+            lines.append((int(y), int(x0), int(x1)))
+    return lines
+
+
+def find_table_region(image: Image.Image) -> Optional[Region]:
+    """원본 좌표계의 표 영역 (left, top, right, bottom). 못 찾거나 거의 전체면 None"""
+    source = image if image.mode in ("L", "RGB", "RGBA") else image.convert("RGB")
+    factor = max(1, max(image.size) // DETECT_MAX_DIM)
+    small = (source.reduce(factor) if factor > 1 else source).convert("L")  # 정수배 축소 (thumbnail보다 빠름)
+    gray = np.asarray(small, dtype=np.int16)
+    height, width = gray.shape
+    lines = _horizontal_lines(gray)
+    if len(lines) < MIN_LINES:
+        return None
+
+    # 간격이 MAX_GAP_RATIO 이내로 이어지는 가로선 묶음 중 선이 가장 많은 것
+    groups, current = [], [lines[0]]
+    for line in lines[1:]:
+        if line[0] - current[-1][0] <= MAX_GAP_RATIO * height:
+            current.append(line)
+        else:
+            groups.append(current)
+            current = [line]
+    groups.append(current)
+    group = max(groups, key=len)
+    if len(group) < MIN_LINES:
+        return None
+
+    # 첫 선 위의 제목(영양정보, 총 내용량/열량) 줄까지 포함하도록 선 간격 중앙값만큼 여유를 둠
+    spacing = float(np.median(np.diff([y for y, _, _ in group])))
+    margin = max(2.0, 0.02 * width)
+    left = max(0.0, min(x0 for _, x0, _ in group) - margin)
+    right = min(float(width), max(x1 for _, _, x1 in group) + margin)
+    top = max(0.0, group[0][0] - spacing - margin)
+    bottom = min(float(height), group[-1][0] + spacing + margin)
+    if (right - left) * (bottom - top) > MAX_AREA_RATIO * width * height:
+        return None
+
+    scale_x, scale_y = image.width / width, image.height / height
+    return (int(left * scale_x), int(top * scale_y), int(np.ceil(right * scale_x)), int(np.ceil(bottom * scale_y)))
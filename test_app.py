@@ -0,0 +1,730 @@
+"""
+Flask 앱 유닛 테스트
+
+OCR/LLM 호출을 Mock으로 대체하고 app.py의 업로드 파이프라인을 테스트합니다.
+"""
+
+import io
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+import zipfile
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+import app as app_module
+import llm_client
+import metrics
+from result_store import ResultStore
+from image_hash import PhashIndex
+from test_image_hash import label_image, nutrition_label, encode
+from upload_store import UploadStore
+import thumbnails
+
+SAMPLE_OCR_JSON = {
+    "images": [{
+        "fields": [
+            {"inferText": "열량 500kcal"},
+            {"inferText": "나트륨 4000mg"},
+            {"inferText": "단백질 10g"},
+        ]
+    }]
+}
+
+
+class AppTestCase(unittest.TestCase):
+    """OCR을 Mock으로 대체한 테스트 클라이언트 공통 설정"""
+
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.db_dir = tempfile.mkdtemp()
+        patchers = [
+            patch.object(app_module, 'upload_store', UploadStore(self.upload_dir)),
+            patch.object(app_module, 'result_store', ResultStore(os.path.join(self.db_dir, 'results.sqlite3'))),
+            patch.object(app_module, 'ncp_ocr', return_value=SAMPLE_OCR_JSON),
+            patch.object(app_module, 'ocr_routing', return_value='ncp'),
+            patch.object(app_module, 'phash_index', PhashIndex()),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.upload_dir, ignore_errors=True)
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def upload(self, *names, path='/upload', **extra):
+        data = {'images': [(io.BytesIO(b'fake-image-bytes'), name) for name in names]}
+        data.update(extra)
+        # /upload는 저장된 결과 페이지(/results/<id>)로 리다이렉트
+        return self.client.post(path, data=data, content_type='multipart/form-data', follow_redirects=True)
+
+    @staticmethod
+    def analysis_id_from(html: str) -> str:
+        return html.split('analysis_id: "')[1].split('"')[0]
+
+
+class TestProgressiveRecommendation(AppTestCase):
+    """점진적 모드 테스트"""
+
+    @patch('llm_client.llm_client')
+    def test_renders_statistics_then_upgrades(self, mock_llm_client):
+        """통계 기반 추천으로 즉시 렌더링 후 백그라운드에서 AI 추천으로 교체"""
+        mock_llm_client.execute_streaming.return_value = "AI 맞춤 분석 결과"
+
+        # 백그라운드 작업을 붙잡아 두고 통계 기반 결과 페이지가 먼저 렌더링되는지 확인
+        with patch.object(app_module.socketio, 'start_background_task') as mock_start:
+            response = self.upload('label.png')
+        html = response.data.decode('utf-8')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('recommendation-pending', html)
+
+        analysis_id = self.analysis_id_from(html)
+        data = self.client.get(f'/analysis/{analysis_id}/recommendations').get_json()
+        self.assertEqual(data['status'], 'pending')
+
+        target, *args = mock_start.call_args.args
+        target(*args)
+        data = self.client.get(f'/analysis/{analysis_id}/recommendations').get_json()
+        self.assertEqual(data['status'], 'complete')
+        self.assertEqual(data['male_recommendation'], "AI 맞춤 분석 결과")
+        self.assertEqual(data['female_reduction'], "AI 맞춤 분석 결과")
+
+        # 추천이 갱신되면 캐시된 결과 페이지도 다시 렌더링됨
+        html = self.client.get(f'/results/{analysis_id}').data.decode('utf-8')
+        self.assertNotIn('id="recommendation-pending"', html)
+        self.assertIn('AI \\ub9de\\ucda4', html)
+
+    @patch('llm_client.llm_client')
+    def test_update_emit_failure_logged(self, mock_llm_client):
+        """추천 갱신 이벤트 전송이 실패해도 저장된 결과는 갱신되고 분석 ID와 함께 경고를 남김"""
+        mock_llm_client.execute_streaming.return_value = "AI 맞춤 분석 결과"
+        with patch.object(app_module.socketio, 'start_background_task') as mock_start:
+            analysis_id = self.analysis_id_from(self.upload('label.png').data.decode('utf-8'))
+        target, *args = mock_start.call_args.args
+
+        def emit(event, *_, **__):
+            if event == 'recommendation_update':
+                raise ConnectionError("broker down")
+
+        with patch.object(app_module.socketio, 'emit', side_effect=emit), self.assertLogs('ncp.app', 'WARNING') as logs:
+            target(*args)
+
+        record = next(r for r in logs.records if r.getMessage() == "추천 갱신 이벤트 전송 실패")
+        self.assertEqual(record.fields['analysis_id'], analysis_id)
+        data = self.client.get(f'/analysis/{analysis_id}/recommendations').get_json()
+        self.assertEqual(data['status'], 'complete')
+
+    def test_without_llm_renders_synchronously(self):
+        """LLM이 없으면 기존처럼 완성된 결과를 렌더링"""
+        with patch.object(llm_client, 'llm_client', None):
+            response = self.upload('label.png')
+        html = response.data.decode('utf-8')
+
+        self.assertNotIn('id="recommendation-pending"', html)
+        analysis_id = self.analysis_id_from(html)
+        data = self.client.get(f'/analysis/{analysis_id}/recommendations').get_json()
+        self.assertEqual(data['status'], 'complete')
+
+    def test_unknown_analysis_id(self):
+        """없는 분석 ID 조회 시 404"""
+        response = self.client.get('/analysis/unknown/recommendations')
+        self.assertEqual(response.status_code, 404)
+
+
+class TestRecommendationStreaming(AppTestCase):
+    """섹션별 LLM 스트리밍 중계 테스트"""
+
+    @patch('llm_client.llm_client')
+    def test_background_streams_sections_to_analysis_room(self, mock_llm_client):
+        mock_llm_client.execute_streaming.return_value = "AI 결과"
+        with patch.object(app_module.socketio, 'emit'):
+            html = self.upload('label.png').data.decode('utf-8')
+            analysis_id = self.analysis_id_from(html)
+            for _ in range(50):
+                if mock_llm_client.execute_streaming.call_count >= 4:
+                    break
+                time.sleep(0.05)
+
+        calls = mock_llm_client.execute_streaming.call_args_list
+        sections = [c.args[3] for c in calls]
+        self.assertEqual(sections, ['male_recommendation', 'female_recommendation', 'male_reduction', 'female_reduction'])
+        self.assertTrue(all(c.args[2] == analysis_id for c in calls))
+
+    def test_stream_snapshot_accumulates(self):
+        """늦게 참여한 클라이언트용 섹션별 누적 본문"""
+        stream = app_module.RecommendationStream()
+        with patch.object(app_module.socketio, 'emit') as mock_emit:
+            stream.emit('llm_response', {'data': '안녕', 'type': 'chunk', 'offset': 0, 'section': 'male_reduction'}, room='r')
+            stream.emit('llm_response', {'data': '하세요', 'type': 'chunk', 'offset': 2, 'section': 'male_reduction'}, room='r')
+            stream.emit('llm_response', {'data': '...', 'type': 'thinking', 'section': 'female_reduction'}, room='r')
+        self.assertEqual(stream.snapshot(), {'male_reduction': '안녕하세요'})
+        self.assertEqual(mock_emit.call_count, 3)
+
+    def test_late_join_on_other_worker_gets_stored_snapshot(self):
+        """다른 워커에서 생성 중인 추천도 result_store에 저장된 누적 본문으로 이어 받음"""
+        analysis_id = 'b' * 32
+        app_module.result_store.save(analysis_id, {'recommendation_status': 'pending'})
+        stream = app_module.RecommendationStream(analysis_id, app_module.result_store)  # 생성 중인 워커
+        with patch.object(app_module.socketio, 'emit'):
+            stream.emit('llm_response', {'data': '나트륨을', 'type': 'chunk', 'offset': 0, 'section': 'male_reduction'},
+                        room=analysis_id)
+
+        client = app_module.socketio.test_client(app_module.app)  # analysis_streams에 없는 워커
+        self.addCleanup(client.disconnect)
+        client.emit('join_analysis', {'analysis_id': analysis_id})
+        snapshots = [event['args'][0] for event in client.get_received() if event['name'] == 'llm_response']
+        self.assertEqual(snapshots, [{'data': '나트륨을', 'type': 'snapshot', 'section': 'male_reduction'}])
+
+    def test_stream_store_write_failure_keeps_streaming(self):
+        store = MagicMock()
+        store.set_partial.side_effect = sqlite3.OperationalError('database is locked')
+        stream = app_module.RecommendationStream('c' * 32, store)
+        with patch.object(app_module.socketio, 'emit') as mock_emit, self.assertLogs('ncp.app', 'WARNING'):
+            stream.emit('llm_response', {'data': '안녕', 'type': 'chunk', 'offset': 0, 'section': 'male_reduction'}, room='r')
+        mock_emit.assert_called_once()
+        self.assertEqual(stream.snapshot(), {'male_reduction': '안녕'})
+
+
+class TestProgressRoom(AppTestCase):
+    """analysis_progress room 지정 테스트"""
+
+    @patch('llm_client.llm_client', None)
+    def test_progress_only_to_submitting_client(self):
+        token = 'a' * 32
+        with patch.object(app_module.socketio, 'emit') as mock_emit:
+            self.upload('label.png', progress_token=token)
+        progress_calls = [c for c in mock_emit.call_args_list if c.args[0] == 'analysis_progress']
+        self.assertTrue(progress_calls)
+        self.assertTrue(all(c.kwargs.get('room') == token for c in progress_calls))
+        self.assertEqual(progress_calls[-1].args[1]['step'], 'complete')
+
+    @patch('llm_client.llm_client', None)
+    def test_no_token_no_broadcast(self):
+        with patch.object(app_module.socketio, 'emit') as mock_emit:
+            self.upload('label.png')
+        self.assertFalse([c for c in mock_emit.call_args_list if c.args[0] == 'analysis_progress'])
+
+    def test_index_renders_token(self):
+        html = self.client.get('/').data.decode('utf-8')
+        self.assertIn('name="progress_token"', html)
+
+
+class TestJsonApi(AppTestCase):
+    """/api/analyze JSON API 테스트"""
+
+    @patch('llm_client.llm_client', None)
+    def test_full_schema(self):
+        response = self.upload('label.png', path='/api/analyze')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(set(data), set(app_module.API_FIELDS))
+        self.assertEqual(data['images'][0]['status'], 'success')
+        self.assertIn('ocr_texts', data['images'][0])
+        self.assertIn('male', data['percentages'])
+        self.assertEqual(data['recommendations']['status'], 'complete')
+        self.assertTrue(data['recommendations']['male_recommendation'])
+
+    @patch('llm_client.llm_client')
+    def test_field_selection_skips_llm(self, mock_llm_client):
+        """추천을 제외하면 LLM을 호출하지 않고, 이미지 하위 필드도 제외 가능"""
+        response = self.upload('label.png', path='/api/analyze?exclude=ocr_texts,recommendations,image_url')
+        data = response.get_json()
+        self.assertNotIn('recommendations', data)
+        self.assertNotIn('ocr_texts', data['images'][0])
+        self.assertNotIn('image_url', data['images'][0])
+        mock_llm_client.execute_streaming.assert_not_called()
+
+        data = self.upload('label.png', path='/api/analyze', fields='totals').get_json()
+        self.assertEqual(list(data), ['totals'])
+        mock_llm_client.execute_streaming.assert_not_called()
+
+    @patch('llm_client.llm_client', None)
+    def test_unsaved_result_has_no_id(self):
+        """추천을 생략한 결과는 저장하지 않으므로 analysis_id도 반환하지 않음"""
+        data = self.upload('label.png', path='/api/analyze', recommendations='none').get_json()
+        self.assertNotIn('analysis_id', data)
+        self.assertIn('totals', data)
+
+        analysis_id = self.upload('label.png', path='/api/analyze').get_json()['analysis_id']
+        self.assertIsNotNone(app_module.result_store.get(analysis_id))
+
+    @patch('llm_client.llm_client')
+    def test_sync_recommendations(self, mock_llm_client):
+        mock_llm_client.execute_streaming.return_value = "AI 결과"
+        data = self.upload('label.png', path='/api/analyze', recommendations='sync').get_json()
+        self.assertEqual(data['recommendations']['status'], 'complete')
+        self.assertEqual(data['recommendations']['male_recommendation'], "AI 결과")
+
+    def test_errors(self):
+        response = self.upload('notes.txt', path='/api/analyze')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['unsupported_files'], ['notes.txt'])
+        response = self.upload('label.png', path='/api/analyze', recommendations='later')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestZipApi(AppTestCase):
+    """/api/analyze-zip NDJSON 스트리밍 테스트"""
+
+    def post_zip(self, members, **extra):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            for name, content in members:
+                zf.writestr(name, content)
+        buf.seek(0)
+        data = {'archive': (buf, 'labels.zip')}
+        data.update(extra)
+        response = self.client.post('/api/analyze-zip', data=data, content_type='multipart/form-data')
+        return response, [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+
+    def test_streams_image_lines_then_summary(self):
+        members = [(f'labels/{i}.jpg', b'fake-image-bytes') for i in range(7)]
+        members += [('labels/readme.txt', b'text'), ('__MACOSX/labels/._0.jpg', b'meta')]
+        response, lines = self.post_zip(members, exclude='ocr_texts')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        images, summary = lines[:-1], lines[-1]
+        self.assertEqual(len(images), 8)  # __MACOSX 항목은 줄도 만들지 않음
+        self.assertEqual(sorted(line['index'] for line in images), list(range(8)))
+        skipped = [line for line in images if line['status'] == 'skipped']
+        self.assertEqual([line['filename'] for line in skipped], ['readme.txt'])
+        self.assertTrue(all('ocr_texts' not in line for line in images))
+
+        self.assertEqual(summary['type'], 'summary')
+        self.assertEqual((summary['success'], summary['pass'], summary['skipped']), (7, 0, 1))
+        self.assertEqual(summary['totals']['calories_kcal'], 3500)
+        self.assertEqual(summary['percentages']['male']['sodium_mg'], 100.0)
+        self.assertEqual(app_module.ncp_ocr.call_count, 7)
+
+    def test_ocr_failure_and_limits(self):
+        app_module.ncp_ocr.side_effect = [SAMPLE_OCR_JSON, RuntimeError("OCR 실패")]
+        with patch.object(app_module, 'ZIP_MAX_IMAGES', 2), patch.object(app_module, 'ZIP_CONCURRENCY', 1):
+            _, lines = self.post_zip([(f'{i}.png', b'img') for i in range(3)])
+        by_index = {line['index']: line for line in lines[:-1]}
+        self.assertEqual(by_index[0]['status'], 'success')
+        self.assertEqual(by_index[1]['status'], 'pass')
+        self.assertEqual(by_index[2]['status'], 'skipped')
+        self.assertEqual((lines[-1]['success'], lines[-1]['pass'], lines[-1]['skipped']), (1, 1, 1))
+
+    def test_unreadable_members_skipped(self):
+        """CRC 오류/암호화된 멤버는 건너뛴 줄을 내보내고 나머지와 합계 줄은 계속 씀"""
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            zf.writestr('corrupt.jpg', b'corrupt-image-bytes')
+            zf.writestr('encrypted.jpg', b'encrypted-bytes')
+            zf.writestr('ok.jpg', b'fake-image-bytes')
+        archive = bytearray(buf.getvalue().replace(b'corrupt-image-bytes', b'CORRUPT-image-bytes'))
+        # encrypted.jpg의 로컬 헤더(파일명 앞 30바이트)와 중앙 디렉터리 헤더(파일명 앞 46바이트)에 암호화 플래그 설정
+        local = archive.index(b'encrypted.jpg') - 30
+        central = archive.index(b'encrypted.jpg', local + 31) - 46
+        archive[local + 6] |= 0x1
+        archive[central + 8] |= 0x1
+        response = self.client.post('/api/analyze-zip', data={'archive': (io.BytesIO(bytes(archive)), 'labels.zip')},
+                                    content_type='multipart/form-data')
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+
+        by_name = {line['filename']: line for line in lines[:-1]}
+        self.assertEqual(by_name['corrupt.jpg']['status'], 'skipped')
+        self.assertIn('압축 해제 실패', by_name['corrupt.jpg']['error'])
+        self.assertEqual(by_name['encrypted.jpg']['status'], 'skipped')
+        self.assertEqual(by_name['ok.jpg']['status'], 'success')
+        self.assertEqual(lines[-1]['type'], 'summary')
+        self.assertEqual((lines[-1]['success'], lines[-1]['skipped']), (1, 2))
+        self.assertEqual(app_module.ncp_ocr.call_count, 1)
+
+    def test_bad_archive(self):
+        response = self.client.post('/api/analyze-zip', data={'archive': (io.BytesIO(b'not a zip'), 'x.zip')},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/analyze-zip', data={}, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestUploadedImages(AppTestCase):
+    """업로드 이미지 섬네일/캐시 헤더 테스트"""
+
+    def upload_png(self):
+        buf = io.BytesIO()
+        Image.new('RGB', (1600, 1200), 'white').save(buf, 'PNG')
+        response = self.client.post('/api/analyze', data={'images': [(io.BytesIO(buf.getvalue()), 'label.png')],
+                                                          'recommendations': 'none'},
+                                    content_type='multipart/form-data')
+        return response.get_json()['images'][0]
+
+    def test_thumbnail_created_on_upload(self):
+        image = self.upload_png()
+        upload_id, filename = image['image_url'].split('/')[-2:]
+        self.assertTrue(os.path.exists(os.path.join(self.upload_dir, upload_id, filename + thumbnails.THUMBNAIL_SUFFIX)))
+
+        response = self.client.get(image['thumbnail_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, thumbnails.THUMBNAIL_MIMETYPE)
+        self.assertEqual(max(Image.open(io.BytesIO(response.data)).size), thumbnails.THUMBNAIL_SIZE)
+        self.assertTrue(response.cache_control.private)
+        self.assertEqual(response.cache_control.max_age, app_module.UPLOAD_CACHE_MAX_AGE)
+
+        etag = response.headers['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        response = self.client.get(image['thumbnail_url'], headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(image['image_url'])
+        self.assertEqual(response.mimetype, 'image/png')
+        self.assertIn('ETag', response.headers)
+
+    def test_non_image_falls_back_to_original(self):
+        image = self.upload('label.png', path='/api/analyze', recommendations='none').get_json()['images'][0]
+        response = self.client.get(image['thumbnail_url'])
+        self.assertEqual(response.data, b'fake-image-bytes')
+        upload_id = image['image_url'].split('/')[-2]
+        self.assertEqual(self.client.get(f'/uploaded_image/{upload_id}/..').status_code, 404)
+        self.assertEqual(self.client.get('/uploaded_image/.trash/x.png').status_code, 404)
+        self.assertEqual(self.client.get(f'/uploaded_image/{upload_id}/missing.png/thumbnail').status_code, 404)
+
+    def test_accel_redirect(self):
+        image = self.upload_png()
+        upload_id, filename = image['image_url'].split('/')[-2:]
+        with patch.object(app_module, 'UPLOAD_ACCEL_REDIRECT', '/_uploads/'):
+            response = self.client.get(image['thumbnail_url'])
+        self.assertEqual(response.headers['X-Accel-Redirect'],
+                         f'/_uploads/{upload_id}/{filename}{thumbnails.THUMBNAIL_SUFFIX}')
+        self.assertEqual(response.data, b'')
+
+
+class TestSessionUploads(AppTestCase):
+    """세션별 업로드 디렉터리/초기화 테스트"""
+
+    def session_dirs(self):
+        return sorted(name for name in os.listdir(self.upload_dir) if not name.startswith('.'))
+
+    @patch('llm_client.llm_client', None)
+    def test_reset_discards_only_own_session(self):
+        other = app_module.app.test_client()
+        with patch.object(app_module.upload_store, 'retain'):  # 결과가 가리키는 디렉터리는 남음 (test_images_outlive_upload_ttl)
+            self.upload('a.png')
+            self.upload('b.png')
+            other.post('/upload', data={'images': [(io.BytesIO(b'x'), 'c.png')]}, content_type='multipart/form-data')
+        dirs = self.session_dirs()
+        self.assertEqual(len(dirs), 2)  # 같은 세션의 업로드는 한 디렉터리
+
+        with self.client.session_transaction() as sess:
+            own = sess['upload_id']
+        self.client.post('/reset')
+        self.assertEqual(self.session_dirs(), [d for d in dirs if d != own])
+
+        # 휴지통은 스위퍼가 비움
+        app_module.upload_store.sweep()
+        self.assertEqual(os.listdir(os.path.join(self.upload_dir, '.trash')), [])
+
+
+class TestResultsPage(AppTestCase):
+    """저장된 결과 페이지(/results/<id>) 테스트"""
+
+    @staticmethod
+    def progress_token_from(html: str) -> str:
+        return html.split('id="progress-token" value="')[1].split('"')[0]
+
+    @patch('llm_client.llm_client', None)
+    def test_redirect_and_cached_views(self):
+        response = self.client.post('/upload', data={'images': [(io.BytesIO(b'img'), 'label.png')]},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 303)
+        path = response.headers['Location']
+        self.assertTrue(path.startswith('/results/'))
+
+        hits = metrics.RESULT_PAGE_VIEWS.labels('hit').get()
+        first = self.client.get(path).data.decode('utf-8')
+        second = self.client.get(path).data.decode('utf-8')
+        self.assertEqual(metrics.RESULT_PAGE_VIEWS.labels('hit').get(), hits + 1)
+        self.assertEqual(app_module.ncp_ocr.call_count, 1)  # 다시 보기는 재분석하지 않음
+
+        # 캐시된 HTML이어도 progress_token은 응답마다 새로 발급
+        self.assertNotEqual(self.progress_token_from(first), self.progress_token_from(second))
+        self.assertEqual(first.replace(self.progress_token_from(first), ''),
+                         second.replace(self.progress_token_from(second), ''))
+
+        # 공유 링크: 다른 브라우저에서도 같은 결과
+        other = app_module.app.test_client().get(path)
+        self.assertIn(self.analysis_id_from(first), other.data.decode('utf-8'))
+
+    @patch('llm_client.llm_client', None)
+    def test_flash_messages_not_cached(self):
+        app_module.ncp_ocr.side_effect = RuntimeError("OCR 실패")
+        html = self.upload('label.png').data.decode('utf-8')
+        self.assertIn('OCR 중 오류', html)
+        again = self.client.get(f'/results/{self.analysis_id_from(html)}').data.decode('utf-8')
+        self.assertNotIn('OCR 중 오류', again)
+
+    @patch('llm_client.llm_client', None)
+    def test_images_outlive_upload_ttl(self):
+        """저장된 결과가 가리키는 업로드 이미지는 UPLOAD_TTL이 지나거나 초기화해도 결과 보관 기간까지 남음"""
+        html = self.upload('label.png').data.decode('utf-8')
+        image_url = html.split('class="thumbnail-image"')[0].rsplit('src="', 1)[1].split('"')[0]
+        self.client.post('/reset')
+        app_module.upload_store.sweep(now=time.time() + app_module.upload_store.ttl + 60)
+
+        self.assertEqual(self.client.get(image_url).status_code, 200)
+        page = self.client.get(f'/results/{self.analysis_id_from(html)}').data.decode('utf-8')
+        self.assertIn(image_url, page)
+        app_module.upload_store.sweep(now=time.time() + app_module.result_store.ttl + 60)
+        self.assertEqual(self.client.get(image_url).status_code, 404)
+
+    def test_unknown_result(self):
+        response = self.client.get('/results/unknown', follow_redirects=True)
+        self.assertIn('분석 결과를 찾을 수 없습니다', response.data.decode('utf-8'))
+
+
+class TestClientResizedUpload(AppTestCase):
+    """브라우저에서 줄여 보낸 이미지와 원본 재요청 흐름 테스트"""
+
+    LOW_CONFIDENCE_OCR = {"images": [{"fields": [
+        {"inferText": "열량 500kcal", "inferConfidence": 0.42},
+        {"inferText": "나트륨 4000mg", "inferConfidence": 0.51},
+    ]}]}
+
+    def post_resized(self, *names, resized=('0',)):
+        data = {'images': [(io.BytesIO(b'small'), name) for name in names], 'client_resized': list(resized)}
+        return self.client.post('/upload', data=data, content_type='multipart/form-data',
+                                headers={'Accept': 'application/json'})
+
+    def test_rejected_upload_returns_json_error(self):
+        """fetch 업로드의 오류는 리다이렉트/HTML 대신 JSON으로 응답 (브라우저가 원본으로 다시 올리지 않도록)"""
+        response = self.post_resized('notes.txt')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('지원되는 형식이 없습니다', response.get_json()['error'])
+        app_module.ncp_ocr.assert_not_called()
+
+        # 폼 제출은 기존처럼 flash 후 첫 화면으로
+        response = self.client.post('/upload', data={'images': [(io.BytesIO(b'x'), 'notes.txt')]},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 302)
+
+    @patch('llm_client.llm_client')
+    def test_low_confidence_requests_original(self, mock_llm_client):
+        mock_llm_client.execute_streaming.return_value = "AI 결과"
+        app_module.ncp_ocr.side_effect = [self.LOW_CONFIDENCE_OCR, SAMPLE_OCR_JSON, SAMPLE_OCR_JSON]
+        data = self.post_resized('a.jpg', 'b.jpg', resized=('0',)).get_json()
+
+        # 줄여 보낸 첫 번째 이미지만 원본 요청, 추천 생성은 미룸
+        self.assertEqual(data['needs_original'], [{'index': 0, 'position': 0, 'filename': 'a.jpg'}])
+        first = app_module.result_store.get(data['analysis_id'])
+        self.assertEqual(first['recommendation_status'], 'deferred')
+        self.assertEqual(first['images'][0]['ocr_confidence'], 0.465)
+        mock_llm_client.execute_streaming.assert_not_called()
+
+        response = self.client.post(data['originals_url'], data={
+            'index': ['0'], 'images': [(io.BytesIO(b'original'), 'a.jpg')],
+        }, content_type='multipart/form-data', headers={'Accept': 'application/json'})
+        final = response.get_json()
+        self.assertNotEqual(final['analysis_id'], data['analysis_id'])
+        self.assertEqual(app_module.ncp_ocr.call_args.args[0], b'original')
+
+        stored = app_module.result_store.get(final['analysis_id'])
+        self.assertEqual(len(stored['images']), 2)
+        self.assertNotIn('needs_original', stored['images'][0])
+        self.assertIn(stored['recommendation_status'], ('pending', 'complete'))
+        self.assertEqual(stored['totals']['calories_kcal'], 1000)
+
+    @patch('llm_client.llm_client', None)
+    def test_confident_resized_image_is_final(self):
+        data = self.post_resized('a.jpg').get_json()
+        self.assertEqual(data['needs_original'], [])
+        stored = app_module.result_store.get(data['analysis_id'])
+        self.assertEqual(stored['recommendation_status'], 'complete')
+
+        # 기본 폼 제출(HTML)은 원본을 요청하지 않고 결과 페이지로 이동
+        app_module.ncp_ocr.return_value = self.LOW_CONFIDENCE_OCR
+        response = self.client.post('/upload', data={'images': [(io.BytesIO(b'small'), 'a.jpg')], 'client_resized': '0'},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 303)
+
+    @patch('llm_client.llm_client', None)
+    def test_finalize_without_originals_and_errors(self):
+        app_module.ncp_ocr.return_value = self.LOW_CONFIDENCE_OCR
+        data = self.post_resized('a.jpg').get_json()
+        self.assertEqual(len(data['needs_original']), 1)
+
+        response = self.client.post(data['originals_url'], data={'index': ['5'], 'images': [(io.BytesIO(b'x'), 'a.jpg')]},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/results/unknown/originals').status_code, 404)
+
+        final = self.client.post(data['originals_url']).get_json()
+        stored = app_module.result_store.get(final['analysis_id'])
+        self.assertEqual(stored['recommendation_status'], 'complete')
+
+
+class TestMetricsEndpoint(AppTestCase):
+    """/metrics 엔드포인트 테스트"""
+
+    @patch('llm_client.llm_client', None)
+    def test_metrics_after_upload(self):
+        before = metrics.UPLOAD_BYTES._default.snapshot()[1]
+        self.upload('label.png')
+
+        response = self.client.get('/metrics')
+        text = response.data.decode('utf-8')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertEqual(metrics.UPLOAD_BYTES._default.snapshot()[1], before + 1)
+        self.assertIn('ncp_parse_seconds_count', text)
+        self.assertIn('ncp_statistical_fallback_total{kind="comprehensive",reason="no_client"}', text)
+        self.assertIn('ncp_analyses_in_flight{stage="upload"} 0', text)
+        self.assertIn('ncp_cache_hits_total{cache="render_line"}', text)
+
+
+class TestPaddleBatch(AppTestCase):
+    """네이버 OCR을 쓰지 않을 때 업로드 이미지를 PaddleOCR 배치로 인식하는지 테스트"""
+
+    @patch('llm_client.llm_client', None)
+    def test_batch_when_routing_to_paddle(self):
+        app_module.ocr_routing.return_value = 'paddle'
+        with patch.object(app_module, 'paddle_ocr_batch', return_value=[SAMPLE_OCR_JSON, SAMPLE_OCR_JSON]) as batch:
+            response = self.upload('a.png', 'b.png', path='/api/analyze')
+        data = response.get_json()
+        batch.assert_called_once()
+        self.assertEqual([name for _, name in batch.call_args.args[0]], ['a.png', 'b.png'])
+        app_module.ncp_ocr.assert_not_called()
+        self.assertEqual([image['status'] for image in data['images']], ['success', 'success'])
+
+    @patch('llm_client.llm_client', None)
+    def test_batch_failure_falls_back_per_image(self):
+        app_module.ocr_routing.return_value = 'paddle'
+        with patch.object(app_module, 'paddle_ocr_batch', side_effect=RuntimeError('batch')):
+            self.upload('a.png', 'b.png', path='/api/analyze')
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+
+    @patch('llm_client.llm_client', None)
+    def test_probe_image_left_out_of_batch(self):
+        """차단기 복구 시험 상태면 첫 이미지는 ncp_ocr로 보내 시험 호출이 되게 하고 나머지만 배치"""
+        app_module.ocr_routing.return_value = 'probe'
+        with patch.object(app_module, 'paddle_ocr_batch', return_value=[SAMPLE_OCR_JSON, SAMPLE_OCR_JSON]) as batch:
+            self.upload('a.png', 'b.png', 'c.png', path='/api/analyze')
+        self.assertEqual([name for _, name in batch.call_args.args[0]], ['b.png', 'c.png'])
+        self.assertEqual(app_module.ncp_ocr.call_count, 1)
+        self.assertEqual(app_module.ncp_ocr.call_args.kwargs['filename'], 'a.png')
+
+    @patch('llm_client.llm_client', None)
+    def test_no_batch_with_ncp(self):
+        with patch.object(app_module, 'paddle_ocr_batch') as batch:
+            self.upload('a.png', 'b.png', path='/api/analyze')
+        batch.assert_not_called()
+
+
+class TestDuplicateImages(AppTestCase):
+    """pHash로 거의 같은 사진의 OCR 결과를 재사용하는지 테스트"""
+
+    def post_images(self, *images):
+        data = {'images': [(io.BytesIO(content), name) for name, content in images]}
+        return self.client.post('/api/analyze', data=data, content_type='multipart/form-data').get_json()
+
+    @patch('llm_client.llm_client', None)
+    def test_same_file_within_upload_counted_once(self):
+        content = encode(label_image())
+        data = self.post_images(('a.png', content), ('b.png', content), ('c.png', encode(label_image(5))))
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)  # 같은 파일은 OCR 생략
+        second = data['images'][1]
+        self.assertEqual(second['duplicate_of'], 'a.png')
+        self.assertEqual(second['fields'], data['images'][0]['fields'])
+        single = self.post_images(('a.png', encode(label_image(9))))
+        # 중복을 빼고 두 장만 합산 (같은 OCR 결과이므로 한 장 합계의 두 배)
+        self.assertAlmostEqual(data['totals']['sodium_mg'], 2 * single['totals']['sodium_mg'])
+
+    @patch('llm_client.llm_client', None)
+    def test_similar_photo_with_same_numbers_counted_once(self):
+        image = label_image()
+        data = self.post_images(('a.png', encode(image)), ('b.jpg', encode(image, 'JPEG', quality=70)))
+        self.assertEqual(app_module.ncp_ocr.call_count, 1)  # 다시 인코딩한 사진은 픽셀 비교로 확인하고 OCR 생략
+        self.assertEqual(data['images'][1]['duplicate_of'], 'a.png')
+        self.assertEqual(data['images'][1]['fields'], data['images'][0]['fields'])
+
+    @patch('llm_client.llm_client', None)
+    def test_unconfirmed_similar_photo_checked_by_ocr(self):
+        """픽셀 비교로 확인할 수 없는 작은 사본은 OCR 뒤 숫자가 같으면 중복으로 표시"""
+        image = label_image()
+        data = self.post_images(('a.png', encode(image)), ('b.png', encode(image.resize((300, 400)))))
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+        self.assertEqual(data['images'][1]['duplicate_of'], 'a.png')
+
+    @patch('llm_client.llm_client', None)
+    def test_same_layout_different_product_counted(self):
+        """pHash가 가까워도 읽은 숫자가 다르면 다른 제품으로 합산"""
+        other = json.loads(json.dumps(SAMPLE_OCR_JSON).replace('4000mg', '100mg'))
+        app_module.ncp_ocr.side_effect = [SAMPLE_OCR_JSON, other]
+        a = nutrition_label(('500kcal', '4000mg', '30g', '10g', '5g', '10g'))
+        b = nutrition_label(('500kcal', '100mg', '30g', '10g', '5g', '10g'))
+        data = self.post_images(('a.png', encode(a)), ('b.png', encode(b)))
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+        self.assertNotIn('duplicate_of', data['images'][1])
+        self.assertEqual(data['totals']['sodium_mg'], 4100)
+
+    def upload_in_session(self, client, name, content):
+        data = {'images': [(io.BytesIO(content), name)]}
+        client.post('/upload', data=data, content_type='multipart/form-data', follow_redirects=True)
+
+    @patch('llm_client.llm_client', None)
+    def test_reuse_across_uploads_in_same_session(self):
+        content = encode(label_image())
+        self.upload_in_session(self.client, 'a.png', content)
+        self.upload_in_session(self.client, 'again.png', content)
+        self.assertEqual(app_module.ncp_ocr.call_count, 1)
+
+        # 다시 인코딩한 사진도 원본과 픽셀 비교로 확인되면 OCR 없이 재사용
+        self.upload_in_session(self.client, 'again.jpg', encode(label_image(), 'JPEG', quality=70))
+        self.assertEqual(app_module.ncp_ocr.call_count, 1)
+
+        # 확인할 해상도가 안 되는 작은 사본은 다시 인식
+        self.upload_in_session(self.client, 'resized.png', encode(label_image().resize((300, 400))))
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+
+    @patch('llm_client.llm_client', None)
+    def test_no_reuse_when_cached_original_removed(self):
+        content = encode(label_image())
+        self.upload_in_session(self.client, 'a.png', content)
+        for entry in app_module.phash_index._entries.values():
+            os.remove(entry['path'])  # 업로드 보관 기간이 지나 원본이 지워짐
+        self.upload_in_session(self.client, 'again.jpg', encode(label_image(), 'JPEG', quality=70))
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+
+    @patch('llm_client.llm_client', None)
+    def test_index_is_per_worker(self):
+        """재사용 색인은 워커별: 같은 세션이 다른 워커로 가면 OCR을 다시 할 뿐 결과는 같음"""
+        content = encode(label_image())
+        self.upload_in_session(self.client, 'a.png', content)
+        with patch.object(app_module, 'phash_index', PhashIndex()):  # 색인이 빈 다른 워커
+            self.upload_in_session(self.client, 'again.png', content)
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+        self.upload_in_session(self.client, 'third.png', content)  # 처음 워커로 돌아오면 다시 재사용
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+
+    @patch('llm_client.llm_client', None)
+    def test_no_reuse_across_sessions(self):
+        content = encode(label_image())
+        self.upload_in_session(self.client, 'a.png', content)
+        self.upload_in_session(app_module.app.test_client(), 'a.png', content)
+        self.assertEqual(app_module.ncp_ocr.call_count, 2)
+        data = self.post_images(('a.png', content))  # API 요청도 세션이 없으므로 재사용 안 함
+        self.assertNotIn('ocr_reused', data['images'][0])
+
+
+class TestOcrStatusEndpoint(AppTestCase):
+    """/api/ocr/status 엔드포인트 테스트"""
+
+    def test_status(self):
+        data = self.client.get('/api/ocr/status').get_json()
+        self.assertIn(data['routing'], ('ncp', 'hedged', 'probe', 'paddle'))
+        self.assertIn('state', data['breaker'])
+        self.assertIn('ncp_circuit_breaker_state', self.client.get('/metrics').data.decode('utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+"""
+회로 차단기 유닛 테스트
+
+circuit_breaker.py의 실패율/느린 호출 기반 차단, 반개방 시험 호출, 복구를 테스트합니다.
+"""
+
+import unittest
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """CircuitBreaker 클래스 테스트"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", window=60, min_calls=3, error_rate=0.5, slow_seconds=5,
+                                      open_seconds=30, enabled=True, clock=self.clock)
+
+    def fail(self, times=1):
+        for _ in range(times):
+            self.breaker.record(False, 0.1, error="503")
+
+    def test_opens_after_error_rate(self):
+        """최소 호출 수를 채우고 실패율이 기준 이상이면 차단"""
+        self.breaker.record(True, 0.1)
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)  # 호출 수 부족
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.status()["last_error"], "503")
+
+    def test_slow_calls_count_as_failures(self):
+        for _ in range(3):
+            self.breaker.record(True, 6.0)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.status()["last_error"], "slow")
+
+    def test_old_calls_leave_window(self):
+        self.fail(2)
+        self.clock.now += 61
+        self.breaker.record(True, 0.1)
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.status()["calls"], 2)
+
+    def test_half_open_probe_recovers(self):
+        """차단 시간이 지나면 시험 호출 하나만 허용하고 성공하면 복구"""
+        self.fail(3)
+        self.clock.now += 29
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.status()["retry_in_seconds"], 1.0)
+        self.clock.now += 1
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())  # 시험 호출 진행 중
+        self.breaker.record(True, 0.2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.status()["calls"], 0)
+
+    def test_status_reports_half_open_after_open_seconds(self):
+        """allow()를 부르지 않아도 차단 시간이 지나면 status가 반개방을 보고 (배치 경로의 라우팅 판단용)"""
+        self.fail(3)
+        self.clock.now += 1000
+        self.assertEqual(self.breaker.status()["state"], HALF_OPEN)
+        self.assertTrue(self.breaker.allow())  # 시험 호출은 여전히 하나만
+        self.assertFalse(self.breaker.allow())
+
+    def test_release_returns_probe(self):
+        """시험 호출을 하지 않고 끝나면 release로 반납해 다음 호출이 시험할 수 있음"""
+        self.fail(3)
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_probe_failure_reopens(self):
+        self.fail(3)
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow())
+
+    def test_disabled(self):
+        breaker = CircuitBreaker("off", min_calls=1, enabled=False)
+        breaker.record(False)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_status_and_collect(self):
+        self.breaker.record(True, 0.1)
+        self.breaker.record(True, 0.3)
+        status = self.breaker.status()
+        self.assertEqual(status["calls"], 2)
+        self.assertEqual(status["error_rate"], 0.0)
+        self.assertEqual(status["p50_seconds"], 0.3)
+        samples = dict((name, values) for name, _, _, values in self.breaker.collect())
+        self.assertEqual(samples["ncp_circuit_breaker_state"], [({"breaker": "test"}, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+OCR 이미지 디코딩 유닛 테스트
+
+image_decode.py의 축소 디코딩(JPEG draft/reduce), 채널 변환, EXIF 방향 적용, 스레드별 버퍼 재사용, 최대 RSS 기록(선택)을 테스트합니다.
+"""
+
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+import image_decode
+from metrics import OCR_DECODE_PEAK_RSS
+from image_decode import decode_image, to_array, as_three_channel, reset_peak_rss, peak_rss_bytes
+from test_image_hash import label_image, encode
+
+
+class TestDecodeImage(unittest.TestCase):
+    """decode_image 크기/채널 테스트"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.photo = label_image(size=(4000, 3000))
+        cls.jpeg = encode(cls.photo, "JPEG", quality=85)
+
+    def test_jpeg_decoded_at_reduced_scale(self):
+        image = decode_image(self.jpeg, max_dim=1000, mode="RGB")
+        self.assertEqual(image.size, (1000, 750))
+        self.assertEqual(image.mode, "RGB")
+
+    def test_nearest_draft_scale_without_resampling(self):
+        """4000px -> 1500px 목표면 1/4(1000px)보다 가까운 1/2(2000px)로 디코딩"""
+        image = decode_image(self.jpeg, max_dim=1500, mode="RGB")
+        self.assertEqual(image.size, (2000, 1500))
+        self.assertEqual(decode_image(self.jpeg, max_dim=2560, mode="RGB").size, (2000, 1500))
+
+    def test_grayscale(self):
+        image = decode_image(self.jpeg, max_dim=1000, mode="L")
+        self.assertEqual(image.mode, "L")
+        self.assertEqual(to_array(image).shape, (750, 1000))
+
+    def test_original_size_when_unlimited(self):
+        self.assertEqual(decode_image(self.jpeg, max_dim=0, mode="RGB").size, (4000, 3000))
+
+    def test_small_image_untouched(self):
+        image = decode_image(encode(label_image(size=(300, 400))), max_dim=1000, mode="RGB")
+        self.assertEqual(image.size, (300, 400))
+
+    def test_png_integer_reduce_and_alpha_dropped(self):
+        image = decode_image(encode(label_image(size=(3000, 600)).convert("RGBA")), max_dim=1000, mode="RGB")
+        self.assertEqual(image.mode, "RGB")
+        self.assertEqual(image.size, (1000, 200))
+
+    def test_palette_png(self):
+        image = decode_image(encode(label_image(size=(600, 800)).convert("P")), max_dim=0, mode="L")
+        self.assertEqual(image.mode, "L")
+
+    def test_exif_orientation_applied(self):
+        """EXIF 방향 태그(6: 시계 방향 90도 회전해서 봐야 함)를 디코딩 때 적용"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        content = encode(label_image(size=(800, 600)), "JPEG", exif=exif)
+        image = decode_image(content, max_dim=0, mode="RGB")
+        self.assertEqual(image.size, (600, 800))
+
+    def test_content_matches_full_decode(self):
+        """축소 디코딩 결과가 원본을 같은 크기로 줄인 것과 거의 같음"""
+        image = decode_image(self.jpeg, max_dim=1000, mode="L")
+        expected = np.asarray(self.photo.convert("L").resize(image.size), dtype=np.float64)
+        self.assertLess(np.abs(np.asarray(image, dtype=np.float64) - expected).mean(), 12)
+
+    def test_default_max_dim_skipped_when_tiling(self):
+        """타일 분할 인식을 켜면 기본값으로는 줄이지 않음 (명시한 max_dim은 그대로 적용)"""
+        with patch.object(image_decode, "TILE_ENABLED", True):
+            self.assertEqual(decode_image(self.jpeg, mode="RGB").size, (4000, 3000))
+            self.assertEqual(decode_image(self.jpeg, max_dim=1000, mode="RGB").size, (1000, 750))
+        self.assertEqual(decode_image(self.jpeg, mode="RGB").size, (2000, 1500))
+
+    def test_records_peak_rss(self):
+        if not reset_peak_rss():
+            self.skipTest("/proc/self/clear_refs 미지원 환경")
+        before = OCR_DECODE_PEAK_RSS._default.snapshot()[1]
+        with patch.object(image_decode, "DECODE_TRACK_RSS", True):
+            decode_image(self.jpeg, max_dim=1000, mode="RGB")
+        self.assertEqual(OCR_DECODE_PEAK_RSS._default.snapshot()[1], before + 1)
+        self.assertGreater(peak_rss_bytes(), 0)
+
+    def test_peak_rss_off_by_default(self):
+        before = OCR_DECODE_PEAK_RSS._default.snapshot()[1]
+        with patch.object(image_decode, "reset_peak_rss") as reset:
+            decode_image(self.jpeg, max_dim=1000, mode="RGB")
+        reset.assert_not_called()
+        self.assertEqual(OCR_DECODE_PEAK_RSS._default.snapshot()[1], before)
+
+
+class TestToArray(unittest.TestCase):
+    """to_array 버퍼 재사용 테스트"""
+
+    def test_matches_numpy_conversion(self):
+        image = label_image(size=(321, 123))
+        np.testing.assert_array_equal(to_array(image), np.array(image))
+        np.testing.assert_array_equal(to_array(image.convert("L")), np.array(image.convert("L")))
+
+    def test_buffer_reused_within_thread(self):
+        first = to_array(label_image(seed=1, size=(200, 100)))
+        second_image = label_image(seed=2, size=(150, 100))
+        second = to_array(second_image)
+        self.assertTrue(np.shares_memory(first, second))
+        np.testing.assert_array_equal(second, np.array(second_image))
+
+    def test_copied_in_strips(self):
+        """행 묶음 경계가 이미지 높이로 나누어떨어지지 않아도 같은 결과"""
+        image = label_image(seed=3, size=(301, 97))
+        with patch.object(image_decode, "COPY_STRIP_BYTES", 301 * 3 * 10):
+            np.testing.assert_array_equal(to_array(image), np.array(image))
+            np.testing.assert_array_equal(to_array(image.convert("L")), np.array(image.convert("L")))
+
+    def test_no_reuse(self):
+        first = to_array(label_image(seed=1, size=(200, 100)))
+        self.assertFalse(np.shares_memory(first, to_array(label_image(seed=2, size=(200, 100)), reuse=False)))
+
+    def test_separate_buffer_per_thread(self):
+        main = to_array(label_image(size=(200, 100)))
+        arrays = []
+        thread = threading.Thread(target=lambda: arrays.append(to_array(label_image(size=(200, 100)))))
+        thread.start()
+        thread.join()
+        self.assertFalse(np.shares_memory(main, arrays[0]))
+
+    def test_as_three_channel(self):
+        gray = np.arange(6, dtype=np.uint8).reshape(2, 3)
+        rgb = as_three_channel(gray)
+        self.assertEqual(rgb.shape, (2, 3, 3))
+        np.testing.assert_array_equal(rgb[:, :, 2], gray)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+이미지 중복 감지 유닛 테스트
+
+image_hash.py의 pHash, 같은 사진 확인(same_picture), BK-tree 검색, PhashIndex 보관 정책을 테스트합니다.
+"""
+
+import random
+import unittest
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+from image_hash import phash, hamming, content_digest, same_picture, BKTree, PhashIndex, PHASH_MAX_DISTANCE
+
+
+def label_image(seed=0, size=(600, 800)):
+    """무작위 가로줄/글자 상자가 있는 라벨 흉내 이미지"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(size[0] - 100), rng.randrange(size[1] - 30)
+        draw.rectangle((x, y, x + rng.randrange(20, 100), y + rng.randrange(5, 30)), fill="black")
+    return image
+
+
+def nutrition_label(values, size=(600, 800)):
+    """같은 표준 양식에 값만 다른 영양정보 표 이미지"""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=28)
+    draw.rectangle((20, 20, size[0] - 20, size[1] - 20), outline="black", width=4)
+    draw.text((40, 40), "Nutrition Facts", fill="black", font=font)
+    for i, (name, value) in enumerate(zip(("Calories", "Sodium", "Carbs", "Sugars", "Fat", "Protein"), values)):
+        y = 110 + i * 100
+        draw.text((40, y), name, fill="black", font=font)
+        draw.text((400, y), value, fill="black", font=font)
+        draw.line((30, y + 60, size[0] - 30, y + 60), fill="black", width=2)
+    return image
+
+
+def encode(image, fmt="PNG", **kwargs):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+class TestPhash(unittest.TestCase):
+    """phash 함수 테스트"""
+
+    def test_near_duplicates_are_close(self):
+        """다시 인코딩/축소/살짝 자른 사진은 해시가 가까움"""
+        image = label_image()
+        base = phash(encode(image))
+        self.assertLessEqual(hamming(base, phash(encode(image, "JPEG", quality=60))), 4)
+        self.assertLessEqual(hamming(base, phash(encode(image.resize((300, 400))))), 4)
+        self.assertLessEqual(hamming(base, phash(encode(image.crop((6, 6, 600, 800))))), 8)
+
+    def test_different_images_are_far(self):
+        self.assertGreater(hamming(phash(encode(label_image(1))), phash(encode(label_image(2)))), 12)
+
+    def test_same_layout_different_values_are_close(self):
+        """표준 양식 라벨은 숫자가 달라도 해시가 가까움 (pHash만으로 같은 사진이라 판단하면 안 되는 이유)"""
+        a = nutrition_label(("500kcal", "400mg", "30g", "10g", "5g", "8g"))
+        b = nutrition_label(("350kcal", "900mg", "45g", "12g", "7g", "4g"))
+        self.assertLessEqual(hamming(phash(encode(a)), phash(encode(b))), PHASH_MAX_DISTANCE)
+        self.assertNotEqual(content_digest(encode(a)), content_digest(encode(b)))
+
+    def test_not_an_image(self):
+        self.assertIsNone(phash(b"not-an-image"))
+
+
+class TestSamePicture(unittest.TestCase):
+    """same_picture 함수 테스트 (pHash 후보를 OCR 없이 재사용해도 되는지)"""
+
+    def test_reencoded_photo_is_same(self):
+        for image in (label_image(), nutrition_label(("500kcal", "400mg", "30g", "10g", "5g", "8g"))):
+            original = encode(image)
+            for quality in (85, 60, 30):
+                self.assertTrue(same_picture(original, encode(image, "JPEG", quality=quality)), quality)
+            self.assertTrue(same_picture(original, encode(image, "WEBP", quality=50)))
+
+    def test_one_digit_changed_is_different(self):
+        """표준 양식 라벨에서 숫자 한 글자만 달라도 다른 사진으로 판단"""
+        values = ["500kcal", "400mg", "30g", "10g", "5g", "8g"]
+        original = encode(nutrition_label(values))
+        for position, value in enumerate(("600kcal", "900mg", "38g", "16g", "6g", "9g")):
+            changed = list(values)
+            changed[position] = value
+            self.assertFalse(same_picture(original, encode(nutrition_label(changed), "JPEG", quality=85)), value)
+
+    def test_unverifiable_images(self):
+        image = label_image()
+        original = encode(image)
+        self.assertFalse(same_picture(original, encode(image.resize((300, 400)))))  # 글자를 구분할 해상도가 안 됨
+        self.assertFalse(same_picture(original, encode(image.crop((0, 0, 600, 700)))))  # 가로세로 비가 다름
+        self.assertFalse(same_picture(original, b"not-an-image"))
+
+
+class TestBKTree(unittest.TestCase):
+    """BKTree 검색이 전수 비교와 같은 결과를 내는지 테스트"""
+
+    def test_search_matches_brute_force(self):
+        rng = random.Random(7)
+        keys = [rng.getrandbits(64) for _ in range(500)]
+        tree = BKTree()
+        for index, key in enumerate(keys):
+            tree.add(key, index)
+        for query in keys[:20] + [rng.getrandbits(64) for _ in range(20)]:
+            query ^= 1 << rng.randrange(64)
+            expected = sorted(i for i, key in enumerate(keys) if hamming(query, key) <= 20)
+            self.assertEqual(sorted(value for _, _, value in tree.search(query, 20)), expected)
+
+
+class TestPhashIndex(unittest.TestCase):
+    """PhashIndex 클래스 테스트"""
+
+    def test_find_nearest_within_distance(self):
+        index = PhashIndex(max_distance=3)
+        index.add(0b1111, "a")
+        self.assertEqual(index.find(0b1110), "a")
+        self.assertIsNone(index.find(0b1111 ^ 0b11110000))
+
+    def test_scope_and_confirm(self):
+        index = PhashIndex(max_distance=3)
+        index.add(0b1111, {"digest": "a"}, scope="user-1")
+        self.assertIsNone(index.find(0b1111, scope="user-2"))  # 다른 세션의 결과는 찾지 않음
+        self.assertIsNone(index.find(0b1110, scope="user-1", confirm=lambda v: v["digest"] == "b"))
+        self.assertEqual(index.find(0b1110, scope="user-1", confirm=lambda v: v["digest"] == "a"), {"digest": "a"})
+        index.add(0b1111, {"digest": "c"}, scope="user-2")  # 같은 해시도 scope별로 따로 보관
+        self.assertEqual(index.find(0b1111, scope="user-1"), {"digest": "a"})
+        self.assertEqual(len(index), 2)
+
+    def test_replace_and_evict(self):
+        index = PhashIndex(max_distance=0, max_size=4)
+        index.add(1, "old")
+        index.add(1, "new")
+        self.assertEqual(index.find(1), "new")
+        for key in range(2, 7):
+            index.add(key << 8, key)
+        self.assertLessEqual(len(index), 4)
+        self.assertIsNone(index.find(1))  # 오래된 항목부터 제거
+        self.assertEqual(index.find(6 << 8), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,7 @@ LLM Client 유닛 테스트
 import unittest
 import os
 import json
+import sqlite3
 from unittest.mock import Mock, patch, MagicMock
 from io import StringIO
 import sys
@@ -162,6 +163,56 @@ class TestCompletionExecutor(unittest.TestCase):
         # 빈 응답의 경우 None이 반환됨 (실제 구현에 맞춤)
         self.assertIsNone(result)
 
+    @patch('requests.post')
+    def test_execute_streaming_rate_limited(self, mock_post):
+        """호출량 제한 대기 초과 시 요청 없이 None 반환 테스트"""
+        mock_limiter = Mock()
+        mock_limiter.acquire.return_value = False
+        executor = CompletionExecutor(self.host, self.api_key, self.request_id, rate_limiter=mock_limiter)
+
+        result = executor.execute_streaming({"messages": [{"role": "user", "content": "테스트"}]})
+
+        self.assertIsNone(result)
+        mock_post.assert_not_called()
+
+    @patch('requests.post')
+    def test_rate_limiter_error_fails_open(self, mock_post):
+        """제한기 DB 오류(잠김/손상)가 나도 예외 없이 LLM 호출을 진행 테스트"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_lines.return_value = [b'data: {"message": {"content": "ok"}}', b'data: [DONE]']
+        mock_response.__enter__ = Mock(return_value=mock_response)
+        mock_response.__exit__ = Mock(return_value=None)
+        mock_post.return_value = mock_response
+        mock_limiter = Mock()
+        mock_limiter.acquire.side_effect = sqlite3.OperationalError("database is locked")
+        mock_limiter.on_success.side_effect = sqlite3.OperationalError("database is locked")
+        executor = CompletionExecutor(self.host, self.api_key, self.request_id, rate_limiter=mock_limiter)
+
+        result = executor.execute_streaming({"messages": [{"role": "user", "content": "테스트"}]})
+
+        self.assertEqual(result, "ok")
+        mock_post.assert_called_once()
+
+    @patch('requests.post')
+    def test_execute_streaming_429_throttles(self, mock_post):
+        """429 응답 시 호출 속도 감소 테스트"""
+        mock_response = Mock()
+        mock_response.status_code = 429
+        mock_response.text = "Too Many Requests"
+        mock_response.__enter__ = Mock(return_value=mock_response)
+        mock_response.__exit__ = Mock(return_value=None)
+        mock_post.return_value = mock_response
+        mock_limiter = Mock()
+        mock_limiter.acquire.return_value = True
+        executor = CompletionExecutor(self.host, self.api_key, self.request_id, rate_limiter=mock_limiter)
+
+        result = executor.execute_streaming({"messages": [{"role": "user", "content": "테스트"}]})
+
+        self.assertIsNone(result)
+        mock_limiter.on_throttled.assert_called_once()
+        mock_limiter.on_success.assert_not_called()
+
 
 class TestLLMFunctions(unittest.TestCase):
     """LLM 함수들 테스트"""
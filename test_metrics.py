@@ -0,0 +1,89 @@
+"""
+메트릭 레지스트리 유닛 테스트
+
+metrics.py의 Counter/Gauge/Histogram 누적과 Prometheus 텍스트 출력을 테스트합니다.
+"""
+
+import threading
+import unittest
+from functools import lru_cache
+
+import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """레지스트리별 메트릭 테스트"""
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter_labels(self):
+        counter = self.registry.register(metrics.Counter("test_total", "테스트", ("kind",)))
+        counter.labels("a").inc()
+        counter.labels("a").inc(2)
+        counter.labels("b").inc()
+        self.assertEqual(counter.labels("a").get(), 3)
+        self.assertIn('test_total{kind="a"} 3', self.registry.render())
+        with self.assertRaises(ValueError):
+            counter.labels("a", "b")
+        with self.assertRaises(ValueError):
+            counter.labels("a").inc(-1)
+
+    def test_histogram_buckets(self):
+        histogram = self.registry.register(metrics.Histogram("test_seconds", "테스트", buckets=(0.1, 1.0)))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        text = self.registry.render()
+        self.assertIn('test_seconds_bucket{le="0.1"} 2', text)
+        self.assertIn('test_seconds_bucket{le="1"} 3', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn('test_seconds_count 4', text)
+        self.assertIn('test_seconds_sum 3.65', text)
+        self.assertIn('# TYPE test_seconds histogram', text)
+
+    def test_gauge_track_inprogress(self):
+        gauge = self.registry.register(metrics.Gauge("test_in_flight", "테스트"))
+        with gauge.track_inprogress():
+            self.assertEqual(gauge.get(), 1)
+        self.assertEqual(gauge.get(), 0)
+
+    def test_concurrent_increments(self):
+        """여러 스레드가 다른 스트라이프에 기록해도 합계가 정확"""
+        counter = self.registry.register(metrics.Counter("test_concurrent_total", "테스트"))
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(counter.get(), 16000)
+
+    def test_duplicate_name_rejected(self):
+        self.registry.register(metrics.Counter("test_dup_total", "테스트"))
+        with self.assertRaises(ValueError):
+            self.registry.register(metrics.Counter("test_dup_total", "테스트"))
+
+    def test_lru_cache_collector(self):
+        @lru_cache(maxsize=8)
+        def square(x):
+            return x * x
+
+        square(2)
+        square(2)
+        original = metrics.REGISTRY
+        metrics.REGISTRY = self.registry
+        try:
+            metrics.register_lru_caches({"square": square})
+        finally:
+            metrics.REGISTRY = original
+        text = self.registry.render()
+        self.assertIn('ncp_cache_hits_total{cache="square"} 1', text)
+        self.assertIn('ncp_cache_misses_total{cache="square"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,123 @@
+"""
+Mock Clova Studio 서버 연동 테스트
+
+mock_clova_server.py를 로컬에 띄우고 CompletionExecutor의 실제 스트리밍 동작을 테스트합니다.
+"""
+
+import time
+import unittest
+from unittest.mock import Mock
+
+from llm_client import CompletionExecutor
+from mock_clova_server import start_mock_server, SAMPLE_TOKENS
+
+COMPLETION_REQUEST = {
+    "messages": [{"role": "user", "content": [{"type": "text", "text": "테스트 메시지"}]}],
+    "maxTokens": 1000,
+}
+
+
+class MockServerTestCase(unittest.TestCase):
+    """테스트별 Mock 서버 실행/종료"""
+
+    server_config = {}
+
+    def setUp(self):
+        self.server, self.host = start_mock_server(**self.server_config)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def executor(self, **kwargs):
+        return CompletionExecutor(self.host, "Bearer mock", "test_request_id", **kwargs)
+
+
+class TestMockStreaming(MockServerTestCase):
+    """정상 스트리밍 테스트"""
+
+    server_config = {"ttft": 0.05, "inter_token": 0.0, "tokens": 20}
+
+    def test_stream_collects_tokens(self):
+        """토큰 조각을 모아 전체 응답을 반환 (result 이벤트로 중복되지 않음)"""
+        result = self.executor().execute_streaming(COMPLETION_REQUEST)
+        self.assertEqual(result, "".join(SAMPLE_TOKENS[:20]))
+
+    def test_stream_emits_chunks(self):
+        """Socket.IO로 조각 단위 이벤트 전송"""
+        mock_socketio = Mock()
+        self.executor().execute_streaming(COMPLETION_REQUEST, mock_socketio, "room")
+        types = [c.args[1]['type'] for c in mock_socketio.emit.call_args_list]
+        self.assertEqual(types.count('chunk'), 20)
+        self.assertEqual(types[-1], 'complete')
+
+    def test_stream_section_offsets(self):
+        """section 표시와 offset으로 조각을 순서대로 이어 붙일 수 있음"""
+        mock_socketio = Mock()
+        self.executor().execute_streaming(COMPLETION_REQUEST, mock_socketio, "room", section="male_reduction")
+        payloads = [c.args[1] for c in mock_socketio.emit.call_args_list]
+        self.assertTrue(all(p['section'] == 'male_reduction' for p in payloads))
+        text = ""
+        for p in payloads:
+            if p['type'] == 'chunk':
+                self.assertEqual(p['offset'], len(text))
+                text += p['data']
+        self.assertEqual(text, payloads[-1]['data'])
+
+    def test_time_to_first_token(self):
+        """설정한 첫 토큰 지연 이상 소요"""
+        start = time.time()
+        self.executor().execute_streaming(COMPLETION_REQUEST)
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_max_tokens_respected(self):
+        """요청 maxTokens만큼만 생성"""
+        result = self.executor().execute_streaming(dict(COMPLETION_REQUEST, maxTokens=3))
+        self.assertEqual(result, "".join(SAMPLE_TOKENS[:3]))
+
+
+class TestMockThrottling(MockServerTestCase):
+    """429 주입 테스트"""
+
+    server_config = {"ttft": 0.0, "rate_429": 1.0}
+
+    def test_429_returns_none_and_throttles(self):
+        limiter = Mock()
+        limiter.acquire.return_value = True
+        result = self.executor(rate_limiter=limiter).execute_streaming(COMPLETION_REQUEST)
+        self.assertIsNone(result)
+        limiter.on_throttled.assert_called_once()
+
+
+class TestMockErrors(MockServerTestCase):
+    """에러/연결 끊김 주입 테스트"""
+
+    server_config = {"ttft": 0.0, "inter_token": 0.0, "tokens": 20, "error_rate": 1.0}
+
+    def test_server_error_returns_none(self):
+        self.assertIsNone(self.executor().execute_streaming(COMPLETION_REQUEST))
+
+    def test_missing_auth(self):
+        executor = CompletionExecutor(self.host, "", "test_request_id")
+        self.assertIsNone(executor.execute_streaming(COMPLETION_REQUEST))
+
+
+class TestMockDrop(MockServerTestCase):
+    """스트리밍 도중 연결 끊김 테스트"""
+
+    server_config = {"ttft": 0.0, "inter_token": 0.0, "tokens": 20, "drop_rate": 1.0, "seed": 1}
+
+    def test_drop_is_failure(self):
+        """result 이벤트 없이 끊긴 스트림은 받은 조각을 반환하지 않고 실패로 처리"""
+        limiter = Mock()
+        limiter.acquire.return_value = True
+        mock_socketio = Mock()
+        result = self.executor(rate_limiter=limiter).execute_streaming(COMPLETION_REQUEST, mock_socketio, "room")
+        self.assertIsNone(result)
+        limiter.on_success.assert_not_called()
+        limiter.on_error.assert_called_once()
+        types = [c.args[1]['type'] for c in mock_socketio.emit.call_args_list]
+        self.assertNotIn('complete', types)
+        self.assertEqual(types[-1], 'error')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
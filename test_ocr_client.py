@@ -0,0 +1,630 @@
+"""
+OCR 클라이언트 유닛 테스트
+
+네이버 OCR 전송 방식(json base64 / multipart)을 Mock OCR 서버로 테스트하고
+네이버 OCR/PaddleOCR 헤지 모드, 회로 차단기, PaddleOCR 표 영역 인식/선택적 재인식/방향 정리를 테스트합니다.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import unittest
+from io import BytesIO
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+import metrics
+import ocr_client
+import image_decode
+from circuit_breaker import CircuitBreaker
+from parser import parse_ocr_payload
+from ocr_tiles import tile_boxes as TILE_BOXES
+from test_table_region import package_photo
+from test_orientation import text_page
+from mock_clova_server import start_mock_server, OCR_PATH, SAMPLE_OCR_TEXTS
+
+IMAGE_BYTES = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40 + b"\r\n--not-a-boundary\r\n"
+
+
+class TestMultipartBody(unittest.TestCase):
+    """multipart 본문 스트림 테스트"""
+
+    def test_length_matches_stream(self):
+        """__len__이 실제로 읽히는 바이트 수와 같음 (Content-Length로 사용)"""
+        body = ocr_client.MultipartBody([("message", '{"a": 1}')], "file", "a.jpg", BytesIO(IMAGE_BYTES), len(IMAGE_BYTES))
+        chunks = []
+        while True:
+            chunk = body.read(1000)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        data = b"".join(chunks)
+        self.assertEqual(len(data), len(body))
+        self.assertIn(IMAGE_BYTES, data)
+        self.assertTrue(data.endswith(f"--{body.boundary}--\r\n".encode()))
+
+    def test_read_all(self):
+        body = ocr_client.MultipartBody([("message", "{}")], "file", 'a"b.jpg', BytesIO(b"xyz"), 3)
+        data = body.read()
+        self.assertEqual(len(data), len(body))
+        self.assertIn(b'filename="ab.jpg"', data)
+
+
+class TestOcrTransport(unittest.TestCase):
+    """Mock OCR 서버로 두 전송 방식 비교"""
+
+    def setUp(self):
+        self.server, host = start_mock_server()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for name, value in (("ENDPOINT", host + OCR_PATH), ("SECRET", "mock"),
+                            ("ncp_breaker", CircuitBreaker("test", enabled=False))):
+            patcher = patch.object(ocr_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stats(self):
+        return dict(self.server.RequestHandlerClass.config.stats)
+
+    def texts(self, ocr_json):
+        return [f["inferText"] for f in ocr_json["images"][0]["fields"]]
+
+    def test_json_transport(self):
+        result = ocr_client.ncp_ocr_process(IMAGE_BYTES, "label.jpg")
+        self.assertEqual(self.texts(result), SAMPLE_OCR_TEXTS)
+        self.assertEqual(self.stats()["ocr_image_bytes"], len(IMAGE_BYTES))
+
+    def test_multipart_transport_from_bytes(self):
+        result = ocr_client.ncp_ocr_process_multipart(IMAGE_BYTES, "label.jpg")
+        self.assertEqual(self.texts(result), SAMPLE_OCR_TEXTS)
+        self.assertEqual(result["images"][0]["name"], "label.jpg")
+        self.assertEqual(self.stats()["ocr_image_bytes"], len(IMAGE_BYTES))
+
+    def test_multipart_transport_from_path(self):
+        """경로를 주면 디스크에서 읽어 보냄 (image_bytes 없이도 동작)"""
+        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
+            f.write(IMAGE_BYTES)
+        self.addCleanup(os.remove, f.name)
+        result = ocr_client.ncp_ocr_process_multipart(None, "label.jpg", path=f.name)
+        self.assertEqual(self.texts(result), SAMPLE_OCR_TEXTS)
+        self.assertEqual(self.stats()["ocr_image_bytes"], len(IMAGE_BYTES))
+
+    def test_multipart_request_is_smaller(self):
+        """multipart 요청은 base64가 없어 JSON 요청보다 작음"""
+        ocr_client.ncp_ocr_process(IMAGE_BYTES, "label.jpg")
+        json_bytes = self.stats()["ocr_request_bytes"]
+        ocr_client.ncp_ocr_process_multipart(IMAGE_BYTES, "label.jpg")
+        multipart_bytes = self.stats()["ocr_request_bytes"] - json_bytes
+        self.assertLess(multipart_bytes, json_bytes)
+        self.assertLess(multipart_bytes, len(IMAGE_BYTES) + 1024)
+
+    def test_ncp_ocr_uses_configured_transport(self):
+        for transport in ("json", "multipart"):
+            with self.subTest(transport=transport), patch.object(ocr_client, "TRANSPORT", transport), \
+                    patch.object(ocr_client, "paddle_ocr_process") as paddle:
+                result = ocr_client.ncp_ocr(IMAGE_BYTES, "label.jpg")
+                self.assertEqual(self.texts(result), SAMPLE_OCR_TEXTS)
+                paddle.assert_not_called()
+
+    def test_message_part_has_no_image_data(self):
+        message = ocr_client._ocr_message("label.jpg")
+        self.assertNotIn("data", message["images"][0])
+        self.assertEqual(json.loads(json.dumps(message))["images"][0]["format"], "jpg")
+
+
+def ocr_json(texts):
+    return {"images": [{"fields": [{"inferText": text, "inferConfidence": 0.99} for text in texts]}]}
+
+
+GOOD_OCR = ocr_json(SAMPLE_OCR_TEXTS)
+THIN_OCR = ocr_json(["영양정보", "열량 250kcal"])
+
+
+def backend(result=None, delay=0.0, error=None):
+    """지연 후 결과를 반환하거나 오류를 던지는 가짜 OCR 엔진"""
+    def run(*args, **kwargs):
+        time.sleep(delay)
+        if error:
+            raise error
+        return result
+    return run
+
+
+class TestHedgedOcr(unittest.TestCase):
+    """네이버 OCR 지연/실패 시 PaddleOCR 병행 테스트"""
+
+    def setUp(self):
+        for name, value in (("ENDPOINT", "http://ocr.invalid"), ("SECRET", "mock"), ("HEDGE", True),
+                            ("HEDGE_DELAY", "0.1"), ("TRANSPORT", "json"),
+                            ("ncp_breaker", CircuitBreaker("test", enabled=False))):
+            patcher = patch.object(ocr_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_hedged(self, ncp, paddle):
+        with patch.object(ocr_client, "ncp_ocr_process", side_effect=ncp) as ncp_mock, \
+                patch.object(ocr_client, "paddle_ocr_process", side_effect=paddle) as paddle_mock:
+            start = time.perf_counter()
+            result = ocr_client.ncp_ocr(IMAGE_BYTES, "label.jpg")
+            return result, time.perf_counter() - start, ncp_mock, paddle_mock
+
+    def wins(self, name):
+        return metrics.OCR_HEDGE_WINS.labels(name).get()
+
+    def test_fast_ncp_skips_paddle(self):
+        wins = self.wins("ncp")
+        result, _, _, paddle = self.run_hedged(backend(GOOD_OCR), backend(GOOD_OCR))
+        self.assertIs(result, GOOD_OCR)
+        paddle.assert_not_called()
+        self.assertEqual(self.wins("ncp"), wins + 1)
+
+    def test_slow_ncp_loses_to_paddle(self):
+        """네이버 OCR이 지연되면 지연 시간 후 PaddleOCR를 시작하고 먼저 끝난 결과 사용"""
+        wins = self.wins("paddle")
+        paddle_result = ocr_json(SAMPLE_OCR_TEXTS[:5])
+        result, elapsed, _, paddle = self.run_hedged(backend(GOOD_OCR, delay=1.0), backend(paddle_result))
+        self.assertIs(result, paddle_result)
+        self.assertLess(elapsed, 0.8)
+        paddle.assert_called_once()
+        self.assertEqual(self.wins("paddle"), wins + 1)
+
+    def test_ncp_error_starts_paddle_without_delay(self):
+        with patch.object(ocr_client, "HEDGE_DELAY", "5"):
+            result, elapsed, _, _ = self.run_hedged(backend(error=RuntimeError("500")), backend(GOOD_OCR))
+        self.assertIs(result, GOOD_OCR)
+        self.assertLess(elapsed, 1.0)
+
+    def test_insufficient_ncp_result_starts_paddle(self):
+        """영양성분이 부족한 결과는 승리로 인정하지 않음"""
+        result, _, _, paddle = self.run_hedged(backend(THIN_OCR), backend(GOOD_OCR))
+        self.assertIs(result, GOOD_OCR)
+        paddle.assert_called_once()
+
+    def test_returns_thin_result_when_nothing_better(self):
+        result, _, _, _ = self.run_hedged(backend(THIN_OCR), backend(error=RuntimeError("paddle")))
+        self.assertIs(result, THIN_OCR)
+
+    def test_both_fail_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.run_hedged(backend(error=RuntimeError("ncp")), backend(error=RuntimeError("paddle")))
+
+    def test_cancelled_probe_released(self):
+        """반개방 시험 호출이던 네이버 OCR이 시작 전에 취소되면 시험 권한을 반납 (차단기가 멈추지 않음)"""
+        now = [1000.0]
+        breaker = CircuitBreaker("test", min_calls=1, open_seconds=30, enabled=True, clock=lambda: now[0])
+        breaker.record(False, 0.1)
+        now[0] += 30
+        submit = ocr_client._submit
+
+        def never_start_ncp(fn, *args):
+            return Future() if fn is ocr_client._run_ncp else submit(fn, *args)
+
+        with patch.object(ocr_client, "ncp_breaker", breaker), \
+                patch.object(ocr_client, "_submit", side_effect=never_start_ncp):
+            result, _, ncp, _ = self.run_hedged(backend(GOOD_OCR), backend(GOOD_OCR))
+        self.assertIs(result, GOOD_OCR)
+        ncp.assert_not_called()
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())  # 다음 요청이 다시 시험 호출을 보낼 수 있음
+
+    def test_hedged_ncp_uses_shorter_timeout(self):
+        with patch.object(ocr_client.requests, "post", side_effect=RuntimeError("down")) as post, \
+                patch.object(ocr_client, "paddle_ocr_process", return_value=GOOD_OCR):
+            self.assertIs(ocr_client.ncp_ocr(IMAGE_BYTES, "label.jpg"), GOOD_OCR)
+        self.assertEqual(post.call_args.kwargs["timeout"], ocr_client.HEDGE_NCP_TIMEOUT)
+
+    def test_p95_delay(self):
+        with patch.object(ocr_client, "HEDGE_DELAY", "p95"), \
+                patch.object(ocr_client, "_ncp_latencies", ocr_client.deque(maxlen=200)) as latencies:
+            self.assertEqual(ocr_client.hedge_delay(), ocr_client.HEDGE_INITIAL_DELAY)
+            latencies.extend(i / 100 for i in range(1, 101))
+            self.assertAlmostEqual(ocr_client.hedge_delay(), 0.95)
+
+
+class TestBreakerRouting(unittest.TestCase):
+    """차단기가 열리면 네이버 OCR 없이 PaddleOCR로 바로 보내는지 테스트"""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", min_calls=2, error_rate=0.5, open_seconds=60, enabled=True)
+        for name, value in (("ENDPOINT", "http://ocr.invalid"), ("SECRET", "mock"), ("HEDGE", False),
+                            ("TRANSPORT", "json"), ("ncp_breaker", self.breaker)):
+            patcher = patch.object(ocr_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_open_breaker_skips_ncp(self):
+        with patch.object(ocr_client, "ncp_ocr_process", side_effect=RuntimeError("timeout")) as ncp, \
+                patch.object(ocr_client, "paddle_ocr_process", return_value=GOOD_OCR) as paddle:
+            for _ in range(4):
+                self.assertIs(ocr_client.ncp_ocr(IMAGE_BYTES, "label.jpg"), GOOD_OCR)
+        self.assertEqual(ncp.call_count, 2)
+        self.assertEqual(paddle.call_count, 4)
+        status = ocr_client.ocr_status()
+        self.assertEqual(status["routing"], "paddle")
+        self.assertEqual(status["breaker"]["state"], "open")
+        self.assertEqual(status["breaker"]["last_error"], "timeout")
+
+    def test_routing_moves_to_probe_without_calls(self):
+        """차단 시간이 지나면 OCR 호출 없이도 라우팅이 probe가 됨 (배치 경로가 시험 호출을 보낼 수 있도록)"""
+        now = [1000.0]
+        breaker = CircuitBreaker("test", min_calls=2, error_rate=0.5, open_seconds=60, enabled=True,
+                                 clock=lambda: now[0])
+        with patch.object(ocr_client, "ncp_breaker", breaker):
+            breaker.record(False, 0.1)
+            breaker.record(False, 0.1)
+            self.assertEqual(ocr_client.ocr_routing(), "paddle")
+            now[0] += 1000
+            self.assertEqual(ocr_client.ocr_routing(), "probe")
+
+    def test_routing_without_ncp_config(self):
+        with patch.object(ocr_client, "ENDPOINT", None):
+            self.assertEqual(ocr_client.ocr_routing(), "paddle")
+        self.assertEqual(ocr_client.ocr_routing(), "ncp")
+
+
+class FakePaddle:
+    """입력 배열 크기를 기록하고 정해진 텍스트를 PaddleOCR 결과 형식으로 반환"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.shapes = []
+
+    def ocr(self, image_array, cls=True):
+        self.shapes.append(image_array.shape)
+        texts = self.responses.pop(0)
+        return [[[None, (text, 0.9)] for text in texts]]
+
+
+class TestPaddleTableCrop(unittest.TestCase):
+    """표 영역만 먼저 인식하고 부족하면 전체 이미지로 다시 인식하는지 테스트"""
+
+    def setUp(self):
+        buffer = BytesIO()
+        package_photo().save(buffer, "PNG")
+        self.image_bytes = buffer.getvalue()
+        for patcher in (patch.object(ocr_client, "TABLE_CROP", True), patch.object(image_decode, "DECODE_MAX_DIM", 0)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_paddle(self, fake):
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=fake):
+            return ocr_client.paddle_ocr_process(self.image_bytes, "label.png")
+
+    def test_crop_only(self):
+        fake = FakePaddle(SAMPLE_OCR_TEXTS)
+        result = self.run_paddle(fake)
+        self.assertEqual(len(fake.shapes), 1)
+        height, width = fake.shapes[0][:2]
+        self.assertLess(height * width, 2000 * 3000 / 4)
+        self.assertEqual(len(result["images"][0]["fields"]), len(SAMPLE_OCR_TEXTS))
+
+    def test_fallback_to_full_image(self):
+        fake = FakePaddle(["영양정보"], SAMPLE_OCR_TEXTS)
+        result = self.run_paddle(fake)
+        self.assertEqual([shape[:2] for shape in fake.shapes][1], (3000, 2000))
+        self.assertEqual(len(result["images"][0]["fields"]), len(SAMPLE_OCR_TEXTS))
+
+    def test_disabled(self):
+        fake = FakePaddle(SAMPLE_OCR_TEXTS)
+        with patch.object(ocr_client, "TABLE_CROP", False):
+            self.run_paddle(fake)
+        self.assertEqual(fake.shapes[0][:2], (3000, 2000))
+
+
+class FakeResolutionPaddle:
+    """입력 크기에 따라 다른 결과를 돌려주는 가짜 PaddleOCR (작은 1차 이미지/고해상도 전체/줄 영역)"""
+
+    def __init__(self, first, full=None, strip=None):
+        self.first, self.full, self.strip = first, full, strip
+        self.calls = []
+
+    def ocr(self, image_array, cls=True):
+        height = image_array.shape[0]
+        self.calls.append((image_array.shape[:2], cls))
+        if height < 500:
+            texts = self.strip
+        elif height <= 1000:
+            texts = self.first
+        else:
+            texts = self.full
+        return [[[[[0, y], [300, y], [300, y + 20], [0, y + 20]], (text, confidence)]
+                 for text, confidence, y in texts]]
+
+
+class TestPaddleReocr(unittest.TestCase):
+    """주요 영양성분이 없거나 신뢰도가 낮을 때 2차 인식하는지 테스트"""
+
+    FIRST = [("열량 250kcal", 0.95, 100), ("탄수화물 30g", 0.95, 140), ("당류 10g", 0.95, 180),
+             ("지방 12g", 0.95, 220), ("단백질 8g", 0.95, 260)]
+
+    def setUp(self):
+        buffer = BytesIO()
+        package_photo().save(buffer, "PNG")  # 2000x3000
+        self.image_bytes = buffer.getvalue()
+        for patcher in (patch.object(ocr_client, "REOCR_ENABLED", True), patch.object(ocr_client, "TABLE_CROP", False),
+                        patch.object(ocr_client, "FIRST_PASS_MAX_DIM", 1000), patch.object(ocr_client, "REOCR_MAX_DIM", 0)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_paddle(self, fake):
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=fake):
+            result = ocr_client.paddle_ocr_process(self.image_bytes, "label.png")
+        return parse_ocr_payload(result), result
+
+    def test_no_second_pass_when_complete(self):
+        fake = FakeResolutionPaddle(self.FIRST + [("나트륨 500mg", 0.95, 300)])
+        values, _ = self.run_paddle(fake)
+        self.assertEqual(values["sodium_mg"], 500)
+        self.assertEqual(len(fake.calls), 1)
+        self.assertEqual(fake.calls[0][0], (1000, 667))  # 싼 해상도로 1차 인식
+
+    def test_missing_field_uses_full_resolution(self):
+        full = self.FIRST + [("나트륨 500mg", 0.95, 900)]
+        fake = FakeResolutionPaddle(self.FIRST, full=full)
+        before = metrics.OCR_SECOND_PASSES.labels("full", "improved").get()
+        values, _ = self.run_paddle(fake)
+        self.assertEqual(values["sodium_mg"], 500)
+        self.assertEqual(fake.calls[1], ((3000, 2000), True))
+        self.assertEqual(metrics.OCR_SECOND_PASSES.labels("full", "improved").get(), before + 1)
+
+    def test_missing_field_still_missing_keeps_first(self):
+        fake = FakeResolutionPaddle(self.FIRST, full=[("열량 250kcal", 0.95, 300)])
+        values, _ = self.run_paddle(fake)
+        self.assertIsNone(values["sodium_mg"])
+        self.assertEqual(values["protein_g"], 8)
+
+    def test_low_confidence_line_reocr(self):
+        first = self.FIRST + [("나트륨 800mg", 0.6, 300)]
+        fake = FakeResolutionPaddle(first, strip=[("나트륨 500mg", 0.97, 5)])
+        values, result = self.run_paddle(fake)
+        self.assertEqual(values["sodium_mg"], 500)
+        self.assertEqual(len(fake.calls), 2)
+        (height, width), cls = fake.calls[1]
+        self.assertEqual((width, cls), (2000, True))
+        self.assertLess(height, 200)  # 해당 줄만 고해상도로
+        texts = [f["inferText"] for f in result["images"][0]["fields"]]
+        self.assertEqual(texts, [text for text, _, _ in self.FIRST] + ["나트륨 500mg"])
+
+    def test_low_confidence_not_improved(self):
+        first = self.FIRST + [("나트륨 800mg", 0.6, 300)]
+        fake = FakeResolutionPaddle(first, strip=[("나트륨 300mg", 0.55, 5)])
+        values, _ = self.run_paddle(fake)
+        self.assertEqual(values["sodium_mg"], 800)
+
+
+class FakeOrientedPaddle:
+    """방향 분류기 투표 결과를 정해 두고 ocr() 호출 인자를 기록하는 가짜 PaddleOCR"""
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.sample_calls = []
+        self.calls = []
+
+    def text_classifier(self, crops):
+        self.sample_calls.append(len(crops))
+        return crops, [(label, 0.99) for label in (self.labels * len(crops))[:len(crops)]], 0.0
+
+    def ocr(self, image_array, cls=True):
+        self.calls.append((np.array(image_array), cls))
+        return [[]]
+
+
+class TestPaddleOrientation(unittest.TestCase):
+    """방향을 미리 맞추고 글자 조각별 방향 분류를 건너뛰는지 테스트"""
+
+    def setUp(self):
+        self.page = text_page()
+        buffer = BytesIO()
+        self.page.save(buffer, "PNG")
+        self.image_bytes = buffer.getvalue()
+        patcher = patch.object(ocr_client, "TABLE_CROP", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_paddle(self, fake, image_bytes=None):
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=fake):
+            ocr_client.paddle_ocr_process(image_bytes or self.image_bytes, "label.png")
+        self.assertEqual(len(fake.calls), 1)
+        return fake.calls[0]
+
+    def test_upright_skips_classifier(self):
+        before = metrics.OCR_ORIENTATIONS.labels("0").get()
+        fake = FakeOrientedPaddle(["0"])
+        array, cls = self.run_paddle(fake)
+        self.assertFalse(cls)
+        self.assertEqual(fake.sample_calls, [6])
+        np.testing.assert_array_equal(array, np.array(self.page))
+        self.assertEqual(metrics.OCR_ORIENTATIONS.labels("0").get(), before + 1)
+
+    def test_upside_down_rotated_once(self):
+        fake = FakeOrientedPaddle(["180"])
+        array, cls = self.run_paddle(fake)
+        self.assertFalse(cls)
+        np.testing.assert_array_equal(array, np.array(self.page.transpose(Image.ROTATE_180)))
+
+    def test_sideways_rotated(self):
+        buffer = BytesIO()
+        self.page.transpose(Image.ROTATE_270).save(buffer, "PNG")
+        array, cls = self.run_paddle(FakeOrientedPaddle(["0"]), buffer.getvalue())
+        self.assertFalse(cls)
+        self.assertEqual(array.shape[:2], (900, 1200))
+
+    def test_split_vote_uses_classifier(self):
+        before = metrics.OCR_ORIENTATIONS.labels("ambiguous").get()
+        _, cls = self.run_paddle(FakeOrientedPaddle(["0", "180"]))
+        self.assertTrue(cls)
+        self.assertEqual(metrics.OCR_ORIENTATIONS.labels("ambiguous").get(), before + 1)
+
+    def test_disabled(self):
+        fake = FakeOrientedPaddle(["0"])
+        with patch.object(ocr_client, "ORIENTATION_CHECK", False):
+            _, cls = self.run_paddle(fake)
+        self.assertTrue(cls)
+        self.assertEqual(fake.sample_calls, [])
+
+
+class FakePaddleSystem:
+    """PaddleOCR의 검출/방향 분류/인식 단계를 흉내 (인식 결과는 조각의 밝기로 이미지 번호를 표시)"""
+
+    use_angle_cls = True
+
+    def __init__(self):
+        self.rec_batches = []
+        self.cls_batches = []
+
+    def text_detector(self, image_array):
+        height, width = image_array.shape[:2]
+        boxes = [[[x, 0], [x + 40, 0], [x + 40, height], [x, height]] for x in range(0, width - 40, 50)]
+        return np.array(boxes, dtype=np.float32), 0.0
+
+    def text_classifier(self, crops):
+        self.cls_batches.append(len(crops))
+        return crops, [("0", 1.0)] * len(crops), 0.0
+
+    def text_recognizer(self, crops):
+        self.rec_batches.append(len(crops))
+        return [(f"img{int(round(crop.mean() / 10))}", 0.9) for crop in crops], 0.0
+
+
+def solid_png(value, width):
+    buffer = BytesIO()
+    Image.new("L", (width, 60), value).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class TestPaddleBatch(unittest.TestCase):
+    """여러 이미지의 글자 조각을 모아 배치 인식하는 paddle_ocr_batch 테스트"""
+
+    def test_pools_crops_and_splits_results(self):
+        fake = FakePaddleSystem()
+        images = [(solid_png(index * 10, width), f"{index}.png") for index, width in ((1, 200), (2, 300), (3, 120))]
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=fake), patch.object(ocr_client, "TABLE_CROP", False):
+            results = ocr_client.paddle_ocr_batch(images, batch_size=4)
+
+        self.assertEqual(len(results), 3)
+        counts = [len(r["images"][0]["fields"]) for r in results]
+        self.assertEqual(counts, [4, 6, 2])
+        for index, result in enumerate(results, 1):
+            self.assertEqual(result["images"][0]["name"], f"{index}.png")
+            self.assertEqual({f["inferText"] for f in result["images"][0]["fields"]}, {f"img{index}"})
+        # 이미지 경계를 넘어 4개씩 묶어 인식
+        self.assertEqual(fake.rec_batches, [4, 4, 4])
+
+    def test_records_per_image_latency(self):
+        """배치 소요 시간을 이미지 한 장당 평균으로 기록 (배치 반복 변수와 타이머가 섞이지 않음)"""
+        fake = FakePaddleSystem()
+        images = [(solid_png(10, 200), "a.png"), (solid_png(20, 300), "b.png")]
+        histogram = metrics.OCR_SECONDS.labels("paddle_batch")
+        count, total = histogram.snapshot()[1:3]
+        started = time.perf_counter()
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=fake), patch.object(ocr_client, "TABLE_CROP", False):
+            ocr_client.paddle_ocr_batch(images, batch_size=2)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(histogram.snapshot()[1], count + 2)
+        self.assertLessEqual(histogram.snapshot()[2] - total, elapsed)
+
+    def test_classifier_only_for_ambiguous_images(self):
+        """방향을 맞춘 이미지의 글자 조각은 방향 분류기에 넣지 않음"""
+        fake = FakePaddleSystem()
+        buffer = BytesIO()
+        text_page().save(buffer, "PNG")
+        images = [(buffer.getvalue(), "page.png"), (solid_png(10, 200), "blank.png")]
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=fake), patch.object(ocr_client, "TABLE_CROP", False):
+            ocr_client.paddle_ocr_batch(images, batch_size=64)
+        # 첫 이미지의 방향 투표(6줄) + 방향이 애매한 빈 이미지의 글자 조각(4개)만 분류
+        self.assertEqual(fake.cls_batches, [6, 4])
+
+    def test_oversize_image_tiled_outside_batch(self):
+        """PADDLE_OCR_TILE=1이면 타일보다 큰 이미지는 검출기에 통째로 넣지 않고 타일 분할 인식"""
+        fake = FakePaddleSystem()
+        images = [(solid_png(10, 200), "small.png"), (solid_png(20, 3000), "wide.png")]
+        tiled = [{"inferText": "tiled", "inferTextRaw": "tiled", "confidence": 0.9}]
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=fake), patch.object(ocr_client, "TABLE_CROP", False), \
+                patch.object(ocr_client, "TILE_ENABLED", True), patch.object(image_decode, "TILE_ENABLED", True), \
+                patch.object(ocr_client, "paddle_tiled_fields", return_value=tiled) as tiled_fields:
+            results = ocr_client.paddle_ocr_batch(images, batch_size=64)
+
+        self.assertEqual(tiled_fields.call_args[0][0].shape[1], 3000)
+        self.assertEqual(results[1]["images"][0]["fields"], tiled)
+        self.assertEqual(results[1]["images"][0]["name"], "wide.png")
+        self.assertEqual({f["inferText"] for f in results[0]["images"][0]["fields"]}, {"img1"})
+        self.assertEqual(fake.rec_batches, [4])  # 작은 이미지의 글자 조각만 배치 인식
+
+
+class TestPaddleThreads(unittest.TestCase):
+    """PaddleOCR 인스턴스를 스레드 간에 공유하지 않는지 테스트"""
+
+    def test_instance_per_thread(self):
+        module = type(sys)("paddleocr")
+        module.PaddleOCR = lambda **kwargs: object()
+        instances = []
+        with patch.dict(sys.modules, {"paddleocr": module}):
+            for _ in range(2):
+                thread = threading.Thread(target=lambda: instances.extend([ocr_client.get_paddle_ocr()] * 2))
+                thread.start()
+                thread.join()
+        self.assertIs(instances[0], instances[1])
+        self.assertIsNot(instances[0], instances[2])
+
+    def test_inference_on_paddle_workers(self):
+        """요청/헤지 스레드가 아니라 PaddleOCR 작업 스레드에서 인식"""
+        names = []
+
+        class Recorder(FakePaddleSystem):
+            def text_detector(self, image_array):
+                names.append(threading.current_thread().name)
+                return super().text_detector(image_array)
+
+            def ocr(self, image_array, cls=True):
+                names.append(threading.current_thread().name)
+                return [[]]
+
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=Recorder()), \
+                patch.object(ocr_client, "TABLE_CROP", False):
+            ocr_client.paddle_ocr_process(solid_png(10, 200), "a.png")
+            ocr_client.paddle_ocr_batch([(solid_png(10, 200), "b.png")])
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(name.startswith("ocr-paddle") for name in names))
+
+
+class FakeWordOcr:
+    """밝기 값이 다른 사각형을 단어로 보고 보이는 부분의 상자와 word<값>을 반환하는 가짜 PaddleOCR"""
+
+    def ocr(self, image_array, cls=True):
+        detections = []
+        for value in np.unique(image_array):
+            if value == 0:
+                continue
+            ys, xs = np.nonzero(image_array == value)
+            box = [[xs.min(), ys.min()], [xs.max() + 1, ys.min()], [xs.max() + 1, ys.max() + 1], [xs.min(), ys.max() + 1]]
+            detections.append([box, (f"word{value}", 0.9)])
+        return [detections]
+
+
+class TestPaddleTiled(unittest.TestCase):
+    """큰 이미지를 타일로 나눠 인식하고 합치는지 테스트"""
+
+    def test_words_found_once_with_global_coordinates(self):
+        image = np.zeros((300, 2600), dtype=np.uint8)
+        words = {10: (100, 50), 20: (950, 120), 30: (1230, 60), 40: (2450, 200)}  # 값: (x, y), 20/30은 겹침 영역
+        for value, (x, y) in words.items():
+            image[y:y + 30, x:x + 100] = value
+
+        with patch.object(ocr_client, "get_paddle_ocr", return_value=FakeWordOcr()), \
+                patch.object(ocr_client, "tile_boxes", lambda w, h: TILE_BOXES(w, h, size=1000, overlap=250)):
+            fields = ocr_client.paddle_tiled_fields(image)
+
+        self.assertEqual(sorted(f["inferText"] for f in fields), [f"word{v}" for v in sorted(words)])
+        for field in fields:
+            x, y = words[int(field["inferText"][4:])]
+            self.assertEqual(field["boundingPoly"]["vertices"][0], {"x": x, "y": y})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+PaddleOCR 선택적 재인식 도우미 유닛 테스트
+
+parser.parse_ocr_with_sources의 항목별 출처 field, ocr_refine.py의 재인식 대상 판단과
+줄 영역 계산/교체를 테스트합니다.
+"""
+
+import unittest
+
+from parser import parse_ocr_payload, parse_ocr_with_sources
+from ocr_refine import (field_box, reocr_plan, key_field_count, source_confidence, line_strip, replace_region,
+                        scale_fields, better_result)
+
+KEYS = ("calories_kcal", "sodium_mg", "protein_g")
+
+
+def field(text, confidence=0.95, y=None, x=10, width=200, height=20):
+    f = {"inferText": text, "inferTextRaw": text, "confidence": confidence}
+    if y is not None:
+        f["boundingPoly"] = {"vertices": [{"x": x, "y": y}, {"x": x + width, "y": y},
+                                          {"x": x + width, "y": y + height}, {"x": x, "y": y + height}]}
+    return f
+
+
+def payload(*fields):
+    return {"images": [{"fields": list(fields)}]}
+
+
+class TestParseSources(unittest.TestCase):
+    """항목별로 값을 읽은 field 추적 테스트"""
+
+    def test_same_line(self):
+        sodium = field("나트륨 500mg")
+        values, sources = parse_ocr_with_sources(payload(field("열량 250kcal"), sodium))
+        self.assertEqual(values["sodium_mg"], 500)
+        self.assertIs(sources["sodium_mg"][0], sodium)
+        self.assertEqual(len(sources["sodium_mg"]), 1)
+
+    def test_split_lines(self):
+        """키워드와 값이 다른 field로 나뉜 경우 둘 다 출처"""
+        keyword, value = field("단백질"), field("8g", confidence=0.6)
+        values, sources = parse_ocr_with_sources(payload(field("나트륨 500mg"), keyword, value, field("지방 3g")))
+        self.assertEqual(values["protein_g"], 8)
+        self.assertEqual([id(f) for f in sources["protein_g"]], [id(keyword), id(value)])
+
+    def test_payload_result_unchanged(self):
+        ocr_json = payload(field("열량 250kcal"), field("단백질"), field("8g"))
+        self.assertEqual(parse_ocr_payload(ocr_json), parse_ocr_with_sources(ocr_json)[0])
+
+
+class TestReocrPlan(unittest.TestCase):
+    """재인식 대상 판단 테스트"""
+
+    def test_missing_and_low_confidence(self):
+        ocr_json = payload(field("열량 250kcal"), field("나트륨 500mg", confidence=0.6))
+        missing, low = reocr_plan(ocr_json, keys=KEYS, threshold=0.8)
+        self.assertEqual(missing, ["protein_g"])
+        self.assertEqual(list(low), ["sodium_mg"])
+        self.assertAlmostEqual(source_confidence(ocr_json, "sodium_mg"), 0.6)
+        self.assertIsNone(source_confidence(ocr_json, "protein_g"))
+
+    def test_nothing_to_do(self):
+        ocr_json = payload(field("열량 250kcal"), field("나트륨 500mg"), field("단백질 8g"))
+        self.assertEqual(reocr_plan(ocr_json, keys=KEYS, threshold=0.8), ([], {}))
+
+    def test_better_result(self):
+        first = payload(field("열량 250kcal"))
+        second = payload(field("열량 250kcal"), field("단백질 8g"))
+        self.assertEqual(key_field_count(second, KEYS), 2)
+        self.assertIs(better_result(first, second, KEYS), second)
+        self.assertIs(better_result(second, payload(field("단백질 8g"), field("열량 1kcal")), KEYS), second)
+
+
+class TestRegions(unittest.TestCase):
+    """줄 영역 계산/교체 테스트"""
+
+    def test_line_strip_spans_width(self):
+        strip = line_strip([field("단백질", y=100, x=10, width=80), field("8g", y=104, x=300, width=40)], (1000, 800))
+        self.assertEqual(strip, (0.0, 88.0, 1000.0, 136.0))
+
+    def test_line_strip_without_boxes(self):
+        self.assertIsNone(line_strip([field("단백질 8g")], (1000, 800)))
+
+    def test_replace_region_keeps_order(self):
+        fields = [field("열량 250kcal", y=50), field("나트륨", y=100), field("5OOmg", y=100, x=300), field("단백질 8g", y=150)]
+        new = [field("나트륨 500mg", y=100)]
+        replaced = replace_region(fields, (0, 90, 1000, 130), new)
+        self.assertEqual([f["inferText"] for f in replaced], ["열량 250kcal", "나트륨 500mg", "단백질 8g"])
+
+    def test_scale_fields(self):
+        scaled = scale_fields([field("열량", y=10, x=20, width=30, height=5), field("박스 없음")], 2.0)
+        self.assertEqual(field_box(scaled[0]), (40.0, 20.0, 100.0, 30.0))
+        self.assertNotIn("boundingPoly", scaled[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+타일 분할 OCR 유닛 테스트
+
+ocr_tiles.py의 타일 좌표 계산과 타일별 검출 결과 병합(좌표 변환, 잘린/중복 글자 정리)을 테스트합니다.
+"""
+
+import unittest
+
+from ocr_tiles import tile_boxes, needs_tiling, merge_tile_detections
+
+
+def quad(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+class TestTileBoxes(unittest.TestCase):
+    """tile_boxes 함수 테스트"""
+
+    def test_covers_image_with_overlap(self):
+        tiles = tile_boxes(2500, 1000, size=1000, overlap=200)
+        self.assertEqual(tiles, [(0, 0, 1000, 1000), (800, 0, 1800, 1000), (1500, 0, 2500, 1000)])
+
+    def test_small_image_single_tile(self):
+        self.assertEqual(tile_boxes(500, 400, size=1000, overlap=100), [(0, 0, 500, 400)])
+        self.assertFalse(needs_tiling(500, 400, size=1000))
+        self.assertTrue(needs_tiling(500, 1400, size=1000))
+
+    def test_grid(self):
+        tiles = tile_boxes(1800, 1800, size=1000, overlap=200)
+        self.assertEqual(len(tiles), 4)
+        self.assertEqual(tiles[-1], (800, 800, 1800, 1800))
+
+
+class TestMergeTileDetections(unittest.TestCase):
+    """merge_tile_detections 함수 테스트"""
+
+    image_size = (1800, 1000)
+    left = (0, 0, 1000, 1000)
+    right = (800, 0, 1800, 1000)
+
+    def test_remaps_coordinates(self):
+        merged = merge_tile_detections([(self.right, [(quad(300, 10, 400, 40), "나트륨", 0.9)])], self.image_size)
+        self.assertEqual(merged, [((1100, 10, 1200, 40), "나트륨", 0.9)])
+
+    def test_overlap_duplicate_keeps_best(self):
+        """겹침 영역에서 두 번 인식된 글자는 신뢰도가 높은 쪽만 남김"""
+        merged = merge_tile_detections([
+            (self.left, [(quad(850, 10, 950, 40), "단백질", 0.8)]),
+            (self.right, [(quad(50, 12, 150, 41), "단백질", 0.95)]),
+        ], self.image_size)
+        self.assertEqual([(text, confidence) for _, text, confidence in merged], [("단백질", 0.95)])
+
+    def test_drops_text_cut_by_tile_edge(self):
+        """타일 안쪽 경계에서 잘린 글자 대신 이웃 타일의 온전한 글자 사용"""
+        merged = merge_tile_detections([
+            (self.left, [(quad(900, 10, 1000, 40), "탄수", 0.99)]),
+            (self.right, [(quad(100, 10, 300, 40), "탄수화물 14g", 0.9)]),
+        ], self.image_size)
+        self.assertEqual([text for _, text, _ in merged], ["탄수화물 14g"])
+
+    def test_keeps_cut_text_without_complete_copy(self):
+        merged = merge_tile_detections([(self.left, [(quad(700, 10, 1000, 40), "아주 긴 문장", 0.9)])], self.image_size)
+        self.assertEqual(len(merged), 1)
+
+    def test_reading_order(self):
+        merged = merge_tile_detections([
+            (self.right, [(quad(100, 10, 200, 40), "B", 0.9)]),
+            (self.left, [(quad(100, 10, 200, 40), "A", 0.9), (quad(100, 100, 200, 130), "C", 0.9)]),
+        ], self.image_size)
+        self.assertEqual([text for _, text, _ in merged], ["A", "B", "C"])
+
+
+if __name__ == "__main__":
+    unittest.main()
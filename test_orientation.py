@@ -0,0 +1,91 @@
+"""
+이미지 방향 판단 유닛 테스트
+
+orientation.py의 글자 줄 방향 판단, 방향 투표용 글자 줄 선택, 투표 집계를 테스트합니다.
+"""
+
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from orientation import rotate, small_gray, text_direction, text_bands, vote
+from test_table_region import package_photo
+
+
+def text_page(lines=10, size=(1200, 900), rules=False):
+    """왼쪽 정렬된 영문 글자 줄이 있는 이미지 (rules=True면 줄 사이에 표 구분선)"""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=40)
+    for i in range(lines):
+        draw.text((60, 60 + i * 80), f"Nutrition {i} sodium 500mg", fill="black", font=font)
+        if rules:
+            draw.line((40, 125 + i * 80, size[0] - 40, 125 + i * 80), fill="black", width=4)
+    return image
+
+
+class TestTextDirection(unittest.TestCase):
+    """text_direction 테스트"""
+
+    def test_horizontal(self):
+        for image in (text_page(), package_photo(), Image.open("sample/info.jpg")):
+            self.assertEqual(text_direction(small_gray(image)), "horizontal")
+
+    def test_vertical(self):
+        for image in (text_page(), package_photo(), Image.open("sample/info.jpg")):
+            self.assertEqual(text_direction(small_gray(rotate(image, 90))), "vertical")
+            self.assertEqual(text_direction(small_gray(rotate(image, 270))), "vertical")
+
+    def test_blank_is_ambiguous(self):
+        self.assertIsNone(text_direction(small_gray(Image.new("RGB", (400, 300), "white"))))
+
+
+class TestTextBands(unittest.TestCase):
+    """방향 투표용 글자 줄 선택 테스트"""
+
+    def test_bands_cover_text_lines(self):
+        image = text_page(rules=True)
+        bands = text_bands(small_gray(image), image.size, count=4)
+        self.assertEqual(len(bands), 4)
+        for left, top, right, bottom in bands:
+            self.assertLess(bottom - top, 80)  # 한 줄씩 (구분선 사이)
+            self.assertLessEqual(right - left, 8 * (bottom - top) + 1)
+            line = (top - 60) // 80
+            self.assertLessEqual(top, 60 + line * 80 + 12)
+            self.assertGreaterEqual(bottom, 60 + line * 80 + 30)
+
+    def test_scaled_to_original_coordinates(self):
+        image = text_page(size=(2400, 1800))
+        for left, top, right, bottom in text_bands(small_gray(image), image.size):
+            self.assertLessEqual(right, 2400)
+            self.assertLessEqual(bottom, 1800)
+        self.assertTrue(text_bands(small_gray(image), image.size))
+
+    def test_no_text(self):
+        image = Image.new("RGB", (400, 300), "white")
+        self.assertEqual(text_bands(small_gray(image), image.size), [])
+
+
+class TestVote(unittest.TestCase):
+    """방향 분류 결과 투표 테스트"""
+
+    def test_agreement(self):
+        self.assertEqual(vote([("0", 0.99)] * 5), 0)
+        self.assertEqual(vote([("180", 0.97)] * 4 + [("0", 0.95)]), 180)
+
+    def test_ambiguous(self):
+        self.assertIsNone(vote([("0", 0.99)] * 3 + [("180", 0.99)] * 3))
+        self.assertIsNone(vote([("0", 0.6)] * 6))  # 점수가 낮음
+        self.assertIsNone(vote([("0", 0.99)] * 2))  # 표본이 적음
+
+    def test_rotate(self):
+        image = Image.new("L", (30, 20))
+        self.assertEqual(rotate(image, 90).size, (20, 30))
+        self.assertIs(rotate(image, 0), image)
+        array = np.arange(6, dtype=np.uint8).reshape(2, 3)
+        np.testing.assert_array_equal(np.asarray(rotate(Image.fromarray(array), 90)), np.rot90(array))
+
+
+if __name__ == "__main__":
+    unittest.main()
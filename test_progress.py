@@ -0,0 +1,64 @@
+"""
+진행 상황 전송기 유닛 테스트
+
+progress.py의 room 지정, 중복/과다 이벤트 억제를 테스트합니다.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from progress import ProgressReporter, NULL_PROGRESS, new_progress_token, valid_progress_token
+
+
+class TestProgressReporter(unittest.TestCase):
+    """ProgressReporter 테스트"""
+
+    def setUp(self):
+        self.socketio = Mock()
+        self.token = new_progress_token()
+        self.reporter = ProgressReporter(self.socketio, self.token, min_interval=10)
+
+    def test_emits_to_room(self):
+        self.assertTrue(self.reporter.emit('upload', 0, '시작', total_files=2))
+        self.socketio.emit.assert_called_once_with(
+            'analysis_progress',
+            {'step': 'upload', 'progress': 0, 'message': '시작', 'total_files': 2},
+            room=self.token)
+
+    def test_invalid_token_disables(self):
+        """토큰이 없거나 형식이 틀리면 아무에게도 전송하지 않음 (브로드캐스트 금지)"""
+        for token in (None, '', 'other-room', self.token.upper()):
+            reporter = ProgressReporter(self.socketio, token)
+            self.assertFalse(reporter.emit('upload', 0, '시작'))
+        self.assertFalse(NULL_PROGRESS.emit('upload', 0, '시작'))
+        self.socketio.emit.assert_not_called()
+        self.assertFalse(valid_progress_token('../x'))
+
+    def test_duplicate_and_throttled_events_skipped(self):
+        """같은 이벤트 반복과 같은 단계의 잦은 중간 갱신은 생략, 단계 전환/0/100%는 전송"""
+        self.reporter.emit('nutrition', 0, '시작')
+        self.reporter.emit('nutrition', 0, '시작')
+        self.reporter.emit('nutrition', 20, '합계')
+        self.reporter.emit('nutrition', 40, '정규화')
+        self.reporter.emit('nutrition', 100, '완료')
+        self.reporter.emit('recommendation', 25, '남성')
+        sent = [c.args[1]['progress'] for c in self.socketio.emit.call_args_list]
+        self.assertEqual(sent, [0, 100, 25])
+        self.assertEqual(self.reporter.skipped, 3)
+
+    def test_intermediate_sent_after_interval(self):
+        reporter = ProgressReporter(self.socketio, self.token, min_interval=0.5)
+        with patch('progress.time.monotonic', side_effect=[0.0, 0.1, 1.0]):
+            reporter.emit('ocr', 0, '시작')
+            reporter.emit('ocr', 30, '1/3')
+            reporter.emit('ocr', 60, '2/3')
+        sent = [c.args[1]['progress'] for c in self.socketio.emit.call_args_list]
+        self.assertEqual(sent, [0, 60])
+
+    def test_emit_errors_ignored(self):
+        self.socketio.emit.side_effect = RuntimeError("no socket")
+        self.assertTrue(self.reporter.emit('upload', 0, '시작'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
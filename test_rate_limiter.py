@@ -0,0 +1,110 @@
+"""
+Rate Limiter 유닛 테스트
+
+rate_limiter.py의 요청/토큰 버킷과 AIMD 속도 조절을 테스트합니다.
+"""
+
+import os
+import tempfile
+import sqlite3
+import time
+import unittest
+from unittest.mock import patch
+
+import rate_limiter
+from rate_limiter import RateLimiter, estimate_tokens, MIN_SCALE, IDLE_RECOVERY_SECONDS
+
+
+class TestRateLimiter(unittest.TestCase):
+    """RateLimiter 클래스 테스트"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.limiter = RateLimiter(db_path=self.db_path, qps=2.0, tpm=600)
+
+    def tearDown(self):
+        os.unlink(self.db_path)
+
+    def test_burst_then_wait(self):
+        """버킷 용량만큼 즉시 허용 후 대기 시간 반환 테스트"""
+        self.assertEqual(self.limiter.try_acquire(10), 0.0)
+        self.assertEqual(self.limiter.try_acquire(10), 0.0)
+        self.assertGreater(self.limiter.try_acquire(10), 0.0)
+
+    def test_token_budget(self):
+        """토큰 예산 초과 시 대기 테스트"""
+        self.assertEqual(self.limiter.try_acquire(600), 0.0)
+        # 분당 600 토큰 = 초당 10 토큰 -> 100 토큰은 약 10초 필요
+        self.assertGreater(self.limiter.try_acquire(100), 5.0)
+
+    def test_acquire_deadline(self):
+        """대기 허용 시간 초과 시 False 반환 테스트"""
+        self.assertTrue(self.limiter.acquire(600, timeout=0.1))
+        self.assertFalse(self.limiter.acquire(600, timeout=0.1))
+
+    def test_acquire_waits_for_refill(self):
+        """짧은 대기 후 허용 테스트"""
+        self.limiter.try_acquire(0)
+        self.limiter.try_acquire(0)
+        self.assertTrue(self.limiter.acquire(0, timeout=2.0))
+
+    def test_aimd(self):
+        """429 시 절반 감소, 성공 시 점진 회복, 실패 시 회복분 감소 테스트"""
+        self.assertAlmostEqual(self.limiter.on_throttled(), 0.5)
+        self.assertAlmostEqual(self.limiter.on_throttled(), 0.25)
+        self.assertAlmostEqual(self.limiter.on_success(), 0.30)
+        self.assertAlmostEqual(self.limiter.on_error(), 0.25)  # 끊긴 응답은 회복분만큼 감소
+        for _ in range(20):
+            self.limiter.on_throttled()
+        self.assertAlmostEqual(self.limiter.scale, MIN_SCALE)
+
+    def test_min_scale_fits_max_wait(self):
+        """가장 느린 속도에서도 요청 1건은 대기 허용 시간 안에 허용되는지 테스트"""
+        limiter = RateLimiter(db_path=self.db_path, qps=1.0, tpm=600, name="slow", max_wait=10)
+        self.assertAlmostEqual(limiter.min_scale, 0.1)  # MIN_SCALE(0.05)이면 요청 1건에 20초
+        for _ in range(20):
+            limiter.on_throttled()
+        self.assertAlmostEqual(limiter.scale, 0.1)
+        self.assertLessEqual(limiter.try_acquire(0), 10)
+
+    def test_stored_scale_recovers_on_start(self):
+        """이전 실행에서 줄어든 속도가 시작할 때 쉬었던 시간만큼 회복되는지 테스트"""
+        for _ in range(3):
+            self.limiter.on_throttled()
+        self.assertAlmostEqual(RateLimiter(db_path=self.db_path, qps=2.0, tpm=600).scale, 0.125, places=2)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE buckets SET updated = ?", (time.time() - IDLE_RECOVERY_SECONDS / 2,))
+        self.assertAlmostEqual(RateLimiter(db_path=self.db_path, qps=2.0, tpm=600).scale, 0.625, places=2)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE buckets SET scale = 0.01")  # 하한이 더 낮던 설정에서 저장된 값
+        self.assertAlmostEqual(RateLimiter(db_path=self.db_path, qps=1.0, tpm=600, max_wait=5).scale, 0.2, places=2)
+
+    def test_unusable_db_disables_limiter(self):
+        """DB를 열 수 없으면 임포트가 실패하지 않고 제한기 없이 동작하는지 테스트"""
+        error = sqlite3.OperationalError("unable to open database file")
+        with patch.object(rate_limiter, "_rate_limiter", None), \
+                patch.object(rate_limiter, "RateLimiter", side_effect=error):
+            with self.assertLogs("ncp.rate_limiter", "WARNING"):
+                self.assertIsNone(rate_limiter.get_rate_limiter())
+
+    def test_shared_state(self):
+        """같은 DB 파일을 쓰는 인스턴스 간 상태 공유 테스트"""
+        other = RateLimiter(db_path=self.db_path, qps=2.0, tpm=600)
+        self.limiter.on_throttled()
+        self.assertAlmostEqual(other.scale, 0.5)
+
+    def test_estimate_tokens(self):
+        """토큰 추정 테스트"""
+        request = {
+            "messages": [
+                {"role": "system", "content": [{"type": "text", "text": "가나다"}]},
+                {"role": "user", "content": "라마"},
+            ],
+            "maxTokens": 100,
+        }
+        self.assertEqual(estimate_tokens(request), 105)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
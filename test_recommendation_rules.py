@@ -0,0 +1,56 @@
+"""
+통계 기반 추천 규칙 엔진 유닛 테스트
+
+recommendation_rules.py의 문구 조각 캐시와 조합 결과를 테스트합니다.
+"""
+
+import unittest
+
+import recommendation_rules as rules
+
+
+class TestRecommendationRules(unittest.TestCase):
+    """규칙 엔진 테스트"""
+
+    def test_nutrient_name_lookup_order(self):
+        """원본 -> 소문자 -> 단위 제거 순 매핑"""
+        self.assertEqual(rules.nutrient_name('sodium_mg'), '나트륨')
+        self.assertEqual(rules.nutrient_name('CALORIES_KCAL'), '칼로리')
+        self.assertEqual(rules.nutrient_name('vitamin_d_ug'), '비타민D')
+        self.assertEqual(rules.nutrient_name('unknown_key'), 'unknown_key')
+
+    def test_render_line_sections(self):
+        """섹션별 문구 조각"""
+        self.assertEqual(rules.render_line('deficient', 'female', 'iron_mg'), "• 철분: 소고기, 시금치, 굴, 콩류\n")
+        self.assertEqual(rules.render_line('deficient', 'male', 'carbs_g'), "• 탄수화물: 균형 잡힌 식단\n")
+        self.assertEqual(rules.render_line('supplement', 'male', 'fiber_g'), "")
+        self.assertIn("줄일 음식", rules.render_line('reduction', 'male', 'sodium_mg'))
+        with self.assertRaises(ValueError):
+            rules.render_line('unknown', 'male', 'sodium_mg')
+
+    def test_fragments_are_cached(self):
+        """같은 (섹션, 성별, 영양소)는 캐시에서 재사용"""
+        rules.render_line.cache_clear()
+        rules.render_comprehensive({'protein_g': 1}, {'sodium_mg': 1}, 'male', True)
+        rules.render_comprehensive({'protein_g': 2}, {'sodium_mg': 2}, 'male', False)
+        info = rules.render_line.cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 2)
+
+    def test_comprehensive_top_n(self):
+        """종합 추천은 종류별 상위 3개만 표시"""
+        deficient = {'protein_g': 1, 'calcium_mg': 1, 'iron_mg': 1, 'fiber_g': 1}
+        result = rules.render_comprehensive(deficient, {}, 'male', False)
+        self.assertIn('철분', result)
+        self.assertNotIn('식이섬유', result)
+        self.assertIn('4개 영양소 개선이 필요', result)
+
+    def test_invalid_gender_uses_female_rules(self):
+        """male 이외의 성별은 여성 기준"""
+        result = rules.render_supplement({'iron_mg': 1}, 'invalid', False)
+        self.assertIn('굴', result)
+        self.assertIn('여성', result)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
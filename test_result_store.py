@@ -0,0 +1,73 @@
+"""
+분석 결과 저장소 유닛 테스트
+
+result_store.py의 저장/갱신, HTML 캐시 무효화, 스트리밍 누적 본문 공유, 보관 정책을 테스트합니다.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from result_store import ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+    """ResultStore 테스트"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.store = ResultStore(os.path.join(self.tmp_dir, 'results.sqlite3'), ttl=100, max_rows=3)
+
+    def test_save_and_get(self):
+        self.store.save('a', {'totals': {'calories_kcal': 500.0}, 'recommendation_status': 'pending'})
+        self.assertEqual(self.store.get('a')['totals'], {'calories_kcal': 500.0})
+        self.assertIsNone(self.store.get('missing'))
+        self.assertIsNone(self.store.update('missing', {'x': 1}))
+
+    def test_update_invalidates_html(self):
+        self.store.save('a', {'recommendation_status': 'pending'})
+        _, version = self.store.get_versioned('a')
+        self.store.set_html('a', '<html>pending</html>', version)
+        self.assertEqual(self.store.get_html('a'), '<html>pending</html>')
+
+        updated = self.store.update('a', {'recommendation_status': 'complete'})
+        self.assertEqual(updated['recommendation_status'], 'complete')
+        self.assertIsNone(self.store.get_html('a'))
+
+        # 갱신 전에 렌더링한(이전 버전) HTML은 캐시하지 않음
+        self.store.set_html('a', '<html>pending</html>', version)
+        self.assertIsNone(self.store.get_html('a'))
+
+    def test_partial_shared_between_workers(self):
+        """다른 워커 프로세스(같은 DB 파일)에서 스트리밍 중인 누적 본문을 조회"""
+        self.store.save('a', {'recommendation_status': 'pending'})
+        _, version = self.store.get_versioned('a')
+        other = ResultStore(self.store.db_path, ttl=100, max_rows=3)
+        self.store.set_partial('a', {'male': '나트륨을'})
+        self.store.set_partial('a', {'male': '나트륨을 줄이세요', 'female': '당류'})
+        self.assertEqual(other.get_partial('a'), {'male': '나트륨을 줄이세요', 'female': '당류'})
+        self.assertEqual(other.get_versioned('a')[1], version)  # HTML 캐시는 무효화하지 않음
+        self.store.clear_partial('a')
+        self.assertIsNone(other.get_partial('a'))
+
+        self.store.set_partial('b', {'male': '끊긴 스트림'})
+        self.store.purge(now=time.time() + 1000)
+        self.assertIsNone(self.store.get_partial('b'))
+
+    def test_retention(self):
+        for name in 'abcde':
+            self.store.save(name, {})
+        self.assertEqual(self.store.purge(), 2)
+        self.assertIsNone(self.store.get('a'))
+        self.assertIsNotNone(self.store.get('e'))
+
+        # 보관 기간이 지난 결과는 조회되지 않고 정리 시 삭제
+        self.assertEqual(self.store.purge(now=time.time() + 1000), 3)
+        self.assertIsNone(self.store.get('e'))
+
+
+if __name__ == '__main__':
+    unittest.main()
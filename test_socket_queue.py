@@ -0,0 +1,153 @@
+"""
+Socket.IO 메시지 큐 백엔드 유닛 테스트
+
+socket_queue.py의 SQLite/Unix 소켓 매니저가 프로세스 간 메시지를 전달하는지 테스트합니다.
+"""
+
+import os
+import json
+import time
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from socket_queue import SQLiteManager, UnixSocketManager, SUBSCRIBE_LINE, start_broker, socketio_queue_options
+
+MESSAGE = {'method': 'emit', 'event': 'analysis_progress', 'data': [{'progress': 50}],
+           'namespace': '/', 'room': 'a' * 32, 'host_id': 'other-host'}
+
+
+def receive_while_publishing(listener, publish, attempts=100):
+    """listener의 첫 메시지를 받을 때까지 publish()를 반복 (구독 시작 시점과 무관하게 확인)"""
+    result = queue.Queue()
+    threading.Thread(target=lambda: result.put(next(listener._listen())), daemon=True).start()
+    for _ in range(attempts):
+        publish()
+        try:
+            return result.get(timeout=0.05)
+        except queue.Empty:
+            continue
+    raise AssertionError("메시지를 받지 못했습니다")
+
+
+class TestSQLiteManager(unittest.TestCase):
+    """SQLite 큐 테스트"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.url = "sqlite://" + os.path.join(self.temp_dir, "queue.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_publish_reaches_other_manager(self):
+        publisher = SQLiteManager(self.url, poll_interval=0.01)
+        listener = SQLiteManager(self.url, poll_interval=0.01)
+        publisher._publish({'method': 'old'})  # 구독 시작 전 메시지는 받지 않음
+        payload = receive_while_publishing(listener, lambda: publisher._publish(MESSAGE))
+        self.assertEqual(json.loads(payload), MESSAGE)
+
+    def test_channels_are_separate(self):
+        other = SQLiteManager(self.url, channel="other")
+        publisher = SQLiteManager(self.url)
+        listener = SQLiteManager(self.url, poll_interval=0.01)
+
+        def publish():
+            other._publish({'method': 'ignored'})
+            publisher._publish(MESSAGE)
+
+        self.assertEqual(json.loads(receive_while_publishing(listener, publish)), MESSAGE)
+
+
+class TestUnixSocketManager(unittest.TestCase):
+    """Unix 소켓 브로커 테스트"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "queue.sock")
+        self.broker = start_broker(self.path, client_buffer=50)
+
+    def tearDown(self):
+        self.broker.shutdown()
+        self.broker.server_close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_broker_fans_out(self):
+        listener = UnixSocketManager("unix://" + self.path)
+        publisher = UnixSocketManager("unix://" + self.path)
+        data = receive_while_publishing(listener, lambda: publisher._publish(MESSAGE))
+        self.assertEqual(data, MESSAGE)
+
+    def publish_many(self, publisher, count, timeout=10):
+        """2KB 메시지 count개를 발행하고, timeout 안에 끝나지 않으면 실패"""
+        done = threading.Event()
+
+        def run():
+            for i in range(count):
+                publisher._publish(dict(MESSAGE, data=[{'i': i, 'text': 'x' * 2048}]))
+            done.set()
+
+        threading.Thread(target=run, daemon=True).start()
+        self.assertTrue(done.wait(timeout), "발행이 막혔습니다")
+
+    def test_many_messages_in_order(self):
+        """구독자 버퍼보다 많은 메시지도 줄이 섞이지 않고 순서대로 전달"""
+        listener = UnixSocketManager("unix://" + self.path)
+        publisher = UnixSocketManager("unix://" + self.path)
+        received = queue.Queue()
+        threading.Thread(target=lambda: [received.put(m) for m in listener._listen()], daemon=True).start()
+        for _ in range(100):  # 구독 시작 확인
+            publisher._publish(MESSAGE)
+            try:
+                received.get(timeout=0.05)
+                break
+            except queue.Empty:
+                continue
+        self.publish_many(publisher, 40)
+        indexes = []
+        while len(indexes) < 40:
+            data = received.get(timeout=5)
+            if data.get('data', [{}])[0].get('i') is not None:
+                indexes.append(data['data'][0]['i'])
+        self.assertEqual(indexes, list(range(40)))
+
+    def test_stalled_subscriber_does_not_block_publisher(self):
+        """읽지 않는 구독자가 있어도 발행은 막히지 않고, 밀린 구독자는 연결이 끊김"""
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(stalled.close)
+        stalled.connect(self.path)
+        stalled.sendall(SUBSCRIBE_LINE)
+        while not self.broker.clients:
+            time.sleep(0.01)
+
+        publisher = UnixSocketManager("unix://" + self.path)
+        self.publish_many(publisher, 500)
+        deadline = time.time() + 5
+        while self.broker.clients and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.broker.clients), 0)  # 발행 연결은 구독자로 등록되지 않음
+
+        stalled.settimeout(5)
+        while stalled.recv(65536):  # 밀린 데이터 뒤 연결 종료(EOF)
+            pass
+
+
+class TestQueueOptions(unittest.TestCase):
+    """SOCKETIO_MESSAGE_QUEUE 설정 해석 테스트"""
+
+    def test_options(self):
+        self.assertEqual(socketio_queue_options(""), {})
+        self.assertEqual(socketio_queue_options("redis://localhost:6379/0"), {"message_queue": "redis://localhost:6379/0"})
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        options = socketio_queue_options("sqlite://" + os.path.join(temp_dir, "q.sqlite3"))
+        self.assertIsInstance(options["client_manager"], SQLiteManager)
+        options = socketio_queue_options("unix://" + os.path.join(temp_dir, "q.sock"))
+        self.assertIsInstance(options["client_manager"], UnixSocketManager)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
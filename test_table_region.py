@@ -0,0 +1,63 @@
+"""
+영양정보 표 영역 탐지 유닛 테스트
+
+table_region.py의 가로선 기반 표 영역 탐지를 테스트합니다.
+"""
+
+import unittest
+
+from PIL import Image, ImageDraw
+
+from table_region import find_table_region
+
+TABLE_BOX = (1000, 1500, 1800, 2700)
+
+
+def package_photo(mode="RGB", inverted=False):
+    """주황색 포장 위에 가로 구분선이 있는 영양정보 표가 있는 합성 사진"""
+    image = Image.new("RGB", (2000, 3000), (200, 120, 60))
+    draw = ImageDraw.Draw(image)
+    background, ink = ("black", "white") if inverted else ("white", "black")
+    draw.rectangle(TABLE_BOX, fill=background)
+    for y in range(1600, 2700, 120):
+        draw.line((1000, y, 1800, y), fill=ink, width=6)
+    draw.ellipse((100, 100, 900, 900), fill=(30, 160, 60))  # 포장 그림
+    return image.convert(mode)
+
+
+class TestFindTableRegion(unittest.TestCase):
+    """find_table_region 함수 테스트"""
+
+    def assert_contains_table(self, region):
+        self.assertIsNotNone(region)
+        left, top, right, bottom = region
+        self.assertLessEqual(left, TABLE_BOX[0])
+        self.assertLessEqual(top, TABLE_BOX[1])
+        self.assertGreaterEqual(right, TABLE_BOX[2])
+        self.assertGreaterEqual(bottom, TABLE_BOX[3] - 10)
+        # 포장 그림 영역은 제외
+        self.assertGreater(left, 900)
+        self.assertGreater(top, 900)
+
+    def test_finds_table(self):
+        self.assert_contains_table(find_table_region(package_photo()))
+
+    def test_inverted_and_palette_images(self):
+        """흰 선/검은 배경 표와 팔레트 이미지도 탐지"""
+        self.assert_contains_table(find_table_region(package_photo(inverted=True)))
+        self.assert_contains_table(find_table_region(package_photo(mode="P")))
+
+    def test_no_lines(self):
+        self.assertIsNone(find_table_region(Image.new("RGB", (1200, 1600), "white")))
+
+    def test_table_filling_image(self):
+        """표가 이미지 대부분을 차지하면 자를 필요 없음"""
+        image = Image.new("L", (800, 1000), 255)
+        draw = ImageDraw.Draw(image)
+        for y in range(20, 1000, 100):
+            draw.line((0, y, 799, y), fill=0, width=4)
+        self.assertIsNone(find_table_region(image))
+
+
+if __name__ == "__main__":
+    unittest.main()
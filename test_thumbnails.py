@@ -0,0 +1,69 @@
+"""
+섬네일 생성 유닛 테스트
+
+thumbnails.py의 축소/EXIF 회전 반영/저장을 테스트합니다.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+import thumbnails
+
+
+def image_bytes(size, fmt='JPEG', exif=None):
+    buf = io.BytesIO()
+    img = Image.new('RGB', size, 'white')
+    if exif is not None:
+        img.save(buf, fmt, exif=exif)
+    else:
+        img.save(buf, fmt)
+    return buf.getvalue()
+
+
+class TestThumbnails(unittest.TestCase):
+    """섬네일 테스트"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+    def test_resizes_to_max_side(self):
+        data = thumbnails.make_thumbnail(image_bytes((4000, 3000)), size=200)
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.format, thumbnails.THUMBNAIL_FORMAT)
+            self.assertEqual(img.size, (200, 150))
+
+    def test_applies_exif_orientation(self):
+        """세로로 찍은 사진(Orientation=6)은 섬네일에서 세로로 보여야 함"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        data = thumbnails.make_thumbnail(image_bytes((800, 600), exif=exif), size=100)
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.size, (75, 100))
+
+    def test_save_once(self):
+        original = os.path.join(self.tmp_dir, 'label.png')
+        with open(original, 'wb') as f:
+            f.write(image_bytes((640, 480), 'PNG'))
+
+        path = thumbnails.save_thumbnail(original)
+        self.assertEqual(path, original + thumbnails.THUMBNAIL_SUFFIX)
+        mtime = os.stat(path).st_mtime_ns
+        self.assertEqual(thumbnails.save_thumbnail(original), path)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)  # 이미 있으면 다시 만들지 않음
+
+    def test_non_image(self):
+        original = os.path.join(self.tmp_dir, 'fake.jpg')
+        with open(original, 'wb') as f:
+            f.write(b'not an image')
+        self.assertIsNone(thumbnails.save_thumbnail(original))
+        self.assertEqual(os.listdir(self.tmp_dir), ['fake.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+구조화 로깅/추적 유닛 테스트
+
+tracing.py의 요청 ID, span 기록/내보내기, 로그 샘플링과 app.py 요청 훅을 테스트합니다.
+"""
+
+import os
+import json
+import logging
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import tracing
+
+
+class TestSpans(unittest.TestCase):
+    """span 기록 테스트"""
+
+    def test_noop_span_when_disabled(self):
+        """추적이 꺼져 있으면 공용 no-op span 반환"""
+        with patch.object(tracing, 'TRACE_ENABLED', False):
+            with tracing.request_context("req-1"):
+                self.assertIs(tracing.span("ocr"), tracing.NOOP_SPAN)
+        self.assertIs(tracing.span("ocr"), tracing.NOOP_SPAN)
+
+    def test_spans_recorded_and_exported(self):
+        """요청 종료 시 span을 JSON lines로 내보냄"""
+        export_path = os.path.join(tempfile.mkdtemp(), "trace.jsonl")
+        with patch.object(tracing, 'TRACE_ENABLED', True), patch.object(tracing, 'TRACE_EXPORT_PATH', export_path):
+            tokens = tracing.start_request("req-2")
+            with tracing.span("ocr", filename="a.jpg") as s:
+                s.set("backend", "paddle")
+            with self.assertRaises(ValueError):
+                with tracing.span("parse"):
+                    raise ValueError("bad")
+            spans = tracing.end_request(tokens)
+
+        self.assertEqual([s.name for s in spans], ["ocr", "parse"])
+        with open(export_path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(entries[0]["request_id"], "req-2")
+        self.assertEqual(entries[0]["backend"], "paddle")
+        self.assertIsNotNone(entries[0]["duration_ms"])
+        self.assertEqual(entries[1]["error"], "ValueError")
+        self.assertIsNone(tracing.current_request_id())
+
+    def test_request_id_generated(self):
+        """ID를 주지 않으면 새로 발급"""
+        with tracing.request_context() as request_id:
+            self.assertEqual(tracing.current_request_id(), request_id)
+            self.assertEqual(len(request_id), 32)
+
+
+class TestLogging(unittest.TestCase):
+    """구조화 로그/샘플링 테스트"""
+
+    def make_record(self, level=logging.INFO, fields=None):
+        record = logging.LogRecord("ncp.test", level, __file__, 1, "메시지", None, None)
+        record.fields = fields or {}
+        return record
+
+    def test_json_format_includes_fields(self):
+        formatter = tracing.StructuredFormatter("json")
+        record = self.make_record(fields={"filename": "a.jpg"})
+        record.request_id = "req-3"
+        entry = json.loads(formatter.format(record))
+        self.assertEqual(entry["request_id"], "req-3")
+        self.assertEqual(entry["filename"], "a.jpg")
+        self.assertEqual(entry["msg"], "메시지")
+
+    def test_sampling_is_per_request(self):
+        """같은 요청의 로그는 모두 남기거나 모두 버리고, WARNING 이상은 항상 남김"""
+        log_filter = tracing.RequestContextFilter(sample_rate=0.5)
+        kept = set()
+        for i in range(50):
+            with tracing.request_context(f"req-{i}"):
+                first = log_filter.filter(self.make_record())
+                self.assertEqual(first, log_filter.filter(self.make_record()))
+                self.assertTrue(log_filter.filter(self.make_record(logging.WARNING)))
+                kept.add(first)
+        self.assertEqual(kept, {True, False})
+
+
+class TestAppRequestId(unittest.TestCase):
+    """app.py 요청 훅 테스트"""
+
+    def setUp(self):
+        from app import app
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_request_id_header(self):
+        response = self.client.get('/', headers={'X-Request-ID': 'client-id'})
+        self.assertEqual(response.headers.get('X-Request-ID'), 'client-id')
+
+        response = self.client.get('/')
+        self.assertEqual(len(response.headers.get('X-Request-ID')), 32)
+        self.assertIsNone(tracing.current_request_id())
+
+    def test_invalid_request_id_replaced(self):
+        """너무 길거나 허용하지 않는 문자가 있는 X-Request-ID는 새로 발급"""
+        for value in ('x' * 65, 'id with space', 'id\u00e9', '<script>'):
+            response = self.client.get('/', headers={'X-Request-ID': value})
+            request_id = response.headers.get('X-Request-ID')
+            self.assertNotEqual(request_id, value)
+            self.assertEqual(len(request_id), 32)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,105 @@
+"""
+업로드 저장소 유닛 테스트
+
+upload_store.py의 세션 디렉터리 저장, 초기화(discard), TTL/용량 정리를 테스트합니다.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import upload_store
+from upload_store import UploadStore, TRASH_DIR, SWEEP_LOCK_FILE, new_upload_id, valid_upload_id
+
+
+class TestUploadStore(unittest.TestCase):
+    """UploadStore 테스트"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.store = UploadStore(self.root, ttl=100, max_bytes=250)
+
+    def save(self, size, age=0):
+        upload_id = new_upload_id()
+        self.store.save(upload_id, 'a.png', b'x' * size)
+        mtime = time.time() - age
+        os.utime(self.store.path(upload_id), (mtime, mtime))
+        return upload_id
+
+    def test_save_and_discard(self):
+        upload_id = new_upload_id()
+        path = self.store.save(upload_id, 'a.png', b'img')
+        self.assertEqual(path, os.path.join(self.root, upload_id, 'a.png'))
+        self.assertTrue(self.store.discard(upload_id))
+        self.assertFalse(os.path.exists(self.store.path(upload_id)))
+        self.assertEqual(len(os.listdir(os.path.join(self.root, TRASH_DIR))), 1)
+        self.assertFalse(self.store.discard(upload_id))  # 이미 정리됨
+
+        # 초기화 후 같은 세션으로 다시 업로드해도 저장됨
+        self.store.save(upload_id, 'b.png', b'img')
+        self.assertTrue(os.path.exists(self.store.path(upload_id, 'b.png')))
+
+    def test_sweep_ttl(self):
+        old = self.save(10, age=500)
+        fresh = self.save(10)
+        result = self.store.sweep()
+        self.assertEqual((result['ttl'], result['quota'], result['dirs']), (1, 0, 1))
+        self.assertFalse(os.path.exists(self.store.path(old)))
+        self.assertTrue(os.path.exists(self.store.path(fresh)))
+
+    @unittest.skipIf(upload_store.fcntl is None, "파일 잠금 미지원")
+    def test_one_sweeper_per_root(self):
+        """같은 루트를 쓰는 워커 중 잠금을 잡은 한 곳만 정리하고, 그 워커가 멈추면 다른 워커가 이어받음"""
+        other = UploadStore(self.root, ttl=100, max_bytes=250)
+        self.assertTrue(self.store.acquire_sweep_lock())
+        self.assertTrue(self.store.acquire_sweep_lock())
+        self.assertFalse(other.acquire_sweep_lock())
+        self.store.stop_sweeper()
+        self.assertTrue(other.acquire_sweep_lock())
+        other.stop_sweeper()
+
+        old = self.save(10, age=500)
+        os.utime(os.path.join(self.root, SWEEP_LOCK_FILE), (0, 0))
+        self.store.sweep()
+        self.assertTrue(os.path.exists(os.path.join(self.root, SWEEP_LOCK_FILE)))  # 잠금 파일은 정리 대상이 아님
+        self.assertFalse(os.path.exists(self.store.path(old)))
+
+    def test_retained_until(self):
+        """결과가 가리키는 디렉터리는 TTL/초기화와 관계없이 보관 시각까지 남고, 용량 초과 시 마지막에 정리"""
+        retained = self.save(10, age=500)
+        self.store.retain(retained, time.time() + 1000)
+        self.assertFalse(self.store.discard(retained))
+        self.store.sweep()
+        self.assertTrue(os.path.exists(self.store.path(retained, 'a.png')))
+
+        newer = self.save(245)
+        result = self.store.sweep()
+        self.assertEqual(result['quota'], 1)
+        self.assertFalse(os.path.exists(self.store.path(newer)))
+        self.assertTrue(os.path.exists(self.store.path(retained)))
+
+        self.store.sweep(now=time.time() + 2000)
+        self.assertFalse(os.path.exists(self.store.path(retained)))
+
+    def test_sweep_quota_evicts_oldest(self):
+        oldest = self.save(100, age=30)
+        middle = self.save(100, age=20)
+        newest = self.save(100, age=10)
+        result = self.store.sweep()
+        self.assertEqual((result['quota'], result['bytes']), (1, 200))
+        self.assertFalse(os.path.exists(self.store.path(oldest)))
+        self.assertTrue(os.path.exists(self.store.path(middle)))
+        self.assertTrue(os.path.exists(self.store.path(newest)))
+        self.assertEqual(self.store.collect()[0][3], [({}, 200)])
+
+    def test_valid_upload_id(self):
+        self.assertTrue(valid_upload_id(new_upload_id()))
+        for value in (None, '', '..', TRASH_DIR, 'a/b'):
+            self.assertFalse(valid_upload_id(value))
+
+
+if __name__ == '__main__':
+    unittest.main()
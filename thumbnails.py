@@ -0,0 +1,64 @@
+import os
+import threading
+from io import BytesIO
+
+from PIL import Image, ImageOps, features
+
+import tracing
+
+# 업로드 이미지 섬네일
+# - 결과 화면의 작은 섬네일 칸에 원본(수 MB) 대신 축소본을 내려보냅니다.
+# - 업로드 시 한 번 만들어 원본 옆에 저장하고(<원본파일명>.thumb.webp), 원본은 상세보기에서만 불러옵니다.
+
+THUMBNAIL_SIZE = int(os.environ.get("THUMBNAIL_SIZE", "320"))  # 긴 변 기준 최대 픽셀
+THUMBNAIL_QUALITY = int(os.environ.get("THUMBNAIL_QUALITY", "75"))
+THUMBNAIL_FORMAT = "WEBP" if features.check("webp") else "JPEG"
+THUMBNAIL_SUFFIX = ".thumb.webp" if THUMBNAIL_FORMAT == "WEBP" else ".thumb.jpg"
+THUMBNAIL_MIMETYPE = "image/webp" if THUMBNAIL_FORMAT == "WEBP" else "image/jpeg"
+
+logger = tracing.get_logger("thumbnails")
+
+# 같은 파일의 섬네일을 여러 요청이 동시에 만들지 않도록 경로별 잠금 (스트라이프)
+_LOCKS = [threading.Lock() for _ in range(16)]
+
+
+def thumbnail_path(original_path: str) -> str:
+    return original_path + THUMBNAIL_SUFFIX
+
+
+def make_thumbnail(content: bytes, size: int = THUMBNAIL_SIZE) -> bytes:
+    """이미지 바이트 -> 축소된 섬네일 바이트 (EXIF 회전 반영)"""
+    with Image.open(BytesIO(content)) as img:
+        # JPEG은 디코딩 단계에서 미리 축소 (큰 사진도 빠르게 처리)
+        img.draft("RGB", (size, size))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((size, size))
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        if THUMBNAIL_FORMAT == "JPEG" and img.mode == "RGBA":
+            img = img.convert("RGB")
+        out = BytesIO()
+        img.save(out, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+        return out.getvalue()
+
+
+def save_thumbnail(original_path: str, content: bytes = None):
+    """섬네일을 만들어 저장하고 경로를 반환. 이미지가 아니라 만들 수 없으면 None"""
+    path = thumbnail_path(original_path)
+    with _LOCKS[hash(path) % len(_LOCKS)]:
+        if os.path.exists(path):
+            return path
+        try:
+            if content is None:
+                with open(original_path, "rb") as f:
+                    content = f.read()
+            data = make_thumbnail(content)
+        except Exception as e:
+            logger.debug("섬네일 생성 실패", path=os.path.basename(original_path), error=str(e))
+            return None
+        # 반쯤 쓰인 파일이 제공되지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# 구조화 로깅 + 단계별 타이밍(span) 추적
+# - 로그: logger.info("이벤트", key=value, ...) 형태로 필드를 남기고 레벨/샘플링으로 걸러냅니다.
+# - 요청 ID: 요청(또는 백그라운드 작업)마다 새로 발급되어 로그와 Clova 호출 헤더에 실립니다.
+# - span: TRACE_ENABLED일 때만 기록하며, 꺼져 있으면 공용 no-op 객체를 돌려줘 비용이 없습니다.
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")  # text | json
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))  # WARNING 미만 로그 샘플링 비율
+TRACE_ENABLED = os.environ.get("TRACE_ENABLED", "0") == "1"
+TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH", "")  # span을 JSON lines로 내보낼 파일
+
+_request_id: ContextVar = ContextVar("request_id", default=None)
+_spans: ContextVar = ContextVar("spans", default=None)
+_export_lock = threading.Lock()
+
+# Logger._log가 받는 키워드 (그 외 키워드는 구조화 필드로 취급)
+_LOG_KWARGS = {"exc_info", "stack_info", "stacklevel", "extra"}
+
+
+# 클라이언트가 보낸 X-Request-ID는 로그와 응답 헤더에 그대로 실리므로 길이/문자를 제한
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def valid_request_id(value) -> bool:
+    return isinstance(value, str) and _REQUEST_ID_PATTERN.fullmatch(value) is not None
+
+
+def current_request_id():
+    """현재 요청/작업의 ID (없으면 None)"""
+    return _request_id.get()
+
+
+class RequestContextFilter(logging.Filter):
+    """로그 레코드에 요청 ID를 붙이고, WARNING 미만은 요청 단위로 샘플링"""
+
+    def __init__(self, sample_rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        request_id = _request_id.get()
+        record.request_id = request_id or "-"
+        if not hasattr(record, "fields"):
+            record.fields = {}
+        if self.sample_rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if request_id:
+            # 같은 요청의 로그는 모두 남기거나 모두 버림
+            return (zlib.crc32(request_id.encode()) % 10000) < self.sample_rate * 10000
+        return random.random() < self.sample_rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """text: '시간 레벨 [요청ID] 이름: 메시지 key=value', json: 한 줄 JSON"""
+
+    def __init__(self, fmt_type: str = LOG_FORMAT):
+        super().__init__()
+        self.fmt_type = fmt_type
+
+    def format(self, record):
+        fields = getattr(record, "fields", {})
+        if self.fmt_type == "json":
+            entry = {
+                "ts": round(record.created, 3),
+                "level": record.levelname,
+                "logger": record.name,
+                "request_id": getattr(record, "request_id", "-"),
+                "msg": record.getMessage(),
+            }
+            entry.update(fields)
+            if record.exc_info:
+                entry["exc"] = self.formatException(record.exc_info)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record)} {record.levelname} [{getattr(record, 'request_id', '-')}] {record.name}: {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """logger.info("메시지", key=value) 형태의 키워드를 구조화 필드로 전달"""
+
+    def process(self, msg, kwargs):
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in _LOG_KWARGS}
+        extra = dict(kwargs.get("extra") or {})
+        extra["fields"] = fields
+        kwargs["extra"] = extra
+        return msg, kwargs
+
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt_type: str = LOG_FORMAT, sample_rate: float = LOG_SAMPLE_RATE):
+    """'ncp' 로거 계층에 핸들러/필터를 한 번만 설정"""
+    global _configured
+    with _configure_lock:
+        root = logging.getLogger("ncp")
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        handler = logging.StreamHandler()
+        handler.setFormatter(StructuredFormatter(fmt_type))
+        handler.addFilter(RequestContextFilter(sample_rate))
+        root.addHandler(handler)
+        root.setLevel(level)
+        root.propagate = False
+        _configured = True
+
+
+def get_logger(name: str) -> StructuredLogger:
+    if not _configured:
+        configure_logging()
+    return StructuredLogger(logging.getLogger(f"ncp.{name}"), {})
+
+
+class Span:
+    """단계 하나의 시작/소요 시간과 속성"""
+
+    __slots__ = ("name", "start", "duration_ms", "attrs")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.start = time.time()
+        self.duration_ms = None
+        self.attrs = attrs
+
+    def set(self, key: str, value):
+        self.attrs[key] = value
+
+    def to_dict(self, request_id) -> dict:
+        entry = {"request_id": request_id, "span": self.name, "start": round(self.start, 6),
+                 "duration_ms": self.duration_ms}
+        entry.update(self.attrs)
+        return entry
+
+
+class _NoopSpan:
+    """추적 비활성화 시 사용하는 공용 span (아무것도 기록하지 않음)"""
+
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("span", "spans", "t0")
+
+    def __init__(self, span: Span, spans: list):
+        self.span = span
+        self.spans = spans
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.duration_ms = round((time.perf_counter() - self.t0) * 1000, 3)
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        self.spans.append(self.span)
+        return False
+
+
+def span(name: str, **attrs):
+    """with span("ocr", filename=...) as s: ... s.set("backend", "paddle")"""
+    spans = _spans.get()
+    if spans is None:
+        return NOOP_SPAN
+    return _ActiveSpan(Span(name, attrs), spans)
+
+
+def start_request(request_id=None):
+    """요청/작업 컨텍스트 시작. end_request에 넘길 토큰을 반환 (request_id가 없거나 형식이 맞지 않으면 새로 발급)"""
+    request_id = request_id if valid_request_id(request_id) else new_request_id()
+    return (_request_id.set(request_id), _spans.set([] if TRACE_ENABLED else None))
+
+
+def end_request(tokens):
+    """컨텍스트 종료. 기록된 span을 내보내고 요청 ID/span을 이전 값으로 되돌림"""
+    request_id = _request_id.get()
+    spans = _spans.get()
+    if spans:
+        export_spans(request_id, spans)
+    id_token, spans_token = tokens
+    _spans.reset(spans_token)
+    _request_id.reset(id_token)
+    return spans or []
+
+
+@contextmanager
+def request_context(request_id=None):
+    """백그라운드 작업 등에서 쓰는 with 버전"""
+    tokens = start_request(request_id)
+    try:
+        yield _request_id.get()
+    finally:
+        end_request(tokens)
+
+
+def export_spans(request_id, spans):
+    """span들을 TRACE_EXPORT_PATH에 JSON lines로 추가"""
+    if not TRACE_EXPORT_PATH:
+        return
+    lines = "".join(json.dumps(s.to_dict(request_id), ensure_ascii=False, default=str) + "\n" for s in spans)
+    with _export_lock:
+        with open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as f:
+            f.write(lines)
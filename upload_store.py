@@ -0,0 +1,212 @@
+import os
+import re
+import time
+import uuid
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: 스위퍼 잠금 없이 실행 (단일 프로세스 가정)
+    fcntl = None
+
+import tracing
+from metrics import UPLOAD_EVICTIONS
+
+# 업로드 임시 파일 저장소
+# - 세션(또는 API 요청)마다 <루트>/<upload_id>/ 하위 디렉터리에 저장합니다.
+# - 세션 정리는 디렉터리를 휴지통(<루트>/.trash/)으로 rename 한 번만 하고(O(1)),
+#   실제 삭제와 오래된/용량 초과 디렉터리 정리는 백그라운드 스위퍼가 맡습니다.
+# - 저장된 분석 결과가 가리키는 디렉터리는 결과 보관 기간까지 남깁니다 (retain, 디렉터리 안의 .retain 파일).
+# - 여러 워커 프로세스가 같은 루트를 쓰므로 <루트>/.sweeper.lock 파일 잠금을 잡은 프로세스 하나만 정리합니다.
+#   잡은 프로세스가 끝나면 잠금이 풀리고 다른 프로세스가 다음 주기에 이어받습니다.
+
+UPLOAD_TTL = float(os.environ.get("UPLOAD_TTL", "3600"))  # 마지막 업로드 이후 보관 시간(초)
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))  # 전체 용량 한도
+UPLOAD_SWEEP_INTERVAL = float(os.environ.get("UPLOAD_SWEEP_INTERVAL", "60"))
+
+TRASH_DIR = ".trash"
+RETAIN_FILE = ".retain"  # 이 시각(epoch 초)까지 보관
+SWEEP_LOCK_FILE = ".sweeper.lock"
+
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+logger = tracing.get_logger("upload_store")
+
+
+def new_upload_id() -> str:
+    return uuid.uuid4().hex
+
+
+def valid_upload_id(upload_id) -> bool:
+    """세션/URL로 받은 upload_id 형식 확인 (경로 조작 방지)"""
+    return isinstance(upload_id, str) and bool(_UPLOAD_ID_PATTERN.match(upload_id))
+
+
+def _retained_until(path: str) -> float:
+    try:
+        with open(os.path.join(path, RETAIN_FILE)) as f:
+            return float(f.read())
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return total
+
+
+class UploadStore:
+    """업로드 파일을 upload_id별 디렉터리에 저장하고 TTL/용량 기준으로 정리"""
+
+    def __init__(self, root: str, ttl: float = UPLOAD_TTL, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.last_sweep = {"bytes": 0, "dirs": 0}
+        self._sweeper = None
+        self._sweep_lock = None  # 잡은 잠금 파일 (프로세스가 끝날 때까지 유지)
+        self._stop = threading.Event()
+        os.makedirs(os.path.join(root, TRASH_DIR), exist_ok=True)
+
+    def path(self, upload_id: str, filename: str = "") -> str:
+        return os.path.join(self.root, upload_id, filename) if filename else os.path.join(self.root, upload_id)
+
+    def save(self, upload_id: str, filename: str, content: bytes) -> str:
+        """파일을 저장하고 경로를 반환"""
+        directory = self.path(upload_id)
+        for attempt in range(2):
+            os.makedirs(directory, exist_ok=True)
+            try:
+                with open(os.path.join(directory, filename), "wb") as f:
+                    f.write(content)
+                break
+            except FileNotFoundError:
+                # 같은 세션의 초기화(discard)와 겹친 경우 디렉터리를 다시 만들고 한 번 더 시도
+                if attempt:
+                    raise
+        return os.path.join(directory, filename)
+
+    def retain(self, upload_id: str, until: float):
+        """저장된 결과가 가리키는 디렉터리를 until(epoch 초)까지 TTL/초기화와 관계없이 보관"""
+        path = self.path(upload_id)
+        if not os.path.isdir(path) or _retained_until(path) >= until:
+            return
+        temp = os.path.join(path, f"{RETAIN_FILE}.{new_upload_id()}")
+        with open(temp, "w") as f:
+            f.write(str(until))
+        os.replace(temp, os.path.join(path, RETAIN_FILE))
+
+    def discard(self, upload_id: str) -> bool:
+        """세션 디렉터리를 휴지통으로 옮김 (삭제는 스위퍼가 처리). 결과가 가리키는 디렉터리는 남김"""
+        source = self.path(upload_id)
+        if _retained_until(source) > time.time():
+            return False
+        try:
+            os.rename(source, os.path.join(self.root, TRASH_DIR, f"{upload_id}.{new_upload_id()}"))
+        except OSError:
+            return False
+        UPLOAD_EVICTIONS.labels("reset").inc()
+        return True
+
+    def sweep(self, now: float = None) -> dict:
+        """휴지통 비우기 -> TTL 지난 디렉터리 삭제 -> 용량 한도를 넘으면 오래된 순으로 삭제"""
+        now = time.time() if now is None else now
+        trash = os.path.join(self.root, TRASH_DIR)
+        for name in os.listdir(trash):
+            shutil.rmtree(os.path.join(trash, name), ignore_errors=True)
+
+        dirs = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name in (TRASH_DIR, SWEEP_LOCK_FILE):
+                    continue
+                try:
+                    mtime = entry.stat(follow_symlinks=False).st_mtime
+                except OSError:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append((mtime, entry.name, entry.path))
+                elif now - mtime > self.ttl:
+                    # 디렉터리 구분 이전(루트에 바로 저장하던) 파일
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+
+        removed = {"ttl": 0, "quota": 0}
+        kept = []
+        for mtime, name, path in dirs:
+            retained = _retained_until(path) > now
+            if now - mtime > self.ttl and not retained:
+                shutil.rmtree(path, ignore_errors=True)
+                removed["ttl"] += 1
+            else:
+                kept.append((retained, mtime, name, path, _dir_size(path)))
+
+        total = sum(size for *_, size in kept)
+        kept.sort()  # 용량 초과 시 결과가 가리키지 않는 디렉터리부터, 오래된 순으로
+        while kept and total > self.max_bytes:
+            _, _, _, path, size = kept.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed["quota"] += 1
+
+        for reason, count in removed.items():
+            if count:
+                UPLOAD_EVICTIONS.labels(reason).inc(count)
+        self.last_sweep = {"bytes": total, "dirs": len(kept)}
+        if removed["ttl"] or removed["quota"]:
+            logger.info("업로드 디렉터리 정리", bytes=total, dirs=len(kept), **removed)
+        return {"bytes": total, "dirs": len(kept), **removed}
+
+    def collect(self):
+        """/metrics collector (마지막 정리 시점 기준 사용량, 스위퍼를 맡은 프로세스만 값이 있음)"""
+        return [
+            ("ncp_upload_store_bytes", "gauge", "임시 업로드 저장소 사용량 (마지막 정리 기준)",
+             [({}, self.last_sweep["bytes"])]),
+            ("ncp_upload_store_dirs", "gauge", "임시 업로드 디렉터리 수 (마지막 정리 기준)",
+             [({}, self.last_sweep["dirs"])]),
+        ]
+
+    def acquire_sweep_lock(self) -> bool:
+        """이 프로세스가 정리를 맡았는지 (같은 루트를 쓰는 프로세스 중 한 곳만 파일 잠금을 잡음)"""
+        if self._sweep_lock is not None or fcntl is None:
+            return True
+        lock_file = open(os.path.join(self.root, SWEEP_LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._sweep_lock = lock_file
+        return True
+
+    def start_sweeper(self, interval: float = UPLOAD_SWEEP_INTERVAL):
+        """백그라운드 정리 스레드 시작 (이미 실행 중이면 무시). 잠금을 잡은 프로세스에서만 정리"""
+        if self._sweeper is not None or interval <= 0:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    if self.acquire_sweep_lock():
+                        self.sweep()
+                except Exception as e:
+                    logger.warning("업로드 디렉터리 정리 중 오류", error=str(e))
+
+        self._sweeper = threading.Thread(target=run, name="upload-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+        if self._sweep_lock is not None:
+            self._sweep_lock.close()  # 다른 프로세스가 정리를 이어받도록 잠금 해제
+            self._sweep_lock = None